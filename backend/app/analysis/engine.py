@@ -39,6 +39,9 @@ MAX_POST_FRESHNESS_SECONDS = 10 * 60
 EXPECTED_POST_INTERVAL_SECONDS = 60
 SEQUENCE_GAP_FACTOR = 1.8
 MAX_CLOCK_SKEW_SECONDS = 30
+# Samples plus rapprochés que cet écart (payload multi-samples d'un même fetch) comptent pour une
+# seule collecte dans MIN_POST_SAMPLES : un fetch ne couvre pas à lui seul la fenêtre d'observation.
+MIN_COLLECTION_SPACING_SECONDS = EXPECTED_POST_INTERVAL_SECONDS * 0.75
 MIN_DATA_QUALITY_FOR_OK = 0.9
 OK_BLOCKING_QUALITY_ISSUE_PREFIXES = (
     "min_post_samples",
@@ -385,16 +388,6 @@ def _evaluate_data_quality(
     issues: list[str] = []
     score = 1.0
 
-    post_count = len(post_samples)
-    if post_count < MIN_POST_SAMPLES:
-        missing_ratio = (MIN_POST_SAMPLES - post_count) / max(MIN_POST_SAMPLES, 1)
-        score -= min(0.4, 0.4 * missing_ratio)
-        issues.append(f"min_post_samples {post_count}/{MIN_POST_SAMPLES}")
-
-    if len(pre_samples) == 0:
-        score -= 0.2
-        issues.append("missing_pre_samples")
-
     pre_times = sorted(
         _as_utc(sample.collected_at) for sample in pre_samples if getattr(sample, "collected_at", None) is not None
     )
@@ -402,6 +395,17 @@ def _evaluate_data_quality(
         _as_utc(sample.collected_at) for sample in post_samples if getattr(sample, "collected_at", None) is not None
     )
 
+    post_count = len(post_samples)
+    post_collections = _distinct_collections(post_times) + (post_count - len(post_times))
+    if post_collections < MIN_POST_SAMPLES:
+        missing_ratio = (MIN_POST_SAMPLES - post_collections) / max(MIN_POST_SAMPLES, 1)
+        score -= min(0.4, 0.4 * missing_ratio)
+        issues.append(f"min_post_samples {post_collections}/{MIN_POST_SAMPLES}")
+
+    if len(pre_samples) == 0:
+        score -= 0.2
+        issues.append("missing_pre_samples")
+
     if post_count > 0 and len(post_times) != post_count:
         score -= 0.25
         issues.append("missing_post_timestamps")
@@ -439,6 +443,20 @@ def _evaluate_data_quality(
     return round(score, 2), issues
 
 
+def _distinct_collections(times: list[datetime]) -> int:
+    """Collectes distinctes d'une série triée : un sample ouvre une collecte s'il est assez loin de la précédente."""
+    count = 0
+    collection_started_at: datetime | None = None
+    for collected_at in times:
+        if (
+            collection_started_at is None
+            or (collected_at - collection_started_at).total_seconds() >= MIN_COLLECTION_SPACING_SECONDS
+        ):
+            count += 1
+            collection_started_at = collected_at
+    return count
+
+
 def _append_data_quality_details(
     *,
     details: list[str],
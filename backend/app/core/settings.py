@@ -48,8 +48,113 @@ class Settings(BaseSettings):
     TWOFA_PREAUTH_TTL_SECONDS: int = 300
     SCHEDULER_POLL_INTERVAL_SECONDS: int = 10
     SCHEDULER_MAX_CONCURRENT_JOBS: int = 10
-    SCHEDULER_RUNNING_STUCK_SECONDS: int = 600
+    SCHEDULER_WORKER_QUEUE_SIZE: int = 10
+    SCHEDULER_RUNNING_STUCK_SECONDS: int = 600  # jobs running sans lease (claims antérieurs aux leases)
+    SCHEDULER_LEASE_SECONDS: int = 30
+    SCHEDULER_SHARDING_ENABLED: bool = True
+    SCHEDULER_SHARD_COUNT: int = 256  # ne pas changer avec des jobs pending (shard_key stocké)
     SCHEDULER_FAIRNESS_LOOKAHEAD_MULTIPLIER: int = 5
+    SCHEDULER_SCHEDULE_JITTER_SECONDS: float = 5.0  # étalement des post_collect / analysis créés à la même seconde
+    SCHEDULER_DEADLINE_URGENCY_SECONDS: int = 15  # marge sous laquelle un job passe avant la fairness (EDF)
+    SCHEDULER_QUEUE_METRICS_INTERVAL_SECONDS: int = 30  # files dues / backlog tenants (les totaux par statut sont incrémentaux)
+    SCHEDULER_TENANT_METRICS_TOP_N: int = 20  # tenants exportés par seqpulse_scheduler_tenant_* (cardinalité)
+    SCHEDULER_OBSERVATION_SESSIONS_ENABLED: bool = True  # false : N jobs post_collect + 1 analysis par déploiement
+    SCHEDULER_DEPENDENCY_GRACE_SECONDS: int = 600  # attente max de l'analyse au-delà de son heure de repli (retries de collecte)
+    # Durée d'exécution max par type de job (watchdog : annulation, remise en file avec backoff, slot libéré)
+    # et statement_timeout Postgres des sessions de job (borné par la durée du job, 0 = désactivé)
+    SCHEDULER_JOB_TIMEOUT_COLLECT_SECONDS: int = 30
+    SCHEDULER_JOB_TIMEOUT_ANALYSIS_SECONDS: int = 300
+    SCHEDULER_JOB_TIMEOUT_NOTIFICATION_SECONDS: int = 60
+    SCHEDULER_STATEMENT_TIMEOUT_SECONDS: int = 30
+    SCHEDULER_WATCHDOG_ENABLED: bool = True
+    # Retries par type de job : backoff nominal (un retry par valeur, en secondes) allongé d'un jitter
+    # aléatoire (0 à ratio × délai), âge max depuis l'heure prévue au-delà duquel le retry est abandonné
+    # (0 = sans limite). Jobs épuisés : scheduled_jobs_dead_letter (purgée après N jours, 0 = conservée)
+    SCHEDULER_RETRY_JITTER_RATIO: float = 0.2
+    SCHEDULER_RETRY_COLLECT_BACKOFF_SECONDS: str = "10,30,60"
+    SCHEDULER_RETRY_COLLECT_MAX_AGE_SECONDS: int = 120  # un sample rejoué plusieurs minutes après ne mesure plus le déploiement
+    SCHEDULER_RETRY_ANALYSIS_BACKOFF_SECONDS: str = "30,120,300"
+    SCHEDULER_RETRY_ANALYSIS_MAX_AGE_SECONDS: int = 3600
+    SCHEDULER_RETRY_NOTIFICATION_BACKOFF_SECONDS: str = "30,120,300"
+    SCHEDULER_RETRY_NOTIFICATION_MAX_AGE_SECONDS: int = 21600
+    SCHEDULER_DEAD_LETTER_RETENTION_DAYS: int = 90
+    # Rattrapage après indisponibilité : seuil de jobs en retard (deadline dépassée), samples POST gardés
+    # par déploiement (0 = MIN_POST_SAMPLES de l'analyse), déploiements réduits par tick
+    SCHEDULER_CATCHUP_BACKLOG_THRESHOLD: int = 200
+    SCHEDULER_CATCHUP_SAMPLES_PER_DEPLOYMENT: int = 0
+    SCHEDULER_CATCHUP_DEPLOYMENTS_PER_TICK: int = 200
+    SCHEDULER_CATCHUP_CHECK_INTERVAL_SECONDS: int = 30  # COUNT des jobs en retard au plus à ce rythme
+    # Rétention de scheduled_jobs : jobs terminés sortis de la table chaude après N jours (0 = jamais),
+    # copiés dans scheduled_jobs_archive ("archive") ou supprimés ("delete"), par lots
+    SCHEDULER_ARCHIVE_ENABLED: bool = True
+    SCHEDULER_ARCHIVE_MODE: str = "archive"  # "archive" | "delete"
+    SCHEDULER_ARCHIVE_COMPLETED_AFTER_DAYS: int = 7  # completed et skipped
+    SCHEDULER_ARCHIVE_FAILED_AFTER_DAYS: int = 30
+    SCHEDULER_ARCHIVE_RETENTION_DAYS: int = 180  # purge de scheduled_jobs_archive (0 = conservée)
+    SCHEDULER_ARCHIVE_BATCH_SIZE: int = 1000
+    SCHEDULER_ARCHIVE_MAX_BATCHES_PER_RUN: int = 50
+    SCHEDULER_ARCHIVE_INTERVAL_SECONDS: int = 300
+    # Lanes d'exécution : part du pool, ordre de claim (0 = d'abord), lookahead, emprunt de slots libres
+    SCHEDULER_LANE_COLLECTION_SHARE: float = 0.5
+    SCHEDULER_LANE_COLLECTION_PRIORITY: int = 0
+    SCHEDULER_LANE_COLLECTION_LOOKAHEAD: int = 5
+    SCHEDULER_LANE_COLLECTION_CAN_BORROW: bool = True
+    SCHEDULER_LANE_ANALYSIS_SHARE: float = 0.2
+    SCHEDULER_LANE_ANALYSIS_PRIORITY: int = 1
+    SCHEDULER_LANE_ANALYSIS_LOOKAHEAD: int = 2
+    SCHEDULER_LANE_ANALYSIS_CAN_BORROW: bool = False
+    SCHEDULER_LANE_NOTIFICATIONS_SHARE: float = 0.3
+    SCHEDULER_LANE_NOTIFICATIONS_PRIORITY: int = 2
+    SCHEDULER_LANE_NOTIFICATIONS_LOOKAHEAD: int = 5
+    SCHEDULER_LANE_NOTIFICATIONS_CAN_BORROW: bool = False
+    SCHEDULER_LISTEN_NOTIFY_ENABLED: bool = True
+    SCHEDULER_EXECUTION_MODE: str = "thread"  # "thread" | "async"
+    SCHEDULER_ASYNC_MAX_IN_FLIGHT: int = 1000
+    SCHEDULER_ASYNC_DB_THREADS: int = 4
+    SCHEDULER_EMBEDDED_POLLER: bool = True  # false : jobs exécutés par `python -m app.scheduler.worker`
+    SCHEDULER_DRAIN_GRACE_SECONDS: int = 20  # arrêt : délai pour finir les jobs en cours avant de les rendre (< terminationGracePeriod)
+    SCHEDULER_WORKER_METRICS_PORT: int = 0
+    SCHEDULER_HEALTH_STATEMENT_TIMEOUT_MS: int = 2000  # requêtes du snapshot /health (Postgres, 0 = désactivé)
+
+    # Client HTTP partagé de la collecte : un pool keep-alive par hôte d'endpoint, réutilisé d'un sample
+    # à l'autre (expiry > intervalle entre samples), plafond de connexions simultanées par hôte (sinon
+    # MAX_CONNECTIONS par pool), HTTP/2 si le paquet h2 est installé, cache DNS (0 = résolution à chaque
+    # nouvelle connexion)
+    COLLECTOR_HTTP_MAX_CONNECTIONS: int = 200
+    COLLECTOR_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 100
+    COLLECTOR_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 75.0
+    COLLECTOR_HTTP_MAX_CONNECTIONS_PER_HOST: int = 4
+    COLLECTOR_HTTP2_ENABLED: bool = False
+    COLLECTOR_DNS_CACHE_TTL_SECONDS: int = 60
+
+    # Coalescence des fetchs : les collectes simultanées d'un même endpoint (mêmes identifiants HMAC)
+    # partagent un seul appel HTTP, et son résultat sert encore pendant la fenêtre (0 = appels en cours seulement)
+    COLLECTOR_SINGLE_FLIGHT_ENABLED: bool = True
+    COLLECTOR_SINGLE_FLIGHT_WINDOW_MS: int = 1000
+
+    # Circuit breaker par hôte d'endpoint : ouvert quand au moins MIN_REQUESTS fetchs sur la fenêtre
+    # échouent à FAILURE_RATE ou plus ; les collectes échouent alors sans appel réseau (sample perdu),
+    # puis HALF_OPEN_MAX_CALLS fetchs d'essai après le cooldown
+    COLLECTOR_CIRCUIT_BREAKER_ENABLED: bool = True
+    COLLECTOR_CIRCUIT_FAILURE_RATE: float = 0.5
+    COLLECTOR_CIRCUIT_MIN_REQUESTS: int = 5
+    COLLECTOR_CIRCUIT_WINDOW_SECONDS: int = 60
+    COLLECTOR_CIRCUIT_COOLDOWN_SECONDS: int = 30
+    COLLECTOR_CIRCUIT_HALF_OPEN_MAX_CALLS: int = 1
+
+    # Écriture groupée des MetricSample (INSERT multi-lignes ON CONFLICT DO NOTHING) : flush dès
+    # BATCH_SIZE lignes ou FLUSH_INTERVAL_MS après la plus ancienne (court : un lot ne dépasse pas le
+    # nombre de collectes en cours, chacune attendant son flush) ; false = un commit par sample
+    COLLECTOR_BUFFERED_WRITES_ENABLED: bool = False
+    COLLECTOR_WRITE_BATCH_SIZE: int = 500
+    COLLECTOR_WRITE_FLUSH_INTERVAL_MS: int = 5
+    COLLECTOR_WRITE_ACK_TIMEOUT_SECONDS: float = 30.0  # attente max du flush par une collecte (0 = sans limite)
+
+    # Payload multi-samples ({"samples": [{"timestamp": ..., ...}]}) : nombre max de samples par fetch ;
+    # les samples plus vieux que MAX_AGE ou en avance de plus de MAX_FUTURE_SKEW sont ignorés
+    COLLECTOR_MAX_SAMPLES_PER_PAYLOAD: int = 60
+    COLLECTOR_SAMPLE_MAX_AGE_SECONDS: int = 120
+    COLLECTOR_SAMPLE_MAX_FUTURE_SKEW_SECONDS: int = 30
 
     class Config:
         env_file = ".env"
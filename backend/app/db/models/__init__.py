@@ -11,3 +11,7 @@ from .auth_challenge import AuthChallenge
 from .email_delivery import EmailDelivery
 from .slack_delivery import SlackDelivery
 from .project_endpoint_event import ProjectEndpointEvent
+from .scheduler_worker import SchedulerWorker
+from .scheduled_job_count import ScheduledJobCount
+from .scheduled_job_archive import ScheduledJobArchive
+from .scheduled_job_dead_letter import ScheduledJobDeadLetter
@@ -1,16 +1,28 @@
 # app/db/models/scheduled_job.py
-from sqlalchemy import Column, String, Integer, DateTime, Text, Index, ForeignKey
+from sqlalchemy import Column, String, Integer, SmallInteger, DateTime, Text, Index, ForeignKey, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 import uuid
 
 from app.db.base import Base
 
+# Index partiels : seules les lignes actives (pending/running) sont indexées pour le claim et la
+# recovery ; leur taille ne dépend pas de l'historique. Les lignes terminées n'ont qu'un index
+# pour l'archivage (app/scheduler/retention.py), sur updated_at : l'instant du statut terminal.
+_PENDING = text("status = 'pending'")
+_RUNNING = text("status = 'running'")
+_TERMINAL = text("status IN ('completed', 'failed', 'skipped')")
+
 
 class ScheduledJob(Base):
     __tablename__ = "scheduled_jobs"
     __table_args__ = (
-        Index("ix_scheduled_jobs_status_scheduled_at", "status", "scheduled_at"),
+        Index("ix_scheduled_jobs_pending_scheduled_at", "scheduled_at", postgresql_where=_PENDING),
+        Index("ix_scheduled_jobs_pending_deadline_at", "deadline_at", postgresql_where=_PENDING),
+        Index("ix_scheduled_jobs_pending_shard_key_scheduled_at", "shard_key", "scheduled_at", postgresql_where=_PENDING),
+        Index("ix_scheduled_jobs_pending_tenant_key_deadline_at", "tenant_key", "deadline_at", postgresql_where=_PENDING),
+        Index("ix_scheduled_jobs_running_lease_expires_at", "lease_expires_at", postgresql_where=_RUNNING),
+        Index("ix_scheduled_jobs_terminal_status_updated_at", "status", "updated_at", postgresql_where=_TERMINAL),
     )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -20,14 +32,20 @@ class ScheduledJob(Base):
         nullable=True,
         index=True,
     )
-    job_type = Column(String(50), nullable=False)  # pre_collect|post_collect|analysis|email_send|slack_send|notification_outbox
+    job_type = Column(String(50), nullable=False)  # pre_collect|post_collect|observation_session|analysis|email_send|slack_send|notification_outbox
     phase = Column(String(20), nullable=True)  # 'pre', 'post' (null pour analysis)
-    sequence_index = Column(Integer, nullable=True)  # 0,1,2... pour multiple post collections
-    scheduled_at = Column(DateTime(timezone=True), nullable=False, index=True)
-    status = Column(String(20), nullable=False, default='pending', index=True)  # pending/running/completed/failed
+    sequence_index = Column(Integer, nullable=True)  # 0,1,2... pour multiple post collections (curseur d'une observation_session)
+    scheduled_at = Column(DateTime(timezone=True), nullable=False)
+    deadline_at = Column(DateTime(timezone=True), nullable=True)  # scheduled_at + budget de retard du type
+    planned_at = Column(DateTime(timezone=True), nullable=True)  # heure prévue d'origine, figée au 1er retry (âge max)
+    status = Column(String(20), nullable=False, default='pending')  # pending/running/completed/failed/skipped
     retry_count = Column(Integer, nullable=False, default=0)
     last_error = Column(Text, nullable=True)
     job_metadata = Column(JSONB, nullable=True)
+    locked_by = Column(String(255), nullable=True)  # worker_id du poller propriétaire du claim
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)  # renouvelé tant que le job tourne
+    shard_key = Column(SmallInteger, nullable=True)  # hash(projet) % SCHEDULER_SHARD_COUNT, null = tout worker
+    tenant_key = Column(String(80), nullable=True)  # project:<id> | user:<id> | deployment:<id> (fairness DRR)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
 
@@ -0,0 +1,34 @@
+# app/db/models/scheduled_job_archive.py
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class ScheduledJobArchive(Base):
+    """
+    Historique compact des jobs terminés sortis de scheduled_jobs (app/scheduler/retention.py) :
+    ni payload JSONB, ni colonnes de claim. Pas de FK : l'historique survit aux déploiements.
+    """
+
+    __tablename__ = "scheduled_jobs_archive"
+    __table_args__ = (
+        Index("ix_scheduled_jobs_archive_created_at", "created_at"),
+        Index("ix_scheduled_jobs_archive_deployment_id", "deployment_id"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    deployment_id = Column(UUID(as_uuid=True), nullable=True)
+    tenant_key = Column(String(80), nullable=True)
+    job_type = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False)  # completed/failed/skipped
+    retry_count = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)  # tronqué à ARCHIVE_LAST_ERROR_CHARS
+    scheduled_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)  # updated_at du job au moment de l'archivage
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<ScheduledJobArchive id={self.id} job_type={self.job_type} status={self.status}>"
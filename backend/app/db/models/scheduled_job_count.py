@@ -0,0 +1,21 @@
+# app/db/models/scheduled_job_count.py
+from sqlalchemy import BigInteger, Column, SmallInteger, String
+
+from app.db.base import Base
+
+
+class ScheduledJobCount(Base):
+    """
+    Compteurs de scheduled_jobs par (status, job_type), tenus par triggers
+    (app/scheduler/job_counts.py). Plusieurs `slot` par clé : la valeur réelle est la somme.
+    """
+
+    __tablename__ = "scheduled_job_counts"
+
+    status = Column(String(20), primary_key=True)
+    job_type = Column(String(50), primary_key=True)
+    slot = Column(SmallInteger, primary_key=True, default=0)
+    count = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ScheduledJobCount status={self.status} job_type={self.job_type} slot={self.slot} count={self.count}>"
@@ -0,0 +1,45 @@
+# app/db/models/scheduled_job_dead_letter.py
+from sqlalchemy import Column, DateTime, Index, Integer, SmallInteger, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class ScheduledJobDeadLetter(Base):
+    """
+    Jobs dont la politique de retry a abandonné (app/scheduler/dead_letter.py) : sortis de
+    scheduled_jobs avec leur payload complet pour inspection et replay. Pas de FK : un job
+    rejoué est une nouvelle ligne de scheduled_jobs (replay_job_id).
+    """
+
+    __tablename__ = "scheduled_jobs_dead_letter"
+    __table_args__ = (
+        Index(
+            "ix_scheduled_jobs_dead_letter_pending_dead_lettered_at",
+            "dead_lettered_at",
+            postgresql_where=text("replayed_at IS NULL"),
+        ),
+        Index("ix_scheduled_jobs_dead_letter_job_type_dead_lettered_at", "job_type", "dead_lettered_at"),
+        Index("ix_scheduled_jobs_dead_letter_deployment_id", "deployment_id"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True)  # id du job d'origine
+    deployment_id = Column(UUID(as_uuid=True), nullable=True)
+    job_type = Column(String(50), nullable=False)
+    phase = Column(String(20), nullable=True)
+    sequence_index = Column(Integer, nullable=True)
+    job_metadata = Column(JSONB, nullable=True)
+    shard_key = Column(SmallInteger, nullable=True)
+    tenant_key = Column(String(80), nullable=True)
+    retry_count = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    reason = Column(String(20), nullable=False)  # exhausted|max_age|lease_expired
+    scheduled_at = Column(DateTime(timezone=True), nullable=False)  # dernier scheduled_at du job
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    dead_lettered_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    replayed_at = Column(DateTime(timezone=True), nullable=True)
+    replay_job_id = Column(UUID(as_uuid=True), nullable=True)
+
+    def __repr__(self):
+        return f"<ScheduledJobDeadLetter id={self.id} job_type={self.job_type} reason={self.reason}>"
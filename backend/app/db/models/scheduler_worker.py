@@ -0,0 +1,34 @@
+# app/db/models/scheduler_worker.py
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class SchedulerWorker(Base):
+    """Une ligne par processus poller : heartbeat partagé lu par /health/scheduler."""
+
+    __tablename__ = "scheduler_workers"
+    __table_args__ = (
+        Index("ix_scheduler_workers_heartbeat_at", "heartbeat_at"),
+    )
+
+    worker_id = Column(String(255), primary_key=True)  # hostname:pid:suffix
+    hostname = Column(String(255), nullable=False)
+    pid = Column(Integer, nullable=False)
+    role = Column(String(20), nullable=False, default="worker")  # worker | api (poller embarqué)
+    execution_mode = Column(String(20), nullable=False, default="thread")
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=False)
+    stopped_at = Column(DateTime(timezone=True), nullable=True)
+    # Mode rattrapage (app/scheduler/catchup.py) : NULL hors rattrapage.
+    catchup_started_at = Column(DateTime(timezone=True), nullable=True)
+    catchup_backlog_start = Column(Integer, nullable=True)
+    catchup_backlog_remaining = Column(Integer, nullable=True)
+    catchup_collapsed_jobs = Column(Integer, nullable=True)
+
+    def __repr__(self):
+        return (
+            f"<SchedulerWorker worker_id={self.worker_id} role={self.role} "
+            f"heartbeat_at={self.heartbeat_at} stopped_at={self.stopped_at}>"
+        )
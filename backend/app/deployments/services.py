@@ -8,12 +8,18 @@ import hashlib
 import os
 import time
 import structlog
+from app.core.settings import settings
 from app.db.models.deployment import Deployment
 from app.db.models.deployment_verdict import DeploymentVerdict
 from app.db.models.project import Project
 from app.db.models.user import User
 from app.email.types import EMAIL_TYPE_FREE_QUOTA_80, EMAIL_TYPE_FREE_QUOTA_REACHED, EMAIL_TYPE_ENV_FORCED_TO_PROD
-from app.scheduler.tasks import schedule_pre_collection, schedule_post_collection, schedule_analysis
+from app.scheduler.tasks import (
+    schedule_analysis,
+    schedule_observation_session,
+    schedule_post_collection,
+    schedule_pre_collection,
+)
 from app.scheduler.tasks import schedule_email
 from app.metrics.collector import MetricsHMACValidationError, probe_metrics_endpoint_hmac
 from app.projects.observation import resolve_project_observation_window_minutes
@@ -230,9 +236,6 @@ def trigger_deployment_flow(db: Session, project, payload, idempotency_key: Opti
     schedule_pre_collection(
         db=db,
         deployment_id=deployment.id,
-        metrics_endpoint=active_endpoint,
-        use_hmac=project.hmac_enabled,
-        hmac_secret=project.hmac_secret,
         project_id=project.id,
     )
 
@@ -326,25 +329,33 @@ def finish_deployment_flow(db: Session, project, payload):
         duration_ms=deployment.duration_ms,
     )
 
-    schedule_post_collection(
-        db=db,
-        deployment_id=deployment.id,
-        metrics_endpoint=active_endpoint,
-        use_hmac=project.hmac_enabled,
-        hmac_secret=project.hmac_secret,
-        project_id=project.id,
-        observation_window=window  # ← passé ici
-    )
+    if settings.SCHEDULER_OBSERVATION_SESSIONS_ENABLED:
+        # Un seul job pour la fenêtre : il avance son curseur et libère l'analyse à la fin.
+        schedule_observation_session(
+            db=db,
+            deployment_id=deployment.id,
+            project_id=project.id,
+            observation_window=window,
+        )
+    else:
+        schedule_post_collection(
+            db=db,
+            deployment_id=deployment.id,
+            project_id=project.id,
+            observation_window=window  # ← passé ici
+        )
 
+    # Heure de repli : avancée dès que la dernière collecte POST est terminée.
     schedule_analysis(
         db=db,
         deployment_id=deployment.id,
-        delay_minutes=delay  # ← dynamique
+        delay_minutes=delay,  # ← dynamique
+        project_id=project.id,
     )
 
     return {
         "status": "accepted",
-        "message": f"Deployment finished. Analysis scheduled in {delay} minutes."
+        "message": f"Deployment finished. Analysis scheduled in at most {delay} minutes."
     }
 
 
@@ -36,6 +36,26 @@ def build_frontend_url(path: str) -> str:
     return urljoin(base_url, normalized_path)
 
 
+@dataclass(frozen=True)
+class _PendingEmailSend:
+    delivery: EmailDelivery
+    email_type: str
+    to_email: str
+    subject: str
+    text: str
+    html: str
+    dedupe_key: str
+
+    def provider_kwargs(self) -> dict[str, str]:
+        return {
+            "to_email": self.to_email,
+            "subject": self.subject,
+            "text": self.text,
+            "html": self.html,
+            "dedupe_key": self.dedupe_key,
+        }
+
+
 def send_email_if_not_sent(
     db: Session,
     *,
@@ -46,6 +66,70 @@ def send_email_if_not_sent(
     project_id: str | UUID | None = None,
     context: dict[str, Any] | None = None,
 ) -> EmailSendResult:
+    pending = _prepare_email_send(
+        db,
+        user_id=user_id,
+        to_email=to_email,
+        email_type=email_type,
+        dedupe_key=dedupe_key,
+        project_id=project_id,
+        context=context,
+    )
+    if isinstance(pending, EmailSendResult):
+        return pending
+
+    try:
+        provider_message_id = _send_via_provider(**pending.provider_kwargs())
+    except Exception as exc:
+        return _record_email_send_failed(db, pending, exc)
+    return _record_email_sent(db, pending, provider_message_id)
+
+
+async def send_email_if_not_sent_async(
+    db: Session,
+    *,
+    client: httpx.AsyncClient,
+    run_db,
+    user_id: str | UUID,
+    to_email: str,
+    email_type: str,
+    dedupe_key: str,
+    project_id: str | UUID | None = None,
+    context: dict[str, Any] | None = None,
+) -> EmailSendResult:
+    """
+    Variante asyncio : les étapes DB passent par `run_db`, l'appel provider est attendu sur la boucle.
+    """
+    pending = await run_db(
+        _prepare_email_send,
+        db,
+        user_id=user_id,
+        to_email=to_email,
+        email_type=email_type,
+        dedupe_key=dedupe_key,
+        project_id=project_id,
+        context=context,
+    )
+    if isinstance(pending, EmailSendResult):
+        return pending
+
+    try:
+        provider_message_id = await _send_via_provider_async(client=client, **pending.provider_kwargs())
+    except Exception as exc:
+        return await run_db(_record_email_send_failed, db, pending, exc)
+    return await run_db(_record_email_sent, db, pending, provider_message_id)
+
+
+def _prepare_email_send(
+    db: Session,
+    *,
+    user_id: str | UUID,
+    to_email: str,
+    email_type: str,
+    dedupe_key: str,
+    project_id: str | UUID | None = None,
+    context: dict[str, Any] | None = None,
+) -> EmailSendResult | _PendingEmailSend:
     if email_type not in SUPPORTED_MVP_EMAIL_TYPES:
         raise ValueError(f"Unsupported MVP email type: {email_type}")
     if not dedupe_key:
@@ -70,7 +154,7 @@ def send_email_if_not_sent(
                     email_delivery_id=str(existing.id),
                     reason="rollout_disabled",
                 )
-            return _send_existing_delivery(
+            return _prepare_existing_delivery(
                 db=db,
                 delivery=existing,
                 to_email=to_email,
@@ -188,7 +272,7 @@ def send_email_if_not_sent(
             reason="duplicate_dedupe_key",
         )
 
-    return _send_existing_delivery(
+    return _prepare_existing_delivery(
         db=db,
         delivery=delivery,
         to_email=to_email,
@@ -244,7 +328,7 @@ def _should_skip_no_project_email(db: Session, user_id: UUID, email_type: str) -
     return row is not None
 
 
-def _send_existing_delivery(
+def _prepare_existing_delivery(
     db: Session,
     *,
     delivery: EmailDelivery,
@@ -252,7 +336,7 @@ def _send_existing_delivery(
     email_type: str,
     dedupe_key: str,
     context: dict[str, Any],
-) -> EmailSendResult:
+) -> _PendingEmailSend:
     enriched_context = _enrich_context(context)
     content = render_mvp_email_content(email_type=email_type, context=enriched_context)
 
@@ -266,33 +350,40 @@ def _send_existing_delivery(
     }
     db.commit()
 
-    try:
-        provider_message_id = _send_via_provider(
-            to_email=to_email,
-            subject=content.subject,
-            text=content.text,
-            html=content.html,
-            dedupe_key=dedupe_key,
-        )
-    except Exception as exc:
-        db.refresh(delivery)
-        delivery.status = "failed"
-        delivery.error_message = str(exc)
-        db.commit()
-        logger.warning(
-            "email_send_failed",
-            email_type=email_type,
-            dedupe_key=dedupe_key,
-            user_id=str(delivery.user_id),
-            project_id=str(delivery.project_id) if delivery.project_id else None,
-            error=str(exc),
-        )
-        return EmailSendResult(
-            status="failed",
-            email_delivery_id=str(delivery.id),
-            reason=str(exc),
-        )
+    return _PendingEmailSend(
+        delivery=delivery,
+        email_type=email_type,
+        to_email=to_email,
+        subject=content.subject,
+        text=content.text,
+        html=content.html,
+        dedupe_key=dedupe_key,
+    )
+
+
+def _record_email_send_failed(db: Session, pending: _PendingEmailSend, exc: Exception) -> EmailSendResult:
+    delivery = pending.delivery
+    db.refresh(delivery)
+    delivery.status = "failed"
+    delivery.error_message = str(exc)
+    db.commit()
+    logger.warning(
+        "email_send_failed",
+        email_type=pending.email_type,
+        dedupe_key=pending.dedupe_key,
+        user_id=str(delivery.user_id),
+        project_id=str(delivery.project_id) if delivery.project_id else None,
+        error=str(exc),
+    )
+    return EmailSendResult(
+        status="failed",
+        email_delivery_id=str(delivery.id),
+        reason=str(exc),
+    )
 
+
+def _record_email_sent(db: Session, pending: _PendingEmailSend, provider_message_id: str) -> EmailSendResult:
+    delivery = pending.delivery
     db.refresh(delivery)
     delivery.status = "sent"
     delivery.provider_message_id = provider_message_id
@@ -301,8 +392,8 @@ def _send_existing_delivery(
 
     logger.info(
         "email_sent",
-        email_type=email_type,
-        dedupe_key=dedupe_key,
+        email_type=pending.email_type,
+        dedupe_key=pending.dedupe_key,
         email_delivery_id=str(delivery.id),
         provider_message_id=provider_message_id,
         user_id=str(delivery.user_id),
@@ -333,9 +424,91 @@ def _enrich_context(context: dict[str, Any]) -> dict[str, Any]:
 
 
 def _send_via_provider(*, to_email: str, subject: str, text: str, html: str, dedupe_key: str) -> str:
-    provider = (settings.EMAIL_PROVIDER or "console").strip().lower()
+    provider = _email_provider()
+    if provider in {"console", "noop"}:
+        return _mock_provider_send(provider=provider, to_email=to_email, subject=subject)
+
+    request = _build_provider_request(
+        provider,
+        to_email=to_email,
+        subject=subject,
+        text=text,
+        html=html,
+        dedupe_key=dedupe_key,
+    )
+    response = httpx.post(request.url, headers=request.headers, json=request.payload, timeout=10)
+    return request.parse_response(response)
+
+
+async def _send_via_provider_async(
+    *,
+    client: httpx.AsyncClient,
+    to_email: str,
+    subject: str,
+    text: str,
+    html: str,
+    dedupe_key: str,
+) -> str:
+    provider = _email_provider()
+    if provider in {"console", "noop"}:
+        return _mock_provider_send(provider=provider, to_email=to_email, subject=subject)
+
+    request = _build_provider_request(
+        provider,
+        to_email=to_email,
+        subject=subject,
+        text=text,
+        html=html,
+        dedupe_key=dedupe_key,
+    )
+    response = await client.post(request.url, headers=request.headers, json=request.payload, timeout=10)
+    return request.parse_response(response)
+
+
+@dataclass(frozen=True)
+class _ProviderRequest:
+    url: str
+    headers: dict[str, str]
+    payload: dict[str, Any]
+    message_id_field: str
+    missing_message_id_error: str
+
+    def parse_response(self, response: httpx.Response) -> str:
+        response.raise_for_status()
+        data = response.json()
+        msg_id = data.get(self.message_id_field)
+        if not msg_id:
+            raise ValueError(self.missing_message_id_error)
+        return str(msg_id)
+
+
+def _email_provider() -> str:
+    return (settings.EMAIL_PROVIDER or "console").strip().lower()
+
+
+def _mock_provider_send(*, provider: str, to_email: str, subject: str) -> str:
+    msg_id = f"{provider}_{uuid4()}"
+    logger.info(
+        "email_send_mocked",
+        provider=provider,
+        to_email=to_email,
+        subject=subject,
+        provider_message_id=msg_id,
+    )
+    return msg_id
+
+
+def _build_provider_request(
+    provider: str,
+    *,
+    to_email: str,
+    subject: str,
+    text: str,
+    html: str,
+    dedupe_key: str,
+) -> _ProviderRequest:
     if provider == "resend":
-        return _send_via_resend(
+        return _build_resend_request(
             to_email=to_email,
             subject=subject,
             text=text,
@@ -343,27 +516,17 @@ def _send_via_provider(*, to_email: str, subject: str, text: str, html: str, ded
             dedupe_key=dedupe_key,
         )
     if provider == "postmark":
-        return _send_via_postmark(
+        return _build_postmark_request(
             to_email=to_email,
             subject=subject,
             text=text,
             html=html,
             dedupe_key=dedupe_key,
         )
-    if provider in {"console", "noop"}:
-        msg_id = f"{provider}_{uuid4()}"
-        logger.info(
-            "email_send_mocked",
-            provider=provider,
-            to_email=to_email,
-            subject=subject,
-            provider_message_id=msg_id,
-        )
-        return msg_id
     raise ValueError(f"Unsupported email provider: {provider}")
 
 
-def _send_via_resend(*, to_email: str, subject: str, text: str, html: str, dedupe_key: str) -> str:
+def _build_resend_request(*, to_email: str, subject: str, text: str, html: str, dedupe_key: str) -> _ProviderRequest:
     api_key = (settings.EMAIL_API_KEY or "").strip()
     if not api_key:
         raise ValueError("EMAIL_API_KEY is required for resend provider")
@@ -379,25 +542,20 @@ def _send_via_resend(*, to_email: str, subject: str, text: str, html: str, dedup
     if reply_to:
         payload["reply_to"] = reply_to
 
-    response = httpx.post(
-        "https://api.resend.com/emails",
+    return _ProviderRequest(
+        url="https://api.resend.com/emails",
         headers={
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
             "Idempotency-Key": dedupe_key,
         },
-        json=payload,
-        timeout=10,
+        payload=payload,
+        message_id_field="id",
+        missing_message_id_error="Resend response missing message id",
     )
-    response.raise_for_status()
-    data = response.json()
-    msg_id = data.get("id")
-    if not msg_id:
-        raise ValueError("Resend response missing message id")
-    return str(msg_id)
 
 
-def _send_via_postmark(*, to_email: str, subject: str, text: str, html: str, dedupe_key: str) -> str:
+def _build_postmark_request(*, to_email: str, subject: str, text: str, html: str, dedupe_key: str) -> _ProviderRequest:
     api_key = (settings.EMAIL_API_KEY or "").strip()
     if not api_key:
         raise ValueError("EMAIL_API_KEY is required for postmark provider")
@@ -414,19 +572,14 @@ def _send_via_postmark(*, to_email: str, subject: str, text: str, html: str, ded
     if reply_to:
         payload["ReplyTo"] = reply_to
 
-    response = httpx.post(
-        "https://api.postmarkapp.com/email",
+    return _ProviderRequest(
+        url="https://api.postmarkapp.com/email",
         headers={
             "X-Postmark-Server-Token": api_key,
             "Content-Type": "application/json",
             "Accept": "application/json",
         },
-        json=payload,
-        timeout=10,
+        payload=payload,
+        message_id_field="MessageID",
+        missing_message_id_error="Postmark response missing MessageID",
     )
-    response.raise_for_status()
-    data = response.json()
-    msg_id = data.get("MessageID")
-    if not msg_id:
-        raise ValueError("Postmark response missing MessageID")
-    return str(msg_id)
@@ -1,9 +1,11 @@
+import threading
 import time
+from typing import Optional
 from fastapi import FastAPI, Depends, Request, Response
 from datetime import datetime, timedelta, timezone
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import and_, func, or_, text
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
@@ -14,13 +16,29 @@ from app.projects.routes import router as projects_router
 from app.deployments.routes import router as deployments_router
 from app.sdh.routes import router as sdh_router
 from app.analytics.routes import router as analytics_router
-from app.db.models import User, Project, Subscription, Deployment, MetricSample, deployment_verdict, SDHHint, ScheduledJob, SlackDelivery
-from app.scheduler.poller import POLL_INTERVAL, RUNNING_STUCK_SECONDS, poller
+from app.scheduler.routes import router as scheduler_router
+from app.db.models import User, Project, Subscription, Deployment, MetricSample, deployment_verdict, SDHHint, ScheduledJob, SlackDelivery, SchedulerWorker
+from app.core.settings import settings
+from app.scheduler.poller import POLL_INTERVAL, RUNNING_STUCK_SECONDS, SHARD_MEMBERSHIP_TTL_SECONDS, poller
+from app.scheduler.dead_letter import count_pending_dead_letters
+from app.scheduler.job_counts import counts_by_status, read_job_counts
+from app.scheduler.sharding import SHARD_COUNT, assign_shards
 from app.core.rate_limit import limiter
+from app.metrics.http_client import close_http_client
+from app.metrics.sample_writer import close_sample_writer
 from app.observability.metrics import observe_http_request, render_metrics
 
 # Cleanup des archives métriques plutard
 HEARTBEAT_STALE_SECONDS = max(POLL_INTERVAL * 3, 30)
+# Workers disparus sans arrêt propre : encore listés (non frais) pendant cette fenêtre.
+WORKER_VISIBILITY_SECONDS = 3600
+EMBEDDED_POLLER = bool(settings.SCHEDULER_EMBEDDED_POLLER)
+# /health et /health/scheduler sont sondés en continu (load balancers) : snapshot partagé,
+# recalculé au plus une fois par intervalle de poll.
+HEALTH_SNAPSHOT_MAX_AGE_SECONDS = POLL_INTERVAL
+HEALTH_STATEMENT_TIMEOUT_MS = max(0, int(settings.SCHEDULER_HEALTH_STATEMENT_TIMEOUT_MS))
+_scheduler_snapshot_cache: dict = {}
+_scheduler_snapshot_lock = threading.Lock()
 
 configure_logging()
 
@@ -93,16 +111,21 @@ app.include_router(deployments_router)
 
 app.include_router(sdh_router)
 app.include_router(analytics_router)
+app.include_router(scheduler_router)
 
 # HEALTH & DEBUG
 
 @app.on_event("startup")
 async def startup_event():
-    await poller.start()
+    if EMBEDDED_POLLER:
+        await poller.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    await poller.stop()
+    if EMBEDDED_POLLER:
+        await poller.stop()
+    close_sample_writer()
+    close_http_client()
 
 @app.get("/db-check")
 def db_check(db: Session = Depends(get_db)):
@@ -122,11 +145,12 @@ def metrics():
 def health(db: Session = Depends(get_db)):
     now = datetime.now(timezone.utc)
     db_ok = _db_ok(db)
-    scheduler = _scheduler_snapshot(db=db, now=now)
+    scheduler = _cached_scheduler_snapshot(db=db, now=now)
 
     scheduler_db_ok = scheduler["db_query_ok"]
     stuck_running_ok = scheduler_db_ok and scheduler["stuck_running"] == 0
     failed_jobs_ok = scheduler_db_ok and scheduler["failed"] == 0
+    dead_letter_ok = scheduler_db_ok and scheduler["dead_letter"] == 0
 
     checks = {
         "db": db_ok,
@@ -135,6 +159,7 @@ def health(db: Session = Depends(get_db)):
         "scheduler_db_query": scheduler_db_ok,
         "stuck_running_jobs": stuck_running_ok,
         "failed_jobs": failed_jobs_ok,
+        "dead_letter_jobs": dead_letter_ok,
     }
     status = "ok" if all(checks.values()) else "degraded"
     reasons = [name for name, ok in checks.items() if not ok]
@@ -151,10 +176,11 @@ def health(db: Session = Depends(get_db)):
 @app.get("/health/scheduler")
 def scheduler_health(db: Session = Depends(get_db)):
     now = datetime.now(timezone.utc)
-    scheduler = _scheduler_snapshot(db=db, now=now)
+    scheduler = _cached_scheduler_snapshot(db=db, now=now)
     scheduler_db_ok = scheduler["db_query_ok"]
     stuck_running_ok = scheduler_db_ok and scheduler["stuck_running"] == 0
     failed_jobs_ok = scheduler_db_ok and scheduler["failed"] == 0
+    dead_letter_ok = scheduler_db_ok and scheduler["dead_letter"] == 0
 
     checks = {
         "poller_running": scheduler["poller_running"],
@@ -162,6 +188,7 @@ def scheduler_health(db: Session = Depends(get_db)):
         "scheduler_db_query": scheduler_db_ok,
         "stuck_running_jobs": stuck_running_ok,
         "failed_jobs": failed_jobs_ok,
+        "dead_letter_jobs": dead_letter_ok,
     }
     status = "ok" if all(checks.values()) else "degraded"
 
@@ -175,52 +202,181 @@ def scheduler_health(db: Session = Depends(get_db)):
 
 def _db_ok(db: Session) -> bool:
     try:
+        _bound_health_queries(db)
         return db.execute(text("SELECT 1")).scalar() == 1
     except Exception:
         return False
 
 
+def _fresh_scheduler_snapshot() -> Optional[dict]:
+    computed_at = _scheduler_snapshot_cache.get("computed_at")
+    if computed_at is not None and time.monotonic() - computed_at < HEALTH_SNAPSHOT_MAX_AGE_SECONDS:
+        return _scheduler_snapshot_cache["snapshot"]
+    return None
+
+
+def _cached_scheduler_snapshot(db: Session, now: datetime) -> dict:
+    snapshot = _fresh_scheduler_snapshot()
+    if snapshot is not None:
+        return snapshot
+    # Un seul recalcul à la fois, sans file d'attente : pendant qu'une sonde recalcule (DB lente),
+    # les autres reçoivent le snapshot précédent au lieu d'occuper un worker du threadpool.
+    previous = _scheduler_snapshot_cache.get("snapshot")
+    if previous is not None:
+        if not _scheduler_snapshot_lock.acquire(blocking=False):
+            return previous
+    # Premier snapshot : attente bornée du recalcul en cours, sinon calcul direct (lui aussi borné).
+    elif not _scheduler_snapshot_lock.acquire(timeout=max(HEALTH_STATEMENT_TIMEOUT_MS, 1000) / 1000.0):
+        return _scheduler_snapshot(db=db, now=now)
+    try:
+        snapshot = _fresh_scheduler_snapshot()
+        if snapshot is not None:
+            return snapshot
+        snapshot = _scheduler_snapshot(db=db, now=now)
+        _scheduler_snapshot_cache.update(computed_at=time.monotonic(), snapshot=snapshot)
+        return snapshot
+    finally:
+        _scheduler_snapshot_lock.release()
+
+
+def _bound_health_queries(db: Session) -> None:
+    # SET LOCAL : vaut pour la transaction en cours, à reposer après chaque rollback.
+    if HEALTH_STATEMENT_TIMEOUT_MS > 0 and db.get_bind().dialect.name == "postgresql":
+        db.execute(text(f"SET LOCAL statement_timeout = {HEALTH_STATEMENT_TIMEOUT_MS}"))
+
+
 def _scheduler_snapshot(db: Session, now: datetime) -> dict:
     cutoff = now - timedelta(seconds=RUNNING_STUCK_SECONDS)
-    heartbeat_at = poller.last_heartbeat_at
-    heartbeat_age_seconds = None
-    heartbeat_fresh = False
-
-    if heartbeat_at is not None:
-        heartbeat_age_seconds = max(0.0, (now - heartbeat_at).total_seconds())
-        heartbeat_fresh = heartbeat_age_seconds <= HEARTBEAT_STALE_SECONDS
 
     db_query_ok = True
     try:
-        pending = db.query(ScheduledJob).filter(ScheduledJob.status == "pending").count()
-        running = db.query(ScheduledJob).filter(ScheduledJob.status == "running").count()
-        failed = db.query(ScheduledJob).filter(ScheduledJob.status == "failed").count()
+        _bound_health_queries(db)
+        # Compteurs tenus par triggers (scheduled_job_counts) : pas de COUNT(*) sur scheduled_jobs.
+        totals = counts_by_status(read_job_counts(db))
+        pending = totals["pending"]
+        running = totals["running"]
+        failed = totals["failed"]
+        # Jobs abandonnés par leur politique de retry, en attente d'inspection / replay.
+        dead_letter = count_pending_dead_letters(db)
+        # Running dont le lease a expiré (ou, sans lease, bloqués depuis RUNNING_STUCK_SECONDS).
         stuck_running = db.query(ScheduledJob).filter(
             ScheduledJob.status == "running",
-            ScheduledJob.updated_at.isnot(None),
-            ScheduledJob.updated_at < cutoff,
+            or_(
+                ScheduledJob.lease_expires_at < now,
+                and_(
+                    ScheduledJob.lease_expires_at.is_(None),
+                    ScheduledJob.updated_at.isnot(None),
+                    ScheduledJob.updated_at < cutoff,
+                ),
+            ),
         ).count()
+        running_by_worker = dict(
+            db.query(ScheduledJob.locked_by, func.count(ScheduledJob.id))
+            .filter(ScheduledJob.status == "running", ScheduledJob.locked_by.isnot(None))
+            .group_by(ScheduledJob.locked_by)
+            .all()
+        )
     except Exception:
+        db.rollback()
         db_query_ok = False
         pending = None
         running = None
         failed = None
+        dead_letter = None
         stuck_running = None
+        running_by_worker = {}
+
+    # Liveness : heartbeat partagé écrit par chaque poller (API ou `python -m app.scheduler.worker`).
+    workers = []
+    try:
+        _bound_health_queries(db)
+        rows = (
+            db.query(SchedulerWorker)
+            .filter(
+                SchedulerWorker.stopped_at.is_(None),
+                SchedulerWorker.heartbeat_at >= now - timedelta(seconds=WORKER_VISIBILITY_SECONDS),
+            )
+            .order_by(SchedulerWorker.heartbeat_at.desc())
+            .all()
+        )
+    except Exception:
+        db.rollback()
+        db_query_ok = False
+        rows = []
+
+    # Même calcul que les pollers : répartition des shards entre les workers vivants.
+    shard_members = [
+        row.worker_id
+        for row in rows
+        if (now - _as_utc(row.heartbeat_at)).total_seconds() <= SHARD_MEMBERSHIP_TTL_SECONDS
+    ]
+    shard_assignment = assign_shards(shard_members, SHARD_COUNT)
+
+    for row in rows:
+        worker_heartbeat_at = _as_utc(row.heartbeat_at)
+        age_seconds = max(0.0, (now - worker_heartbeat_at).total_seconds())
+        workers.append(
+            {
+                "worker_id": row.worker_id,
+                "role": row.role,
+                "execution_mode": row.execution_mode,
+                "heartbeat_at": worker_heartbeat_at.isoformat(),
+                "heartbeat_age_seconds": age_seconds,
+                "heartbeat_fresh": age_seconds <= HEARTBEAT_STALE_SECONDS,
+                "running_jobs": running_by_worker.get(row.worker_id, 0),
+                "shards_owned": len(shard_assignment.get(row.worker_id, ())),
+                "catch_up": _worker_catch_up(row, now),
+            }
+        )
+
+    heartbeat_at = _as_utc(rows[0].heartbeat_at) if rows else None
+    heartbeat_age_seconds = workers[0]["heartbeat_age_seconds"] if workers else None
+    workers_alive = sum(1 for worker in workers if worker["heartbeat_fresh"])
 
     return {
-        "poller_running": bool(poller.running),
+        "poller_running": workers_alive > 0,
+        "embedded_poller": EMBEDDED_POLLER,
+        "embedded_poller_running": bool(poller.running),
+        "snapshot_at": now.isoformat(),
         "db_query_ok": db_query_ok,
         "heartbeat_at": heartbeat_at.isoformat() if heartbeat_at else None,
         "heartbeat_age_seconds": heartbeat_age_seconds,
         "heartbeat_stale_after_seconds": HEARTBEAT_STALE_SECONDS,
-        "heartbeat_fresh": heartbeat_fresh,
+        "heartbeat_fresh": workers_alive > 0,
+        "workers_alive": workers_alive,
+        "workers": workers,
+        "catch_up_active": any(worker["catch_up"] is not None for worker in workers if worker["heartbeat_fresh"]),
+        "shard_count": SHARD_COUNT,
         "pending": pending,
         "running": running,
         "failed": failed,
+        "dead_letter": dead_letter,
         "stuck_running": stuck_running,
     }
 
 
+def _worker_catch_up(row: SchedulerWorker, now: datetime) -> Optional[dict]:
+    # Progression du mode rattrapage publiée avec le heartbeat (None hors rattrapage).
+    if row.catchup_started_at is None:
+        return None
+    backlog_start = row.catchup_backlog_start or 0
+    remaining = row.catchup_backlog_remaining or 0
+    return {
+        "started_at": _as_utc(row.catchup_started_at).isoformat(),
+        "elapsed_seconds": max(0.0, (now - _as_utc(row.catchup_started_at)).total_seconds()),
+        "backlog_at_start": backlog_start,
+        "backlog_remaining": remaining,
+        "collapsed_samples": row.catchup_collapsed_jobs or 0,
+        "progress": round(min(1.0, max(0.0, (backlog_start - remaining) / backlog_start)), 3) if backlog_start else None,
+    }
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
 def _request_path_template(request: Request) -> str:
     route = request.scope.get("route")
     if route is not None and hasattr(route, "path"):
@@ -0,0 +1,200 @@
+# app/metrics/circuit_breaker.py
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+import structlog
+
+from app.core.settings import settings
+from app.observability.metrics import (
+    inc_collector_circuit_rejected,
+    inc_collector_circuit_transition,
+    set_collector_circuit_breakers,
+)
+
+logger = structlog.get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATES = (CLOSED, OPEN, HALF_OPEN)
+
+# Breaker par hôte d'endpoint : sur les WINDOW_SECONDS dernières secondes, au moins MIN_REQUESTS
+# fetchs dont une part FAILURE_RATE en échec ouvrent le circuit ; après COOLDOWN_SECONDS,
+# HALF_OPEN_MAX_CALLS fetchs d'essai décident de la fermeture (succès) ou d'une nouvelle ouverture.
+FAILURE_RATE_THRESHOLD = min(1.0, max(0.0, float(settings.COLLECTOR_CIRCUIT_FAILURE_RATE)))
+MIN_REQUESTS = max(1, int(settings.COLLECTOR_CIRCUIT_MIN_REQUESTS))
+WINDOW_SECONDS = max(1.0, float(settings.COLLECTOR_CIRCUIT_WINDOW_SECONDS))
+COOLDOWN_SECONDS = max(0.0, float(settings.COLLECTOR_CIRCUIT_COOLDOWN_SECONDS))
+HALF_OPEN_MAX_CALLS = max(1, int(settings.COLLECTOR_CIRCUIT_HALF_OPEN_MAX_CALLS))
+
+
+class CircuitBreaker:
+    """
+    Circuit closed / open / half_open d'un hôte. Non thread-safe : utilisé sous le verrou
+    de CircuitBreakerRegistry.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        *,
+        failure_rate_threshold: float,
+        min_requests: int,
+        window_seconds: float,
+        cooldown_seconds: float,
+        half_open_max_calls: int,
+    ):
+        self.host = host
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_requests = min_requests
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.half_open_calls = 0
+        self._outcomes: deque[tuple[float, bool]] = deque()
+
+    def failure_rate(self, now: float) -> tuple[float, int]:
+        self._trim(now)
+        total = len(self._outcomes)
+        if total == 0:
+            return 0.0, 0
+        return sum(1 for _, ok in self._outcomes if not ok) / total, total
+
+    def retry_after(self, now: float) -> float:
+        if self.state != OPEN or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown_seconds - now)
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and self._outcomes[0][0] <= now - self.window_seconds:
+            self._outcomes.popleft()
+
+    def allow(self, now: float) -> tuple[bool, Optional[str]]:
+        """Autorise (ou non) un fetch ; retourne aussi le nouvel état en cas de transition."""
+        if self.state == OPEN:
+            if self.retry_after(now) > 0:
+                return False, None
+            self.state = HALF_OPEN
+            self.half_open_calls = 1
+            return True, HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self.half_open_calls >= self.half_open_max_calls:
+                return False, None
+            self.half_open_calls += 1
+        return True, None
+
+    def record(self, ok: Optional[bool], now: float) -> Optional[str]:
+        """
+        Enregistre l'issue d'un fetch autorisé (None : échec local, sans verdict sur l'hôte) ;
+        retourne le nouvel état en cas de transition.
+        """
+        if ok is None:
+            if self.state == HALF_OPEN:
+                self.half_open_calls = max(0, self.half_open_calls - 1)
+            return None
+        if self.state == HALF_OPEN:
+            if ok:
+                self._close()
+                return CLOSED
+            self._open(now)
+            return OPEN
+        if self.state == OPEN:
+            # Fetch autorisé avant l'ouverture et terminé après : sans effet.
+            return None
+        self._outcomes.append((now, ok))
+        rate, total = self.failure_rate(now)
+        if not ok and total >= self.min_requests and rate >= self.failure_rate_threshold:
+            self._open(now)
+            return OPEN
+        return None
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self.opened_at = now
+        self.half_open_calls = 0
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self.opened_at = None
+        self.half_open_calls = 0
+        self._outcomes.clear()
+
+
+def endpoint_host(metrics_endpoint: str) -> str:
+    parsed = urlparse(metrics_endpoint)
+    host = (parsed.hostname or "").lower()
+    return f"{host}:{parsed.port}" if parsed.port else host
+
+
+class CircuitBreakerRegistry:
+    """Breakers par hôte d'endpoint (un par processus, partagé par les threads et la boucle async)."""
+
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic, **breaker_options):
+        self._clock = clock
+        self._breaker_options = breaker_options
+        self._lock = threading.Lock()
+        # Borné par le nombre d'hôtes d'endpoints actifs : jamais purgé.
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            options = {
+                "failure_rate_threshold": FAILURE_RATE_THRESHOLD,
+                "min_requests": MIN_REQUESTS,
+                "window_seconds": WINDOW_SECONDS,
+                "cooldown_seconds": COOLDOWN_SECONDS,
+                "half_open_max_calls": HALF_OPEN_MAX_CALLS,
+            }
+            options.update(self._breaker_options)
+            breaker = self._breakers[host] = CircuitBreaker(host, **options)
+        return breaker
+
+    def allow(self, host: str) -> tuple[bool, float]:
+        """(autorisé, secondes avant le prochain essai si refusé)."""
+        now = self._clock()
+        with self._lock:
+            breaker = self._breaker(host)
+            allowed, transition = breaker.allow(now)
+            retry_after = breaker.retry_after(now)
+            if transition:
+                self._on_transition(breaker, transition)
+        if not allowed:
+            inc_collector_circuit_rejected()
+        return allowed, retry_after
+
+    def record(self, host: str, *, ok: Optional[bool]) -> None:
+        now = self._clock()
+        with self._lock:
+            breaker = self._breaker(host)
+            transition = breaker.record(ok, now)
+            if transition:
+                self._on_transition(breaker, transition)
+                if transition == OPEN:
+                    rate, total = breaker.failure_rate(now)
+                    logger.warning(
+                        "metrics_endpoint_circuit_opened",
+                        host=host,
+                        failure_rate=round(rate, 2),
+                        requests=total,
+                        cooldown_seconds=breaker.cooldown_seconds,
+                    )
+                elif transition == CLOSED:
+                    logger.info("metrics_endpoint_circuit_closed", host=host)
+
+    def state(self, host: str) -> str:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            return breaker.state if breaker is not None else CLOSED
+
+    def _on_transition(self, breaker: CircuitBreaker, state: str) -> None:
+        inc_collector_circuit_transition(state)
+        counts = {name: 0 for name in STATES}
+        for other in self._breakers.values():
+            counts[other.state] += 1
+        set_collector_circuit_breakers(counts)
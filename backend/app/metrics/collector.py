@@ -1,21 +1,59 @@
 # app/metrics/collector.py
+import asyncio
+import concurrent.futures
+import hashlib
 import httpx
 import math
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Optional
 from urllib.parse import urlparse
+from uuid import uuid4
 import time
 import structlog
+from app.core.settings import settings
+from app.db.models.deployment import Deployment
 from app.db.models.metric_sample import MetricSample
-from app.observability.metrics import inc_metrics_collected
+from app.metrics.circuit_breaker import CircuitBreakerRegistry, endpoint_host
+from app.metrics.http_client import get_http_client
+from app.metrics.sample_writer import get_sample_writer, insert_samples
+from app.metrics.single_flight import FETCHED, AsyncSingleFlight, SingleFlight
+from app.observability.metrics import inc_collector_fetch, inc_collector_samples_dropped, inc_metrics_collected
 from sqlalchemy.exc import IntegrityError
 
 logger = structlog.get_logger(__name__)
 
+# Coalescence des fetchs : des déploiements qui collectent le même endpoint à la même seconde
+# (envs d'un même service, retry qui croise un post_collect) partagent un seul appel HTTP ;
+# chacun écrit tout de même son propre MetricSample.
+SINGLE_FLIGHT_ENABLED = bool(settings.COLLECTOR_SINGLE_FLIGHT_ENABLED)
+SINGLE_FLIGHT_WINDOW_SECONDS = max(0, int(settings.COLLECTOR_SINGLE_FLIGHT_WINDOW_MS)) / 1000.0
+_fetch_flights = SingleFlight()
+_async_fetch_flights = AsyncSingleFlight()
+# Breakers par hôte d'endpoint (app/metrics/circuit_breaker.py) : un hôte en panne fait échouer
+# ses collectes sans appel réseau au lieu d'occuper un slot de worker jusqu'au timeout.
+CIRCUIT_BREAKER_ENABLED = bool(settings.COLLECTOR_CIRCUIT_BREAKER_ENABLED)
+_circuit_breakers = CircuitBreakerRegistry()
+# Écriture groupée des MetricSample (app/metrics/sample_writer.py) au lieu d'un commit par sample.
+BUFFERED_WRITES_ENABLED = bool(settings.COLLECTOR_BUFFERED_WRITES_ENABLED)
+# Attente max de l'acquittement du writer (0 = sans limite) : un writer bloqué fait échouer la
+# collecte (retry du job) au lieu de figer le worker.
+WRITE_ACK_TIMEOUT_SECONDS = max(0.0, float(settings.COLLECTOR_WRITE_ACK_TIMEOUT_SECONDS))
+# Payload multi-samples : {"samples": [{"timestamp": ..., "requests_per_sec": ..., ...}, ...]},
+# chaque sample gardant l'horodatage de la source (résolution plus fine sans fetch supplémentaire).
+MAX_SAMPLES_PER_PAYLOAD = max(1, int(settings.COLLECTOR_MAX_SAMPLES_PER_PAYLOAD))
+SAMPLE_MAX_AGE_SECONDS = max(0, int(settings.COLLECTOR_SAMPLE_MAX_AGE_SECONDS))
+SAMPLE_MAX_FUTURE_SKEW_SECONDS = max(0, int(settings.COLLECTOR_SAMPLE_MAX_FUTURE_SKEW_SECONDS))
+
 
 class MetricsHMACValidationError(ValueError):
     """Raised when endpoint-side HMAC validation rejects the request."""
 
 
+class MetricsEndpointUnavailable(ValueError):
+    """Raised without any network call while the endpoint host circuit breaker is open."""
+
+
 def _require_float(data: dict, key: str) -> float:
     if key not in data:
         raise ValueError(f"Missing metric '{key}'")
@@ -66,6 +104,35 @@ def _build_hmac_headers(metrics_endpoint: str, secret: str, project_id: str | No
     return headers
 
 
+def _payload_metrics(body):
+    """Tableau `samples` (multi-samples horodatés) s'il est présent, sinon l'objet `metrics`."""
+    if not isinstance(body, dict):
+        raise ValueError(f"Metrics payload must be a JSON object, got {type(body).__name__}")
+    if "samples" in body:
+        return body["samples"]
+    return body.get("metrics", {})
+
+
+def _invalid_payload_error(
+    error: Exception,
+    payload,
+    *,
+    deployment_id,
+    phase: str,
+    metrics_endpoint: str,
+    duration_ms: int,
+) -> ValueError:
+    logger.warning(
+        "metrics_payload_invalid",
+        deployment_id=str(deployment_id),
+        phase=phase,
+        metrics_endpoint=metrics_endpoint,
+        error=str(error),
+        duration_ms=duration_ms,
+    )
+    return ValueError(f"Invalid metric value in {payload}: {error}")
+
+
 def _fetch_metrics_payload(
     *,
     deployment_id,
@@ -83,42 +150,229 @@ def _fetch_metrics_payload(
         headers = _build_hmac_headers(metrics_endpoint=metrics_endpoint, secret=secret, project_id=project_id)
 
     try:
-        resp = httpx.get(metrics_endpoint, headers=headers, timeout=timeout_seconds)
+        resp = get_http_client().get(metrics_endpoint, headers=headers, timeout=timeout_seconds)
         resp.raise_for_status()
-        data = resp.json().get("metrics", {})
-        return data, int((time.perf_counter() - started_at) * 1000)
+        body = resp.json()
     except httpx.RequestError as e:
-        logger.warning(
-            "metrics_fetch_failed",
-            deployment_id=str(deployment_id),
+        _raise_fetch_request_error(
+            e,
+            deployment_id=deployment_id,
             phase=phase,
             metrics_endpoint=metrics_endpoint,
-            error=str(e),
-            duration_ms=int((time.perf_counter() - started_at) * 1000),
+            started_at=started_at,
         )
-        raise ValueError(f"Failed to fetch metrics from {metrics_endpoint}: {e}")
     except httpx.HTTPStatusError as e:
-        if use_hmac and e.response.status_code in (401, 403):
-            logger.warning(
-                "metrics_hmac_validation_failed",
-                deployment_id=str(deployment_id),
-                phase=phase,
-                metrics_endpoint=metrics_endpoint,
-                status_code=e.response.status_code,
-                duration_ms=int((time.perf_counter() - started_at) * 1000),
-            )
-            raise MetricsHMACValidationError(
-                "HMAC validation failed: check secret, timestamp skew, path normalization, and nonce usage"
-            )
+        _raise_fetch_status_error(
+            e,
+            deployment_id=deployment_id,
+            phase=phase,
+            metrics_endpoint=metrics_endpoint,
+            use_hmac=use_hmac,
+            started_at=started_at,
+        )
+    duration_ms = int((time.perf_counter() - started_at) * 1000)
+    try:
+        return _payload_metrics(body), duration_ms
+    except ValueError as e:
+        raise _invalid_payload_error(
+            e,
+            "response body",
+            deployment_id=deployment_id,
+            phase=phase,
+            metrics_endpoint=metrics_endpoint,
+            duration_ms=duration_ms,
+        )
+
+
+async def _fetch_metrics_payload_async(
+    *,
+    client: httpx.AsyncClient,
+    deployment_id,
+    phase: str,
+    metrics_endpoint: str,
+    use_hmac: bool = False,
+    secret: str = None,
+    project_id: str = None,
+    timeout_seconds: float = 5.0,
+) -> tuple[dict, int]:
+    started_at = time.perf_counter()
+    headers: dict[str, str] = {}
+
+    if use_hmac:
+        headers = _build_hmac_headers(metrics_endpoint=metrics_endpoint, secret=secret, project_id=project_id)
+
+    try:
+        resp = await client.get(metrics_endpoint, headers=headers, timeout=timeout_seconds)
+        resp.raise_for_status()
+        body = resp.json()
+    except httpx.RequestError as e:
+        _raise_fetch_request_error(
+            e,
+            deployment_id=deployment_id,
+            phase=phase,
+            metrics_endpoint=metrics_endpoint,
+            started_at=started_at,
+        )
+    except httpx.HTTPStatusError as e:
+        _raise_fetch_status_error(
+            e,
+            deployment_id=deployment_id,
+            phase=phase,
+            metrics_endpoint=metrics_endpoint,
+            use_hmac=use_hmac,
+            started_at=started_at,
+        )
+    duration_ms = int((time.perf_counter() - started_at) * 1000)
+    try:
+        return _payload_metrics(body), duration_ms
+    except ValueError as e:
+        raise _invalid_payload_error(
+            e,
+            "response body",
+            deployment_id=deployment_id,
+            phase=phase,
+            metrics_endpoint=metrics_endpoint,
+            duration_ms=duration_ms,
+        )
+
+
+def _raise_fetch_request_error(
+    e: httpx.RequestError,
+    *,
+    deployment_id,
+    phase: str,
+    metrics_endpoint: str,
+    started_at: float,
+):
+    logger.warning(
+        "metrics_fetch_failed",
+        deployment_id=str(deployment_id),
+        phase=phase,
+        metrics_endpoint=metrics_endpoint,
+        error=str(e),
+        duration_ms=int((time.perf_counter() - started_at) * 1000),
+    )
+    raise ValueError(f"Failed to fetch metrics from {metrics_endpoint}: {e}")
+
+
+def _raise_fetch_status_error(
+    e: httpx.HTTPStatusError,
+    *,
+    deployment_id,
+    phase: str,
+    metrics_endpoint: str,
+    use_hmac: bool,
+    started_at: float,
+):
+    if use_hmac and e.response.status_code in (401, 403):
         logger.warning(
-            "metrics_http_status_error",
+            "metrics_hmac_validation_failed",
             deployment_id=str(deployment_id),
             phase=phase,
             metrics_endpoint=metrics_endpoint,
             status_code=e.response.status_code,
             duration_ms=int((time.perf_counter() - started_at) * 1000),
         )
-        raise ValueError(f"HTTP error {e.response.status_code} from {metrics_endpoint}")
+        raise MetricsHMACValidationError(
+            "HMAC validation failed: check secret, timestamp skew, path normalization, and nonce usage"
+        )
+    logger.warning(
+        "metrics_http_status_error",
+        deployment_id=str(deployment_id),
+        phase=phase,
+        metrics_endpoint=metrics_endpoint,
+        status_code=e.response.status_code,
+        duration_ms=int((time.perf_counter() - started_at) * 1000),
+    )
+    raise ValueError(f"HTTP error {e.response.status_code} from {metrics_endpoint}")
+
+
+def _circuit_host(*, deployment_id, phase: str, metrics_endpoint: str) -> str | None:
+    """Hôte dont le breaker autorise le fetch (None : breaker désactivé) ; fail fast si le circuit est ouvert."""
+    if not CIRCUIT_BREAKER_ENABLED:
+        return None
+    host = endpoint_host(metrics_endpoint)
+    allowed, retry_after = _circuit_breakers.allow(host)
+    if not allowed:
+        logger.warning(
+            "metrics_fetch_circuit_open",
+            deployment_id=str(deployment_id),
+            phase=phase,
+            metrics_endpoint=metrics_endpoint,
+            retry_after_seconds=round(retry_after, 1),
+        )
+        raise MetricsEndpointUnavailable(
+            f"Circuit open for {host}: metrics endpoint failing, next attempt in {retry_after:.0f}s"
+        )
+    return host
+
+
+def _host_outcome(error: BaseException) -> bool | None:
+    """
+    Verdict d'un fetch en échec sur l'hôte : False (réseau, timeout, 5xx), True (l'hôte a répondu :
+    4xx, rejet HMAC) ou None (échec local : plafond par hôte atteint, erreur hors requête).
+    """
+    seen = set()
+    current: BaseException | None = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if isinstance(current, httpx.PoolTimeout):
+            return None
+        if isinstance(current, httpx.HTTPStatusError):
+            return current.response.status_code < 500
+        if isinstance(current, httpx.RequestError):
+            return False
+        current = current.__cause__ or current.__context__
+    return None
+
+
+def _fetch_with_circuit_breaker(fetch, *, deployment_id, phase: str, metrics_endpoint: str) -> tuple[dict, int]:
+    host = _circuit_host(deployment_id=deployment_id, phase=phase, metrics_endpoint=metrics_endpoint)
+    if host is None:
+        return fetch()
+    try:
+        result = fetch()
+    except BaseException as e:
+        _circuit_breakers.record(host, ok=_host_outcome(e))
+        raise
+    _circuit_breakers.record(host, ok=True)
+    return result
+
+
+async def _fetch_with_circuit_breaker_async(
+    fetch, *, deployment_id, phase: str, metrics_endpoint: str
+) -> tuple[dict, int]:
+    host = _circuit_host(deployment_id=deployment_id, phase=phase, metrics_endpoint=metrics_endpoint)
+    if host is None:
+        return await fetch()
+    try:
+        result = await fetch()
+    except BaseException as e:
+        _circuit_breakers.record(host, ok=_host_outcome(e))
+        raise
+    _circuit_breakers.record(host, ok=True)
+    return result
+
+
+def _fetch_key(metrics_endpoint: str, use_hmac: bool, secret: str | None, project_id) -> tuple:
+    """Clé de coalescence : même URL et mêmes identifiants (la requête signée porte le project_id)."""
+    if not use_hmac:
+        return (metrics_endpoint, None, None)
+    # Empreinte seulement : la table des fetchs en cours ne garde pas le secret en clair.
+    secret_digest = hashlib.sha256((secret or "").encode("utf-8")).hexdigest()
+    return (metrics_endpoint, secret_digest, str(project_id) if project_id else None)
+
+
+def _record_fetch_role(role: str, *, deployment_id, phase: str, metrics_endpoint: str) -> None:
+    inc_collector_fetch(role)
+    if role != FETCHED:
+        logger.info(
+            "metrics_fetch_coalesced",
+            deployment_id=str(deployment_id),
+            phase=phase,
+            metrics_endpoint=metrics_endpoint,
+            role=role,
+        )
 
 
 def probe_metrics_endpoint_hmac(
@@ -155,76 +409,372 @@ def collect_metrics(
     Collecte les métriques depuis l'endpoint fourni.
     Si use_hmac=True et secret est fourni, signe la requête.
     """
-    data, fetch_duration_ms = _fetch_metrics_payload(
+    fetch = partial(
+        _fetch_with_circuit_breaker,
+        partial(
+            _fetch_metrics_payload,
+            deployment_id=deployment_id,
+            phase=phase,
+            metrics_endpoint=metrics_endpoint,
+            use_hmac=use_hmac,
+            secret=secret,
+            project_id=project_id,
+        ),
         deployment_id=deployment_id,
         phase=phase,
         metrics_endpoint=metrics_endpoint,
-        use_hmac=use_hmac,
-        secret=secret,
-        project_id=project_id,
+    )
+    if SINGLE_FLIGHT_ENABLED:
+        (data, fetch_duration_ms), role = _fetch_flights.do(
+            _fetch_key(metrics_endpoint, use_hmac, secret, project_id),
+            fetch,
+            window_seconds=SINGLE_FLIGHT_WINDOW_SECONDS,
+        )
+    else:
+        (data, fetch_duration_ms), role = fetch(), FETCHED
+    _record_fetch_role(role, deployment_id=deployment_id, phase=phase, metrics_endpoint=metrics_endpoint)
+    _store_metric_sample(
+        db,
+        deployment_id=deployment_id,
+        phase=phase,
+        metrics_endpoint=metrics_endpoint,
+        data=data,
+        fetch_duration_ms=fetch_duration_ms,
     )
 
+
+async def collect_metrics_async(
+    deployment_id,
+    phase: str,
+    metrics_endpoint: str,
+    db,
+    *,
+    client: httpx.AsyncClient,
+    run_db,
+    use_hmac: bool = False,
+    secret: str = None,
+    project_id: str = None,
+):
+    """
+    Variante asyncio de collect_metrics : le fetch HTTP est attendu sur la boucle,
+    l'écriture DB passe par `run_db` (pool de threads dédié).
+    """
+    fetch = partial(
+        _fetch_with_circuit_breaker_async,
+        partial(
+            _fetch_metrics_payload_async,
+            client=client,
+            deployment_id=deployment_id,
+            phase=phase,
+            metrics_endpoint=metrics_endpoint,
+            use_hmac=use_hmac,
+            secret=secret,
+            project_id=project_id,
+        ),
+        deployment_id=deployment_id,
+        phase=phase,
+        metrics_endpoint=metrics_endpoint,
+    )
+    if SINGLE_FLIGHT_ENABLED:
+        (data, fetch_duration_ms), role = await _async_fetch_flights.do(
+            _fetch_key(metrics_endpoint, use_hmac, secret, project_id),
+            fetch,
+            window_seconds=SINGLE_FLIGHT_WINDOW_SECONDS,
+        )
+    else:
+        (data, fetch_duration_ms), role = await fetch(), FETCHED
+    _record_fetch_role(role, deployment_id=deployment_id, phase=phase, metrics_endpoint=metrics_endpoint)
+    if BUFFERED_WRITES_ENABLED:
+        # Validation sur la boucle puis attente du flush sans occuper de thread DB.
+        window = await run_db(_deployment_window, db, deployment_id, phase) if isinstance(data, list) else None
+        rows = _build_sample_rows(
+            data,
+            deployment_id=deployment_id,
+            phase=phase,
+            metrics_endpoint=metrics_endpoint,
+            fetch_duration_ms=fetch_duration_ms,
+            window=window,
+        )
+        futures = get_sample_writer().submit_many(rows)
+        try:
+            inserted = await asyncio.wait_for(
+                asyncio.gather(*(asyncio.wrap_future(future) for future in futures)),
+                timeout=WRITE_ACK_TIMEOUT_SECONDS or None,
+            )
+        except asyncio.TimeoutError:
+            raise _write_ack_timeout(len(rows)) from None
+        _record_samples_written(inserted, rows, metrics_endpoint=metrics_endpoint, fetch_duration_ms=fetch_duration_ms)
+        return
+    await run_db(
+        _store_metric_sample,
+        db,
+        deployment_id=deployment_id,
+        phase=phase,
+        metrics_endpoint=metrics_endpoint,
+        data=data,
+        fetch_duration_ms=fetch_duration_ms,
+    )
+
+
+def _sample_metrics(data) -> dict:
+    if not isinstance(data, dict):
+        raise ValueError("Metrics payload must be an object")
+
+    requests_per_sec = _require_float(data, "requests_per_sec")
+    latency_p95 = _require_float(data, "latency_p95")
+    error_rate = _require_float(data, "error_rate")
+    cpu_usage = _require_float(data, "cpu_usage")
+    memory_usage = _require_float(data, "memory_usage")
+
+    _validate_range("requests_per_sec", requests_per_sec, min_value=0.0)
+    _validate_range("latency_p95", latency_p95, min_value=0.0)
+    _validate_range("error_rate", error_rate, min_value=0.0, max_value=1.0)
+    _validate_range("cpu_usage", cpu_usage, min_value=0.0, max_value=1.0)
+    _validate_range("memory_usage", memory_usage, min_value=0.0, max_value=1.0)
+    return {
+        "requests_per_sec": requests_per_sec,
+        "latency_p95": latency_p95,
+        "error_rate": error_rate,
+        "cpu_usage": cpu_usage,
+        "memory_usage": memory_usage,
+    }
+
+
+def _parse_sample_timestamp(value) -> datetime:
+    """ISO 8601 avec fuseau (`2026-01-01T10:00:00Z`) ou epoch en secondes."""
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid sample timestamp: {value!r}")
+    if isinstance(value, (int, float)):
+        if not math.isfinite(value):
+            raise ValueError(f"Invalid sample timestamp: {value!r}")
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid sample timestamp: {value!r}")
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        raise ValueError(f"Sample timestamp without timezone: {value!r}")
+    return parsed.astimezone(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _deployment_window(db, deployment_id, phase: str) -> Optional[tuple[Optional[datetime], Optional[datetime]]]:
+    """
+    Bornes (not_before, not_after) des samples horodatés par la source : un sample `pre` postérieur
+    au début du déploiement, ou `post` antérieur à sa fin, ne décrit pas la bonne version.
+    """
+    row = db.query(Deployment.started_at, Deployment.finished_at).filter(Deployment.id == deployment_id).first()
+    if row is None:
+        return None
+    if phase == "pre":
+        return None, _as_utc(row.started_at) if row.started_at else None
+    return (_as_utc(row.finished_at) if row.finished_at else None), None
+
+
+def _timestamped_samples(
+    samples,
+    now: datetime,
+    window: Optional[tuple[Optional[datetime], Optional[datetime]]] = None,
+) -> tuple[list[tuple[datetime, dict]], dict[str, int]]:
+    """
+    Validation en bloc d'un payload multi-samples : une valeur invalide rejette tout le payload.
+    Les samples hors fenêtre (trop vieux, trop en avance, hors de la phase du déploiement) sont
+    seulement ignorés et comptés.
+    """
+    if not isinstance(samples, list):
+        raise ValueError("Metrics samples must be an array")
+    if not samples:
+        raise ValueError("Metrics samples array is empty")
+    if len(samples) > MAX_SAMPLES_PER_PAYLOAD:
+        raise ValueError(f"Too many metrics samples: {len(samples)} > {MAX_SAMPLES_PER_PAYLOAD}")
+
+    oldest = now - timedelta(seconds=SAMPLE_MAX_AGE_SECONDS)
+    newest = now + timedelta(seconds=SAMPLE_MAX_FUTURE_SKEW_SECONDS)
+    accepted: dict[datetime, dict] = {}
+    not_before, not_after = window or (None, None)
+    dropped = {"too_old": 0, "in_future": 0, "outside_phase": 0}
+    for index, sample in enumerate(samples):
+        try:
+            if not isinstance(sample, dict):
+                raise ValueError("Metrics sample must be an object")
+            if "timestamp" not in sample:
+                raise ValueError("Missing sample 'timestamp'")
+            collected_at = _parse_sample_timestamp(sample["timestamp"])
+            metrics = _sample_metrics(sample)
+        except (TypeError, ValueError, OverflowError, OSError) as e:
+            raise ValueError(f"samples[{index}]: {e}")
+        if collected_at < oldest:
+            dropped["too_old"] += 1
+        elif collected_at > newest:
+            dropped["in_future"] += 1
+        elif (not_before is not None and collected_at < not_before) or (
+            not_after is not None and collected_at > not_after
+        ):
+            dropped["outside_phase"] += 1
+        else:
+            # Même timestamp répété dans le payload : le dernier l'emporte, une seule ligne.
+            accepted[collected_at] = metrics
+    if not accepted:
+        raise ValueError(f"No metrics sample within the accepted time window (dropped={dropped})")
+    return sorted(accepted.items(), key=lambda item: item[0]), dropped
+
+
+def _build_sample_rows(
+    data,
+    *,
+    deployment_id,
+    phase: str,
+    metrics_endpoint: str,
+    fetch_duration_ms: int,
+    window: Optional[tuple[Optional[datetime], Optional[datetime]]] = None,
+) -> list[dict]:
+    """
+    Valide le payload et construit les lignes MetricSample (id fixé ici : l'écriture groupée s'en sert).
+    Objet `metrics` : un sample horodaté à la collecte ; tableau `samples` : horodatage de la source,
+    borné par `window` (_deployment_window).
+    """
+    now = datetime.now(timezone.utc)
     try:
-        if not isinstance(data, dict):
-            raise ValueError("Metrics payload must be an object")
-
-        requests_per_sec = _require_float(data, "requests_per_sec")
-        latency_p95 = _require_float(data, "latency_p95")
-        error_rate = _require_float(data, "error_rate")
-        cpu_usage = _require_float(data, "cpu_usage")
-        memory_usage = _require_float(data, "memory_usage")
-
-        _validate_range("requests_per_sec", requests_per_sec, min_value=0.0)
-        _validate_range("latency_p95", latency_p95, min_value=0.0)
-        _validate_range("error_rate", error_rate, min_value=0.0, max_value=1.0)
-        _validate_range("cpu_usage", cpu_usage, min_value=0.0, max_value=1.0)
-        _validate_range("memory_usage", memory_usage, min_value=0.0, max_value=1.0)
-
-        sample = MetricSample(
+        if isinstance(data, list):
+            samples, dropped = _timestamped_samples(data, now, window)
+        else:
+            samples, dropped = [(now, _sample_metrics(data))], {}
+    except (TypeError, ValueError) as e:
+        raise _invalid_payload_error(
+            e,
+            f"samples payload ({len(data)} samples)" if isinstance(data, list) else data,
             deployment_id=deployment_id,
             phase=phase,
-            requests_per_sec=requests_per_sec,
-            latency_p95=latency_p95,
-            error_rate=error_rate,
-            cpu_usage=cpu_usage,
-            memory_usage=memory_usage,
-            collected_at=datetime.now(timezone.utc),
-        )
-        db.add(sample)
+            metrics_endpoint=metrics_endpoint,
+            duration_ms=fetch_duration_ms,
+        )
+
+    for reason, count in dropped.items():
+        if count:
+            inc_collector_samples_dropped(reason, count)
+    if any(dropped.values()):
+        logger.info(
+            "metrics_samples_dropped",
+            deployment_id=str(deployment_id),
+            phase=phase,
+            metrics_endpoint=metrics_endpoint,
+            **dropped,
+        )
+    return [
+        {"id": uuid4(), "deployment_id": deployment_id, "phase": phase, **metrics, "collected_at": collected_at}
+        for collected_at, metrics in samples
+    ]
+
+
+def _write_ack_timeout(rows: int) -> TimeoutError:
+    return TimeoutError(f"Metric samples not flushed within {WRITE_ACK_TIMEOUT_SECONDS}s ({rows} rows)")
+
+
+def _wait_sample_writes(futures: list[concurrent.futures.Future]) -> list[bool]:
+    _done, not_done = concurrent.futures.wait(futures, timeout=WRITE_ACK_TIMEOUT_SECONDS or None)
+    if not_done:
+        # Lignes pas encore prises par un flush : elles ne seront pas écrites ; les autres le seront
+        # (idempotent au retry du job grâce à ON CONFLICT DO NOTHING).
+        for future in not_done:
+            future.cancel()
+        raise _write_ack_timeout(len(futures))
+    return [future.result() for future in futures]
+
+
+def _commit_sample_rows(db, rows: list[dict]) -> list[bool]:
+    if len(rows) == 1:
+        db.add(MetricSample(**rows[0]))
         try:
             db.commit()
         except IntegrityError:
             # Doublon de métriques -> ignore (idempotent)
             db.rollback()
-            logger.info(
-                "metric_sample_duplicate",
-                deployment_id=str(deployment_id),
-                phase=phase,
-                collected_at=sample.collected_at.isoformat(),
-                duration_ms=fetch_duration_ms,
-            )
-            return
+            return [False]
+        return [True]
+    # Payload multi-samples : un seul INSERT, les samples déjà reçus au fetch précédent sont ignorés.
+    try:
+        inserted = insert_samples(db, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return [row["id"] in inserted for row in rows]
+
+
+def _record_samples_written(
+    inserted: list[bool], rows: list[dict], *, metrics_endpoint: str, fetch_duration_ms: int
+) -> None:
+    if len(rows) > 1:
+        written = sum(1 for ok in inserted if ok)
         logger.info(
             "metrics_collected",
-            deployment_id=str(deployment_id),
-            phase=phase,
+            deployment_id=str(rows[0]["deployment_id"]),
+            phase=rows[0]["phase"],
             metrics_endpoint=metrics_endpoint,
-            requests_per_sec=requests_per_sec,
-            latency_p95=latency_p95,
-            error_rate=error_rate,
-            cpu_usage=cpu_usage,
-            memory_usage=memory_usage,
+            samples=len(rows),
+            inserted=written,
+            duplicates=len(rows) - written,
+            first_collected_at=rows[0]["collected_at"].isoformat(),
+            last_collected_at=rows[-1]["collected_at"].isoformat(),
             duration_ms=fetch_duration_ms,
         )
-        inc_metrics_collected(phase=phase)
-    except (TypeError, ValueError) as e:
-        db.rollback()
-        logger.warning(
-            "metrics_payload_invalid",
-            deployment_id=str(deployment_id),
+        if written:
+            inc_metrics_collected(phase=rows[0]["phase"], count=written)
+        return
+
+    row = rows[0]
+    if not inserted[0]:
+        logger.info(
+            "metric_sample_duplicate",
+            deployment_id=str(row["deployment_id"]),
+            phase=row["phase"],
+            collected_at=row["collected_at"].isoformat(),
+            duration_ms=fetch_duration_ms,
+        )
+        return
+    logger.info(
+        "metrics_collected",
+        deployment_id=str(row["deployment_id"]),
+        phase=row["phase"],
+        metrics_endpoint=metrics_endpoint,
+        requests_per_sec=row["requests_per_sec"],
+        latency_p95=row["latency_p95"],
+        error_rate=row["error_rate"],
+        cpu_usage=row["cpu_usage"],
+        memory_usage=row["memory_usage"],
+        duration_ms=fetch_duration_ms,
+    )
+    inc_metrics_collected(phase=row["phase"])
+
+
+def _store_metric_sample(
+    db,
+    *,
+    deployment_id,
+    phase: str,
+    metrics_endpoint: str,
+    data,
+    fetch_duration_ms: int,
+):
+    try:
+        rows = _build_sample_rows(
+            data,
+            deployment_id=deployment_id,
             phase=phase,
             metrics_endpoint=metrics_endpoint,
-            error=str(e),
-            duration_ms=fetch_duration_ms,
+            fetch_duration_ms=fetch_duration_ms,
+            window=_deployment_window(db, deployment_id, phase) if isinstance(data, list) else None,
         )
-        raise ValueError(f"Invalid metric value in {data}: {e}")
+    except ValueError:
+        db.rollback()
+        raise
+    if BUFFERED_WRITES_ENABLED:
+        # Bloque le thread worker jusqu'au flush du lot : le job n'est acquitté qu'une fois les samples écrits.
+        inserted = _wait_sample_writes(get_sample_writer().submit_many(rows))
+    else:
+        inserted = _commit_sample_rows(db, rows)
+    _record_samples_written(inserted, rows, metrics_endpoint=metrics_endpoint, fetch_duration_ms=fetch_duration_ms)
@@ -0,0 +1,490 @@
+# app/metrics/http_client.py
+import asyncio
+import importlib.util
+import ipaddress
+import socket
+import threading
+import time
+import urllib.request
+from typing import Callable, Optional
+
+import anyio
+import httpx
+import structlog
+
+from app.core.settings import settings
+from app.observability.metrics import (
+    inc_collector_dns_cache_lookup,
+    inc_collector_http_host_limit_timeouts,
+    inc_collector_http_pool_request,
+    observe_collector_http_connect,
+    observe_collector_http_tls_handshake,
+)
+
+logger = structlog.get_logger(__name__)
+
+# Client HTTP partagé de la collecte : un endpoint client est interrogé toutes les
+# POST_COLLECTION_INTERVAL_SECONDS, la connexion (TCP + TLS) gardée ouverte d'un sample au suivant.
+MAX_CONNECTIONS = max(1, int(settings.COLLECTOR_HTTP_MAX_CONNECTIONS))
+MAX_KEEPALIVE_CONNECTIONS = max(0, int(settings.COLLECTOR_HTTP_MAX_KEEPALIVE_CONNECTIONS))
+KEEPALIVE_EXPIRY_SECONDS = max(0.0, float(settings.COLLECTOR_HTTP_KEEPALIVE_EXPIRY_SECONDS))
+# Requêtes simultanées par hôte d'endpoint (0 = sans plafond) : un projet qui déploie en rafale
+# n'ouvre pas des dizaines de connexions vers le même service client.
+MAX_CONNECTIONS_PER_HOST = max(0, int(settings.COLLECTOR_HTTP_MAX_CONNECTIONS_PER_HOST))
+HTTP2_ENABLED = bool(settings.COLLECTOR_HTTP2_ENABLED)
+DNS_CACHE_TTL_SECONDS = max(0, int(settings.COLLECTOR_DNS_CACHE_TTL_SECONDS))
+
+
+class DnsCache:
+    """
+    Cache des résolutions d'hôtes d'endpoints (thread-safe), entrées valables `ttl_seconds`.
+    Une connexion refusée sur toutes les adresses en cache invalide l'entrée : l'hôte est
+    résolu à nouveau à la prochaine connexion.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        *,
+        resolver: Callable = socket.getaddrinfo,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self._resolver = resolver
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[float, list[str]]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def lookup(self, host: str) -> Optional[list[str]]:
+        """Adresses connues pour `host`, ou None s'il faut résoudre (absent ou expiré)."""
+        if not self.enabled or _is_ip_address(host):
+            return [host]
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is not None and entry[0] > self._clock():
+                inc_collector_dns_cache_lookup("hit")
+                return list(entry[1])
+        return None
+
+    def resolve(self, host: str, port: int) -> list[str]:
+        """Résout `host` et met le résultat en cache ; OSError si la résolution échoue."""
+        try:
+            infos = self._resolver(host, port, type=socket.SOCK_STREAM)
+        except OSError:
+            inc_collector_dns_cache_lookup("error")
+            raise
+        # Ordre du résolveur conservé (préférence IPv6/IPv4 du système), doublons retirés.
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        if not addresses:
+            inc_collector_dns_cache_lookup("error")
+            raise OSError(f"DNS resolution returned no address for {host}")
+        inc_collector_dns_cache_lookup("miss")
+        with self._lock:
+            self._entries[host] = (self._clock() + self.ttl_seconds, addresses)
+        return list(addresses)
+
+    def invalidate(self, host: str) -> None:
+        with self._lock:
+            self._entries.pop(host, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _is_ip_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return True
+    except ValueError:
+        return False
+
+
+class _ConnectionTrace:
+    """
+    Extension `trace` httpcore d'une requête : une requête qui ouvre une connexion est un miss
+    du pool (temps de connexion TCP et de handshake TLS exportés), sinon un hit (keep-alive).
+    """
+
+    def __init__(self, upstream=None):
+        self._upstream = upstream
+        self._started: dict[str, float] = {}
+        self.new_connection = False
+
+    def record(self, event_name: str, info: dict) -> None:
+        step, _, state = event_name.rpartition(".")
+        if step not in ("connection.connect_tcp", "connection.start_tls"):
+            return
+        if state == "started":
+            self._started[step] = time.perf_counter()
+            self.new_connection = True
+            return
+        started = self._started.pop(step, None)
+        if state != "complete" or started is None:
+            return
+        if step == "connection.connect_tcp":
+            observe_collector_http_connect(connect_seconds=time.perf_counter() - started)
+        else:
+            observe_collector_http_tls_handshake(handshake_seconds=time.perf_counter() - started)
+
+    def __call__(self, event_name: str, info: dict) -> None:
+        self.record(event_name, info)
+        if self._upstream is not None:
+            self._upstream(event_name, info)
+
+    async def acall(self, event_name: str, info: dict) -> None:
+        self.record(event_name, info)
+        if self._upstream is not None:
+            await self._upstream(event_name, info)
+
+    def finish(self) -> None:
+        inc_collector_http_pool_request("miss" if self.new_connection else "hit")
+
+
+def _host_key(request: httpx.Request) -> tuple[str, str, Optional[int]]:
+    return request.url.scheme, request.url.host, request.url.port
+
+
+def _default_port(request: httpx.Request) -> int:
+    return 443 if request.url.scheme == "https" else 80
+
+
+def _pool_timeout(request: httpx.Request) -> Optional[float]:
+    return (request.extensions.get("timeout") or {}).get("pool")
+
+
+def _host_limit_exceeded(request: httpx.Request, max_per_host: int) -> httpx.PoolTimeout:
+    # PoolTimeout est une RequestError : même chemin d'erreur que les autres échecs de fetch.
+    inc_collector_http_host_limit_timeouts()
+    return httpx.PoolTimeout(
+        f"No connection slot available for {request.url.host} ({max_per_host} requests already in flight)",
+        request=request,
+    )
+
+
+def _env_proxy(url: httpx.URL) -> Optional[str]:
+    # Mêmes variables que httpx.get (HTTP(S)_PROXY, ALL_PROXY, NO_PROXY).
+    proxies = urllib.request.getproxies()
+    proxy = proxies.get(url.scheme) or proxies.get("all")
+    if not proxy or urllib.request.proxy_bypass(url.host):
+        return None
+    return proxy if "://" in proxy else f"http://{proxy}"
+
+
+def _route_options(url: httpx.URL, *, max_per_host: int, max_connections: Optional[int]) -> dict:
+    """Options publiques du HTTPTransport d'un hôte : pool keep-alive, HTTP/2, proxy d'environnement."""
+    limits = _limits(max_per_host or max_connections)
+    return dict(limits=limits, http2=_http2(), proxy=_env_proxy(url))
+
+
+def _resolve_failed(request: httpx.Request, error: OSError) -> httpx.ConnectError:
+    return httpx.ConnectError(f"DNS resolution failed for {request.url.host}: {error}", request=request)
+
+
+def _pinned_request(request: httpx.Request, address: str) -> httpx.Request:
+    # Connexion vers l'adresse résolue ; l'en-tête Host et le SNI (donc la vérification du
+    # certificat) restent sur le nom d'hôte de l'endpoint.
+    return httpx.Request(
+        request.method,
+        request.url.copy_with(host=address),
+        headers=request.headers,
+        stream=request.stream,
+        extensions={**request.extensions, "sni_hostname": request.url.host},
+    )
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+            self._release = lambda: None
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+            self._release = lambda: None
+
+
+def _response_with_stream(response: httpx.Response, stream) -> httpx.Response:
+    return httpx.Response(
+        status_code=response.status_code,
+        headers=response.headers,
+        stream=stream,
+        extensions=response.extensions,
+    )
+
+
+class CollectorTransport(httpx.BaseTransport):
+    """
+    Transport de la collecte : un httpx.HTTPTransport par hôte d'endpoint (pool keep-alive à lui,
+    jamais partagé entre noms d'hôte : une connexion TLS n'est réutilisée que pour le nom vérifié),
+    connexions ouvertes vers les adresses du DnsCache, plafond de requêtes simultanées par hôte
+    (le slot est rendu à la fermeture de la réponse) et métriques de réutilisation des connexions.
+    `transport` remplace les transports par hôte et la résolution (tests).
+    """
+
+    def __init__(
+        self,
+        transport: Optional[httpx.BaseTransport] = None,
+        *,
+        max_per_host: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        dns_cache: Optional[DnsCache] = None,
+    ):
+        self._transport = transport
+        self._max_per_host = max(0, int(MAX_CONNECTIONS_PER_HOST if max_per_host is None else max_per_host))
+        self._max_connections = max_connections
+        self._dns_cache = dns_cache if dns_cache is not None else _dns_cache
+        self._lock = threading.Lock()
+        # Un sémaphore et un transport par hôte d'endpoint : bornés par le nombre de projets, jamais purgés.
+        self._slots: dict[tuple, threading.BoundedSemaphore] = {}
+        self._routes: dict[tuple, tuple[httpx.BaseTransport, bool]] = {}
+
+    def _host_slot(self, request: httpx.Request) -> Optional[threading.BoundedSemaphore]:
+        if self._max_per_host <= 0:
+            return None
+        key = _host_key(request)
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = threading.BoundedSemaphore(self._max_per_host)
+        return slot
+
+    def _route(self, request: httpx.Request) -> tuple[httpx.BaseTransport, bool]:
+        """Transport de l'hôte, et si ses connexions passent par le DnsCache (pas derrière un proxy)."""
+        if self._transport is not None:
+            return self._transport, False
+        key = _host_key(request)
+        with self._lock:
+            route = self._routes.get(key)
+            if route is None:
+                options = _route_options(
+                    request.url, max_per_host=self._max_per_host, max_connections=self._max_connections
+                )
+                route = self._routes[key] = (httpx.HTTPTransport(**options), options["proxy"] is None)
+        return route
+
+    def _send(self, request: httpx.Request) -> httpx.Response:
+        transport, pinned = self._route(request)
+        host = request.url.host
+        addresses = self._dns_cache.lookup(host) if pinned else [host]
+        if addresses is None:
+            try:
+                addresses = self._dns_cache.resolve(host, request.url.port or _default_port(request))
+            except OSError as e:
+                raise _resolve_failed(request, e) from e
+        if addresses == [host]:
+            return transport.handle_request(request)
+        last_error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return transport.handle_request(_pinned_request(request, address))
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                last_error = e
+        # Aucune adresse en cache ne répond : l'hôte sera résolu à nouveau.
+        self._dns_cache.invalidate(host)
+        raise last_error
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        slot = self._host_slot(request)
+        if slot is not None:
+            timeout = _pool_timeout(request)
+            # Sans timeout de pool, attente sans borne (comme le transport async et le pool httpcore).
+            acquired = slot.acquire() if timeout is None else slot.acquire(timeout=timeout)
+            if not acquired:
+                raise _host_limit_exceeded(request, self._max_per_host)
+        release = slot.release if slot is not None else (lambda: None)
+        trace = _ConnectionTrace(request.extensions.get("trace"))
+        request.extensions["trace"] = trace
+        try:
+            response = self._send(request)
+        except BaseException:
+            release()
+            raise
+        trace.finish()
+        return _response_with_stream(response, _ReleasingStream(response.stream, release))
+
+    def close(self) -> None:
+        with self._lock:
+            routes, self._routes = list(self._routes.values()), {}
+        for transport, _pinned in routes:
+            transport.close()
+        if self._transport is not None:
+            self._transport.close()
+
+
+class AsyncCollectorTransport(httpx.AsyncBaseTransport):
+    """Équivalent asyncio de CollectorTransport (exécuteur async du scheduler)."""
+
+    def __init__(
+        self,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        *,
+        max_per_host: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        dns_cache: Optional[DnsCache] = None,
+    ):
+        self._transport = transport
+        self._max_per_host = max(0, int(MAX_CONNECTIONS_PER_HOST if max_per_host is None else max_per_host))
+        self._max_connections = max_connections
+        self._dns_cache = dns_cache if dns_cache is not None else _dns_cache
+        # Utilisé depuis la seule boucle de l'exécuteur : pas de verrou.
+        self._slots: dict[tuple, asyncio.Semaphore] = {}
+        self._routes: dict[tuple, tuple[httpx.AsyncBaseTransport, bool]] = {}
+
+    def _host_slot(self, request: httpx.Request) -> Optional[asyncio.Semaphore]:
+        if self._max_per_host <= 0:
+            return None
+        key = _host_key(request)
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = asyncio.Semaphore(self._max_per_host)
+        return slot
+
+    def _route(self, request: httpx.Request) -> tuple[httpx.AsyncBaseTransport, bool]:
+        if self._transport is not None:
+            return self._transport, False
+        key = _host_key(request)
+        route = self._routes.get(key)
+        if route is None:
+            options = _route_options(request.url, max_per_host=self._max_per_host, max_connections=self._max_connections)
+            route = self._routes[key] = (httpx.AsyncHTTPTransport(**options), options["proxy"] is None)
+        return route
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        transport, pinned = self._route(request)
+        host = request.url.host
+        addresses = self._dns_cache.lookup(host) if pinned else [host]
+        if addresses is None:
+            # Résolution bloquante dans un thread, seulement sur un miss.
+            try:
+                addresses = await anyio.to_thread.run_sync(
+                    self._dns_cache.resolve, host, request.url.port or _default_port(request)
+                )
+            except OSError as e:
+                raise _resolve_failed(request, e) from e
+        if addresses == [host]:
+            return await transport.handle_async_request(request)
+        last_error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await transport.handle_async_request(_pinned_request(request, address))
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                last_error = e
+        self._dns_cache.invalidate(host)
+        raise last_error
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        slot = self._host_slot(request)
+        if slot is not None:
+            try:
+                await asyncio.wait_for(slot.acquire(), timeout=_pool_timeout(request))
+            except asyncio.TimeoutError:
+                raise _host_limit_exceeded(request, self._max_per_host) from None
+        release = slot.release if slot is not None else (lambda: None)
+        trace = _ConnectionTrace(request.extensions.get("trace"))
+        request.extensions["trace"] = trace.acall
+        try:
+            response = await self._send(request)
+        except BaseException:
+            release()
+            raise
+        trace.finish()
+        return _response_with_stream(response, _AsyncReleasingStream(response.stream, release))
+
+    async def aclose(self) -> None:
+        routes, self._routes = list(self._routes.values()), {}
+        for transport, _pinned in routes:
+            await transport.aclose()
+        if self._transport is not None:
+            await self._transport.aclose()
+
+
+# Partagé par le client sync et les clients async : un hôte résolu par l'un sert à l'autre.
+_dns_cache = DnsCache(DNS_CACHE_TTL_SECONDS)
+_http2_warned = False
+
+
+def _http2() -> bool:
+    global _http2_warned
+    if not HTTP2_ENABLED:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        if not _http2_warned:
+            _http2_warned = True
+            logger.warning("collector_http2_unavailable", reason="h2 package not installed, falling back to HTTP/1.1")
+        return False
+    return True
+
+
+def _limits(max_connections: Optional[int]) -> httpx.Limits:
+    max_connections = max(1, int(max_connections or MAX_CONNECTIONS))
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(max_connections, MAX_KEEPALIVE_CONNECTIONS),
+        keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+def build_http_client(*, transport: Optional[httpx.BaseTransport] = None) -> httpx.Client:
+    """Client sync de la collecte (`transport` : un HTTPTransport par hôte par défaut, remplaçable en test)."""
+    return httpx.Client(transport=CollectorTransport(transport))
+
+
+def build_async_http_client(
+    *,
+    max_connections: Optional[int] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """Client asyncio de la collecte, un par exécuteur async (lié à sa boucle)."""
+    return httpx.AsyncClient(transport=AsyncCollectorTransport(transport, max_connections=max_connections))
+
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """Client sync partagé (threads du scheduler, preflight des endpoints), créé au premier appel."""
+    global _client
+    client = _client
+    if client is not None:
+        return client
+    with _client_lock:
+        if _client is None:
+            _client = build_http_client()
+        return _client
+
+
+def close_http_client() -> None:
+    """Ferme les connexions gardées ouvertes (arrêt du process) ; un appel suivant recrée le client."""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
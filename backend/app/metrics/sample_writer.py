@@ -0,0 +1,216 @@
+# app/metrics/sample_writer.py
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+import structlog
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.db.models.metric_sample import MetricSample
+from app.db.session import SessionLocal
+from app.observability.metrics import observe_collector_sample_flush
+
+logger = structlog.get_logger(__name__)
+
+# Écriture groupée des MetricSample : les lignes de nombreuses collectes concurrentes partent en un
+# seul INSERT multi-lignes ON CONFLICT DO NOTHING, dès BATCH_SIZE lignes ou FLUSH_INTERVAL_SECONDS
+# après la plus ancienne. Activée par COLLECTOR_BUFFERED_WRITES_ENABLED (app/metrics/collector.py).
+BATCH_SIZE = max(1, int(settings.COLLECTOR_WRITE_BATCH_SIZE))
+FLUSH_INTERVAL_SECONDS = max(0, int(settings.COLLECTOR_WRITE_FLUSH_INTERVAL_MS)) / 1000.0
+
+# Clé de l'index unique uq_metric_sample : un doublon (retry après un flush réussi) est ignoré.
+_CONFLICT_COLUMNS = ["deployment_id", "phase", "collected_at"]
+_INSERT_BY_DIALECT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def insert_samples(db: Session, rows: list[dict]) -> set:
+    """
+    INSERT multi-lignes idempotent (pas de commit) ; retourne les ids réellement insérés.
+    Chaque ligne porte son `id` : c'est lui qui distingue une ligne insérée d'un doublon ignoré.
+    """
+    if not rows:
+        return set()
+    insert = _INSERT_BY_DIALECT.get(db.get_bind().dialect.name)
+    if insert is None:
+        raise RuntimeError(f"Bulk metric sample insert not supported on {db.get_bind().dialect.name}")
+    statement = (
+        insert(MetricSample)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=_CONFLICT_COLUMNS)
+        .returning(MetricSample.id)
+    )
+    return set(db.execute(statement).scalars())
+
+
+class MetricSampleWriter:
+    """
+    Tampon d'écriture partagé par les collectes d'un processus (threads workers et boucle async).
+    `submit` retourne un Future résolu après le commit du lot : True si la ligne a été insérée,
+    False si c'était un doublon. Une ligne rejetée par la base (FK, contrainte) n'échoue que son
+    propre Future ; une erreur de connexion est propagée à toutes les lignes du lot.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_factory: Optional[Callable[[], Session]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval_seconds: Optional[float] = None,
+        name: str = "metric-sample-writer",
+    ):
+        self._session_factory = session_factory
+        self.batch_size = max(1, int(BATCH_SIZE if batch_size is None else batch_size))
+        self.flush_interval_seconds = max(
+            0.0, float(FLUSH_INTERVAL_SECONDS if flush_interval_seconds is None else flush_interval_seconds)
+        )
+        self._name = name
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending: list[tuple[dict, Future]] = []
+        self._oldest_at: Optional[float] = None
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+
+    def submit(self, row: dict) -> Future:
+        return self.submit_many([row])[0]
+
+    def submit_many(self, rows: list[dict]) -> list[Future]:
+        """Lignes d'un même payload, mises en file d'un bloc : elles partent dans le même flush (sauf lot plein)."""
+        futures: list[Future] = [Future() for _ in rows]
+        with self._lock:
+            if self._stopping:
+                raise RuntimeError("Metric sample writer is stopped")
+            was_empty = not self._pending
+            if was_empty:
+                self._oldest_at = time.monotonic()
+            self._pending.extend(zip(rows, futures))
+            if was_empty or len(self._pending) >= self.batch_size:
+                self._wakeup.notify()
+        return futures
+
+    def write(self, row: dict, timeout: Optional[float] = None) -> bool:
+        return self.submit(row).result(timeout=timeout)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Flush des lignes en attente puis arrêt du thread."""
+        with self._lock:
+            self._stopping = True
+            thread, self._thread = self._thread, None
+            self._wakeup.notify()
+        if thread is not None:
+            thread.join(timeout=timeout)
+        else:
+            self._flush(self._take_batch(all_rows=True))
+
+    def _take_batch(self, *, all_rows: bool = False) -> list[tuple[dict, Future]]:
+        size = len(self._pending) if all_rows else self.batch_size
+        batch, self._pending = self._pending[:size], self._pending[size:]
+        self._oldest_at = time.monotonic() if self._pending else None
+        # Lignes abandonnées par leur appelant (timeout d'acquittement) : non écrites ; les autres
+        # ne sont plus annulables, le flush peut résoudre leur Future sans course.
+        return [(row, future) for row, future in batch if future.set_running_or_notify_cancel()]
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._stopping:
+                    if len(self._pending) >= self.batch_size:
+                        break
+                    if self._pending:
+                        remaining = self._oldest_at + self.flush_interval_seconds - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._wakeup.wait(remaining)
+                    else:
+                        self._wakeup.wait()
+                if self._stopping and not self._pending:
+                    return
+                batch = self._take_batch(all_rows=self._stopping)
+            self._flush(batch)
+
+    def _flush(self, batch: list[tuple[dict, Future]]) -> None:
+        if not batch:
+            return
+        started = time.perf_counter()
+        session_factory = self._session_factory or SessionLocal
+        rows = [row for row, _ in batch]
+        try:
+            with session_factory() as db:
+                inserted = insert_samples(db, rows)
+                db.commit()
+        except (IntegrityError, DataError) as e:
+            # Une ligne invalide rejette tout l'INSERT multi-lignes : reprise ligne par ligne pour
+            # n'échouer que les Futures des lignes fautives.
+            logger.warning("metric_samples_flush_row_fallback", rows=len(rows), error=str(e))
+            self._flush_rows(batch, session_factory)
+            observe_collector_sample_flush(
+                rows=len(rows), duration_seconds=time.perf_counter() - started, outcome="row_fallback"
+            )
+            return
+        except Exception as e:
+            observe_collector_sample_flush(rows=len(rows), duration_seconds=time.perf_counter() - started, outcome="error")
+            logger.warning("metric_samples_flush_failed", rows=len(rows), error=str(e))
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        observe_collector_sample_flush(rows=len(rows), duration_seconds=time.perf_counter() - started, outcome="ok")
+        for row, future in batch:
+            future.set_result(row["id"] in inserted)
+
+    def _flush_rows(self, batch: list[tuple[dict, Future]], session_factory: Callable[[], Session]) -> None:
+        try:
+            with session_factory() as db:
+                for row, future in batch:
+                    try:
+                        inserted = insert_samples(db, [row])
+                        db.commit()
+                    except (IntegrityError, DataError) as e:
+                        db.rollback()
+                        logger.warning("metric_sample_write_rejected", deployment_id=str(row["deployment_id"]), error=str(e))
+                        future.set_exception(e)
+                        continue
+                    future.set_result(row["id"] in inserted)
+        except Exception as e:
+            logger.warning("metric_samples_flush_failed", rows=len(batch), error=str(e))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+
+_writer: Optional[MetricSampleWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_sample_writer() -> MetricSampleWriter:
+    """Writer partagé du processus, démarré au premier sample collecté en mode buffered."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = MetricSampleWriter()
+            _writer.start()
+        return _writer
+
+
+def close_sample_writer(timeout: Optional[float] = 10.0) -> None:
+    """Arrêt du process : les samples encore en tampon sont écrits avant de rendre la main."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop(timeout=timeout)
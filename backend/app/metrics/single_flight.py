@@ -0,0 +1,122 @@
+# app/metrics/single_flight.py
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Hashable, Optional
+
+# Rôle d'un appelant : `fetched` (a fait l'appel), `joined` (a attendu l'appel en cours),
+# `reused` (résultat d'un appel terminé depuis moins de la fenêtre).
+FETCHED = "fetched"
+JOINED = "joined"
+REUSED = "reused"
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "completed_at")
+
+    def __init__(self, done):
+        self.done = done
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.completed_at: Optional[float] = None
+
+
+class _SingleFlightTable:
+    """
+    Appels en cours (et récemment terminés) par clé. Le verrou n'est tenu que pour lire ou
+    modifier la table, jamais pendant l'appel.
+    """
+
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def _join(self, key: Hashable, window_seconds: float, new_event) -> tuple[_Call, str]:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call.completed_at is not None:
+                if call.error is None and self._clock() - call.completed_at < window_seconds:
+                    return call, REUSED
+                call = None
+            if call is not None:
+                return call, JOINED
+            call = self._calls[key] = _Call(new_event())
+            return call, FETCHED
+
+    def _complete(self, key: Hashable, call: _Call, window_seconds: float) -> None:
+        now = self._clock()
+        with self._lock:
+            call.completed_at = now
+            if call.error is not None or window_seconds <= 0:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            # Purge des résultats sortis de la fenêtre : la table reste bornée par le débit d'appels.
+            expired = [
+                other_key
+                for other_key, other in self._calls.items()
+                if other.completed_at is not None and now - other.completed_at >= window_seconds
+            ]
+            for other_key in expired:
+                del self._calls[other_key]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(1 for call in self._calls.values() if call.completed_at is None)
+
+
+class SingleFlight(_SingleFlightTable):
+    """
+    Coalescence d'appels bloquants : les appelants concurrents d'une même clé partagent un seul
+    appel de `fn` (résultat ou exception), et pendant `window_seconds` après sa fin les appelants
+    suivants reçoivent le même résultat. Un échec n'est jamais réutilisé au-delà des appelants en attente.
+    Le résultat est partagé tel quel : les appelants ne doivent pas le modifier.
+    """
+
+    def do(self, key: Hashable, fn: Callable[[], object], *, window_seconds: float = 0.0) -> tuple[object, str]:
+        call, role = self._join(key, window_seconds, threading.Event)
+        if role == FETCHED:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                self._complete(key, call, window_seconds)
+                call.done.set()
+            return call.result, role
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result, role
+
+
+class AsyncSingleFlight(_SingleFlightTable):
+    """Équivalent asyncio de SingleFlight, pour les appels d'une même boucle."""
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[object]],
+        *,
+        window_seconds: float = 0.0,
+    ) -> tuple[object, str]:
+        call, role = self._join(key, window_seconds, asyncio.Event)
+        if role == FETCHED:
+            try:
+                call.result = await fn()
+            except asyncio.CancelledError:
+                # Seul le leader est annulé : les appelants en attente reçoivent une erreur ordinaire.
+                call.error = RuntimeError("Shared call was cancelled")
+                raise
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                self._complete(key, call, window_seconds)
+                call.done.set()
+            return call.result, role
+        await call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result, role
@@ -21,11 +21,29 @@ SCHEDULER_JOBS_PENDING = Gauge(
     "Number of scheduler jobs currently pending",
 )
 
+SCHEDULER_JOBS = Gauge(
+    "seqpulse_scheduler_jobs",
+    "Scheduler jobs by status and job type (incremental counters)",
+    ["status", "job_type"],
+)
+
+SCHEDULER_LANE_PENDING_JOBS = Gauge(
+    "seqpulse_scheduler_lane_pending_jobs",
+    "Pending scheduler jobs per execution lane, due or not (incremental counters)",
+    ["lane"],
+)
+
 SCHEDULER_JOBS_FAILED_TOTAL = Counter(
     "seqpulse_scheduler_jobs_failed_total",
     "Total scheduler jobs marked as failed",
 )
 
+SCHEDULER_JOB_FAILURES_TOTAL = Counter(
+    "seqpulse_scheduler_job_failures_total",
+    "Failed scheduler job executions (retried or final) by failure class (timeout, hmac, error)",
+    ["job_type", "failure_class"],
+)
+
 SCHEDULER_JOB_START_DELAY_SECONDS = Histogram(
     "seqpulse_scheduler_job_start_delay_seconds",
     "Delay between scheduled_at and actual scheduler start time in seconds",
@@ -33,6 +51,213 @@ SCHEDULER_JOB_START_DELAY_SECONDS = Histogram(
     buckets=(0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600),
 )
 
+SCHEDULER_CLAIM_BATCH_SIZE = Histogram(
+    "seqpulse_scheduler_claim_batch_size",
+    "Number of scheduler jobs claimed per claim statement",
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200),
+)
+
+SCHEDULER_CLAIMS_LOST_TOTAL = Counter(
+    "seqpulse_scheduler_claims_lost_total",
+    "Total scheduler jobs selected for a claim but already taken by another poller",
+)
+
+SCHEDULER_WORKER_SLOTS = Gauge(
+    "seqpulse_scheduler_worker_slots",
+    "Scheduler worker pool slots by state (busy, idle, queued)",
+    ["state"],
+)
+
+SCHEDULER_LEASE_EVENTS_TOTAL = Counter(
+    "seqpulse_scheduler_lease_events_total",
+    "Scheduler job lease events (recovered after expiry, lost during renewal)",
+    ["event"],
+)
+
+SCHEDULER_DEADLINE_MISSED_TOTAL = Counter(
+    "seqpulse_scheduler_deadline_missed_total",
+    "Scheduler jobs claimed after their lateness budget expired",
+    ["job_type"],
+)
+
+SCHEDULER_DEPENDENCY_EVENTS_TOTAL = Counter(
+    "seqpulse_scheduler_dependency_events_total",
+    "Scheduler job dependency events (released, deferred, fallback)",
+    ["event", "job_type"],
+)
+
+SCHEDULER_LANE_QUEUE_DEPTH = Gauge(
+    "seqpulse_scheduler_lane_queue_depth",
+    "Due pending scheduler jobs waiting per execution lane",
+    ["lane"],
+)
+
+SCHEDULER_LANE_IN_FLIGHT = Gauge(
+    "seqpulse_scheduler_lane_in_flight",
+    "Scheduler jobs claimed and not yet finished per execution lane",
+    ["lane"],
+)
+
+SCHEDULER_LANE_START_DELAY_SECONDS = Histogram(
+    "seqpulse_scheduler_lane_start_delay_seconds",
+    "Delay between scheduled_at and execution start per execution lane",
+    ["lane"],
+    buckets=(0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600),
+)
+
+SCHEDULER_SHARDS_OWNED = Gauge(
+    "seqpulse_scheduler_shards_owned",
+    "Scheduler shards owned by this worker process",
+)
+
+SCHEDULER_SHARD_MEMBERS = Gauge(
+    "seqpulse_scheduler_shard_members",
+    "Live scheduler workers seen by this process when assigning shards",
+)
+
+SCHEDULER_SHARD_REBALANCES_TOTAL = Counter(
+    "seqpulse_scheduler_shard_rebalances_total",
+    "Shard assignment changes observed by this worker process",
+)
+
+SCHEDULER_CATCH_UP_ACTIVE = Gauge(
+    "seqpulse_scheduler_catch_up_active",
+    "1 while this scheduler process is in backlog catch-up mode",
+)
+
+SCHEDULER_CATCH_UP_BACKLOG = Gauge(
+    "seqpulse_scheduler_catch_up_backlog",
+    "Pending scheduler jobs past their deadline seen by this process",
+)
+
+SCHEDULER_CATCH_UP_COLLAPSED_TOTAL = Counter(
+    "seqpulse_scheduler_catch_up_collapsed_total",
+    "Stale post-collection samples dropped by catch-up mode",
+)
+
+SCHEDULER_JOBS_ARCHIVED_TOTAL = Counter(
+    "seqpulse_scheduler_jobs_archived_total",
+    "Terminal scheduler jobs moved out of scheduled_jobs by the retention job",
+    ["status"],
+)
+
+SCHEDULER_ARCHIVE_PURGED_TOTAL = Counter(
+    "seqpulse_scheduler_archive_purged_total",
+    "Archived scheduler jobs deleted past the archive retention",
+)
+
+SCHEDULER_DRAIN_JOBS_TOTAL = Counter(
+    "seqpulse_scheduler_drain_jobs_total",
+    "In-flight scheduler jobs at shutdown, by outcome of the drain (finished|handed_back)",
+    ["outcome"],
+)
+
+SCHEDULER_JOBS_DEAD_LETTERED_TOTAL = Counter(
+    "seqpulse_scheduler_jobs_dead_lettered_total",
+    "Scheduler jobs moved to scheduled_jobs_dead_letter after their retry policy gave up",
+    ["job_type", "reason"],
+)
+
+SCHEDULER_DEAD_LETTER_REPLAYED_TOTAL = Counter(
+    "seqpulse_scheduler_dead_letter_replayed_total",
+    "Dead-lettered scheduler jobs requeued through the replay API",
+    ["job_type"],
+)
+
+SCHEDULER_COLLECT_TARGET_LOOKUPS_TOTAL = Counter(
+    "seqpulse_scheduler_collect_target_lookups_total",
+    "Collect target resolutions by the scheduler workers (cache hit, miss or legacy job payload)",
+    ["result"],
+)
+
+SCHEDULER_TENANT_BACKLOG = Gauge(
+    "seqpulse_scheduler_tenant_backlog",
+    "Due pending scheduler jobs per tenant (top tenants by backlog only)",
+    ["tenant"],
+)
+
+SCHEDULER_TENANT_MAX_LATENESS_SECONDS = Gauge(
+    "seqpulse_scheduler_tenant_max_lateness_seconds",
+    "Age of the oldest due pending job per tenant (top tenants by backlog only)",
+    ["tenant"],
+)
+
+SCHEDULER_TENANTS_BACKLOGGED = Gauge(
+    "seqpulse_scheduler_tenants_backlogged",
+    "Tenants with at least one due pending scheduler job",
+)
+
+COLLECTOR_HTTP_POOL_REQUESTS_TOTAL = Counter(
+    "seqpulse_collector_http_pool_requests_total",
+    "Metrics endpoint requests by connection pool outcome (hit: kept-alive connection reused, miss: new connection)",
+    ["result"],
+)
+
+COLLECTOR_HTTP_CONNECT_SECONDS = Histogram(
+    "seqpulse_collector_http_connect_seconds",
+    "TCP connect time of new connections to metrics endpoints",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+COLLECTOR_HTTP_TLS_HANDSHAKE_SECONDS = Histogram(
+    "seqpulse_collector_http_tls_handshake_seconds",
+    "TLS handshake time of new connections to metrics endpoints",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+COLLECTOR_DNS_CACHE_LOOKUPS_TOTAL = Counter(
+    "seqpulse_collector_dns_cache_lookups_total",
+    "Metrics endpoint host resolutions by the collector DNS cache (hit, miss or error)",
+    ["result"],
+)
+
+COLLECTOR_HTTP_HOST_LIMIT_TIMEOUTS_TOTAL = Counter(
+    "seqpulse_collector_http_host_limit_timeouts_total",
+    "Metrics endpoint requests rejected after waiting for a per-host connection slot",
+)
+
+COLLECTOR_FETCHES_TOTAL = Counter(
+    "seqpulse_collector_fetches_total",
+    "Metrics collections by fetch role (fetched: own HTTP call, joined: shared an in-flight call, reused: shared a just-completed call)",
+    ["role"],
+)
+
+COLLECTOR_CIRCUIT_BREAKERS = Gauge(
+    "seqpulse_collector_circuit_breakers",
+    "Metrics endpoint hosts by circuit breaker state (closed|open|half_open)",
+    ["state"],
+)
+
+COLLECTOR_CIRCUIT_TRANSITIONS_TOTAL = Counter(
+    "seqpulse_collector_circuit_transitions_total",
+    "Circuit breaker state transitions of metrics endpoint hosts, by new state",
+    ["state"],
+)
+
+COLLECTOR_CIRCUIT_REJECTED_TOTAL = Counter(
+    "seqpulse_collector_circuit_rejected_total",
+    "Metrics collections failed fast without a network call because the endpoint host circuit was open",
+)
+
+COLLECTOR_SAMPLE_FLUSH_ROWS = Histogram(
+    "seqpulse_collector_sample_flush_rows",
+    "Metric samples written per buffered flush (one multi-row INSERT)",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+
+COLLECTOR_SAMPLE_FLUSH_SECONDS = Histogram(
+    "seqpulse_collector_sample_flush_seconds",
+    "Duration of buffered metric sample flushes (insert + commit), by outcome",
+    ["outcome"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+COLLECTOR_SAMPLES_DROPPED_TOTAL = Counter(
+    "seqpulse_collector_samples_dropped_total",
+    "Timestamped samples of multi-sample payloads ignored because outside the accepted time window",
+    ["reason"],
+)
+
 HTTP_REQUESTS_TOTAL = Counter(
     "seqpulse_http_requests_total",
     "Total HTTP requests handled by SeqPulse API",
@@ -89,8 +314,8 @@ ANALYSIS_LAST_VERDICT_TIMESTAMP = Gauge(
 )
 
 
-def inc_metrics_collected(phase: str) -> None:
-    METRICS_COLLECTED_TOTAL.labels(phase=phase).inc()
+def inc_metrics_collected(phase: str, count: int = 1) -> None:
+    METRICS_COLLECTED_TOTAL.labels(phase=phase).inc(count)
 
 
 def observe_analysis_duration(duration_seconds: float, outcome: str) -> None:
@@ -101,14 +326,161 @@ def set_scheduler_jobs_pending(value: int) -> None:
     SCHEDULER_JOBS_PENDING.set(value)
 
 
+def set_scheduler_job_counts(*, counts: dict[tuple[str, str], int], pending_by_lane: dict[str, int]) -> None:
+    SCHEDULER_JOBS.clear()
+    for (status, job_type), count in counts.items():
+        SCHEDULER_JOBS.labels(status=status, job_type=job_type).set(count)
+    for lane, count in pending_by_lane.items():
+        SCHEDULER_LANE_PENDING_JOBS.labels(lane=lane).set(count)
+
+
 def inc_scheduler_jobs_failed() -> None:
     SCHEDULER_JOBS_FAILED_TOTAL.inc()
 
 
+def inc_scheduler_job_failures(*, job_type: str, failure_class: str) -> None:
+    SCHEDULER_JOB_FAILURES_TOTAL.labels(job_type=job_type, failure_class=failure_class).inc()
+
+
 def observe_scheduler_job_start_delay(*, job_type: str, delay_seconds: float) -> None:
     SCHEDULER_JOB_START_DELAY_SECONDS.labels(job_type=job_type).observe(delay_seconds)
 
 
+def observe_scheduler_claim(*, claimed: int, lost: int) -> None:
+    SCHEDULER_CLAIM_BATCH_SIZE.observe(claimed)
+    if lost > 0:
+        SCHEDULER_CLAIMS_LOST_TOTAL.inc(lost)
+
+
+def set_scheduler_worker_slots(*, busy: int, idle: int, queued: int) -> None:
+    SCHEDULER_WORKER_SLOTS.labels(state="busy").set(busy)
+    SCHEDULER_WORKER_SLOTS.labels(state="idle").set(idle)
+    SCHEDULER_WORKER_SLOTS.labels(state="queued").set(queued)
+
+
+def inc_scheduler_lease_events(*, event: str, count: int = 1) -> None:
+    if count > 0:
+        SCHEDULER_LEASE_EVENTS_TOTAL.labels(event=event).inc(count)
+
+
+def inc_scheduler_deadline_missed(*, job_type: str) -> None:
+    SCHEDULER_DEADLINE_MISSED_TOTAL.labels(job_type=job_type).inc()
+
+
+def inc_scheduler_dependency_events(*, event: str, job_type: str, count: int = 1) -> None:
+    SCHEDULER_DEPENDENCY_EVENTS_TOTAL.labels(event=event, job_type=job_type).inc(count)
+
+
+def set_scheduler_lane_queue_depth(*, lane: str, depth: int) -> None:
+    SCHEDULER_LANE_QUEUE_DEPTH.labels(lane=lane).set(depth)
+
+
+def set_scheduler_lane_in_flight(*, lane: str, in_flight: int) -> None:
+    SCHEDULER_LANE_IN_FLIGHT.labels(lane=lane).set(in_flight)
+
+
+def observe_scheduler_lane_start_delay(*, lane: str, delay_seconds: float) -> None:
+    SCHEDULER_LANE_START_DELAY_SECONDS.labels(lane=lane).observe(delay_seconds)
+
+
+def set_scheduler_shard_assignment(*, owned: int, members: int) -> None:
+    SCHEDULER_SHARDS_OWNED.set(owned)
+    SCHEDULER_SHARD_MEMBERS.set(members)
+
+
+def inc_scheduler_shard_rebalances() -> None:
+    SCHEDULER_SHARD_REBALANCES_TOTAL.inc()
+
+
+def set_scheduler_catch_up(*, active: bool, backlog: int) -> None:
+    SCHEDULER_CATCH_UP_ACTIVE.set(1 if active else 0)
+    SCHEDULER_CATCH_UP_BACKLOG.set(backlog)
+
+
+def inc_scheduler_catch_up_collapsed(count: int) -> None:
+    SCHEDULER_CATCH_UP_COLLAPSED_TOTAL.inc(count)
+
+
+def inc_scheduler_jobs_archived(*, status: str, count: int) -> None:
+    SCHEDULER_JOBS_ARCHIVED_TOTAL.labels(status=status).inc(count)
+
+
+def inc_scheduler_archive_purged(count: int) -> None:
+    SCHEDULER_ARCHIVE_PURGED_TOTAL.inc(count)
+
+
+def inc_scheduler_drain_jobs(*, outcome: str, count: int) -> None:
+    SCHEDULER_DRAIN_JOBS_TOTAL.labels(outcome=outcome).inc(count)
+
+
+def inc_scheduler_jobs_dead_lettered(*, job_type: str, reason: str, count: int = 1) -> None:
+    SCHEDULER_JOBS_DEAD_LETTERED_TOTAL.labels(job_type=job_type, reason=reason).inc(count)
+
+
+def inc_scheduler_dead_letter_replayed(*, job_type: str, count: int = 1) -> None:
+    SCHEDULER_DEAD_LETTER_REPLAYED_TOTAL.labels(job_type=job_type).inc(count)
+
+
+def inc_scheduler_collect_target_lookup(result: str) -> None:
+    SCHEDULER_COLLECT_TARGET_LOOKUPS_TOTAL.labels(result=result).inc()
+
+
+def inc_collector_http_pool_request(result: str) -> None:
+    COLLECTOR_HTTP_POOL_REQUESTS_TOTAL.labels(result=result).inc()
+
+
+def observe_collector_http_connect(*, connect_seconds: float) -> None:
+    COLLECTOR_HTTP_CONNECT_SECONDS.observe(max(0.0, connect_seconds))
+
+
+def observe_collector_http_tls_handshake(*, handshake_seconds: float) -> None:
+    COLLECTOR_HTTP_TLS_HANDSHAKE_SECONDS.observe(max(0.0, handshake_seconds))
+
+
+def inc_collector_dns_cache_lookup(result: str) -> None:
+    COLLECTOR_DNS_CACHE_LOOKUPS_TOTAL.labels(result=result).inc()
+
+
+def inc_collector_http_host_limit_timeouts() -> None:
+    COLLECTOR_HTTP_HOST_LIMIT_TIMEOUTS_TOTAL.inc()
+
+
+def inc_collector_fetch(role: str) -> None:
+    COLLECTOR_FETCHES_TOTAL.labels(role=role).inc()
+
+
+def set_collector_circuit_breakers(counts: dict[str, int]) -> None:
+    for state, count in counts.items():
+        COLLECTOR_CIRCUIT_BREAKERS.labels(state=state).set(count)
+
+
+def inc_collector_circuit_transition(state: str) -> None:
+    COLLECTOR_CIRCUIT_TRANSITIONS_TOTAL.labels(state=state).inc()
+
+
+def inc_collector_circuit_rejected() -> None:
+    COLLECTOR_CIRCUIT_REJECTED_TOTAL.inc()
+
+
+def observe_collector_sample_flush(*, rows: int, duration_seconds: float, outcome: str) -> None:
+    COLLECTOR_SAMPLE_FLUSH_ROWS.observe(rows)
+    COLLECTOR_SAMPLE_FLUSH_SECONDS.labels(outcome=outcome).observe(max(0.0, duration_seconds))
+
+
+def inc_collector_samples_dropped(reason: str, count: int = 1) -> None:
+    COLLECTOR_SAMPLES_DROPPED_TOTAL.labels(reason=reason).inc(count)
+
+
+def set_scheduler_tenant_backlog(*, tenants: dict[str, tuple[int, float]], backlogged: int) -> None:
+    # Remplacement complet : un tenant sorti du top N ne garde pas une série figée.
+    SCHEDULER_TENANT_BACKLOG.clear()
+    SCHEDULER_TENANT_MAX_LATENESS_SECONDS.clear()
+    for tenant, (backlog, max_lateness_seconds) in tenants.items():
+        SCHEDULER_TENANT_BACKLOG.labels(tenant=tenant).set(backlog)
+        SCHEDULER_TENANT_MAX_LATENESS_SECONDS.labels(tenant=tenant).set(max_lateness_seconds)
+    SCHEDULER_TENANTS_BACKLOGGED.set(backlogged)
+
+
 def observe_http_request(
     method: str,
     path: str,
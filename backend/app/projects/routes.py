@@ -13,6 +13,8 @@ from app.db.models.user import User
 from app.db.models.project import Project
 from app.db.models.deployment import Deployment
 from app.db.models.scheduled_job import ScheduledJob
+from app.db.models.scheduled_job_archive import ScheduledJobArchive
+from app.db.models.scheduled_job_dead_letter import ScheduledJobDeadLetter
 from app.core.public_ids import (
     format_deployment_public_id,
     parse_project_identifier,
@@ -682,6 +684,17 @@ def _delete_project_related_scheduled_jobs(*, db: Session, project_id) -> None:
             .filter(ScheduledJob.deployment_id.in_(deployment_ids))
             .delete(synchronize_session=False)
         )
+        # Historique archivé (app/scheduler/retention.py) : pas de FK, suppression explicite.
+        (
+            db.query(ScheduledJobArchive)
+            .filter(ScheduledJobArchive.deployment_id.in_(deployment_ids))
+            .delete(synchronize_session=False)
+        )
+        (
+            db.query(ScheduledJobDeadLetter)
+            .filter(ScheduledJobDeadLetter.deployment_id.in_(deployment_ids))
+            .delete(synchronize_session=False)
+        )
 
     # Defensive cleanup for potential orphan jobs without deployment_id but linked by metadata.
     orphan_jobs = db.query(ScheduledJob).filter(ScheduledJob.deployment_id.is_(None)).all()
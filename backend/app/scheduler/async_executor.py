@@ -0,0 +1,227 @@
+# app/scheduler/async_executor.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Callable, Optional
+
+import httpx
+import structlog
+
+from app.metrics.http_client import build_async_http_client
+from app.observability.metrics import set_scheduler_worker_slots
+
+logger = structlog.get_logger(__name__)
+
+# Jobs dominés par l'attente réseau : exécutés nativement sur la boucle asyncio.
+ASYNC_JOB_TYPES = frozenset(
+    {"pre_collect", "post_collect", "observation_session", "email_send", "slack_send", "notification_outbox"}
+)
+
+
+def _default_http_client_factory(max_in_flight: int) -> httpx.AsyncClient:
+    # Même pool que la collecte sync (keep-alive, plafond par hôte, cache DNS), borné par les jobs en vol.
+    return build_async_http_client(max_connections=max_in_flight)
+
+
+class AsyncJobExecutor:
+    """
+    Exécuteur asyncio dédié (boucle dans son propre thread) pour les jobs I/O-bound.
+    - les jobs de ASYNC_JOB_TYPES attendent le réseau sur la boucle, sans bloquer de thread ;
+    - les écritures DB passent par un petit pool de threads (`run_db`) ;
+    - les autres jobs (analyse) restent sur un pool CPU borné.
+    Même interface que JobWorkerPool : le poller ne voit que start/submit/free_slots/drain_queued/wait_idle/stop.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_in_flight: int,
+        async_handler: Callable[[object, "AsyncJobExecutor"], Awaitable[None]],
+        sync_handler: Callable[[object], None],
+        db_threads: int = 4,
+        cpu_threads: int = 4,
+        on_slot_freed: Optional[Callable[[], None]] = None,
+        http_client_factory: Optional[Callable[[int], httpx.AsyncClient]] = None,
+        name: str = "scheduler-async",
+    ):
+        self.max_in_flight = max(1, int(max_in_flight))
+        self._async_handler = async_handler
+        self._sync_handler = sync_handler
+        self._db_threads = max(1, int(db_threads))
+        self._cpu_threads = max(1, int(cpu_threads))
+        self._on_slot_freed = on_slot_freed
+        self._http_client_factory = http_client_factory or _default_http_client_factory
+        self._name = name
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._busy = 0
+        self._queued = 0
+        self._started = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._db_pool: Optional[ThreadPoolExecutor] = None
+        self._cpu_pool: Optional[ThreadPoolExecutor] = None
+        self._tasks: set[asyncio.Task] = set()
+        # job_id -> tâche qui l'exécute ; tâches détachées par le watchdog (job en dépassement).
+        self._running: dict = {}
+        self._detached: set[asyncio.Task] = set()
+        self.http_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def capacity(self) -> int:
+        return self.max_in_flight
+
+    @property
+    def busy(self) -> int:
+        with self._lock:
+            return self._busy
+
+    @property
+    def queued(self) -> int:
+        with self._lock:
+            return self._queued
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        self._db_pool = ThreadPoolExecutor(max_workers=self._db_threads, thread_name_prefix=f"{self._name}-db")
+        self._cpu_pool = ThreadPoolExecutor(max_workers=self._cpu_threads, thread_name_prefix=f"{self._name}-cpu")
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name=f"{self._name}-loop", daemon=True)
+        self._thread.start()
+        # Le client HTTP est lié à la boucle : il doit être créé dessus.
+        asyncio.run_coroutine_threadsafe(self._open_http_client(), self._loop).result()
+        with self._lock:
+            self._publish_slots()
+
+    def free_slots(self) -> int:
+        with self._lock:
+            return max(0, self.capacity - self._busy - self._queued)
+
+    def submit(self, job) -> bool:
+        with self._lock:
+            if not self._started or self._busy + self._queued >= self.capacity:
+                return False
+            self._queued += 1
+            self._publish_slots()
+        asyncio.run_coroutine_threadsafe(self._run(job), self._loop)
+        return True
+
+    def detach(self, job_id) -> bool:
+        """
+        Libère tout de suite le slot d'un job en dépassement (déjà remis en file) : la tâche
+        continue jusqu'à son prochain point de sortie (timeout HTTP, requête annulée) sans compter.
+        """
+        with self._lock:
+            task = self._running.pop(job_id, None)
+            if task is None or not self._started:
+                return False
+            self._detached.add(task)
+            self._busy -= 1
+            self._publish_slots()
+            self._idle.notify_all()
+        self._notify_slot_freed()
+        return True
+
+    def drain_queued(self) -> list:
+        # Pas de file : un job soumis démarre aussitôt sur la boucle.
+        return []
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        with self._idle:
+            return self._idle.wait_for(lambda: self._busy == 0 and self._queued == 0, timeout=timeout)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+
+        # Les jobs en vol se terminent avant la fermeture du client et de la boucle.
+        shutdown = asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        if timeout is None:
+            return
+        try:
+            shutdown.result(timeout=timeout)
+        except Exception as e:
+            logger.warning("async_executor_shutdown_timeout", error=str(e))
+        self._thread.join(timeout=timeout)
+
+    async def run_db(self, fn: Callable, *args, **kwargs):
+        """Exécute une étape DB bloquante sur le pool dédié et attend son résultat."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_pool, partial(fn, *args, **kwargs))
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    async def _open_http_client(self) -> None:
+        self.http_client = self._http_client_factory(self.max_in_flight)
+
+    async def _run(self, job) -> None:
+        task = asyncio.current_task()
+        job_id = getattr(job, "id", None)
+        self._tasks.add(task)
+        with self._lock:
+            self._queued -= 1
+            self._busy += 1
+            self._running[job_id] = task
+            self._publish_slots()
+        try:
+            if getattr(job, "job_type", None) in ASYNC_JOB_TYPES:
+                await self._async_handler(job, self)
+            else:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(self._cpu_pool, self._sync_handler, job)
+        except Exception as e:
+            logger.exception("job_worker_error", job_id=str(job_id), error=str(e))
+        finally:
+            self._tasks.discard(task)
+            with self._lock:
+                detached = task in self._detached
+                if detached:
+                    # Slot déjà rendu par detach().
+                    self._detached.discard(task)
+                else:
+                    if self._running.get(job_id) is task:
+                        del self._running[job_id]
+                    self._busy -= 1
+                    self._publish_slots()
+                    self._idle.notify_all()
+            if not detached:
+                self._notify_slot_freed()
+
+    def _notify_slot_freed(self) -> None:
+        if self._on_slot_freed is not None:
+            try:
+                self._on_slot_freed()
+            except Exception as e:
+                logger.warning("worker_slot_callback_failed", error=str(e))
+
+    async def _shutdown(self) -> None:
+        current = asyncio.current_task()
+        pending = [task for task in self._tasks if task is not current]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+        self._db_pool.shutdown(wait=False)
+        self._cpu_pool.shutdown(wait=False)
+        asyncio.get_running_loop().call_soon(self._loop.stop)
+
+    def _publish_slots(self) -> None:
+        # Appelé sous self._lock.
+        set_scheduler_worker_slots(
+            busy=self._busy,
+            idle=max(0, self.capacity - self._busy),
+            queued=self._queued,
+        )
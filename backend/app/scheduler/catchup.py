@@ -0,0 +1,169 @@
+# app/scheduler/catchup.py
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.db.models.scheduled_job import ScheduledJob
+from app.scheduler.deadlines import deadline_for
+
+# Entrée en rattrapage au-delà de ce nombre de jobs pending dont la deadline est dépassée ;
+# sortie sous la moitié (hystérésis : pas d'oscillation autour du seuil).
+CATCHUP_BACKLOG_THRESHOLD = max(1, int(settings.SCHEDULER_CATCHUP_BACKLOG_THRESHOLD))
+CATCHUP_EXIT_BACKLOG = CATCHUP_BACKLOG_THRESHOLD // 2
+CATCHUP_DEPLOYMENTS_PER_TICK = max(1, int(settings.SCHEDULER_CATCHUP_DEPLOYMENTS_PER_TICK))
+# Ordre de claim pendant le rattrapage : verdicts et notifications avant les collectes.
+CATCHUP_LANE_ORDER = ("analysis", "notifications", "collection")
+COLLAPSED_STATUS = "skipped"
+COLLAPSED_REASON = "Collapsed by scheduler catch-up mode (sample slot long past)"
+
+
+@dataclass
+class CatchUpState:
+    active: bool = False
+    started_at: Optional[datetime] = None
+    backlog_at_start: int = 0
+    backlog_remaining: int = 0
+    collapsed_jobs: int = 0
+
+    @property
+    def progress(self) -> Optional[float]:
+        if not self.active or self.backlog_at_start <= 0:
+            return None
+        done = self.backlog_at_start - self.backlog_remaining
+        return round(min(1.0, max(0.0, done / self.backlog_at_start)), 3)
+
+
+@lru_cache(maxsize=1)
+def samples_per_deployment() -> int:
+    """Samples POST conservés par déploiement : le minimum dont l'analyse a besoin."""
+    # Import local : le moteur d'analyse importe app.scheduler.tasks.
+    from app.analysis.engine import MIN_POST_SAMPLES
+
+    configured = int(settings.SCHEDULER_CATCHUP_SAMPLES_PER_DEPLOYMENT)
+    return max(1, configured if configured > 0 else MIN_POST_SAMPLES)
+
+
+def count_overdue(db: Session, now: datetime, shard_filter=None) -> int:
+    query = db.query(func.count(ScheduledJob.id)).filter(
+        ScheduledJob.status == "pending",
+        ScheduledJob.deadline_at < now,
+    )
+    if shard_filter is not None:
+        query = query.filter(shard_filter)
+    return query.scalar() or 0
+
+
+def collapse_overdue_post_collects(
+    db: Session,
+    now: datetime,
+    *,
+    keep: int,
+    interval_seconds: float,
+    shard_filter=None,
+) -> int:
+    """
+    Par déploiement, les post_collect en retard sont réduits aux `keep` derniers, replanifiés
+    à partir de maintenant avec l'espacement normal ; les autres passent en `skipped`.
+    Les post_collect encore à venir sont décalés si le nouvel espacement les rattrape.
+    """
+    deployments_query = db.query(ScheduledJob.deployment_id).filter(
+        ScheduledJob.status == "pending",
+        ScheduledJob.job_type == "post_collect",
+        ScheduledJob.deadline_at < now,
+        ScheduledJob.deployment_id.isnot(None),
+    )
+    if shard_filter is not None:
+        deployments_query = deployments_query.filter(shard_filter)
+    deployment_ids = [
+        row.deployment_id
+        for row in deployments_query.group_by(ScheduledJob.deployment_id)
+        .having(func.count(ScheduledJob.id) > 1)
+        .limit(CATCHUP_DEPLOYMENTS_PER_TICK)
+        .all()
+    ]
+
+    collapsed = 0
+    for deployment_id in deployment_ids:
+        posts = (
+            db.query(ScheduledJob)
+            .filter(
+                ScheduledJob.deployment_id == deployment_id,
+                ScheduledJob.status == "pending",
+                ScheduledJob.job_type == "post_collect",
+            )
+            .order_by(ScheduledJob.sequence_index)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        overdue = [job for job in posts if job.deadline_at is not None and _as_utc(job.deadline_at) < now]
+        upcoming = [job for job in posts if job not in overdue]
+        kept = overdue[-keep:]
+        for job in overdue[:-keep]:
+            job.status = COLLAPSED_STATUS
+            job.last_error = COLLAPSED_REASON
+            job.updated_at = now
+            collapsed += 1
+        for offset, job in enumerate(kept):
+            job.scheduled_at = now + timedelta(seconds=offset * interval_seconds)
+            job.deadline_at = deadline_for(job.job_type, job.scheduled_at)
+        if kept and upcoming:
+            first_free_slot = now + timedelta(seconds=len(kept) * interval_seconds)
+            shift = first_free_slot - _as_utc(upcoming[0].scheduled_at)
+            if shift > timedelta(0):
+                for job in upcoming:
+                    job.scheduled_at = _as_utc(job.scheduled_at) + shift
+                    job.deadline_at = deadline_for(job.job_type, job.scheduled_at)
+    return collapsed
+
+
+def collapse_overdue_observation_sessions(
+    db: Session,
+    now: datetime,
+    *,
+    keep: int,
+    interval_seconds: float,
+    shard_filter=None,
+) -> int:
+    """Le curseur d'une session en retard saute aux `keep` derniers samples, dont le premier est dû maintenant."""
+    query = db.query(ScheduledJob).filter(
+        ScheduledJob.status == "pending",
+        ScheduledJob.job_type == "observation_session",
+        ScheduledJob.deadline_at < now,
+    )
+    if shard_filter is not None:
+        query = query.filter(shard_filter)
+    sessions = query.limit(CATCHUP_DEPLOYMENTS_PER_TICK).with_for_update(skip_locked=True).all()
+
+    skipped = 0
+    for job in sessions:
+        metadata = dict(job.job_metadata or {})
+        if "started_at" not in metadata:
+            continue
+        window = max(1, int(metadata.get("observation_window") or 1))
+        index = job.sequence_index or 0
+        next_index = max(index, window - keep)
+        started_at = _as_utc(datetime.fromisoformat(metadata["started_at"]))
+        interval = float(metadata.get("interval_seconds") or interval_seconds)
+        # Rebase : le sample `next_index` tombe maintenant, les suivants gardent l'espacement.
+        metadata["shift_seconds"] = round(
+            (now - (started_at + timedelta(seconds=next_index * interval))).total_seconds(), 3
+        )
+        metadata["catchup_skipped_samples"] = int(metadata.get("catchup_skipped_samples") or 0) + next_index - index
+        job.job_metadata = metadata
+        job.sequence_index = next_index
+        job.scheduled_at = now
+        job.deadline_at = deadline_for(job.job_type, now)
+        job.updated_at = now
+        skipped += next_index - index
+    return skipped
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
@@ -12,7 +12,7 @@ _HMAC_ERROR_MARKERS = (
     "HMAC validation failed",
     "MetricsHMACValidationError",
 )
-_CLEANUP_JOB_TYPES = {"pre_collect", "post_collect", "analysis"}
+_CLEANUP_JOB_TYPES = {"pre_collect", "post_collect", "observation_session", "analysis"}
 _CLEANUP_PENDING_STATUSES = {"pending", "running"}
 _CLEANUP_REASON = "Cancelled by cleanup after HMAC validation failures on this deployment"
 
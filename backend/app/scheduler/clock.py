@@ -0,0 +1,23 @@
+# app/scheduler/clock.py
+import time
+from datetime import datetime, timezone
+
+
+class SystemClock:
+    """
+    Horloge du poller : heure UTC (scheduled_at, deadlines, leases) et temps monotone
+    (intervalles, durées). Injectable dans JobPoller(clock=...) : le simulateur de capacité
+    (benchmarks/scheduler_simulation.py) y substitue une horloge virtuelle.
+    """
+
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def perf_counter(self) -> float:
+        return time.perf_counter()
+
+
+SYSTEM_CLOCK = SystemClock()
@@ -9,4 +9,11 @@ PLAN_ANALYSIS_DELAYS = {
     "free": 5,
     "pro": 15,
     "enterprise": 30,
-}
\ No newline at end of file
+}
+
+# Poids du deficit round robin du poller (part relative des slots par tenant).
+PLAN_FAIRNESS_WEIGHTS = {
+    "free": 1,
+    "pro": 2,
+    "enterprise": 4,
+}
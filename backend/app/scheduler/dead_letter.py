@@ -0,0 +1,187 @@
+# app/scheduler/dead_letter.py
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.db.models.scheduled_job import ScheduledJob
+from app.db.models.scheduled_job_dead_letter import ScheduledJobDeadLetter
+from app.scheduler.deadlines import deadline_for
+from app.scheduler.retention import ARCHIVE_BATCH_SIZE, ARCHIVE_MAX_BATCHES_PER_RUN
+from app.scheduler.wakeup import notify_jobs_scheduled
+
+# Jobs abandonnés par leur politique de retry (app/scheduler/retry_policies.py) : sortis de
+# scheduled_jobs dans la transaction de l'échec final, payload complet conservé pour le replay.
+DEAD_LETTER_REASONS = ("exhausted", "max_age", "lease_expired")
+DEAD_LETTER_RETENTION_DAYS = max(0, int(settings.SCHEDULER_DEAD_LETTER_RETENTION_DAYS))
+REPLAY_MAX_BATCH = 1000
+
+_DEAD_LETTER_COLUMNS = (
+    ScheduledJobDeadLetter.id,
+    ScheduledJobDeadLetter.deployment_id,
+    ScheduledJobDeadLetter.job_type,
+    ScheduledJobDeadLetter.phase,
+    ScheduledJobDeadLetter.sequence_index,
+    ScheduledJobDeadLetter.job_metadata,
+    ScheduledJobDeadLetter.shard_key,
+    ScheduledJobDeadLetter.tenant_key,
+    ScheduledJobDeadLetter.retry_count,
+    ScheduledJobDeadLetter.last_error,
+    ScheduledJobDeadLetter.scheduled_at,
+    ScheduledJobDeadLetter.created_at,
+    ScheduledJobDeadLetter.reason,
+)
+
+
+def dead_letter_jobs(db: Session, job_ids: Iterable, *, reason: str) -> int:
+    """
+    Déplace des jobs `failed` de scheduled_jobs vers scheduled_jobs_dead_letter.
+    Même transaction que l'appelant (pas de commit). Retourne le nombre de jobs déplacés.
+    """
+    ids = list(job_ids)
+    if not ids:
+        return 0
+    moved = ScheduledJob.id.in_(ids) & (ScheduledJob.status == "failed")
+    db.execute(
+        insert(ScheduledJobDeadLetter).from_select(
+            [column.key for column in _DEAD_LETTER_COLUMNS],
+            select(
+                ScheduledJob.id,
+                ScheduledJob.deployment_id,
+                ScheduledJob.job_type,
+                ScheduledJob.phase,
+                ScheduledJob.sequence_index,
+                ScheduledJob.job_metadata,
+                ScheduledJob.shard_key,
+                ScheduledJob.tenant_key,
+                ScheduledJob.retry_count,
+                ScheduledJob.last_error,
+                ScheduledJob.scheduled_at,
+                ScheduledJob.created_at,
+                literal(reason),
+            ).where(moved),
+        )
+    )
+    result = db.execute(delete(ScheduledJob).where(moved), execution_options={"synchronize_session": False})
+    return result.rowcount or 0
+
+
+def list_dead_letters(
+    db: Session,
+    *,
+    job_type: Optional[str] = None,
+    reason: Optional[str] = None,
+    deployment_id=None,
+    include_replayed: bool = False,
+    limit: int = 100,
+) -> list[ScheduledJobDeadLetter]:
+    query = db.query(ScheduledJobDeadLetter)
+    if not include_replayed:
+        query = query.filter(ScheduledJobDeadLetter.replayed_at.is_(None))
+    if job_type is not None:
+        query = query.filter(ScheduledJobDeadLetter.job_type == job_type)
+    if reason is not None:
+        query = query.filter(ScheduledJobDeadLetter.reason == reason)
+    if deployment_id is not None:
+        query = query.filter(ScheduledJobDeadLetter.deployment_id == deployment_id)
+    return query.order_by(ScheduledJobDeadLetter.dead_lettered_at.desc()).limit(limit).all()
+
+
+def count_pending_dead_letters(db: Session) -> int:
+    return (
+        db.query(func.count(ScheduledJobDeadLetter.id))
+        .filter(ScheduledJobDeadLetter.replayed_at.is_(None))
+        .scalar()
+        or 0
+    )
+
+
+def replay_dead_letters(
+    db: Session,
+    now: datetime,
+    *,
+    ids: Optional[list] = None,
+    job_type: Optional[str] = None,
+    reason: Optional[str] = None,
+    limit: int = REPLAY_MAX_BATCH,
+) -> list[tuple[ScheduledJobDeadLetter, ScheduledJob]]:
+    """
+    Remet en file les dead letters non rejouées correspondant aux filtres : un nouveau job
+    `pending` par entrée (même payload, retries remis à zéro, dû à `now`), l'entrée est marquée
+    rejouée. SKIP LOCKED : deux replays concurrents ne rejouent pas la même entrée.
+    Même transaction que l'appelant (pas de commit).
+    """
+    statement = select(ScheduledJobDeadLetter).where(ScheduledJobDeadLetter.replayed_at.is_(None))
+    if ids is not None:
+        statement = statement.where(ScheduledJobDeadLetter.id.in_(ids))
+    if job_type is not None:
+        statement = statement.where(ScheduledJobDeadLetter.job_type == job_type)
+    if reason is not None:
+        statement = statement.where(ScheduledJobDeadLetter.reason == reason)
+    entries = (
+        db.execute(
+            statement.order_by(ScheduledJobDeadLetter.dead_lettered_at)
+            .limit(min(limit, REPLAY_MAX_BATCH))
+            .with_for_update(skip_locked=True)
+        )
+        .scalars()
+        .all()
+    )
+
+    replayed = []
+    for entry in entries:
+        job = ScheduledJob(
+            id=uuid.uuid4(),
+            deployment_id=entry.deployment_id,
+            job_type=entry.job_type,
+            phase=entry.phase,
+            sequence_index=entry.sequence_index,
+            scheduled_at=now,
+            deadline_at=deadline_for(entry.job_type, now),
+            status="pending",
+            retry_count=0,
+            job_metadata=entry.job_metadata,
+            shard_key=entry.shard_key,
+            tenant_key=entry.tenant_key,
+        )
+        db.add(job)
+        entry.replayed_at = now
+        entry.replay_job_id = job.id
+        replayed.append((entry, job))
+    if replayed:
+        db.flush()
+        notify_jobs_scheduled(db, now)
+    return replayed
+
+
+def purge_dead_letters(db: Session, now: datetime) -> int:
+    """Supprime les dead letters au-delà de DEAD_LETTER_RETENTION_DAYS (0 = jamais), par lots."""
+    if DEAD_LETTER_RETENTION_DAYS <= 0:
+        return 0
+    cutoff = now - timedelta(days=DEAD_LETTER_RETENTION_DAYS)
+    purged = 0
+    for _ in range(ARCHIVE_MAX_BATCHES_PER_RUN):
+        ids = (
+            db.execute(
+                select(ScheduledJobDeadLetter.id)
+                .where(ScheduledJobDeadLetter.dead_lettered_at < cutoff)
+                .order_by(ScheduledJobDeadLetter.dead_lettered_at)
+                .limit(ARCHIVE_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            .scalars()
+            .all()
+        )
+        if ids:
+            db.execute(
+                delete(ScheduledJobDeadLetter).where(ScheduledJobDeadLetter.id.in_(ids)),
+                execution_options={"synchronize_session": False},
+            )
+        db.commit()
+        purged += len(ids)
+        if len(ids) < ARCHIVE_BATCH_SIZE:
+            break
+    return purged
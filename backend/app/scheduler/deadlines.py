@@ -0,0 +1,49 @@
+# app/scheduler/deadlines.py
+import random
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+from app.core.settings import settings
+
+# Retard toléré (secondes après scheduled_at) avant que le job ne dégrade son résultat.
+# post_collect (et chaque sample d'une observation_session) est dérivé du moteur d'analyse
+# (voir post_collect_lateness_budget_seconds).
+LATENESS_BUDGET_SECONDS = {
+    "pre_collect": 60,
+    "analysis": 300,
+    "email_send": 900,
+    "slack_send": 300,
+    "notification_outbox": 300,
+}
+DEFAULT_LATENESS_BUDGET_SECONDS = 600
+SCHEDULE_JITTER_SECONDS = max(0.0, float(settings.SCHEDULER_SCHEDULE_JITTER_SECONDS))
+
+
+@lru_cache(maxsize=1)
+def post_collect_lateness_budget_seconds() -> float:
+    """
+    Un sample en retard de plus de interval × (SEQUENCE_GAP_FACTOR − 1) crée un écart
+    détecté comme `sequence_gaps` par _evaluate_data_quality.
+    """
+    # Import local : le moteur d'analyse importe app.scheduler.tasks.
+    from app.analysis.engine import EXPECTED_POST_INTERVAL_SECONDS, SEQUENCE_GAP_FACTOR
+
+    return EXPECTED_POST_INTERVAL_SECONDS * (SEQUENCE_GAP_FACTOR - 1)
+
+
+def lateness_budget_seconds(job_type: Optional[str]) -> float:
+    if job_type in ("post_collect", "observation_session"):
+        return post_collect_lateness_budget_seconds()
+    return float(LATENESS_BUDGET_SECONDS.get(job_type, DEFAULT_LATENESS_BUDGET_SECONDS))
+
+
+def deadline_for(job_type: Optional[str], scheduled_at: datetime) -> datetime:
+    return scheduled_at + timedelta(seconds=lateness_budget_seconds(job_type))
+
+
+def schedule_jitter() -> timedelta:
+    """Décalage aléatoire [0, SCHEDULER_SCHEDULE_JITTER_SECONDS) : étale les séquences démarrées à la même seconde."""
+    if SCHEDULE_JITTER_SECONDS <= 0:
+        return timedelta(0)
+    return timedelta(seconds=random.uniform(0.0, SCHEDULE_JITTER_SECONDS))
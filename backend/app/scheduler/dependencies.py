@@ -0,0 +1,113 @@
+# app/scheduler/dependencies.py
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.db.models.scheduled_job import ScheduledJob
+from app.scheduler.deadlines import deadline_for
+
+# Petit graphe de dépendances entre jobs d'un même déploiement : un job aval n'a de sens
+# qu'une fois ses jobs amont terminés (completed ou failed définitivement).
+UPSTREAM_JOB_TYPES: dict[str, frozenset[str]] = {
+    "analysis": frozenset({"pre_collect", "post_collect", "observation_session"}),
+}
+DOWNSTREAM_JOB_TYPES: dict[str, frozenset[str]] = {
+    upstream: frozenset(
+        downstream for downstream, upstreams in UPSTREAM_JOB_TYPES.items() if upstream in upstreams
+    )
+    for upstream in frozenset().union(*UPSTREAM_JOB_TYPES.values())
+}
+UNFINISHED_STATUSES = ("pending", "running")
+# Attente maximale d'un job aval au-delà de son heure de repli (retries amont en cours).
+DEPENDENCY_GRACE_SECONDS = max(0, int(settings.SCHEDULER_DEPENDENCY_GRACE_SECONDS))
+
+
+class JobDeferred(Exception):
+    """Le job attend encore ses dépendances : il repasse en `pending` sans consommer de retry."""
+
+    def __init__(self, until: datetime, reason: str):
+        super().__init__(reason)
+        self.until = until
+        self.reason = reason
+
+
+def dependency_metadata(fallback_at: datetime) -> dict:
+    return {"dependencies_deadline_at": (fallback_at + timedelta(seconds=DEPENDENCY_GRACE_SECONDS)).isoformat()}
+
+
+def dependencies_deadline(job: ScheduledJob) -> Optional[datetime]:
+    # Jobs créés avant le graphe de dépendances : pas d'attente.
+    raw = (job.job_metadata or {}).get("dependencies_deadline_at")
+    return datetime.fromisoformat(raw) if raw else None
+
+
+def unfinished_upstream_count(db: Session, job: ScheduledJob) -> int:
+    upstream_types = UPSTREAM_JOB_TYPES.get(job.job_type)
+    if not upstream_types or job.deployment_id is None:
+        return 0
+    return _unfinished_count(db, job.deployment_id, upstream_types, exclude_id=job.id)
+
+
+def _unfinished_count(db: Session, deployment_id, job_types: frozenset[str], *, exclude_id) -> int:
+    return (
+        db.query(func.count(ScheduledJob.id))
+        .filter(
+            ScheduledJob.deployment_id == deployment_id,
+            ScheduledJob.job_type.in_(sorted(job_types)),
+            ScheduledJob.status.in_(UNFINISHED_STATUSES),
+            ScheduledJob.id != exclude_id,
+        )
+        .scalar()
+        or 0
+    )
+
+
+def _lock_pending_downstream(deployment_id, downstream_type: str):
+    return (
+        select(ScheduledJob.id)
+        .where(
+            ScheduledJob.deployment_id == deployment_id,
+            ScheduledJob.job_type == downstream_type,
+            ScheduledJob.status == "pending",
+        )
+        .order_by(ScheduledJob.id)
+        .with_for_update()
+    )
+
+
+def release_downstream_jobs(db: Session, job: ScheduledJob, now: datetime) -> list:
+    """
+    Appelé quand `job` atteint un état terminal : si plus aucun job amont du déploiement
+    n'est en cours, les jobs aval encore planifiés plus tard sont avancés à `now`.
+    Même transaction que le statut final du job amont. Retourne les ids avancés.
+    """
+    downstream_types = DOWNSTREAM_JOB_TYPES.get(job.job_type)
+    if not downstream_types or job.deployment_id is None:
+        return []
+    released = []
+    for downstream_type in sorted(downstream_types):
+        # Verrou sur les jobs aval avant de compter les amont : deux jobs amont qui finissent en même
+        # temps se voient sinon chacun "en cours" (READ COMMITTED) et aucun ne libère le job aval.
+        # Le second compte après le commit du premier et le voit terminé.
+        if not db.execute(_lock_pending_downstream(job.deployment_id, downstream_type)).scalars().all():
+            continue
+        if _unfinished_count(db, job.deployment_id, UPSTREAM_JOB_TYPES[downstream_type], exclude_id=job.id):
+            continue
+        released.extend(
+            db.execute(
+                update(ScheduledJob)
+                .where(
+                    ScheduledJob.deployment_id == job.deployment_id,
+                    ScheduledJob.job_type == downstream_type,
+                    ScheduledJob.status == "pending",
+                    ScheduledJob.scheduled_at > now,
+                )
+                .values(scheduled_at=now, deadline_at=deadline_for(downstream_type, now), updated_at=now)
+                .returning(ScheduledJob.id),
+                execution_options={"synchronize_session": False},
+            ).scalars().all()
+        )
+    return released
@@ -0,0 +1,106 @@
+# app/scheduler/fairness.py
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import Callable, Hashable, Iterable, Optional
+from uuid import UUID
+
+from app.scheduler.config import PLAN_FAIRNESS_WEIGHTS
+
+DEFAULT_PLAN = "free"
+
+
+def tenant_key_for_job(
+    *,
+    project_id: UUID | str | None = None,
+    user_id: UUID | str | None = None,
+    deployment_id: UUID | str | None = None,
+) -> Optional[str]:
+    """Tenant d'un job pour la fairness : projet, sinon utilisateur, sinon déploiement."""
+    if project_id:
+        return f"project:{project_id}"
+    if user_id:
+        return f"user:{user_id}"
+    if deployment_id:
+        return f"deployment:{deployment_id}"
+    return None
+
+
+def plan_weight(plan: Optional[str]) -> int:
+    return max(1, int(PLAN_FAIRNESS_WEIGHTS.get(plan or DEFAULT_PLAN, PLAN_FAIRNESS_WEIGHTS[DEFAULT_PLAN])))
+
+
+class DeficitRoundRobin:
+    """
+    Deficit round robin pondéré entre files virtuelles de tenants.
+    - chaque tour, un tenant reçoit `poids` crédits ; un job coûte 1 crédit
+    - le crédit non consommé est conservé d'un tick à l'autre tant que le tenant a du travail
+      (remis à zéro quand sa file se vide, comme dans DRR)
+    - les tenants sont visités du moins récemment servi au plus récent, à égalité par échéance
+      croissante de leur premier job (EDF entre files) : un tenant chargé dont les jobs sont
+      les plus anciens ne repasse pas systématiquement en tête
+    Les déficits sont indexés par (scope, tenant) : un scope par lane.
+    """
+
+    def __init__(self):
+        self._deficits: dict[tuple[Hashable, str], float] = {}
+        self._last_turn: dict[tuple[Hashable, str], int] = {}
+        self._turns = 0
+
+    def deficit(self, scope: Hashable, tenant: str) -> float:
+        return self._deficits.get((scope, tenant), 0.0)
+
+    def select(
+        self,
+        jobs: Iterable,
+        limit: int,
+        *,
+        tenant_of: Callable[[object], str],
+        weight_of: Callable[[str], int],
+        urgency_of: Callable[[object], datetime],
+        scope: Hashable = None,
+    ) -> list:
+        if limit <= 0:
+            return []
+        queues: dict[str, deque] = defaultdict(deque)
+        for job in sorted(jobs, key=urgency_of):
+            queues[tenant_of(job)].append(job)
+        if not queues:
+            return []
+
+        order = sorted(
+            queues,
+            key=lambda tenant: (self._last_turn.get((scope, tenant), -1), urgency_of(queues[tenant][0])),
+        )
+        selected: list = []
+        while len(selected) < limit and any(queues[tenant] for tenant in order):
+            for tenant in order:
+                queue = queues[tenant]
+                if not queue:
+                    continue
+                key = (scope, tenant)
+                self._turns += 1
+                self._last_turn[key] = self._turns
+                deficit = self._deficits.get(key, 0.0) + weight_of(tenant)
+                while queue and deficit >= 1 and len(selected) < limit:
+                    selected.append(queue.popleft())
+                    deficit -= 1
+                self._deficits[key] = deficit if queue else 0.0
+                if len(selected) >= limit:
+                    break
+
+        # Tenants absents de cette fenêtre : plus de travail visible, plus de crédit.
+        for key in [key for key in self._deficits if key[0] == scope and key[1] not in queues]:
+            del self._deficits[key]
+        for key in [key for key in self._last_turn if key[0] == scope and key[1] not in queues]:
+            del self._last_turn[key]
+        return selected
+
+
+def urgency_key(job) -> datetime:
+    # deadline (NULL : jobs antérieurs aux deadlines) puis scheduled_at.
+    deadline = getattr(job, "deadline_at", None) or getattr(job, "scheduled_at", None)
+    if deadline is None:
+        return datetime.max.replace(tzinfo=timezone.utc)
+    if deadline.tzinfo is None:
+        return deadline.replace(tzinfo=timezone.utc)
+    return deadline
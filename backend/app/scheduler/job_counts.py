@@ -0,0 +1,149 @@
+# app/scheduler/job_counts.py
+from collections import Counter
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.db.models.scheduled_job import ScheduledJob
+from app.db.models.scheduled_job_count import ScheduledJobCount
+from app.scheduler.lanes import LANES, lane_for_job_type
+
+# Les compteurs de scheduled_job_counts sont tenus par des triggers sur scheduled_jobs : même
+# transaction que le changement d'état, y compris pour les UPDATE ensemblistes et les DELETE en
+# cascade. Postgres : triggers par statement (tables de transition), un upsert par
+# (status, job_type) modifié. Le slot (pg_backend_pid() % JOB_COUNT_SLOTS) répartit les
+# upserts concurrents sur plusieurs lignes : pas de ligne chaude sérialisant les claims.
+JOB_COUNT_SLOTS = 16
+
+POSTGRES_TRIGGER_DDL = (
+    f"""
+    CREATE OR REPLACE FUNCTION scheduled_job_counts_apply() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        counter_slot smallint := pg_backend_pid() % {JOB_COUNT_SLOTS};
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO scheduled_job_counts AS c (status, job_type, slot, count)
+            SELECT n.status, n.job_type, counter_slot, count(*)
+            FROM new_rows n
+            GROUP BY n.status, n.job_type
+            ORDER BY n.status, n.job_type
+            ON CONFLICT (status, job_type, slot) DO UPDATE SET count = c.count + EXCLUDED.count;
+        ELSIF TG_OP = 'DELETE' THEN
+            INSERT INTO scheduled_job_counts AS c (status, job_type, slot, count)
+            SELECT o.status, o.job_type, counter_slot, -count(*)
+            FROM old_rows o
+            GROUP BY o.status, o.job_type
+            ORDER BY o.status, o.job_type
+            ON CONFLICT (status, job_type, slot) DO UPDATE SET count = c.count + EXCLUDED.count;
+        ELSE
+            INSERT INTO scheduled_job_counts AS c (status, job_type, slot, count)
+            SELECT d.status, d.job_type, counter_slot, sum(d.delta)
+            FROM (
+                SELECT n.status, n.job_type, 1 AS delta FROM new_rows n
+                UNION ALL
+                SELECT o.status, o.job_type, -1 AS delta FROM old_rows o
+            ) d
+            GROUP BY d.status, d.job_type
+            HAVING sum(d.delta) <> 0
+            ORDER BY d.status, d.job_type
+            ON CONFLICT (status, job_type, slot) DO UPDATE SET count = c.count + EXCLUDED.count;
+        END IF;
+        RETURN NULL;
+    END;
+    $$
+    """,
+    """
+    CREATE TRIGGER scheduled_jobs_counts_insert AFTER INSERT ON scheduled_jobs
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION scheduled_job_counts_apply()
+    """,
+    """
+    CREATE TRIGGER scheduled_jobs_counts_update AFTER UPDATE ON scheduled_jobs
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION scheduled_job_counts_apply()
+    """,
+    """
+    CREATE TRIGGER scheduled_jobs_counts_delete AFTER DELETE ON scheduled_jobs
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION scheduled_job_counts_apply()
+    """,
+)
+
+# SQLite (tests) : pas de tables de transition, triggers par ligne sur le slot 0.
+SQLITE_TRIGGER_DDL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS scheduled_jobs_counts_insert AFTER INSERT ON scheduled_jobs
+    BEGIN
+        INSERT INTO scheduled_job_counts (status, job_type, slot, count) VALUES (NEW.status, NEW.job_type, 0, 1)
+        ON CONFLICT (status, job_type, slot) DO UPDATE SET count = count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS scheduled_jobs_counts_update AFTER UPDATE OF status, job_type ON scheduled_jobs
+    WHEN OLD.status IS NOT NEW.status OR OLD.job_type IS NOT NEW.job_type
+    BEGIN
+        INSERT INTO scheduled_job_counts (status, job_type, slot, count) VALUES (OLD.status, OLD.job_type, 0, -1)
+        ON CONFLICT (status, job_type, slot) DO UPDATE SET count = count - 1;
+        INSERT INTO scheduled_job_counts (status, job_type, slot, count) VALUES (NEW.status, NEW.job_type, 0, 1)
+        ON CONFLICT (status, job_type, slot) DO UPDATE SET count = count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS scheduled_jobs_counts_delete AFTER DELETE ON scheduled_jobs
+    BEGIN
+        INSERT INTO scheduled_job_counts (status, job_type, slot, count) VALUES (OLD.status, OLD.job_type, 0, -1)
+        ON CONFLICT (status, job_type, slot) DO UPDATE SET count = count - 1;
+    END
+    """,
+)
+
+
+def install_job_count_triggers(connection) -> None:
+    """Crée les triggers de comptage (la migration Postgres en embarque une copie figée)."""
+    statements = POSTGRES_TRIGGER_DDL if connection.dialect.name == "postgresql" else SQLITE_TRIGGER_DDL
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def rebuild_job_counts(db: Session) -> None:
+    """
+    Recalcul complet (COUNT ... GROUP BY) : initialisation et réparation manuelle uniquement.
+    À lancer quand aucun job ne change d'état (la migration le fait sous le verrou du CREATE TRIGGER).
+    """
+    db.query(ScheduledJobCount).delete(synchronize_session=False)
+    rows = (
+        db.query(ScheduledJob.status, ScheduledJob.job_type, func.count(ScheduledJob.id))
+        .group_by(ScheduledJob.status, ScheduledJob.job_type)
+        .all()
+    )
+    db.add_all(
+        ScheduledJobCount(status=status, job_type=job_type, slot=0, count=count)
+        for status, job_type, count in rows
+    )
+    db.flush()
+
+
+def read_job_counts(db: Session) -> dict[tuple[str, str], int]:
+    """(status, job_type) -> nombre de jobs ; lecture de quelques centaines de lignes au plus."""
+    rows = (
+        db.query(ScheduledJobCount.status, ScheduledJobCount.job_type, func.sum(ScheduledJobCount.count))
+        .group_by(ScheduledJobCount.status, ScheduledJobCount.job_type)
+        .all()
+    )
+    return {(status, job_type): int(count) for status, job_type, count in rows if count}
+
+
+def counts_by_status(counts: dict[tuple[str, str], int]) -> Counter:
+    totals = Counter()
+    for (status, _), count in counts.items():
+        totals[status] += count
+    return totals
+
+
+def pending_by_lane(counts: dict[tuple[str, str], int]) -> dict[str, int]:
+    totals = {lane.name: 0 for lane in LANES}
+    for (status, job_type), count in counts.items():
+        if status == "pending":
+            totals[lane_for_job_type(job_type).name] += count
+    return totals
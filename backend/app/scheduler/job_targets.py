@@ -0,0 +1,114 @@
+# app/scheduler/job_targets.py
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.db.models.deployment import Deployment
+from app.db.models.project import Project
+from app.db.models.scheduled_job import ScheduledJob
+from app.observability.metrics import inc_scheduler_collect_target_lookup
+
+# Les jobs de collecte ne portent que des références (project_id ; deployment_id et
+# sequence_index sont des colonnes) : endpoint, HMAC et secret sont lus sur le projet à
+# l'exécution. Le cache par processus est invalidé dès que updated_at ou baseline_version
+# du projet bouge (rotation du secret, nouvel endpoint actif).
+TARGET_CACHE_MAX_ENTRIES = 1024
+
+_target_cache: "OrderedDict[str, tuple[tuple, CollectTarget]]" = OrderedDict()
+_target_cache_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class CollectTarget:
+    project_id: Optional[str]
+    metrics_endpoint: str
+    use_hmac: bool
+    secret: Optional[str]
+
+
+def collect_job_metadata(project_id: UUID | str | None) -> dict[str, Any]:
+    """Payload d'un job de collecte : la seule référence qui n'est pas déjà une colonne."""
+    return {"project_id": str(project_id) if project_id else None}
+
+
+def resolve_collect_target(db: Session, job: ScheduledJob) -> CollectTarget:
+    """
+    Cible courante d'un job de collecte. Une lecture indexée de (updated_at, baseline_version)
+    par job ; la ligne complète n'est relue qu'au changement de version.
+    Seuls les jobs sans project_id mais avec un endpoint dans leur payload (anciennes lignes)
+    gardent leur payload ; les autres ont toujours le secret courant.
+    """
+    metadata = job.job_metadata or {}
+    project_id = metadata.get("project_id")
+    if not project_id and metadata.get("metrics_endpoint"):
+        return _legacy_target(job, metadata)
+    if not project_id and job.deployment_id is not None:
+        project_id = db.query(Deployment.project_id).filter(Deployment.id == job.deployment_id).scalar()
+    if not project_id:
+        raise ValueError(f"Missing project_id in job_metadata for job {job.id}")
+
+    project_id = str(project_id)
+    version = (
+        db.query(Project.updated_at, Project.baseline_version)
+        .filter(Project.id == _as_uuid(project_id))
+        .first()
+    )
+    if version is None:
+        raise ValueError(f"Project {project_id} not found for job {job.id}")
+    version_key = (version.updated_at, version.baseline_version)
+
+    with _target_cache_lock:
+        cached = _target_cache.get(project_id)
+        if cached is not None and cached[0] == version_key:
+            _target_cache.move_to_end(project_id)
+            inc_scheduler_collect_target_lookup("hit")
+            return cached[1]
+
+    row = (
+        db.query(Project.metrics_endpoint_active, Project.hmac_enabled, Project.hmac_secret)
+        .filter(Project.id == _as_uuid(project_id))
+        .first()
+    )
+    metrics_endpoint = ((row.metrics_endpoint_active if row else None) or "").strip()
+    if not metrics_endpoint:
+        raise ValueError(f"Project {project_id} has no active metrics endpoint (job {job.id})")
+    target = CollectTarget(
+        project_id=project_id,
+        metrics_endpoint=metrics_endpoint,
+        use_hmac=bool(row.hmac_enabled),
+        secret=row.hmac_secret,
+    )
+
+    with _target_cache_lock:
+        _target_cache[project_id] = (version_key, target)
+        _target_cache.move_to_end(project_id)
+        while len(_target_cache) > TARGET_CACHE_MAX_ENTRIES:
+            _target_cache.popitem(last=False)
+    inc_scheduler_collect_target_lookup("miss")
+    return target
+
+
+def clear_collect_target_cache() -> None:
+    with _target_cache_lock:
+        _target_cache.clear()
+
+
+def _legacy_target(job: ScheduledJob, metadata: dict) -> CollectTarget:
+    inc_scheduler_collect_target_lookup("legacy")
+    return CollectTarget(
+        project_id=None,
+        metrics_endpoint=metadata["metrics_endpoint"],
+        use_hmac=bool(metadata.get("use_hmac", False)),
+        secret=metadata.get("hmac_secret"),
+    )
+
+
+def _as_uuid(value: str):
+    try:
+        return UUID(value)
+    except ValueError:
+        return value
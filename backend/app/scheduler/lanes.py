@@ -0,0 +1,82 @@
+# app/scheduler/lanes.py
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.settings import settings
+
+
+@dataclass(frozen=True)
+class ExecutionLane:
+    """
+    Lane d'exécution : sous-budget de slots du pool pour un groupe de types de jobs.
+    - share : part de la capacité du pool réservée à la lane (limite de concurrence)
+    - priority : ordre de claim à chaque tick (0 = servie en premier)
+    - lookahead : multiplicateur de la fenêtre de fairness pour cette lane
+    - can_borrow : la lane peut utiliser les slots laissés libres par les autres lanes
+    """
+
+    name: str
+    job_types: frozenset[str]
+    share: float
+    priority: int
+    lookahead: int
+    can_borrow: bool
+
+    def concurrency_limit(self, capacity: int) -> int:
+        return max(1, math.floor(capacity * self.share))
+
+
+def _lane(name: str, job_types: set[str], *, share: float, priority: int, lookahead: int, can_borrow: bool):
+    return ExecutionLane(
+        name=name,
+        job_types=frozenset(job_types),
+        share=min(1.0, max(0.0, float(share))),
+        priority=int(priority),
+        lookahead=max(1, int(lookahead)),
+        can_borrow=bool(can_borrow),
+    )
+
+
+LANES: tuple[ExecutionLane, ...] = tuple(
+    sorted(
+        (
+            _lane(
+                "collection",
+                {"pre_collect", "post_collect", "observation_session"},
+                share=settings.SCHEDULER_LANE_COLLECTION_SHARE,
+                priority=settings.SCHEDULER_LANE_COLLECTION_PRIORITY,
+                lookahead=settings.SCHEDULER_LANE_COLLECTION_LOOKAHEAD,
+                can_borrow=settings.SCHEDULER_LANE_COLLECTION_CAN_BORROW,
+            ),
+            _lane(
+                "analysis",
+                {"analysis"},
+                share=settings.SCHEDULER_LANE_ANALYSIS_SHARE,
+                priority=settings.SCHEDULER_LANE_ANALYSIS_PRIORITY,
+                lookahead=settings.SCHEDULER_LANE_ANALYSIS_LOOKAHEAD,
+                can_borrow=settings.SCHEDULER_LANE_ANALYSIS_CAN_BORROW,
+            ),
+            _lane(
+                "notifications",
+                {"email_send", "slack_send", "notification_outbox"},
+                share=settings.SCHEDULER_LANE_NOTIFICATIONS_SHARE,
+                priority=settings.SCHEDULER_LANE_NOTIFICATIONS_PRIORITY,
+                lookahead=settings.SCHEDULER_LANE_NOTIFICATIONS_LOOKAHEAD,
+                can_borrow=settings.SCHEDULER_LANE_NOTIFICATIONS_CAN_BORROW,
+            ),
+        ),
+        key=lambda lane: (lane.priority, lane.name),
+    )
+)
+LANES_BY_NAME = {lane.name: lane for lane in LANES}
+# Types inconnus (nouveaux jobs non encore rangés) : dernière lane par priorité.
+DEFAULT_LANE = LANES[-1]
+KNOWN_JOB_TYPES = frozenset(job_type for lane in LANES for job_type in lane.job_types)
+
+
+def lane_for_job_type(job_type: Optional[str]) -> ExecutionLane:
+    for lane in LANES:
+        if job_type in lane.job_types:
+            return lane
+    return DEFAULT_LANE
@@ -1,152 +1,1142 @@
 # app/scheduler/poller.py
 import asyncio
+import os
+import socket
+import threading
 import time
-from collections import defaultdict, deque
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import uuid
+from collections import Counter
 from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 from typing import Optional
 import structlog
 from sqlalchemy.orm import Session
-from sqlalchemy import update
+from sqlalchemy import and_, func, literal, or_, select, update
 
 from app.core.settings import settings
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, engine
 from app.db.models.deployment import Deployment
+from app.db.models.project import Project
 from app.db.models.scheduled_job import ScheduledJob
-from app.metrics.collector import MetricsHMACValidationError, collect_metrics
+from app.db.models.scheduler_worker import SchedulerWorker
+from app.metrics.collector import (
+    MetricsEndpointUnavailable,
+    MetricsHMACValidationError,
+    collect_metrics,
+    collect_metrics_async,
+)
 from app.analysis.engine import analyze_deployment
-from app.email.service import send_email_if_not_sent
-from app.slack.service import send_slack_if_not_sent
+from app.email.service import send_email_if_not_sent, send_email_if_not_sent_async
+from app.slack.service import send_slack_if_not_sent, send_slack_if_not_sent_async
+from app.scheduler.async_executor import AsyncJobExecutor
+from app.scheduler.catchup import (
+    CATCHUP_BACKLOG_THRESHOLD,
+    CATCHUP_EXIT_BACKLOG,
+    CATCHUP_LANE_ORDER,
+    CatchUpState,
+    collapse_overdue_observation_sessions,
+    collapse_overdue_post_collects,
+    count_overdue,
+    samples_per_deployment,
+)
+from app.scheduler.clock import SYSTEM_CLOCK, SystemClock
+from app.scheduler.dead_letter import dead_letter_jobs, purge_dead_letters
+from app.scheduler.deadlines import deadline_for
+from app.scheduler.dependencies import (
+    JobDeferred,
+    dependencies_deadline,
+    release_downstream_jobs,
+    unfinished_upstream_count,
+)
+from app.scheduler.fairness import DEFAULT_PLAN, DeficitRoundRobin, plan_weight, urgency_key
+from app.scheduler.job_counts import counts_by_status, pending_by_lane, read_job_counts
+from app.scheduler.job_targets import CollectTarget, resolve_collect_target
+from app.scheduler.lanes import DEFAULT_LANE, KNOWN_JOB_TYPES, LANES, ExecutionLane, lane_for_job_type
+from app.scheduler.retention import (
+    ARCHIVE_ENABLED,
+    ARCHIVE_INTERVAL_SECONDS,
+    archive_terminal_jobs,
+    purge_archived_jobs,
+)
+from app.scheduler.retry_policies import RetryPlan, plan_retry
+from app.scheduler.sharding import SHARD_COUNT, assign_shards
+from app.scheduler.tasks import OUTBOX_SHARED_KEYS, POST_COLLECTION_INTERVAL_SECONDS
+from app.scheduler.timeouts import (
+    WATCHDOG_ENABLED,
+    JobExecution,
+    JobTimeout,
+    JobWatchdog,
+    bind_job_session,
+    failure_class,
+    raise_if_timed_out,
+    reset_current_execution,
+    set_current_execution,
+    timeout_for,
+)
+from app.scheduler.wakeup import LISTEN_NOTIFY_ENABLED, JobWakeupListener, notify_jobs_scheduled
+from app.scheduler.workers import JobWorkerPool
 from app.observability.metrics import (
+    inc_scheduler_catch_up_collapsed,
+    inc_scheduler_deadline_missed,
+    inc_scheduler_dependency_events,
+    inc_scheduler_drain_jobs,
+    inc_scheduler_archive_purged,
+    inc_scheduler_job_failures,
+    inc_scheduler_jobs_archived,
+    inc_scheduler_jobs_dead_lettered,
     inc_scheduler_jobs_failed,
+    inc_scheduler_lease_events,
+    inc_scheduler_shard_rebalances,
+    observe_scheduler_claim,
     observe_scheduler_job_start_delay,
+    observe_scheduler_lane_start_delay,
+    set_scheduler_catch_up,
+    set_scheduler_job_counts,
     set_scheduler_jobs_pending,
+    set_scheduler_lane_in_flight,
+    set_scheduler_lane_queue_depth,
+    set_scheduler_shard_assignment,
+    set_scheduler_tenant_backlog,
 )
 
 logger = structlog.get_logger(__name__)
 
 POLL_INTERVAL = max(1, int(settings.SCHEDULER_POLL_INTERVAL_SECONDS))
 MAX_CONCURRENT_JOBS = max(1, int(settings.SCHEDULER_MAX_CONCURRENT_JOBS))
+WORKER_QUEUE_SIZE = max(0, int(settings.SCHEDULER_WORKER_QUEUE_SIZE))
 RUNNING_STUCK_SECONDS = max(1, int(settings.SCHEDULER_RUNNING_STUCK_SECONDS))
-MAX_RETRIES = 3
-RETRY_BACKOFF_SECONDS = [30, 120, 300]  # retry #1, #2, #3
+LEASE_SECONDS = max(5, int(settings.SCHEDULER_LEASE_SECONDS))
+LEASE_RENEW_INTERVAL_SECONDS = max(1.0, LEASE_SECONDS / 3)
 FAIRNESS_LOOKAHEAD_MULTIPLIER = max(1, int(settings.SCHEDULER_FAIRNESS_LOOKAHEAD_MULTIPLIER))
+# Lots SKIP LOCKED successifs d'un claim, pour combler la fenêtre une fois des tenants pleins.
+FAIRNESS_CLAIM_ROUNDS = 3
+DEADLINE_URGENCY_SECONDS = max(0, int(settings.SCHEDULER_DEADLINE_URGENCY_SECONDS))
+TENANT_METRICS_TOP_N = max(0, int(settings.SCHEDULER_TENANT_METRICS_TOP_N))
+EXECUTION_MODE = (settings.SCHEDULER_EXECUTION_MODE or "thread").strip().lower()
+ASYNC_MAX_IN_FLIGHT = max(1, int(settings.SCHEDULER_ASYNC_MAX_IN_FLIGHT))
+ASYNC_DB_THREADS = max(1, int(settings.SCHEDULER_ASYNC_DB_THREADS))
+# Arrêt : délai laissé aux jobs en cours avant de rendre leurs claims en `pending`.
+DRAIN_GRACE_SECONDS = max(0, int(settings.SCHEDULER_DRAIN_GRACE_SECONDS))
+# Profondeur des files dues et backlog par tenant (requêtes sur scheduled_jobs) : au plus à ce
+# rythme ; les totaux par statut viennent de scheduled_job_counts à chaque tick.
+QUEUE_METRICS_INTERVAL_SECONDS = max(POLL_INTERVAL, int(settings.SCHEDULER_QUEUE_METRICS_INTERVAL_SECONDS))
+# COUNT des jobs en retard (entrée/sortie du rattrapage) : au plus à ce rythme.
+CATCHUP_CHECK_INTERVAL_SECONDS = max(POLL_INTERVAL, int(settings.SCHEDULER_CATCHUP_CHECK_INTERVAL_SECONDS))
+# Le heartbeat partagé (scheduler_workers) est écrit au plus à ce rythme, même si les ticks s'enchaînent.
+HEARTBEAT_PERSIST_SECONDS = max(1.0, POLL_INTERVAL / 2)
+SHARDING_ENABLED = bool(settings.SCHEDULER_SHARDING_ENABLED)
+# Un worker sans heartbeat depuis ce délai sort du partage des shards.
+SHARD_MEMBERSHIP_TTL_SECONDS = max(POLL_INTERVAL * 3, 30)
 
 
 class JobPoller:
-    def __init__(self):
+    def __init__(
+        self,
+        *,
+        role: str = "api",
+        execution_mode: Optional[str] = None,
+        max_concurrent_jobs: Optional[int] = None,
+        async_max_in_flight: Optional[int] = None,
+        clock: Optional[SystemClock] = None,
+    ):
+        # Les overrides (processus worker dédié) priment ; sinon les constantes du module,
+        # résolues à la création du pool.
+        self.role = role
+        # Toutes les lectures d'heure du poller passent par l'horloge (simulation : horloge virtuelle).
+        self.clock = clock or SYSTEM_CLOCK
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._execution_mode = execution_mode
+        self._max_concurrent_jobs = max_concurrent_jobs
+        self._async_max_in_flight = async_max_in_flight
+        self._heartbeat_persisted_at: Optional[float] = None
+        self._queue_metrics_refreshed_at: Optional[float] = None
+        self._overdue_counted_at: Optional[float] = None
+        # Jobs réclamés par ce poller et pas encore terminés (job_id -> lane) : leurs leases
+        # sont renouvelés et ils comptent dans la concurrence de leur lane.
+        self._owned_jobs: dict = {}
+        self._owned_lock = threading.Lock()
+        # Shards attribués à ce poller (None : pas encore d'attribution, aucun filtre de shard).
+        self.owned_shards: Optional[frozenset[int]] = None
+        self.shard_members: tuple[str, ...] = ()
+        # Shards récemment acquis qui ont encore des jobs running chez l'ancien propriétaire.
+        self._handover_shards: set[int] = set()
+        # Déficits DRR par (lane, tenant), conservés d'un tick à l'autre.
+        self._drr = DeficitRoundRobin()
+        self.catch_up = CatchUpState()
         self.running = False
+        # Arrêt en cours : plus aucun claim, les jobs en cours finissent ou sont rendus.
+        self.draining = False
         self.task: Optional[asyncio.Task] = None
+        self.lease_task: Optional[asyncio.Task] = None
+        self.retention_task: Optional[asyncio.Task] = None
         self.last_heartbeat_at: Optional[datetime] = None
+        self.listener: Optional[JobWakeupListener] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._next_due_at: Optional[datetime] = None
+        self._notified_due_at: Optional[datetime] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.worker_pool: Optional[JobWorkerPool | AsyncJobExecutor] = None
+        self.watchdog: Optional[JobWatchdog] = None
+
+    @property
+    def execution_mode(self) -> str:
+        return (self._execution_mode or EXECUTION_MODE).strip().lower()
+
+    @property
+    def max_concurrent_jobs(self) -> int:
+        return max(1, int(self._max_concurrent_jobs or MAX_CONCURRENT_JOBS))
+
+    @property
+    def async_max_in_flight(self) -> int:
+        return max(1, int(self._async_max_in_flight or ASYNC_MAX_IN_FLIGHT))
 
     def _touch_heartbeat(self):
-        self.last_heartbeat_at = datetime.now(timezone.utc)
+        self.last_heartbeat_at = self.clock.now()
+
+    def _persist_heartbeat(self, db: Session, *, stopped: bool = False, force: bool = False) -> None:
+        """Upsert de la ligne scheduler_workers de ce processus (lue par /health/scheduler)."""
+        if self.draining and not stopped:
+            # stopped_at déjà publié : un tick encore en vol ne doit pas ré-annoncer ce worker.
+            return
+        monotonic_now = self.clock.monotonic()
+        if (
+            not force
+            and self._heartbeat_persisted_at is not None
+            and monotonic_now - self._heartbeat_persisted_at < HEARTBEAT_PERSIST_SECONDS
+        ):
+            return
+
+        now = self.clock.now()
+        catch_up = self.catch_up
+        values = {
+            "heartbeat_at": now,
+            "execution_mode": self.execution_mode,
+            "stopped_at": now if stopped else None,
+            "catchup_started_at": catch_up.started_at if catch_up.active else None,
+            "catchup_backlog_start": catch_up.backlog_at_start if catch_up.active else None,
+            "catchup_backlog_remaining": catch_up.backlog_remaining if catch_up.active else None,
+            "catchup_collapsed_jobs": catch_up.collapsed_jobs if catch_up.active else None,
+        }
+        try:
+            result = db.execute(
+                update(SchedulerWorker)
+                .where(SchedulerWorker.worker_id == self.worker_id)
+                .values(**values)
+            )
+            if result.rowcount == 0:
+                db.add(
+                    SchedulerWorker(
+                        worker_id=self.worker_id,
+                        hostname=socket.gethostname(),
+                        pid=os.getpid(),
+                        role=self.role,
+                        started_at=now,
+                        **values,
+                    )
+                )
+            db.commit()
+            self._heartbeat_persisted_at = monotonic_now
+        except Exception as e:
+            db.rollback()
+            logger.warning("scheduler_heartbeat_persist_failed", worker_id=self.worker_id, error=str(e))
+
+    def _persist_stopped(self) -> None:
+        db = SessionLocal()
+        try:
+            self._persist_heartbeat(db, stopped=True, force=True)
+        finally:
+            db.close()
 
     async def start(self):
         self.running = True
+        self.draining = False
         self._touch_heartbeat()
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._ensure_worker_pool()
+        if WATCHDOG_ENABLED:
+            self.watchdog = JobWatchdog(on_timeout=self._on_job_timeout)
+            self.watchdog.start()
+        if LISTEN_NOTIFY_ENABLED and engine.dialect.name == "postgresql":
+            self.listener = JobWakeupListener(on_notify=self._on_jobs_scheduled)
+            self.listener.start()
         self.task = asyncio.create_task(self._poll_forever())
-        logger.info("job_poller_started", poll_interval_seconds=POLL_INTERVAL)
+        self.lease_task = asyncio.create_task(self._renew_leases_forever())
+        if ARCHIVE_ENABLED:
+            self.retention_task = asyncio.create_task(self._archive_forever())
+        logger.info(
+            "job_poller_started",
+            worker_id=self.worker_id,
+            role=self.role,
+            poll_interval_seconds=POLL_INTERVAL,
+            execution_mode=self.execution_mode,
+            listen_notify=self.listener is not None,
+            lease_seconds=LEASE_SECONDS,
+        )
 
-    async def stop(self):
+    async def stop(self, grace_seconds: Optional[float] = None):
+        """
+        Drain : plus aucun claim, les jobs pas encore démarrés sont rendus tout de suite, ceux en
+        cours ont `grace_seconds` (SCHEDULER_DRAIN_GRACE_SECONDS) pour finir ; les autres sont
+        rendus en `pending` en un seul UPDATE, sans attendre l'expiration de leur lease.
+        """
+        grace_seconds = DRAIN_GRACE_SECONDS if grace_seconds is None else max(0.0, float(grace_seconds))
+        drain_started = time.monotonic()
         self.running = False
-        if self.task:
-            self.task.cancel()
-            try:
-                await self.task
-            except asyncio.CancelledError:
-                pass
-        logger.info("job_poller_stopped")
+        self.draining = True
+        if self.listener:
+            self.listener.stop()
+            self.listener = None
+        if self._wakeup is not None:
+            self._wakeup.set()
+        # Le tick en cours se termine (ses claims sont suivis et seront drainés) ; borné par la grâce.
+        await self._await_or_cancel(self.task, timeout=grace_seconds)
+        await self._await_or_cancel(self.retention_task, timeout=0)
+        self.task = None
+        self.retention_task = None
+        # stopped_at tout de suite : les autres pollers reprennent les shards de ce worker au
+        # lieu d'attendre l'expiration de son heartbeat.
+        await asyncio.to_thread(self._persist_stopped)
+
+        if self.worker_pool:
+            remaining = max(0.0, grace_seconds - (time.monotonic() - drain_started))
+            await asyncio.to_thread(self._drain_worker_pool, self.worker_pool, remaining)
+            self.worker_pool = None
+        # Leases renouvelés jusqu'au bout du drain.
+        await self._await_or_cancel(self.lease_task, timeout=0)
+        self.lease_task = None
+        if self.watchdog:
+            self.watchdog.stop()
+            self.watchdog = None
+        self._loop = None
+        self.draining = False
+        logger.info(
+            "job_poller_stopped",
+            worker_id=self.worker_id,
+            drain_seconds=round(time.monotonic() - drain_started, 2),
+        )
+
+    @staticmethod
+    async def _await_or_cancel(task: Optional[asyncio.Task], *, timeout: float) -> None:
+        if task is None:
+            return
+        if timeout > 0 and not task.done():
+            await asyncio.wait({task}, timeout=timeout)
+        if not task.done():
+            task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+    def _drain_worker_pool(self, pool: JobWorkerPool | AsyncJobExecutor, grace_seconds: float) -> None:
+        # Jobs encore en file : aucun intérêt à les démarrer ici, un autre poller les prend.
+        queued_ids = [job.id for job in pool.drain_queued()]
+        handed_back = self._hand_back_jobs(queued_ids)
+        in_flight = sum(self.lane_in_flight().values())
+        unfinished = 0
+        if not pool.wait_idle(timeout=grace_seconds):
+            with self._owned_lock:
+                unfinished_ids = list(self._owned_jobs)
+            unfinished = len(unfinished_ids)
+            if self.watchdog is not None:
+                self.watchdog.abandon_all()
+            handed_back += self._hand_back_jobs(unfinished_ids)
+        # Les threads encore occupés par un job rendu sont abandonnés (fencing sur leur résultat).
+        pool.stop()
+        finished = max(0, in_flight - unfinished)
+        if finished:
+            inc_scheduler_drain_jobs(outcome="finished", count=finished)
+        if handed_back:
+            inc_scheduler_drain_jobs(outcome="handed_back", count=handed_back)
+        logger.info(
+            "job_poller_drained",
+            worker_id=self.worker_id,
+            finished_jobs=finished,
+            handed_back_jobs=handed_back,
+            grace_exhausted=bool(unfinished),
+        )
+
+    def _hand_back_jobs(self, job_ids: list) -> int:
+        if not job_ids:
+            return 0
+        db = SessionLocal()
+        try:
+            released = self._release_claimed_jobs(db, job_ids)
+            if released:
+                notify_jobs_scheduled(db)
+                db.commit()
+            return released
+        finally:
+            db.close()
 
     async def _poll_forever(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
         while self.running:
             self._touch_heartbeat()
+            self._notified_due_at = None
             try:
-                await asyncio.to_thread(self._process_pending_jobs)
+                _claimed_count, next_due_at = await asyncio.to_thread(self._process_pending_jobs)
+                self._next_due_at = _earliest(next_due_at, self._notified_due_at)
             except Exception as e:
                 logger.exception("poller_loop_error", error=str(e))
+                self._next_due_at = None
             finally:
                 self._touch_heartbeat()
-            await asyncio.sleep(POLL_INTERVAL)
+            await self._wait_for_next_tick()
+
+    async def _renew_leases_forever(self):
+        while self.running:
+            await asyncio.sleep(LEASE_RENEW_INTERVAL_SECONDS)
+            try:
+                await asyncio.to_thread(self._renew_owned_leases)
+            except Exception as e:
+                logger.exception("job_lease_renewal_error", error=str(e))
+
+    async def _archive_forever(self):
+        # Hors du tick : l'archivage ne retarde jamais un claim.
+        while self.running:
+            await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
+            try:
+                await asyncio.to_thread(self._archive_terminal_jobs)
+            except Exception as e:
+                logger.exception("scheduled_jobs_archive_error", worker_id=self.worker_id, error=str(e))
+
+    def _archive_terminal_jobs(self) -> None:
+        db = SessionLocal()
+        started = self.clock.perf_counter()
+        try:
+            now = self.clock.now()
+            archived = archive_terminal_jobs(db, now)
+            purged = purge_archived_jobs(db, now)
+            dead_letters_purged = purge_dead_letters(db, now)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        for status, count in archived.items():
+            inc_scheduler_jobs_archived(status=status, count=count)
+        if purged:
+            inc_scheduler_archive_purged(purged)
+        if archived or purged or dead_letters_purged:
+            logger.info(
+                "scheduled_jobs_archived",
+                worker_id=self.worker_id,
+                archived=archived,
+                purged=purged,
+                dead_letters_purged=dead_letters_purged,
+                duration_ms=round((self.clock.perf_counter() - started) * 1000, 1),
+            )
+
+    async def _wait_for_next_tick(self):
+        loop = asyncio.get_running_loop()
+        # Filet de sécurité : au pire un tick toutes les POLL_INTERVAL secondes.
+        fallback_deadline = loop.time() + POLL_INTERVAL
+        while self.running:
+            timeout = fallback_deadline - loop.time()
+            # Sans slot libre, inutile de se réveiller pour un job dû : on attend qu'un worker se libère.
+            if self._next_due_at is not None and self._has_free_slots():
+                due_in = (self._next_due_at - self.clock.now()).total_seconds()
+                timeout = min(timeout, due_in)
+            if timeout <= 0:
+                return
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return
+
+    def _on_jobs_scheduled(self, scheduled_at: Optional[datetime]):
+        # Appelé sur la boucle asyncio par le listener LISTEN/NOTIFY.
+        due_at = scheduled_at or self.clock.now()
+        self._notified_due_at = _earliest(self._notified_due_at, due_at)
+        self._next_due_at = _earliest(self._next_due_at, due_at)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _on_worker_slot_freed(self):
+        # Appelé depuis un thread worker.
+        loop = self._loop
+        if loop is None or self._wakeup is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass
+
+    def _ensure_worker_pool(self) -> JobWorkerPool | AsyncJobExecutor:
+        if self.worker_pool is None:
+            if self.execution_mode == "async":
+                # Collectes et notifications en vol sur la boucle ; l'analyse garde
+                # max_concurrent_jobs threads CPU.
+                self.worker_pool = AsyncJobExecutor(
+                    max_in_flight=self.async_max_in_flight,
+                    async_handler=self._execute_job_async,
+                    sync_handler=self._execute_claimed_job,
+                    db_threads=ASYNC_DB_THREADS,
+                    cpu_threads=self.max_concurrent_jobs,
+                    on_slot_freed=self._on_worker_slot_freed,
+                )
+            else:
+                self.worker_pool = JobWorkerPool(
+                    size=self.max_concurrent_jobs,
+                    queue_size=WORKER_QUEUE_SIZE,
+                    handler=self._execute_claimed_job,
+                    on_slot_freed=self._on_worker_slot_freed,
+                )
+            self.worker_pool.start()
+        return self.worker_pool
+
+    def _has_free_slots(self) -> bool:
+        return self.worker_pool is None or self.worker_pool.free_slots() > 0
 
-    def _process_pending_jobs(self):
+    def _process_pending_jobs(self) -> tuple[int, Optional[datetime]]:
         db = SessionLocal()
+        claimed_count = 0
+        next_due_at = None
         try:
-            self._recover_stuck_jobs(db)
+            self._persist_heartbeat(db)
+            self._refresh_shard_assignment(db)
+            self._recover_expired_leases(db)
+            self._update_catch_up(db)
             self._update_pending_jobs_gauge(db)
 
-            now = datetime.now(timezone.utc)
-            lookahead_limit = max(MAX_CONCURRENT_JOBS, MAX_CONCURRENT_JOBS * FAIRNESS_LOOKAHEAD_MULTIPLIER)
-            due_jobs = db.query(ScheduledJob).filter(
-                ScheduledJob.status == 'pending',
-                ScheduledJob.scheduled_at <= now
-            ).order_by(ScheduledJob.scheduled_at).limit(lookahead_limit).all()
+            pool = self._ensure_worker_pool()
+            # Drain en cours : le tick termine sans claim.
+            free_slots = 0 if self.draining else pool.free_slots()
+            claimed_jobs = self._claim_due_jobs_by_lane(db=db, pool=pool, free_slots=free_slots)
+            claimed_count = len(claimed_jobs)
+            if claimed_jobs:
+                logger.info(
+                    "processing_jobs",
+                    jobs_count=len(claimed_jobs),
+                    free_slots=free_slots,
+                    busy_workers=pool.busy,
+                    max_concurrent_jobs=self.max_concurrent_jobs,
+                )
+                self._dispatch_claimed_jobs(db, claimed_jobs)
+            self._publish_lane_in_flight()
 
-            if not due_jobs:
-                return
+            next_due_at = self._next_pending_due_at(db, lanes=self._lanes_with_capacity(pool))
+        except Exception as e:
+            logger.exception("poller_error", error=str(e))
+        finally:
+            db.close()
+        return claimed_count, next_due_at
+
+    def _lanes_with_capacity(self, pool: JobWorkerPool | AsyncJobExecutor) -> list[ExecutionLane]:
+        in_flight = self.lane_in_flight()
+        pool_has_room = pool.free_slots() > 0
+        return [
+            lane
+            for lane in LANES
+            if in_flight[lane.name] < lane.concurrency_limit(pool.capacity) or (lane.can_borrow and pool_has_room)
+        ]
 
-            selected_jobs = self._select_jobs_with_fairness(db=db, jobs=due_jobs, limit=MAX_CONCURRENT_JOBS)
-            if not selected_jobs:
-                return
+    def _next_pending_due_at(
+        self, db: Session, lanes: Optional[list[ExecutionLane]] = None
+    ) -> Optional[datetime]:
+        # Seules les lanes qui peuvent encore réclamer comptent : un job dû d'une lane saturée
+        # ne doit pas provoquer de réveil immédiat (la libération d'un slot s'en charge).
+        if lanes is not None and not lanes:
+            return None
+        query = db.query(func.min(ScheduledJob.scheduled_at)).filter(ScheduledJob.status == 'pending')
+        if lanes is not None and len(lanes) < len(LANES):
+            query = query.filter(or_(*(self._lane_filter(lane) for lane in lanes)))
+        if self.owned_shards is not None:
+            query = query.filter(self._shard_filter(self.owned_shards))
+        next_due_at = query.scalar()
+        if next_due_at is not None and next_due_at.tzinfo is None:
+            next_due_at = next_due_at.replace(tzinfo=timezone.utc)
+        return next_due_at
+
+    def _refresh_shard_assignment(self, db: Session) -> None:
+        """
+        Recalcule les shards de ce poller à partir des workers vivants (scheduler_workers).
+        Chaque poller fait le même calcul déterministe : pas de coordinateur, et le
+        rééquilibrage suit les arrivées/départs au tick suivant.
+        """
+        if not SHARDING_ENABLED:
+            return
+        cutoff = self.clock.now() - timedelta(seconds=SHARD_MEMBERSHIP_TTL_SECONDS)
+        try:
+            live_workers = {
+                worker_id
+                for (worker_id,) in db.query(SchedulerWorker.worker_id).filter(
+                    SchedulerWorker.stopped_at.is_(None),
+                    SchedulerWorker.heartbeat_at >= cutoff,
+                )
+            }
+            db.rollback()
+        except Exception as e:
+            db.rollback()
+            # On garde l'attribution précédente ; les claims restent sûrs grâce à SKIP LOCKED.
+            logger.warning("scheduler_shard_membership_failed", worker_id=self.worker_id, error=str(e))
+            return
+
+        live_workers.add(self.worker_id)
+        members = tuple(sorted(live_workers))
+        if members == self.shard_members and self.owned_shards is not None:
+            return
+
+        owned = assign_shards(members, SHARD_COUNT).get(self.worker_id, frozenset())
+        previous = self.owned_shards
+        gained = owned if previous is None else owned - previous
+        lost = frozenset() if previous is None else previous - owned
+        self._handover_shards = (self._handover_shards - lost) | set(gained)
+        self.owned_shards = owned
+        self.shard_members = members
+        set_scheduler_shard_assignment(owned=len(owned), members=len(members))
+        if previous is not None and (gained or lost):
+            inc_scheduler_shard_rebalances()
+        logger.info(
+            "scheduler_shards_assigned",
+            worker_id=self.worker_id,
+            members=len(members),
+            shards_owned=len(owned),
+            shards_gained=len(gained),
+            shards_lost=len(lost),
+            shard_count=SHARD_COUNT,
+        )
 
+    def _claimable_shards(self, db: Session) -> Optional[frozenset[int]]:
+        """
+        Shards réclamables maintenant : un shard acquis reste en attente tant que l'ancien
+        propriétaire y a des jobs running, pour ne pas doubler l'ordre d'un même projet.
+        """
+        if self.owned_shards is None:
+            return None
+        if not self._handover_shards:
+            return self.owned_shards
+
+        busy_shards = {
+            shard_key
+            for (shard_key,) in db.query(ScheduledJob.shard_key)
+            .filter(
+                ScheduledJob.status == 'running',
+                ScheduledJob.shard_key.in_(self._handover_shards),
+                or_(ScheduledJob.locked_by.is_(None), ScheduledJob.locked_by != self.worker_id),
+            )
+            .distinct()
+        }
+        released = self._handover_shards - busy_shards
+        if released:
+            self._handover_shards -= released
             logger.info(
-                "processing_jobs",
-                jobs_count=len(selected_jobs),
-                due_jobs_count=len(due_jobs),
-                max_concurrent_jobs=MAX_CONCURRENT_JOBS,
+                "scheduler_shards_handover_completed",
+                worker_id=self.worker_id,
+                shards_count=len(released),
+                shards_waiting=len(self._handover_shards),
             )
-            self._execute_jobs_concurrently([job.id for job in selected_jobs])
+        return self.owned_shards - busy_shards
+
+    @staticmethod
+    def _shard_filter(shards: frozenset[int]):
+        # shard_key NULL (jobs antérieurs au sharding) : réclamables par tous les workers.
+        if not shards:
+            return ScheduledJob.shard_key.is_(None)
+        return or_(ScheduledJob.shard_key.in_(sorted(shards)), ScheduledJob.shard_key.is_(None))
+
+    def _claim_due_jobs_by_lane(
+        self, db: Session, pool: JobWorkerPool | AsyncJobExecutor, free_slots: int
+    ) -> list[ScheduledJob]:
+        """
+        Claim par lane, dans l'ordre de priorité : chaque lane réclame au plus sa limite de
+        concurrence moins ses jobs en vol. Les slots restés libres sont ensuite prêtés aux
+        lanes `can_borrow` qui avaient encore du travail dû.
+        """
+        if free_slots <= 0:
+            return []
+        in_flight = self.lane_in_flight()
+        remaining = free_slots
+        claimed: list[ScheduledJob] = []
+        saturated: list[ExecutionLane] = []
 
-            with SessionLocal() as gauge_db:
-                self._update_pending_jobs_gauge(gauge_db)
+        for lane in self._lanes_in_claim_order():
+            if remaining <= 0:
+                break
+            limit = min(remaining, lane.concurrency_limit(pool.capacity) - in_flight[lane.name])
+            if limit <= 0:
+                saturated.append(lane)
+                continue
+            lane_jobs = self._claim_due_jobs(db=db, limit=limit, lane=lane)
+            claimed.extend(lane_jobs)
+            remaining -= len(lane_jobs)
+            if len(lane_jobs) >= limit:
+                saturated.append(lane)
+
+        # Emprunt : uniquement la capacité que les autres lanes n'ont pas utilisée à ce tick.
+        for lane in saturated:
+            if remaining <= 0:
+                break
+            if not lane.can_borrow:
+                continue
+            borrowed = self._claim_due_jobs(db=db, limit=remaining, lane=lane)
+            if borrowed:
+                claimed.extend(borrowed)
+                remaining -= len(borrowed)
+                logger.info("lane_capacity_borrowed", lane=lane.name, borrowed_slots=len(borrowed))
+        return claimed
+
+    def _lanes_in_claim_order(self) -> list[ExecutionLane]:
+        if not self.catch_up.active:
+            return list(LANES)
+        # Rattrapage : verdicts et notifications d'abord, les collectes en retard ensuite.
+        return sorted(
+            LANES,
+            key=lambda lane: (
+                CATCHUP_LANE_ORDER.index(lane.name) if lane.name in CATCHUP_LANE_ORDER else len(CATCHUP_LANE_ORDER),
+                lane.priority,
+            ),
+        )
 
+    def _update_catch_up(self, db: Session) -> None:
+        """
+        Mode rattrapage : au-delà de CATCHUP_BACKLOG_THRESHOLD jobs en retard (deadline
+        dépassée, après une indisponibilité par exemple), les collectes POST en retard sont
+        réduites aux samples encore utiles à l'analyse, et les lanes analysis/notifications
+        passent en premier. Sortie sous CATCHUP_EXIT_BACKLOG. Le COUNT des jobs en retard tourne au
+        plus toutes les CATCHUP_CHECK_INTERVAL_SECONDS ; la réduction continue à chaque tick.
+        """
+        now = self.clock.now()
+        monotonic_now = self.clock.monotonic()
+        count_due = (
+            self._overdue_counted_at is None
+            or monotonic_now - self._overdue_counted_at >= CATCHUP_CHECK_INTERVAL_SECONDS
+        )
+        state = self.catch_up
+        if not count_due and not state.active:
+            return
+        shard_filter = self._shard_filter(self.owned_shards) if self.owned_shards is not None else None
+        overdue = state.backlog_remaining
+        try:
+            if count_due:
+                overdue = count_overdue(db, now, shard_filter)
+                self._overdue_counted_at = monotonic_now
+                if state.active:
+                    state.backlog_remaining = overdue
+                elif overdue >= CATCHUP_BACKLOG_THRESHOLD:
+                    self.catch_up = state = CatchUpState(
+                        active=True,
+                        started_at=now,
+                        backlog_at_start=overdue,
+                        backlog_remaining=overdue,
+                    )
+                    logger.warning("scheduler_catch_up_started", worker_id=self.worker_id, overdue_jobs=overdue)
+            if state.active and count_due and overdue <= CATCHUP_EXIT_BACKLOG:
+                logger.info(
+                    "scheduler_catch_up_finished",
+                    worker_id=self.worker_id,
+                    overdue_jobs=overdue,
+                    backlog_at_start=state.backlog_at_start,
+                    collapsed_samples=state.collapsed_jobs,
+                    duration_seconds=round((now - state.started_at).total_seconds(), 1),
+                )
+                self.catch_up = state = CatchUpState()
+            elif state.active:
+                keep = samples_per_deployment()
+                collapsed = collapse_overdue_post_collects(
+                    db, now, keep=keep, interval_seconds=POST_COLLECTION_INTERVAL_SECONDS, shard_filter=shard_filter
+                ) + collapse_overdue_observation_sessions(
+                    db, now, keep=keep, interval_seconds=POST_COLLECTION_INTERVAL_SECONDS, shard_filter=shard_filter
+                )
+                db.commit()
+                if collapsed:
+                    state.collapsed_jobs += collapsed
+                    inc_scheduler_catch_up_collapsed(collapsed)
+                    # Les samples réduits ne sont plus en retard : estimation jusqu'au prochain COUNT.
+                    state.backlog_remaining = overdue = max(0, state.backlog_remaining - collapsed)
+                logger.info(
+                    "scheduler_catch_up_progress",
+                    worker_id=self.worker_id,
+                    overdue_jobs=overdue,
+                    collapsed_samples=state.collapsed_jobs,
+                    progress=state.progress,
+                )
+            set_scheduler_catch_up(active=state.active, backlog=overdue)
         except Exception as e:
-            logger.exception("poller_error", error=str(e))
+            db.rollback()
+            logger.warning("scheduler_catch_up_failed", worker_id=self.worker_id, error=str(e))
+
+    @staticmethod
+    def _lane_filter(lane: ExecutionLane):
+        lane_types = ScheduledJob.job_type.in_(sorted(lane.job_types))
+        if lane is DEFAULT_LANE:
+            return or_(lane_types, ScheduledJob.job_type.notin_(sorted(KNOWN_JOB_TYPES)))
+        return lane_types
+
+    def _publish_lane_in_flight(self) -> None:
+        in_flight = self.lane_in_flight()
+        for lane in LANES:
+            set_scheduler_lane_in_flight(lane=lane.name, in_flight=in_flight[lane.name])
+
+    def _claim_due_jobs(self, db: Session, limit: int, lane: Optional[ExecutionLane] = None) -> list[ScheduledJob]:
+        now = self.clock.now()
+        lookahead_multiplier = lane.lookahead if lane is not None else FAIRNESS_LOOKAHEAD_MULTIPLIER
+        lookahead_limit = max(limit, limit * lookahead_multiplier)
+
+        edf_order = (ScheduledJob.deadline_at.asc().nulls_last(), ScheduledJob.scheduled_at)
+        candidates_query = db.query(ScheduledJob).filter(
+            ScheduledJob.status == 'pending',
+            ScheduledJob.scheduled_at <= now,
+        )
+        if lane is not None:
+            candidates_query = candidates_query.filter(self._lane_filter(lane))
+        claimable_shards = self._claimable_shards(db)
+        if claimable_shards is not None:
+            candidates_query = candidates_query.filter(self._shard_filter(claimable_shards))
+
+        # SKIP LOCKED d'abord : les pollers concurrents verrouillent des lots disjoints, les verrous
+        # sont tenus jusqu'au commit du claim. Files virtuelles par tenant ensuite, dans le lot
+        # verrouillé : chaque tenant apporte au plus `limit` jobs à la fenêtre (tenant_key NULL :
+        # un job = une file). Un tenant plein est exclu des lots suivants, qui comblent la fenêtre
+        # avec les autres tenants ; un tenant dont les premiers jobs sont verrouillés par un autre
+        # poller apporte ses jobs suivants. EDF : les échéances les plus proches d'abord.
+        due_jobs: list[ScheduledJob] = []
+        locked_ids: list = []
+        per_tenant: Counter = Counter()
+        full_tenants: set[str] = set()
+        for _ in range(FAIRNESS_CLAIM_ROUNDS):
+            wanted = lookahead_limit - len(due_jobs)
+            query = candidates_query
+            if locked_ids:
+                query = query.filter(ScheduledJob.id.notin_(locked_ids))
+            if full_tenants:
+                query = query.filter(
+                    or_(ScheduledJob.tenant_key.is_(None), ScheduledJob.tenant_key.notin_(sorted(full_tenants)))
+                )
+            batch = query.order_by(*edf_order).limit(wanted).with_for_update(skip_locked=True).all()
+            for job in batch:
+                locked_ids.append(job.id)
+                if job.tenant_key is None:
+                    due_jobs.append(job)
+                    continue
+                if per_tenant[job.tenant_key] >= limit:
+                    continue
+                per_tenant[job.tenant_key] += 1
+                due_jobs.append(job)
+                if per_tenant[job.tenant_key] >= limit:
+                    full_tenants.add(job.tenant_key)
+            if len(batch) < wanted or len(due_jobs) >= lookahead_limit:
+                break
+        due_jobs.sort(key=_edf_sort_key)
+        if not due_jobs:
+            db.rollback()
+            return []
+
+        selected_jobs = self._select_jobs_with_fairness(db=db, jobs=due_jobs, limit=limit, lane=lane)
+        if not selected_jobs:
+            db.rollback()
+            return []
+
+        selected_ids = [job.id for job in selected_jobs]
+        claimed_at = self.clock.now()
+        claimed_jobs = db.execute(
+            update(ScheduledJob)
+            .where(ScheduledJob.id.in_(selected_ids), ScheduledJob.status == 'pending')
+            .values(
+                status='running',
+                locked_by=self.worker_id,
+                lease_expires_at=claimed_at + timedelta(seconds=LEASE_SECONDS),
+                updated_at=claimed_at,
+            )
+            .returning(ScheduledJob),
+            execution_options={"synchronize_session": False, "populate_existing": True},
+        ).scalars().all()
+
+        # Workers run on their own sessions: detach the claimed rows so they stay
+        # readable after this session commits and closes.
+        for job in claimed_jobs:
+            db.expunge(job)
+        db.commit()
+
+        self._handle_missed_deadlines(db, claimed_jobs, claimed_at)
+
+        lost_claims = len(selected_ids) - len(claimed_jobs)
+        observe_scheduler_claim(claimed=len(claimed_jobs), lost=lost_claims)
+        if lost_claims > 0:
+            logger.info(
+                "job_claims_lost",
+                selected_jobs=len(selected_ids),
+                claimed_jobs=len(claimed_jobs),
+            )
+        return claimed_jobs
+
+    def _release_claimed_jobs(self, db: Session, job_ids: list) -> int:
+        if not job_ids:
+            return 0
+        for job_id in job_ids:
+            self._forget_owned_job(job_id)
+        try:
+            db.rollback()
+            result = db.execute(
+                update(ScheduledJob)
+                .where(
+                    ScheduledJob.id.in_(job_ids),
+                    ScheduledJob.status == 'running',
+                    ScheduledJob.locked_by == self.worker_id,
+                )
+                .values(
+                    status='pending',
+                    locked_by=None,
+                    lease_expires_at=None,
+                    updated_at=self.clock.now(),
+                )
+            )
+            db.commit()
+        except Exception as e:
+            logger.warning("job_claims_release_failed", jobs_count=len(job_ids), error=str(e))
+            return 0
+        if result.rowcount:
+            logger.warning("job_claims_released", released_jobs=result.rowcount)
+        return result.rowcount
+
+    def _dispatch_claimed_jobs(self, db: Session, jobs: list[ScheduledJob]):
+        pool = self._ensure_worker_pool()
+        submitted = 0
+        try:
+            for job in jobs:
+                self._track_owned_job(job.id, lane_for_job_type(job.job_type).name)
+                if not pool.submit(job):
+                    break
+                submitted += 1
+        finally:
+            if submitted < len(jobs):
+                # Claims that never reached a worker go straight back to pending.
+                self._release_claimed_jobs(db, [job.id for job in jobs[submitted:]])
+
+    def _execute_claimed_job(self, job: ScheduledJob):
+        db = SessionLocal()
+        execution = self._begin_execution_tracking(db, job)
+        token = set_current_execution(execution)
+        try:
+            self._execute_job(db, job, execution)
+        finally:
+            reset_current_execution(token)
+            db.close()
+            self._end_execution_tracking(job, execution)
+
+    def _begin_execution_tracking(self, db: Session, job: ScheduledJob) -> JobExecution:
+        # statement_timeout appliqué même sans watchdog ; le suivi (annulation) seulement avec.
+        if self.watchdog is not None:
+            execution = self.watchdog.track(job)
+        else:
+            execution = JobExecution(job=job, timeout_seconds=timeout_for(job.job_type))
+        bind_job_session(db, execution)
+        return execution
+
+    def _end_execution_tracking(self, job: ScheduledJob, execution: JobExecution) -> None:
+        if self.watchdog is not None:
+            self.watchdog.untrack(execution)
+        # Job expiré par le watchdog : déjà oublié (et peut-être re-réclamé depuis).
+        if not execution.timed_out.is_set():
+            self._forget_owned_job(job.id)
+
+    def _on_job_timeout(self, execution: JobExecution) -> None:
+        """
+        Watchdog : le job a dépassé son délai. Requête SQL en cours annulée, slot libéré tout de
+        suite, job remis en file avec backoff (ou en échec si le budget de retries est épuisé).
+        Le résultat tardif de l'exécution abandonnée est ignoré (_finish_job, fencing).
+        """
+        job = execution.job
+        elapsed_seconds = execution.elapsed_seconds()
+        statement_cancelled = execution.cancel_statement()
+        logger.error(
+            "job_execution_timeout",
+            job_id=str(job.id),
+            deployment_id=str(job.deployment_id),
+            job_type=job.job_type,
+            worker_id=self.worker_id,
+            elapsed_seconds=round(elapsed_seconds, 1),
+            timeout_seconds=execution.timeout_seconds,
+            statement_cancelled=statement_cancelled,
+        )
+        # Oublié avant la remise en file : un re-claim immédiat par ce poller reste suivi.
+        self._forget_owned_job(job.id)
+        pool = self.worker_pool
+        if pool is not None:
+            pool.detach(job.id)
+
+        timeout = JobTimeout(
+            job_type=job.job_type,
+            elapsed_seconds=elapsed_seconds,
+            timeout_seconds=execution.timeout_seconds,
+        )
+        db = SessionLocal()
+        try:
+            self._handle_job_failure(db, job, timeout, self.clock.perf_counter() - elapsed_seconds)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            # Lease non renouvelé : le job sera récupéré à son expiration.
+            logger.warning("job_timeout_requeue_failed", job_id=str(job.id), error=str(e))
         finally:
             db.close()
 
-    def _execute_jobs_concurrently(self, job_ids: list):
-        if not job_ids:
-            return
+    def _track_owned_job(self, job_id, lane: Optional[str] = None) -> None:
+        with self._owned_lock:
+            self._owned_jobs[job_id] = lane or DEFAULT_LANE.name
+
+    def _forget_owned_job(self, job_id) -> None:
+        with self._owned_lock:
+            self._owned_jobs.pop(job_id, None)
+
+    def lane_in_flight(self) -> Counter:
+        with self._owned_lock:
+            return Counter(self._owned_jobs.values())
+
+    def _renew_owned_leases(self) -> int:
+        with self._owned_lock:
+            owned_ids = list(self._owned_jobs)
+        if not owned_ids:
+            return 0
 
-        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_JOBS, len(job_ids))) as executor:
-            futures = {
-                executor.submit(self._execute_job_by_id, job_id): str(job_id)
-                for job_id in job_ids
-            }
-            for future in as_completed(futures):
-                job_id = futures[future]
-                try:
-                    future.result()
-                except Exception as e:
-                    logger.exception("job_worker_error", job_id=job_id, error=str(e))
-
-    def _execute_job_by_id(self, job_id):
         db = SessionLocal()
         try:
-            job = db.get(ScheduledJob, job_id)
-            if job is None:
-                logger.info("job_missing_on_execution", job_id=str(job_id))
-                return
-            self._execute_job(db, job)
+            renewed_ids = set(
+                db.execute(
+                    update(ScheduledJob)
+                    .where(
+                        ScheduledJob.id.in_(owned_ids),
+                        ScheduledJob.status == 'running',
+                        ScheduledJob.locked_by == self.worker_id,
+                    )
+                    .values(lease_expires_at=self.clock.now() + timedelta(seconds=LEASE_SECONDS))
+                    .returning(ScheduledJob.id)
+                ).scalars().all()
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("job_lease_renewal_failed", worker_id=self.worker_id, jobs_count=len(owned_ids), error=str(e))
+            return 0
         finally:
             db.close()
 
-    def _select_jobs_with_fairness(self, db: Session, jobs: list[ScheduledJob], limit: int) -> list[ScheduledJob]:
+        # Un job absent du RETURNING est terminé entre-temps ou a été récupéré par un autre poller.
+        lost_ids = [job_id for job_id in owned_ids if job_id not in renewed_ids]
+        with self._owned_lock:
+            lost_ids = [job_id for job_id in lost_ids if job_id in self._owned_jobs]
+        if lost_ids:
+            inc_scheduler_lease_events(event="lost", count=len(lost_ids))
+            logger.warning(
+                "job_leases_lost",
+                worker_id=self.worker_id,
+                job_ids=[str(job_id) for job_id in lost_ids],
+            )
+        return len(renewed_ids)
+
+    def _handle_missed_deadlines(self, db: Session, jobs: list[ScheduledJob], claimed_at: datetime) -> None:
+        """
+        Un job réclamé après sa deadline est signalé (log + métrique) au lieu de tourner
+        silencieusement en retard. Pour un post_collect, la suite de la séquence et l'analyse
+        du déploiement sont décalées d'autant : l'espacement entre samples et la fenêtre
+        d'observation complète sont préservés.
+        """
+        latest_late_post: dict = {}
+        for job in jobs:
+            if job.deadline_at is None or _as_utc(job.deadline_at) >= claimed_at:
+                continue
+            lateness_seconds = (claimed_at - _as_utc(job.scheduled_at)).total_seconds()
+            inc_scheduler_deadline_missed(job_type=job.job_type)
+            logger.warning(
+                "job_deadline_missed",
+                job_id=str(job.id),
+                deployment_id=str(job.deployment_id),
+                job_type=job.job_type,
+                sequence_index=job.sequence_index,
+                lateness_seconds=round(lateness_seconds, 1),
+                overdue_seconds=round((claimed_at - _as_utc(job.deadline_at)).total_seconds(), 1),
+            )
+            if job.job_type == 'post_collect' and job.deployment_id is not None:
+                current = latest_late_post.get(job.deployment_id)
+                if current is None or (job.sequence_index or 0) > (current[0].sequence_index or 0):
+                    latest_late_post[job.deployment_id] = (job, lateness_seconds)
+
+        for job, lateness_seconds in latest_late_post.values():
+            try:
+                self._shift_remaining_sequence(db, job, timedelta(seconds=lateness_seconds))
+            except Exception as e:
+                db.rollback()
+                logger.warning(
+                    "job_deadline_compensation_failed",
+                    job_id=str(job.id),
+                    deployment_id=str(job.deployment_id),
+                    error=str(e),
+                )
+
+    def _shift_remaining_sequence(self, db: Session, job: ScheduledJob, shift: timedelta) -> int:
+        siblings = (
+            db.query(ScheduledJob)
+            .filter(
+                ScheduledJob.deployment_id == job.deployment_id,
+                ScheduledJob.status == 'pending',
+                or_(
+                    and_(
+                        ScheduledJob.job_type == 'post_collect',
+                        ScheduledJob.sequence_index > (job.sequence_index or 0),
+                    ),
+                    ScheduledJob.job_type == 'analysis',
+                ),
+            )
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for sibling in siblings:
+            sibling.scheduled_at = _as_utc(sibling.scheduled_at) + shift
+            sibling.deadline_at = deadline_for(sibling.job_type, sibling.scheduled_at)
+        db.commit()
+        if siblings:
+            logger.info(
+                "job_sequence_shifted",
+                deployment_id=str(job.deployment_id),
+                after_sequence_index=job.sequence_index,
+                shifted_jobs=len(siblings),
+                shift_seconds=round(shift.total_seconds(), 1),
+            )
+        return len(siblings)
+
+    def _select_jobs_with_fairness(
+        self,
+        db: Session,
+        jobs: list[ScheduledJob],
+        limit: int,
+        lane: Optional[ExecutionLane] = None,
+    ) -> list[ScheduledJob]:
         if not jobs:
             return []
         if len(jobs) <= 1:
             return jobs[:limit]
 
-        deployment_ids = {job.deployment_id for job in jobs if job.deployment_id}
+        # Jobs proches de leur deadline (ou déjà en retard) : EDF strict, avant la fairness.
+        urgent_cutoff = self.clock.now() + timedelta(seconds=DEADLINE_URGENCY_SECONDS)
+        urgent = sorted(
+            (job for job in jobs if job.deadline_at is not None and _as_utc(job.deadline_at) <= urgent_cutoff),
+            key=lambda job: _as_utc(job.deadline_at),
+        )[:limit]
+        if len(urgent) >= limit:
+            return urgent
+        if urgent:
+            urgent_ids = {job.id for job in urgent}
+            return urgent + self._select_jobs_with_fairness(
+                db=db,
+                jobs=[job for job in jobs if job.id not in urgent_ids],
+                limit=limit - len(urgent),
+                lane=lane,
+            )
+
         deployment_to_project = {}
+        deployment_ids = {job.deployment_id for job in jobs if job.deployment_id and not job.tenant_key}
         if deployment_ids:
             try:
-                for deployment_id, project_id in db.query(Deployment.id, Deployment.project_id).filter(
-                    Deployment.id.in_(deployment_ids)
-                ).all():
-                    deployment_to_project[deployment_id] = project_id
+                # Savepoint: a failed lookup must not abort the surrounding claim transaction.
+                with db.begin_nested():
+                    for deployment_id, project_id in db.query(Deployment.id, Deployment.project_id).filter(
+                        Deployment.id.in_(deployment_ids)
+                    ).all():
+                        deployment_to_project[deployment_id] = project_id
             except Exception as e:
                 logger.warning(
                     "fairness_project_lookup_failed",
@@ -154,29 +1144,43 @@ class JobPoller:
                     error=str(e),
                 )
 
-        grouped: dict[str, deque[ScheduledJob]] = defaultdict(deque)
-        key_order: list[str] = []
+        tenants = {
+            job.id: job.tenant_key or self._fairness_key(job=job, deployment_to_project=deployment_to_project)
+            for job in jobs
+        }
+        plans = self._tenant_plans(db, set(tenants.values()))
+        return self._drr.select(
+            jobs,
+            limit,
+            tenant_of=lambda job: tenants[job.id],
+            weight_of=lambda tenant: plan_weight(plans.get(tenant, DEFAULT_PLAN)),
+            urgency_of=urgency_key,
+            scope=lane.name if lane is not None else None,
+        )
 
-        for job in jobs:
-            fairness_key = self._fairness_key(job=job, deployment_to_project=deployment_to_project)
-            if not grouped[fairness_key]:
-                key_order.append(fairness_key)
-            grouped[fairness_key].append(job)
-
-        selected: list[ScheduledJob] = []
-        while len(selected) < limit:
-            progressed = False
-            for key in key_order:
-                queue = grouped[key]
-                if not queue:
-                    continue
-                selected.append(queue.popleft())
-                progressed = True
-                if len(selected) >= limit:
-                    break
-            if not progressed:
-                break
-        return selected
+    def _tenant_plans(self, db: Optional[Session], tenants: set[str]) -> dict[str, str]:
+        """Plan (free/pro/enterprise) des tenants projet ; les autres tenants gardent le poids free."""
+        project_ids = {}
+        for tenant in tenants:
+            kind, _, raw_id = tenant.partition(":")
+            if kind != "project":
+                continue
+            try:
+                project_ids[uuid.UUID(raw_id)] = tenant
+            except ValueError:
+                continue
+        if db is None or not project_ids:
+            return {}
+        plans = {}
+        try:
+            with db.begin_nested():
+                for project_id, plan in db.query(Project.id, Project.plan).filter(
+                    Project.id.in_(project_ids)
+                ).all():
+                    plans[project_ids[project_id]] = plan
+        except Exception as e:
+            logger.warning("fairness_plan_lookup_failed", projects_count=len(project_ids), error=str(e))
+        return plans
 
     def _fairness_key(self, job: ScheduledJob, deployment_to_project: dict) -> str:
         metadata = job.job_metadata or {}
@@ -194,225 +1198,645 @@ class JobPoller:
         return f"job:{job.id}"
 
     def _update_pending_jobs_gauge(self, db: Session) -> None:
-        pending_jobs = db.query(ScheduledJob).filter(ScheduledJob.status == 'pending').count()
-        set_scheduler_jobs_pending(pending_jobs)
-
-    def _recover_stuck_jobs(self, db: Session):
-        now = datetime.now(timezone.utc)
-        cutoff = now - timedelta(seconds=RUNNING_STUCK_SECONDS)
-
-        stuck_jobs = db.query(ScheduledJob).filter(
-            ScheduledJob.status == 'running',
-            ScheduledJob.updated_at.isnot(None),
-            ScheduledJob.updated_at < cutoff,
-        ).all()
-
-        if not stuck_jobs:
+        # Compteurs tenus par triggers : aucun COUNT(*) sur scheduled_jobs à chaque tick.
+        try:
+            counts = read_job_counts(db)
+        except Exception as e:
+            db.rollback()
+            logger.warning("scheduler_job_counts_failed", worker_id=self.worker_id, error=str(e))
+        else:
+            set_scheduler_jobs_pending(counts_by_status(counts)["pending"])
+            set_scheduler_job_counts(counts=counts, pending_by_lane=pending_by_lane(counts))
+
+        monotonic_now = self.clock.monotonic()
+        if (
+            self._queue_metrics_refreshed_at is not None
+            and monotonic_now - self._queue_metrics_refreshed_at < QUEUE_METRICS_INTERVAL_SECONDS
+        ):
             return
+        self._queue_metrics_refreshed_at = monotonic_now
+
+        now = self.clock.now()
+        due_by_type = db.query(ScheduledJob.job_type, func.count(ScheduledJob.id)).filter(
+            ScheduledJob.status == 'pending',
+            ScheduledJob.scheduled_at <= now,
+        ).group_by(ScheduledJob.job_type).all()
+        depth_by_lane = Counter()
+        for job_type, count in due_by_type:
+            depth_by_lane[lane_for_job_type(job_type).name] += count
+        for lane in LANES:
+            set_scheduler_lane_queue_depth(lane=lane.name, depth=depth_by_lane[lane.name])
+        self._update_tenant_backlog_gauges(db, now)
+
+    def _update_tenant_backlog_gauges(self, db: Session, now: datetime) -> None:
+        # Top N par backlog : la cardinalité des séries reste bornée quel que soit le nombre de tenants.
+        tenant = func.coalesce(ScheduledJob.tenant_key, literal("unknown"))
+        backlog = func.count(ScheduledJob.id)
+        due_filter = (ScheduledJob.status == 'pending', ScheduledJob.scheduled_at <= now)
+        backlogged = db.query(func.count(func.distinct(tenant))).filter(*due_filter).scalar() or 0
+        rows = []
+        if TENANT_METRICS_TOP_N > 0:
+            rows = (
+                db.query(tenant, backlog, func.min(ScheduledJob.scheduled_at))
+                .filter(*due_filter)
+                .group_by(tenant)
+                .order_by(backlog.desc())
+                .limit(TENANT_METRICS_TOP_N)
+                .all()
+            )
+        set_scheduler_tenant_backlog(
+            tenants={
+                tenant_key: (count, max(0.0, (now - _as_utc(oldest)).total_seconds()))
+                for tenant_key, count, oldest in rows
+            },
+            backlogged=backlogged,
+        )
 
-        for job in stuck_jobs:
-            new_retry_count = job.retry_count + 1
-            if new_retry_count > MAX_RETRIES:
-                db.execute(
-                    update(ScheduledJob)
-                    .where(ScheduledJob.id == job.id)
-                    .values(
-                        status='failed',
-                        last_error='Recovered job exceeded max retries after timeout',
-                        retry_count=new_retry_count,
-                        updated_at=now,
-                    )
+    def _recover_expired_leases(self, db: Session) -> int:
+        """
+        Remet en file les jobs dont le lease a expiré avec la politique d'un échec d'exécution
+        (plan_retry) : backoff du type, deadline recalculée, dead-letter quand les retries sont
+        épuisés ou que le retry dépasserait l'âge max. Lignes verrouillées en SKIP LOCKED : deux
+        pollers ne récupèrent jamais le même job.
+        """
+        now = self.clock.now()
+        legacy_cutoff = now - timedelta(seconds=RUNNING_STUCK_SECONDS)
+        try:
+            expired_jobs = (
+                db.query(ScheduledJob)
+                .filter(
+                    ScheduledJob.status == 'running',
+                    or_(
+                        ScheduledJob.lease_expires_at < now,
+                        # Claims antérieurs aux leases : ancien critère updated_at.
+                        and_(
+                            ScheduledJob.lease_expires_at.is_(None),
+                            ScheduledJob.updated_at.isnot(None),
+                            ScheduledJob.updated_at < legacy_cutoff,
+                        ),
+                    ),
                 )
-                logger.warning(
-                    "job_recovery_failed",
-                    job_id=str(job.id),
-                    deployment_id=str(job.deployment_id),
-                    retry_count=new_retry_count,
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not expired_jobs:
+                db.rollback()
+                return 0
+
+            requeued, failed, sessions_advanced = [], [], []
+            for job in expired_jobs:
+                plan = plan_retry(job, now)
+                owner = job.locked_by or 'unknown'
+                # Relevé avant le commit : un job passé en dead-letter n'existe plus ensuite.
+                recovered = SimpleNamespace(
+                    id=job.id,
+                    deployment_id=job.deployment_id,
+                    job_type=job.job_type,
+                    plan=plan,
+                    last_error=None,
                 )
-                inc_scheduler_jobs_failed()
-            else:
+                if plan.retry:
+                    recovered.last_error = f"Recovered job after lease expiry (owner={owner})"
+                    db.execute(
+                        self._owned_job_update(job).values(**self._retry_values(job, plan, recovered.last_error))
+                    )
+                    requeued.append(recovered)
+                    continue
+                recovered.last_error = f"Recovered job exceeded max retries after lease expiry (owner={owner})"
+                if job.job_type == 'observation_session':
+                    # Comme après un échec d'exécution : le sample est perdu, la session continue.
+                    if self._advance_observation_session(
+                        db, job, self.clock.perf_counter(), outcome="sample_failed", last_error=recovered.last_error
+                    ):
+                        sessions_advanced.append(recovered)
+                    continue
                 db.execute(
-                    update(ScheduledJob)
-                    .where(ScheduledJob.id == job.id)
-                    .values(
-                        status='pending',
-                        last_error='Recovered job after timeout',
-                        retry_count=new_retry_count,
-                        scheduled_at=now,
+                    self._owned_job_update(job).values(
+                        status='failed',
+                        last_error=recovered.last_error,
+                        retry_count=plan.retry_count,
+                        lease_expires_at=None,
                         updated_at=now,
                     )
                 )
-                logger.warning(
-                    "job_recovered",
-                    job_id=str(job.id),
-                    deployment_id=str(job.deployment_id),
-                    retry_count=new_retry_count,
-                )
-
-        db.commit()
-
-    def _next_retry_delay(self, retry_count: int) -> int:
-        if retry_count <= 0:
-            return RETRY_BACKOFF_SECONDS[0]
-        if retry_count <= len(RETRY_BACKOFF_SECONDS):
-            return RETRY_BACKOFF_SECONDS[retry_count - 1]
-        return RETRY_BACKOFF_SECONDS[-1]
+                self._release_downstream(db, job)
+                failed.append(recovered)
+            dead_lettered = self._dead_letter(db, failed, reason="lease_expired")
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("scheduler_lease_recovery_failed", worker_id=self.worker_id, error=str(e))
+            return 0
 
-    def _execute_job(self, db: Session, job: ScheduledJob):
-        # Marquer comme running (idempotent)
-        claimed_at = datetime.now(timezone.utc)
-        result = db.execute(
-            update(ScheduledJob)
-            .where(ScheduledJob.id == job.id, ScheduledJob.status == 'pending')
-            .values(status='running', updated_at=claimed_at)
-        )
-        db.commit()
+        for row in [*failed, *sessions_advanced]:
+            logger.warning(
+                "job_recovery_failed",
+                job_id=str(row.id),
+                deployment_id=str(row.deployment_id),
+                retry_count=row.plan.retry_count,
+                reason=row.plan.give_up_reason,
+                last_error=row.last_error,
+            )
+        for row in requeued:
+            logger.warning(
+                "job_recovered",
+                job_id=str(row.id),
+                deployment_id=str(row.deployment_id),
+                retry_count=row.plan.retry_count,
+                delay_seconds=round(row.plan.delay_seconds, 1),
+                last_error=row.last_error,
+            )
+        recovered_rows = [*failed, *sessions_advanced, *requeued]
+        for row in recovered_rows:
+            inc_scheduler_job_failures(job_type=row.job_type, failure_class="lease_expired")
+        for _ in [*failed, *sessions_advanced]:
+            inc_scheduler_jobs_failed()
+        for row in dead_lettered:
+            inc_scheduler_jobs_dead_lettered(job_type=row.job_type, reason="lease_expired")
+        inc_scheduler_lease_events(event="recovered", count=len(recovered_rows))
+        return len(recovered_rows)
+
+    def _execute_job(self, db: Session, job: ScheduledJob, execution: Optional[JobExecution] = None):
+        # Le job a déjà été réclamé (status='running') par _claim_due_jobs ;
+        # le délai est mesuré au démarrage effectif (file d'attente du pool incluse).
+        started_at = self._begin_job_execution(job)
+        try:
+            self._run_job(db, job)
+        except Exception as e:
+            self._finish_job(db, job, started_at, error=e, execution=execution)
+        else:
+            self._finish_job(db, job, started_at, execution=execution)
+
+    async def _execute_job_async(self, job: ScheduledJob, executor: AsyncJobExecutor):
+        """
+        Même cycle de vie que _execute_job, mais les appels HTTP sont attendus sur la boucle
+        de l'executor et chaque étape DB passe par son pool de threads dédié.
+        """
+        db = SessionLocal()
+        execution = self._begin_execution_tracking(db, job)
+        token = set_current_execution(execution)
+        try:
+            started_at = self._begin_job_execution(job)
+            try:
+                await self._run_job_async(db, job, executor)
+            except Exception as e:
+                await executor.run_db(self._finish_job, db, job, started_at, error=e, execution=execution)
+            else:
+                await executor.run_db(self._finish_job, db, job, started_at, execution=execution)
+        finally:
+            reset_current_execution(token)
+            await executor.run_db(db.close)
+            self._end_execution_tracking(job, execution)
 
-        if result.rowcount == 0:
-            # Job déjà pris par un autre poller
-            logger.info("job_already_claimed", job_id=str(job.id))
-            return
+    def _begin_job_execution(self, job: ScheduledJob) -> float:
+        execution_started_at = self.clock.now()
         scheduled_at = job.scheduled_at
         if scheduled_at is not None:
             if scheduled_at.tzinfo is None:
                 scheduled_at = scheduled_at.replace(tzinfo=timezone.utc)
-            delay_seconds = max(0.0, (claimed_at - scheduled_at).total_seconds())
+            delay_seconds = max(0.0, (execution_started_at - scheduled_at).total_seconds())
             observe_scheduler_job_start_delay(job_type=job.job_type, delay_seconds=delay_seconds)
+            observe_scheduler_lane_start_delay(lane=lane_for_job_type(job.job_type).name, delay_seconds=delay_seconds)
 
-        started_at = time.perf_counter()
-        try:
-            logger.info(
-                "job_started",
+        logger.info(
+            "job_started",
+            job_id=str(job.id),
+            deployment_id=str(job.deployment_id),
+            job_type=job.job_type,
+            phase=job.phase,
+        )
+        return self.clock.perf_counter()
+
+    def _run_job(self, db: Session, job: ScheduledJob):
+        if job.job_type == 'pre_collect':
+            self._execute_pre_collect(db, job)
+
+        elif job.job_type in ('post_collect', 'observation_session'):
+            self._execute_post_collect(db, job)
+
+        elif job.job_type == 'analysis':
+            self._execute_analysis(db, job)
+
+        elif job.job_type == 'email_send':
+            self._execute_email_send(db, job)
+
+        elif job.job_type == 'slack_send':
+            self._execute_slack_send(db, job)
+
+        elif job.job_type == 'notification_outbox':
+            self._execute_notification_outbox(db, job)
+
+    async def _run_job_async(self, db: Session, job: ScheduledJob, executor: AsyncJobExecutor):
+        if job.job_type in ('pre_collect', 'post_collect', 'observation_session'):
+            await self._execute_collect_async(db, job, executor)
+
+        elif job.job_type == 'email_send':
+            await self._execute_email_send_async(db, job, executor)
+
+        elif job.job_type == 'slack_send':
+            await self._execute_slack_send_async(db, job, executor)
+
+        elif job.job_type == 'notification_outbox':
+            await self._execute_notification_outbox_async(db, job, executor)
+
+        else:
+            await executor.run_db(self._run_job, db, job)
+
+    def _finish_job(
+        self,
+        db: Session,
+        job: ScheduledJob,
+        started_at: float,
+        error: Optional[Exception] = None,
+        execution: Optional[JobExecution] = None,
+    ):
+        # Statut final + commit dans une seule étape : la transaction ne reste jamais
+        # ouverte entre deux étapes DB d'un job asynchrone.
+        if execution is not None and execution.timed_out.is_set():
+            # Déjà remis en file par le watchdog : ce résultat tardif est ignoré.
+            db.rollback()
+            logger.warning(
+                "job_result_discarded_timed_out",
                 job_id=str(job.id),
                 deployment_id=str(job.deployment_id),
                 job_type=job.job_type,
-                phase=job.phase,
+                error=f"{type(error).__name__}: {error}" if error is not None else None,
             )
+            return
+        try:
+            if isinstance(error, JobDeferred):
+                self._defer_job(db, job, error)
+                return
+            if error is not None:
+                raise error
+            self._mark_job_completed(db, job, started_at)
+        except Exception as e:
+            self._handle_job_failure(db, job, e, started_at)
+        finally:
+            db.commit()
 
-            if job.job_type == 'pre_collect':
-                self._execute_pre_collect(db, job)
-
-            elif job.job_type == 'post_collect':
-                self._execute_post_collect(db, job)
+    def _defer_job(self, db: Session, job: ScheduledJob, deferred: JobDeferred) -> None:
+        # Pas un échec : le job repasse en file jusqu'à `until` sans consommer de retry.
+        until = _as_utc(deferred.until)
+        result = db.execute(
+            self._owned_job_update(job).values(
+                status='pending',
+                scheduled_at=until,
+                deadline_at=deadline_for(job.job_type, until),
+                locked_by=None,
+                lease_expires_at=None,
+                updated_at=self.clock.now(),
+            )
+        )
+        if not self._check_lease_still_owned(result, job, "deferred"):
+            return
+        inc_scheduler_dependency_events(event="deferred", job_type=job.job_type)
+        logger.info(
+            "job_deferred",
+            job_id=str(job.id),
+            deployment_id=str(job.deployment_id),
+            job_type=job.job_type,
+            until=until.isoformat(),
+            reason=deferred.reason,
+        )
 
-            elif job.job_type == 'analysis':
-                self._execute_analysis(db, job)
+    def _release_downstream(self, db: Session, job: ScheduledJob) -> None:
+        """Job amont terminé (succès ou échec définitif) : avance les jobs aval qui l'attendaient."""
+        try:
+            # Savepoint : un échec ici ne doit pas annuler le statut final du job amont.
+            with db.begin_nested():
+                released = release_downstream_jobs(db, job, self.clock.now())
+        except Exception as e:
+            logger.warning(
+                "job_dependencies_release_failed",
+                job_id=str(job.id),
+                deployment_id=str(job.deployment_id),
+                error=str(e),
+            )
+            return
+        if not released:
+            return
+        notify_jobs_scheduled(db, self.clock.now())
+        inc_scheduler_dependency_events(event="released", job_type=job.job_type, count=len(released))
+        logger.info(
+            "job_dependencies_released",
+            job_id=str(job.id),
+            deployment_id=str(job.deployment_id),
+            job_type=job.job_type,
+            released_jobs=len(released),
+        )
 
-            elif job.job_type == 'email_send':
-                self._execute_email_send(db, job)
+    def _dead_letter(self, db: Session, jobs: list, *, reason: str) -> list:
+        """Jobs passés en `failed` par la politique de retry : déplacés vers scheduled_jobs_dead_letter."""
+        if not jobs:
+            return []
+        try:
+            # Savepoint : si le déplacement échoue, le job reste `failed` dans scheduled_jobs.
+            with db.begin_nested():
+                dead_letter_jobs(db, [job.id for job in jobs], reason=reason)
+        except Exception as e:
+            logger.warning(
+                "job_dead_letter_failed",
+                job_ids=[str(job.id) for job in jobs],
+                reason=reason,
+                error=str(e),
+            )
+            return []
+        return list(jobs)
 
-            elif job.job_type == 'slack_send':
-                self._execute_slack_send(db, job)
+    def _owned_job_update(self, job: ScheduledJob):
+        # Fencing : l'écriture finale ne s'applique que si le claim courant est toujours le nôtre.
+        # retry_count distingue une ancienne exécution d'un re-claim par le même worker.
+        statement = update(ScheduledJob).where(
+            ScheduledJob.id == job.id,
+            ScheduledJob.status == 'running',
+            ScheduledJob.locked_by == job.locked_by,
+            ScheduledJob.retry_count == job.retry_count,
+        )
+        if job.job_type == 'observation_session':
+            # retry_count repart à 0 à chaque sample : le curseur distingue les exécutions.
+            statement = statement.where(ScheduledJob.sequence_index == job.sequence_index)
+        return statement
+
+    def _check_lease_still_owned(self, result, job: ScheduledJob, outcome: str) -> bool:
+        if result.rowcount:
+            return True
+        inc_scheduler_lease_events(event="fenced")
+        logger.warning(
+            "job_result_discarded_lease_lost",
+            job_id=str(job.id),
+            deployment_id=str(job.deployment_id),
+            job_type=job.job_type,
+            locked_by=job.locked_by,
+            outcome=outcome,
+        )
+        return False
 
-            elif job.job_type == 'notification_outbox':
-                self._execute_notification_outbox(db, job)
+    def _mark_job_completed(self, db: Session, job: ScheduledJob, started_at: float):
+        if job.job_type == 'observation_session':
+            self._advance_observation_session(db, job, started_at, outcome="completed")
+            return
+        result = db.execute(
+            self._owned_job_update(job).values(
+                status='completed',
+                lease_expires_at=None,
+                updated_at=self.clock.now(),
+            )
+        )
+        if not self._check_lease_still_owned(result, job, "completed"):
+            return
+        self._release_downstream(db, job)
+        logger.info(
+            "job_completed",
+            job_id=str(job.id),
+            deployment_id=str(job.deployment_id),
+            job_type=job.job_type,
+            phase=job.phase,
+            duration_ms=int((self.clock.perf_counter() - started_at) * 1000),
+        )
 
-            # Marquer comme completed
-            db.execute(
-                update(ScheduledJob)
-                .where(ScheduledJob.id == job.id)
-                .values(status='completed', updated_at=datetime.now(timezone.utc))
+    def _handle_job_failure(self, db: Session, job: ScheduledJob, e: Exception, started_at: float):
+        # Clear failed transactional state (DB timeout/deadlock/etc.) before updating retry status.
+        try:
+            db.rollback()
+        except Exception as rollback_error:
+            logger.warning(
+                "job_failure_rollback_failed",
+                job_id=str(job.id),
+                deployment_id=str(job.deployment_id),
+                rollback_error=f"{type(rollback_error).__name__}: {rollback_error}",
             )
-            logger.info(
-                "job_completed",
+        error_msg = f"{type(e).__name__}: {str(e)}"
+        plan = plan_retry(job, self.clock.now())
+        new_retry_count = plan.retry_count
+        if isinstance(e, MetricsHMACValidationError):
+            job_failure_class = "hmac"
+        elif isinstance(e, MetricsEndpointUnavailable):
+            job_failure_class = "circuit_open"
+        else:
+            job_failure_class = failure_class(e)
+        inc_scheduler_job_failures(job_type=job.job_type, failure_class=job_failure_class)
+        if isinstance(e, MetricsEndpointUnavailable):
+            self._skip_unavailable_sample(db, job, started_at, error_msg)
+        elif isinstance(e, MetricsHMACValidationError):
+            logger.warning(
+                "job_failed_non_retryable",
                 job_id=str(job.id),
                 deployment_id=str(job.deployment_id),
                 job_type=job.job_type,
                 phase=job.phase,
-                duration_ms=int((time.perf_counter() - started_at) * 1000),
+                error=error_msg,
             )
-
-        except Exception as e:
-            # Clear failed transactional state (DB timeout/deadlock/etc.) before updating retry status.
-            try:
-                db.rollback()
-            except Exception as rollback_error:
-                logger.warning(
-                    "job_failure_rollback_failed",
-                    job_id=str(job.id),
-                    deployment_id=str(job.deployment_id),
-                    rollback_error=f"{type(rollback_error).__name__}: {rollback_error}",
-                )
-            error_msg = f"{type(e).__name__}: {str(e)}"
-            new_retry_count = job.retry_count + 1
-            if isinstance(e, MetricsHMACValidationError):
-                logger.warning(
-                    "job_failed_non_retryable",
-                    job_id=str(job.id),
-                    deployment_id=str(job.deployment_id),
-                    job_type=job.job_type,
-                    phase=job.phase,
-                    error=error_msg,
-                )
-                db.execute(
-                    update(ScheduledJob)
-                    .where(ScheduledJob.id == job.id)
-                    .values(
-                        status='failed',
-                        last_error=error_msg,
-                        retry_count=new_retry_count,
-                        updated_at=datetime.now(timezone.utc),
-                    )
-                )
-                self._cancel_related_jobs_after_hmac_failure(db=db, failed_job=job)
-                inc_scheduler_jobs_failed()
-            elif new_retry_count <= MAX_RETRIES:
-                delay_seconds = self._next_retry_delay(new_retry_count)
-                scheduled_at = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
-                db.execute(
-                    update(ScheduledJob)
-                    .where(ScheduledJob.id == job.id)
-                    .values(
-                        status='pending',
-                        last_error=error_msg,
-                        retry_count=new_retry_count,
-                        scheduled_at=scheduled_at,
-                        updated_at=datetime.now(timezone.utc),
-                    )
-                )
-                logger.warning(
-                    "job_retry_scheduled",
-                    job_id=str(job.id),
-                    deployment_id=str(job.deployment_id),
+            result = db.execute(
+                self._owned_job_update(job).values(
+                    status='failed',
+                    last_error=error_msg,
                     retry_count=new_retry_count,
-                    delay_seconds=delay_seconds,
-                    error=error_msg,
+                    lease_expires_at=None,
+                    updated_at=self.clock.now(),
                 )
-            else:
-                logger.exception(
-                    "job_failed",
-                    job_id=str(job.id),
-                    deployment_id=str(job.deployment_id),
+            )
+            if not self._check_lease_still_owned(result, job, "failed"):
+                return
+            self._cancel_related_jobs_after_hmac_failure(db=db, failed_job=job)
+            inc_scheduler_jobs_failed()
+        elif plan.retry:
+            result = db.execute(self._owned_job_update(job).values(**self._retry_values(job, plan, error_msg)))
+            if not self._check_lease_still_owned(result, job, "retry"):
+                return
+            logger.warning(
+                "job_retry_scheduled",
+                job_id=str(job.id),
+                deployment_id=str(job.deployment_id),
+                retry_count=new_retry_count,
+                delay_seconds=round(plan.delay_seconds, 1),
+                error=error_msg,
+            )
+        elif job.job_type == 'observation_session':
+            # Sample définitivement perdu : la session continue (comme un post_collect isolé en échec).
+            logger.error(
+                "observation_sample_failed",
+                job_id=str(job.id),
+                deployment_id=str(job.deployment_id),
+                sequence_index=job.sequence_index,
+                retry_count=new_retry_count,
+                error=error_msg,
+            )
+            if self._advance_observation_session(db, job, started_at, outcome="sample_failed", last_error=error_msg):
+                inc_scheduler_jobs_failed()
+        else:
+            result = db.execute(
+                self._owned_job_update(job).values(
+                    status='failed',
+                    last_error=error_msg,
                     retry_count=new_retry_count,
-                    error=error_msg,
-                    duration_ms=int((time.perf_counter() - started_at) * 1000),
+                    lease_expires_at=None,
+                    updated_at=self.clock.now(),
                 )
-                db.execute(
-                    update(ScheduledJob)
-                    .where(ScheduledJob.id == job.id)
-                    .values(
-                        status='failed',
-                        last_error=error_msg,
-                        retry_count=new_retry_count,
-                        updated_at=datetime.now(timezone.utc),
-                    )
+            )
+            if not self._check_lease_still_owned(result, job, "failed"):
+                return
+            self._release_downstream(db, job)
+            # Retries épuisés, ou prochain retry trop tard après l'heure prévue pour avoir un sens.
+            reason = plan.give_up_reason
+            dead_lettered = bool(self._dead_letter(db, [job], reason=reason))
+            logger.error(
+                "job_failed",
+                job_id=str(job.id),
+                deployment_id=str(job.deployment_id),
+                job_type=job.job_type,
+                retry_count=new_retry_count,
+                reason=reason,
+                dead_lettered=dead_lettered,
+                error=error_msg,
+                duration_ms=int((self.clock.perf_counter() - started_at) * 1000),
+                exc_info=e,
+            )
+            inc_scheduler_jobs_failed()
+            if dead_lettered:
+                inc_scheduler_jobs_dead_lettered(job_type=job.job_type, reason=reason)
+
+    def _retry_values(self, job: ScheduledJob, plan: RetryPlan, last_error: str) -> dict:
+        # La deadline suit le retry ; l'âge max reste mesuré depuis l'heure prévue d'origine.
+        return {
+            "status": 'pending',
+            "last_error": last_error,
+            "retry_count": plan.retry_count,
+            "scheduled_at": plan.retry_at,
+            "deadline_at": deadline_for(job.job_type, plan.retry_at),
+            "planned_at": plan.planned_at,
+            "locked_by": None,
+            "lease_expires_at": None,
+            "updated_at": self.clock.now(),
+        }
+
+    def _skip_unavailable_sample(self, db: Session, job: ScheduledJob, started_at: float, error_msg: str) -> None:
+        """
+        Circuit ouvert sur l'hôte de l'endpoint : le sample est abandonné sans retry. L'analyse le
+        compte comme un trou de données (min_post_samples, sequence_gaps, missing_pre_samples)
+        au lieu que des retries voués à l'échec occupent la lane de collecte.
+        """
+        logger.warning(
+            "collect_sample_skipped",
+            job_id=str(job.id),
+            deployment_id=str(job.deployment_id),
+            job_type=job.job_type,
+            phase=job.phase,
+            sequence_index=job.sequence_index,
+            reason="circuit_open",
+            error=error_msg,
+        )
+        if job.job_type == 'observation_session':
+            self._advance_observation_session(db, job, started_at, outcome="sample_skipped", last_error=error_msg)
+            return
+        result = db.execute(
+            self._owned_job_update(job).values(
+                status='skipped',
+                last_error=error_msg,
+                lease_expires_at=None,
+                updated_at=self.clock.now(),
+            )
+        )
+        if not self._check_lease_still_owned(result, job, "skipped"):
+            return
+        self._release_downstream(db, job)
+
+    def _advance_observation_session(
+        self,
+        db: Session,
+        job: ScheduledJob,
+        started_at: float,
+        *,
+        outcome: str,
+        last_error: Optional[str] = None,
+    ) -> bool:
+        """
+        Avance le curseur d'une observation_session après un sample : la même ligne repasse
+        en `pending` pour le sample suivant, ou se termine et libère l'analyse du déploiement
+        dans la même transaction. Un sample réclamé après sa deadline
+        décale la suite d'autant, comme _shift_remaining_sequence pour les post_collect.
+        """
+        metadata = dict(job.job_metadata or {})
+        now = self.clock.now()
+        window = max(1, int(metadata.get("observation_window") or 1))
+        interval = float(metadata.get("interval_seconds") or POST_COLLECTION_INTERVAL_SECONDS)
+        sequence_started_at = _as_utc(datetime.fromisoformat(metadata["started_at"]))
+        shift_seconds = float(metadata.get("shift_seconds") or 0.0)
+        index = job.sequence_index or 0
+
+        # updated_at = instant du claim (posé par l'UPDATE ... RETURNING du claim).
+        planned_at = sequence_started_at + timedelta(seconds=index * interval + shift_seconds)
+        claimed_at = _as_utc(job.updated_at) if job.updated_at is not None else now
+        if claimed_at > deadline_for(job.job_type, planned_at):
+            shift_seconds += (claimed_at - planned_at).total_seconds()
+            metadata["shift_seconds"] = round(shift_seconds, 3)
+
+        next_index = index + 1
+        if next_index < window:
+            scheduled_at = sequence_started_at + timedelta(seconds=next_index * interval + shift_seconds)
+            result = db.execute(
+                self._owned_job_update(job).values(
+                    status='pending',
+                    sequence_index=next_index,
+                    scheduled_at=scheduled_at,
+                    deadline_at=deadline_for(job.job_type, scheduled_at),
+                    planned_at=None,
+                    retry_count=0,
+                    last_error=last_error,
+                    job_metadata=metadata,
+                    locked_by=None,
+                    lease_expires_at=None,
+                    updated_at=now,
                 )
-                inc_scheduler_jobs_failed()
+            )
+            if not self._check_lease_still_owned(result, job, outcome):
+                return False
+            notify_jobs_scheduled(db, scheduled_at)
+            logger.info(
+                "observation_session_advanced",
+                job_id=str(job.id),
+                deployment_id=str(job.deployment_id),
+                sequence_index=index,
+                next_sequence_index=next_index,
+                next_scheduled_at=scheduled_at.isoformat(),
+                outcome=outcome,
+                shift_seconds=round(shift_seconds, 1),
+            )
+            return True
 
-        finally:
-            db.commit()
+        result = db.execute(
+            self._owned_job_update(job).values(
+                status='completed',
+                last_error=last_error,
+                job_metadata=metadata,
+                lease_expires_at=None,
+                updated_at=now,
+            )
+        )
+        if not self._check_lease_still_owned(result, job, outcome):
+            return False
+        self._release_downstream(db, job)
+        logger.info(
+            "observation_session_completed",
+            job_id=str(job.id),
+            deployment_id=str(job.deployment_id),
+            samples=window,
+            shift_seconds=round(shift_seconds, 1),
+            duration_ms=int((self.clock.perf_counter() - started_at) * 1000),
+        )
+        return True
 
     def _cancel_related_jobs_after_hmac_failure(self, db: Session, failed_job: ScheduledJob):
         if not failed_job.deployment_id:
             return
 
-        now = datetime.now(timezone.utc)
+        now = self.clock.now()
         cleanup_reason = (
             f"Cancelled after non-retryable HMAC failure on sibling job {failed_job.id}"
         )
         cancelled_count = 0
 
-        for job_type in ("pre_collect", "post_collect", "analysis"):
+        for job_type in ("pre_collect", "post_collect", "observation_session", "analysis"):
             for status in ("pending", "running"):
                 result = db.execute(
                     update(ScheduledJob)
@@ -438,80 +1862,105 @@ class JobPoller:
             )
 
     def _execute_pre_collect(self, db: Session, job: ScheduledJob):
-        metadata = job.job_metadata or {}
-        metrics_endpoint = metadata.get('metrics_endpoint')
-        use_hmac = metadata.get('use_hmac', False)
-        hmac_secret = metadata.get('hmac_secret')
-        project_id = metadata.get('project_id')
-
-        if not metrics_endpoint:
-            raise ValueError(f"Missing metrics_endpoint in job_metadata for job {job.id}")
+        collect_metrics(db=db, **self._prepare_collect(job, resolve_collect_target(db, job)))
 
-        logger.info(
-            "pre_collect_execute",
-            job_id=str(job.id),
-            deployment_id=str(job.deployment_id),
-            metrics_endpoint=metrics_endpoint,
-            use_hmac=bool(use_hmac),
-            project_id=str(project_id) if project_id else None,
-            phase="pre",
-        )
+    def _execute_post_collect(self, db: Session, job: ScheduledJob):
+        collect_metrics(db=db, **self._prepare_collect(job, resolve_collect_target(db, job)))
 
-        collect_metrics(
-            deployment_id=job.deployment_id,
-            phase='pre',
-            metrics_endpoint=metrics_endpoint,
+    async def _execute_collect_async(self, db: Session, job: ScheduledJob, executor: AsyncJobExecutor):
+        target = await executor.run_db(resolve_collect_target, db, job)
+        await collect_metrics_async(
             db=db,
-            use_hmac=use_hmac,
-            secret=hmac_secret,
-            project_id=project_id,
+            client=executor.http_client,
+            run_db=executor.run_db,
+            **self._prepare_collect(job, target),
         )
 
-    def _execute_post_collect(self, db: Session, job: ScheduledJob):
-        metadata = job.job_metadata or {}
-        metrics_endpoint = metadata.get('metrics_endpoint')
-        use_hmac = metadata.get('use_hmac', False)
-        hmac_secret = metadata.get('hmac_secret')
-        project_id = metadata.get('project_id')
-
-        if not metrics_endpoint:
-            raise ValueError(f"Missing metrics_endpoint in job_metadata for job {job.id}")
+    def _prepare_collect(self, job: ScheduledJob, target: CollectTarget) -> dict:
+        # Endpoint et secret résolus sur le projet (app/scheduler/job_targets.py), pas copiés dans le job.
+        phase = 'pre' if job.job_type == 'pre_collect' else 'post'
+        log_fields = {
+            "job_id": str(job.id),
+            "deployment_id": str(job.deployment_id),
+            "metrics_endpoint": target.metrics_endpoint,
+            "use_hmac": target.use_hmac,
+            "project_id": target.project_id,
+        }
+        if phase == 'post':
+            log_fields["sequence_index"] = job.sequence_index
+        logger.info(f"{phase}_collect_execute", phase=phase, **log_fields)
+
+        return {
+            "deployment_id": job.deployment_id,
+            "phase": phase,
+            "metrics_endpoint": target.metrics_endpoint,
+            "use_hmac": target.use_hmac,
+            "secret": target.secret,
+            "project_id": target.project_id,
+        }
 
+    def _execute_analysis(self, db: Session, job: ScheduledJob):
+        self._wait_for_upstream(db, job)
         logger.info(
-            "post_collect_execute",
+            "analysis_execute",
             job_id=str(job.id),
             deployment_id=str(job.deployment_id),
-            metrics_endpoint=metrics_endpoint,
-            use_hmac=bool(use_hmac),
-            project_id=str(project_id) if project_id else None,
-            sequence_index=job.sequence_index,
-            phase="post",
-        )
-
-        collect_metrics(
-            deployment_id=job.deployment_id,
-            phase='post',
-            metrics_endpoint=metrics_endpoint,
-            db=db,
-            use_hmac=use_hmac,
-            secret=hmac_secret,
-            project_id=project_id,
         )
+        analyze_deployment(deployment_id=job.deployment_id, db=db)
 
-    def _execute_analysis(self, db: Session, job: ScheduledJob):
-        logger.info(
-            "analysis_execute",
+    def _wait_for_upstream(self, db: Session, job: ScheduledJob) -> None:
+        """
+        Heure de repli atteinte mais collecte encore en cours (retry d'un sample) : le job
+        attend, au plus jusqu'à sa deadline de dépendances, pour ne pas perdre les samples tardifs.
+        """
+        wait_until = dependencies_deadline(job)
+        if wait_until is None:
+            return
+        waiting = unfinished_upstream_count(db, job)
+        if not waiting:
+            return
+        if self.clock.now() < _as_utc(wait_until):
+            raise JobDeferred(until=wait_until, reason=f"{waiting} upstream job(s) unfinished")
+        inc_scheduler_dependency_events(event="fallback", job_type=job.job_type)
+        logger.warning(
+            "job_dependencies_timed_out",
             job_id=str(job.id),
             deployment_id=str(job.deployment_id),
+            job_type=job.job_type,
+            unfinished_upstream=waiting,
         )
-        analyze_deployment(deployment_id=job.deployment_id, db=db)
 
     def _execute_notification_outbox(self, db: Session, job: ScheduledJob):
+        for idx, channel, adapter_job in self._iter_outbox_notifications(job):
+            raise_if_timed_out()
+            if channel == "email":
+                self._execute_email_send(db, adapter_job)
+            else:
+                self._execute_slack_send(db, adapter_job)
+            self._log_outbox_item_executed(job, idx, channel, adapter_job)
+
+    async def _execute_notification_outbox_async(
+        self,
+        db: Session,
+        job: ScheduledJob,
+        executor: AsyncJobExecutor,
+    ):
+        for idx, channel, adapter_job in self._iter_outbox_notifications(job):
+            raise_if_timed_out()
+            if channel == "email":
+                await self._execute_email_send_async(db, adapter_job, executor)
+            else:
+                await self._execute_slack_send_async(db, adapter_job, executor)
+            self._log_outbox_item_executed(job, idx, channel, adapter_job)
+
+    def _iter_outbox_notifications(self, job: ScheduledJob):
         metadata = job.job_metadata or {}
         notifications = metadata.get("notifications")
         if not isinstance(notifications, list) or not notifications:
             raise ValueError("Missing required outbox metadata key: notifications")
 
+        # Champs communs stockés une fois au niveau du job (voir tasks._compact_outbox_notifications).
+        shared = {key: metadata[key] for key in OUTBOX_SHARED_KEYS if metadata.get(key) is not None}
         for idx, notification in enumerate(notifications):
             if not isinstance(notification, dict):
                 raise ValueError(f"Invalid outbox notification at index={idx}: expected object")
@@ -520,25 +1969,40 @@ class JobPoller:
             payload = notification.get("payload")
             if not isinstance(payload, dict):
                 raise ValueError(f"Invalid outbox notification payload at index={idx}")
-
-            adapter_job = SimpleNamespace(id=job.id, job_metadata=payload)
-            if channel == "email":
-                self._execute_email_send(db, adapter_job)
-            elif channel == "slack":
-                self._execute_slack_send(db, adapter_job)
-            else:
+            if channel not in ("email", "slack"):
                 raise ValueError(f"Unsupported outbox channel at index={idx}: {channel}")
 
-            logger.info(
-                "notification_outbox_item_executed",
-                outbox_job_id=str(job.id),
-                deployment_id=str(job.deployment_id),
-                index=idx,
-                channel=channel,
-                dedupe_key=payload.get("dedupe_key"),
-            )
+            shared_keys = notification.get("shared_keys")
+            if shared_keys is None:
+                # Outbox compacté avant `shared_keys` : toutes les clés communes étaient fusionnées.
+                shared_keys = shared.keys()
+            restored = {key: shared[key] for key in shared_keys if key in shared}
+            yield idx, channel, SimpleNamespace(id=job.id, job_metadata={**restored, **payload})
+
+    def _log_outbox_item_executed(self, job: ScheduledJob, idx: int, channel: str, adapter_job):
+        logger.info(
+            "notification_outbox_item_executed",
+            outbox_job_id=str(job.id),
+            deployment_id=str(job.deployment_id),
+            index=idx,
+            channel=channel,
+            dedupe_key=adapter_job.job_metadata.get("dedupe_key"),
+        )
 
     def _execute_email_send(self, db: Session, job: ScheduledJob):
+        result = send_email_if_not_sent(db=db, **self._email_send_kwargs(job))
+        self._check_email_result(job, result)
+
+    async def _execute_email_send_async(self, db: Session, job: ScheduledJob, executor: AsyncJobExecutor):
+        result = await send_email_if_not_sent_async(
+            db,
+            client=executor.http_client,
+            run_db=executor.run_db,
+            **self._email_send_kwargs(job),
+        )
+        self._check_email_result(job, result)
+
+    def _email_send_kwargs(self, job: ScheduledJob) -> dict:
         metadata = job.job_metadata or {}
         missing = [
             key
@@ -552,15 +2016,16 @@ class JobPoller:
         if not isinstance(context, dict):
             context = {}
 
-        result = send_email_if_not_sent(
-            db=db,
-            user_id=metadata["user_id"],
-            to_email=metadata["to_email"],
-            email_type=metadata["email_type"],
-            dedupe_key=metadata["dedupe_key"],
-            project_id=metadata.get("project_id"),
-            context=context,
-        )
+        return {
+            "user_id": metadata["user_id"],
+            "to_email": metadata["to_email"],
+            "email_type": metadata["email_type"],
+            "dedupe_key": metadata["dedupe_key"],
+            "project_id": metadata.get("project_id"),
+            "context": context,
+        }
+
+    def _check_email_result(self, job: ScheduledJob, result):
         logger.info(
             "email_job_executed",
             job_id=str(job.id),
@@ -573,6 +2038,19 @@ class JobPoller:
             raise RuntimeError(result.reason or "email_send_failed")
 
     def _execute_slack_send(self, db: Session, job: ScheduledJob):
+        result = send_slack_if_not_sent(db=db, **self._slack_send_kwargs(job))
+        self._check_slack_result(job, result)
+
+    async def _execute_slack_send_async(self, db: Session, job: ScheduledJob, executor: AsyncJobExecutor):
+        result = await send_slack_if_not_sent_async(
+            db,
+            client=executor.http_client,
+            run_db=executor.run_db,
+            **self._slack_send_kwargs(job),
+        )
+        self._check_slack_result(job, result)
+
+    def _slack_send_kwargs(self, job: ScheduledJob) -> dict:
         metadata = job.job_metadata or {}
         missing = [
             key
@@ -582,14 +2060,15 @@ class JobPoller:
         if missing:
             raise ValueError(f"Missing required slack metadata keys: {', '.join(missing)}")
 
-        result = send_slack_if_not_sent(
-            db=db,
-            user_id=metadata["user_id"],
-            project_id=metadata["project_id"],
-            notification_type=metadata["notification_type"],
-            dedupe_key=metadata["dedupe_key"],
-            message_text=metadata["message_text"],
-        )
+        return {
+            "user_id": metadata["user_id"],
+            "project_id": metadata["project_id"],
+            "notification_type": metadata["notification_type"],
+            "dedupe_key": metadata["dedupe_key"],
+            "message_text": metadata["message_text"],
+        }
+
+    def _check_slack_result(self, job: ScheduledJob, result):
         logger.info(
             "slack_job_executed",
             job_id=str(job.id),
@@ -602,5 +2081,22 @@ class JobPoller:
             raise RuntimeError(result.reason or "slack_send_failed")
 
 
+def _edf_sort_key(job: ScheduledJob) -> tuple:
+    # Même ordre que la requête de claim : deadline croissante (NULL en dernier), puis scheduled_at.
+    deadline_at = _as_utc(job.deadline_at) if job.deadline_at is not None else None
+    return (deadline_at is None, deadline_at or _as_utc(job.scheduled_at), _as_utc(job.scheduled_at))
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _earliest(*values: Optional[datetime]) -> Optional[datetime]:
+    present = [value for value in values if value is not None]
+    return min(present) if present else None
+
+
 # Singleton poller instance
 poller = JobPoller()
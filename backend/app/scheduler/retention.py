@@ -0,0 +1,134 @@
+# app/scheduler/retention.py
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.db.models.scheduled_job import ScheduledJob
+from app.db.models.scheduled_job_archive import ScheduledJobArchive
+
+# Séparation chaud/froid : scheduled_jobs ne garde que les jobs actifs et l'historique récent ;
+# les jobs terminés plus anciens partent par petits lots (transactions courtes, SKIP LOCKED :
+# plusieurs pollers peuvent archiver en parallèle sans se bloquer).
+ARCHIVE_ENABLED = bool(settings.SCHEDULER_ARCHIVE_ENABLED)
+ARCHIVE_MODE = (settings.SCHEDULER_ARCHIVE_MODE or "archive").strip().lower()
+ARCHIVE_BATCH_SIZE = max(1, int(settings.SCHEDULER_ARCHIVE_BATCH_SIZE))
+ARCHIVE_MAX_BATCHES_PER_RUN = max(1, int(settings.SCHEDULER_ARCHIVE_MAX_BATCHES_PER_RUN))
+ARCHIVE_INTERVAL_SECONDS = max(10, int(settings.SCHEDULER_ARCHIVE_INTERVAL_SECONDS))
+ARCHIVE_RETENTION_DAYS = max(0, int(settings.SCHEDULER_ARCHIVE_RETENTION_DAYS))
+ARCHIVE_LAST_ERROR_CHARS = 500
+# Jours passés dans la table chaude par statut terminal (0 = jamais archivé).
+HOT_RETENTION_DAYS = {
+    "completed": max(0, int(settings.SCHEDULER_ARCHIVE_COMPLETED_AFTER_DAYS)),
+    "skipped": max(0, int(settings.SCHEDULER_ARCHIVE_COMPLETED_AFTER_DAYS)),
+    "failed": max(0, int(settings.SCHEDULER_ARCHIVE_FAILED_AFTER_DAYS)),
+}
+
+_ARCHIVED_COLUMNS = (
+    ScheduledJobArchive.id,
+    ScheduledJobArchive.deployment_id,
+    ScheduledJobArchive.tenant_key,
+    ScheduledJobArchive.job_type,
+    ScheduledJobArchive.status,
+    ScheduledJobArchive.retry_count,
+    ScheduledJobArchive.last_error,
+    ScheduledJobArchive.scheduled_at,
+    ScheduledJobArchive.created_at,
+    ScheduledJobArchive.finished_at,
+)
+
+
+def archive_terminal_jobs(db: Session, now: datetime) -> dict[str, int]:
+    """
+    Sort de scheduled_jobs les jobs terminés plus vieux que leur rétention chaude, au plus
+    ARCHIVE_MAX_BATCHES_PER_RUN lots de ARCHIVE_BATCH_SIZE, un commit par lot.
+    Retourne le nombre de jobs déplacés par statut.
+    """
+    moved: dict[str, int] = {}
+    batches = 0
+    for status, hot_days in sorted(HOT_RETENTION_DAYS.items()):
+        if hot_days <= 0:
+            continue
+        cutoff = now - timedelta(days=hot_days)
+        while batches < ARCHIVE_MAX_BATCHES_PER_RUN:
+            count = _move_batch(db, status, cutoff)
+            db.commit()
+            batches += 1
+            if count:
+                moved[status] = moved.get(status, 0) + count
+            if count < ARCHIVE_BATCH_SIZE:
+                break
+    return moved
+
+
+def purge_archived_jobs(db: Session, now: datetime) -> int:
+    """Supprime de scheduled_jobs_archive les lignes au-delà de ARCHIVE_RETENTION_DAYS (0 = jamais)."""
+    if ARCHIVE_RETENTION_DAYS <= 0:
+        return 0
+    cutoff = now - timedelta(days=ARCHIVE_RETENTION_DAYS)
+    purged = 0
+    for _ in range(ARCHIVE_MAX_BATCHES_PER_RUN):
+        ids = (
+            db.execute(
+                select(ScheduledJobArchive.id)
+                .where(ScheduledJobArchive.created_at < cutoff)
+                .order_by(ScheduledJobArchive.created_at)
+                .limit(ARCHIVE_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            .scalars()
+            .all()
+        )
+        if ids:
+            db.execute(
+                delete(ScheduledJobArchive).where(ScheduledJobArchive.id.in_(ids)),
+                execution_options={"synchronize_session": False},
+            )
+        db.commit()
+        purged += len(ids)
+        if len(ids) < ARCHIVE_BATCH_SIZE:
+            break
+    return purged
+
+
+def _move_batch(db: Session, status: str, cutoff: datetime) -> int:
+    # Âge compté depuis le passage au statut terminal (updated_at), pas depuis la création : un job
+    # retenté, différé ou une longue observation_session reste en table chaude après sa fin.
+    # Index partiel (status, updated_at) sur les seuls statuts terminaux.
+    ids = (
+        db.execute(
+            select(ScheduledJob.id)
+            .where(ScheduledJob.status == status, ScheduledJob.updated_at < cutoff)
+            .order_by(ScheduledJob.updated_at)
+            .limit(ARCHIVE_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        .scalars()
+        .all()
+    )
+    if not ids:
+        return 0
+    if ARCHIVE_MODE == "archive":
+        db.execute(
+            insert(ScheduledJobArchive).from_select(
+                [column.key for column in _ARCHIVED_COLUMNS],
+                select(
+                    ScheduledJob.id,
+                    ScheduledJob.deployment_id,
+                    ScheduledJob.tenant_key,
+                    ScheduledJob.job_type,
+                    ScheduledJob.status,
+                    ScheduledJob.retry_count,
+                    func.substr(ScheduledJob.last_error, 1, ARCHIVE_LAST_ERROR_CHARS),
+                    ScheduledJob.scheduled_at,
+                    ScheduledJob.created_at,
+                    ScheduledJob.updated_at,
+                ).where(ScheduledJob.id.in_(ids)),
+            )
+        )
+    db.execute(
+        delete(ScheduledJob).where(ScheduledJob.id.in_(ids)),
+        execution_options={"synchronize_session": False},
+    )
+    return len(ids)
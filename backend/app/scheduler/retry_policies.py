@@ -0,0 +1,148 @@
+# app/scheduler/retry_policies.py
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.core.settings import settings
+from app.scheduler.deadlines import lateness_budget_seconds
+
+RETRY_JITTER_RATIO = max(0.0, float(settings.SCHEDULER_RETRY_JITTER_RATIO))
+
+
+def _parse_backoff(raw: str, default: tuple[float, ...]) -> tuple[float, ...]:
+    values = tuple(float(part) for part in (raw or "").split(",") if part.strip())
+    return tuple(value for value in values if value > 0) or default
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retries d'un type de job : un retry par valeur de `backoff_seconds`, chacun allongé d'un
+    jitter positif (les retries d'un même incident ne retombent pas sur la même seconde), et
+    abandonnés quand ils partiraient plus de `max_age_seconds` après l'heure prévue du job.
+    """
+
+    backoff_seconds: tuple[float, ...]
+    max_age_seconds: Optional[float] = None  # None = pas de limite d'âge
+    jitter_ratio: float = RETRY_JITTER_RATIO
+
+    @property
+    def max_retries(self) -> int:
+        return len(self.backoff_seconds)
+
+    def base_delay_seconds(self, retry_count: int) -> float:
+        index = min(max(retry_count, 1), len(self.backoff_seconds)) - 1
+        return self.backoff_seconds[index]
+
+    def delay_seconds(self, retry_count: int, rng: random.Random = random) -> float:
+        # Jitter positif seulement : jamais plus tôt que le backoff nominal.
+        base = self.base_delay_seconds(retry_count)
+        return base + rng.uniform(0.0, base * self.jitter_ratio)
+
+    def too_old(self, planned_at: datetime, retry_at: datetime) -> bool:
+        if self.max_age_seconds is None:
+            return False
+        return retry_at > planned_at + timedelta(seconds=self.max_age_seconds)
+
+
+def _policy(backoff: str, max_age_seconds: int, default: tuple[float, ...]) -> RetryPolicy:
+    return RetryPolicy(
+        backoff_seconds=_parse_backoff(backoff, default),
+        max_age_seconds=float(max_age_seconds) if max_age_seconds > 0 else None,
+    )
+
+
+_COLLECT_POLICY = _policy(
+    settings.SCHEDULER_RETRY_COLLECT_BACKOFF_SECONDS,
+    int(settings.SCHEDULER_RETRY_COLLECT_MAX_AGE_SECONDS),
+    (10.0, 30.0, 60.0),
+)
+_NOTIFICATION_POLICY = _policy(
+    settings.SCHEDULER_RETRY_NOTIFICATION_BACKOFF_SECONDS,
+    int(settings.SCHEDULER_RETRY_NOTIFICATION_MAX_AGE_SECONDS),
+    (30.0, 120.0, 300.0),
+)
+
+RETRY_POLICIES = {
+    "pre_collect": _COLLECT_POLICY,
+    "post_collect": _COLLECT_POLICY,
+    "observation_session": _COLLECT_POLICY,
+    "analysis": _policy(
+        settings.SCHEDULER_RETRY_ANALYSIS_BACKOFF_SECONDS,
+        int(settings.SCHEDULER_RETRY_ANALYSIS_MAX_AGE_SECONDS),
+        (30.0, 120.0, 300.0),
+    ),
+    "email_send": _NOTIFICATION_POLICY,
+    "slack_send": _NOTIFICATION_POLICY,
+    "notification_outbox": _NOTIFICATION_POLICY,
+}
+DEFAULT_RETRY_POLICY = RetryPolicy(backoff_seconds=(30.0, 120.0, 300.0))
+
+
+def retry_policy_for(job_type: Optional[str]) -> RetryPolicy:
+    return RETRY_POLICIES.get(job_type, DEFAULT_RETRY_POLICY)
+
+
+def max_retries_by_job_type() -> dict[str, int]:
+    return {job_type: policy.max_retries for job_type, policy in RETRY_POLICIES.items()}
+
+
+@dataclass(frozen=True)
+class RetryPlan:
+    """Suite d'un échec : prochain retry à `retry_at`, ou abandon (`give_up_reason`)."""
+
+    retry_count: int
+    delay_seconds: float
+    retry_at: datetime
+    planned_at: datetime
+    give_up_reason: Optional[str] = None  # exhausted | max_age ; None = retry
+
+    @property
+    def retry(self) -> bool:
+        return self.give_up_reason is None
+
+
+def plan_retry(job, now: datetime, rng: random.Random = random) -> RetryPlan:
+    """
+    Même décision pour un échec d'exécution et pour un lease expiré : backoff du type,
+    abandon si les retries sont épuisés ou si le retry partirait au-delà de l'âge max.
+    """
+    policy = retry_policy_for(job.job_type)
+    retry_count = job.retry_count + 1
+    delay_seconds = policy.delay_seconds(retry_count, rng)
+    retry_at = now + timedelta(seconds=delay_seconds)
+    job_planned_at = planned_at(job)
+    if retry_count > policy.max_retries:
+        give_up_reason = "exhausted"
+    elif policy.too_old(job_planned_at, retry_at):
+        give_up_reason = "max_age"
+    else:
+        give_up_reason = None
+    return RetryPlan(
+        retry_count=retry_count,
+        delay_seconds=delay_seconds,
+        retry_at=retry_at,
+        planned_at=job_planned_at,
+        give_up_reason=give_up_reason,
+    )
+
+
+def planned_at(job) -> datetime:
+    """
+    Heure prévue du job, référence de l'âge max : planned_at, figé au premier retry (scheduled_at
+    et deadline_at sont réécrits à chaque retry), sinon deadline_at moins le budget de retard du type.
+    """
+    stored = getattr(job, "planned_at", None)
+    if stored is not None:
+        return _as_utc(stored)
+    deadline_at = getattr(job, "deadline_at", None)
+    if deadline_at is not None:
+        return _as_utc(deadline_at) - timedelta(seconds=lateness_budget_seconds(job.job_type))
+    return _as_utc(getattr(job, "created_at", None) or job.scheduled_at)
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
@@ -0,0 +1,94 @@
+# app/scheduler/routes.py
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.auth.deps import get_current_user
+from app.db.deps import get_db
+from app.db.models.user import User
+from app.observability.metrics import inc_scheduler_dead_letter_replayed
+from app.scheduler.dead_letter import count_pending_dead_letters, list_dead_letters, replay_dead_letters
+from app.scheduler.schemas import (
+    DeadLetterListResponse,
+    DeadLetterOut,
+    DeadLetterReason,
+    DeadLetterReplayedJobOut,
+    DeadLetterReplayRequest,
+    DeadLetterReplayResponse,
+)
+
+logger = structlog.get_logger(__name__)
+
+router = APIRouter(prefix="/scheduler", tags=["scheduler"])
+
+
+def _require_superuser(current_user: User = Depends(get_current_user)) -> User:
+    # Dead letters de tous les projets (payloads de notification compris) : réservé aux admins.
+    if not bool(getattr(current_user, "is_superuser", False)):
+        raise HTTPException(status_code=403, detail="INSUFFICIENT_ROLE")
+    return current_user
+
+
+@router.get("/dead-letters", response_model=DeadLetterListResponse)
+def get_dead_letters(
+    job_type: Optional[str] = Query(None),
+    reason: Optional[DeadLetterReason] = Query(None),
+    deployment_id: Optional[UUID] = Query(None),
+    include_replayed: bool = Query(False),
+    limit: int = Query(100, ge=1, le=500),
+    _admin: User = Depends(_require_superuser),
+    db: Session = Depends(get_db),
+):
+    entries = list_dead_letters(
+        db,
+        job_type=job_type,
+        reason=reason,
+        deployment_id=deployment_id,
+        include_replayed=include_replayed,
+        limit=limit,
+    )
+    return DeadLetterListResponse(
+        pending=count_pending_dead_letters(db),
+        items=[DeadLetterOut.model_validate(entry) for entry in entries],
+    )
+
+
+@router.post("/dead-letters/replay", response_model=DeadLetterReplayResponse)
+def replay_dead_letter_jobs(
+    payload: DeadLetterReplayRequest,
+    admin: User = Depends(_require_superuser),
+    db: Session = Depends(get_db),
+):
+    if payload.ids is None and payload.job_type is None and payload.reason is None:
+        raise HTTPException(status_code=400, detail="DEAD_LETTER_REPLAY_FILTER_REQUIRED")
+
+    replayed = replay_dead_letters(
+        db,
+        datetime.now(timezone.utc),
+        ids=payload.ids,
+        job_type=payload.job_type,
+        reason=payload.reason,
+        limit=payload.limit,
+    )
+    db.commit()
+
+    for entry, _job in replayed:
+        inc_scheduler_dead_letter_replayed(job_type=entry.job_type)
+    logger.info(
+        "dead_letters_replayed",
+        user_id=str(admin.id),
+        replayed=len(replayed),
+        job_type=payload.job_type,
+        reason=payload.reason,
+    )
+    return DeadLetterReplayResponse(
+        replayed=len(replayed),
+        jobs=[
+            DeadLetterReplayedJobOut(dead_letter_id=entry.id, job_id=job.id, job_type=job.job_type)
+            for entry, job in replayed
+        ],
+    )
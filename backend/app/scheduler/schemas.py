@@ -0,0 +1,50 @@
+# app/scheduler/schemas.py
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field, UUID4
+
+DeadLetterReason = Literal["exhausted", "max_age", "lease_expired"]
+
+
+class DeadLetterOut(BaseModel):
+    id: UUID4
+    deployment_id: Optional[UUID4] = None
+    job_type: str
+    phase: Optional[str] = None
+    sequence_index: Optional[int] = None
+    reason: DeadLetterReason
+    retry_count: int
+    last_error: Optional[str] = None
+    job_metadata: Optional[Dict[str, Any]] = None
+    scheduled_at: datetime
+    created_at: datetime
+    dead_lettered_at: datetime
+    replayed_at: Optional[datetime] = None
+    replay_job_id: Optional[UUID4] = None
+
+    class Config:
+        from_attributes = True
+
+
+class DeadLetterListResponse(BaseModel):
+    pending: int = Field(..., description="Dead letters non rejouées (tous filtres confondus)")
+    items: List[DeadLetterOut]
+
+
+class DeadLetterReplayRequest(BaseModel):
+    ids: Optional[List[UUID4]] = Field(None, description="Entrées à rejouer ; sinon toutes celles des filtres")
+    job_type: Optional[str] = None
+    reason: Optional[DeadLetterReason] = None
+    limit: int = Field(100, ge=1, le=1000)
+
+
+class DeadLetterReplayedJobOut(BaseModel):
+    dead_letter_id: UUID4
+    job_id: UUID4
+    job_type: str
+
+
+class DeadLetterReplayResponse(BaseModel):
+    replayed: int
+    jobs: List[DeadLetterReplayedJobOut]
@@ -0,0 +1,55 @@
+# app/scheduler/sharding.py
+import hashlib
+from typing import Iterable, Optional
+from uuid import UUID
+
+from app.core.settings import settings
+
+# Nombre de shards virtuels : fixe pour un déploiement (il est stocké dans scheduled_jobs.shard_key).
+SHARD_COUNT = max(1, int(settings.SCHEDULER_SHARD_COUNT))
+
+
+def _stable_hash(value: str) -> int:
+    # hash() est salé par processus : il faut un hash identique sur tous les nœuds.
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def shard_for_key(key: Optional[str], shard_count: int = SHARD_COUNT) -> Optional[int]:
+    if not key:
+        return None
+    return _stable_hash(key) % shard_count
+
+
+def shard_key_for_job(
+    *,
+    project_id: UUID | str | None = None,
+    deployment_id: UUID | str | None = None,
+    user_id: UUID | str | None = None,
+    shard_count: int = SHARD_COUNT,
+) -> Optional[int]:
+    """
+    Shard d'un job : tous les jobs d'un même projet tombent sur le même shard, donc sur un
+    seul worker à la fois, ce qui préserve leur ordre. Repli sur le déploiement puis l'utilisateur.
+    """
+    if project_id:
+        return shard_for_key(f"project:{project_id}", shard_count)
+    if deployment_id:
+        return shard_for_key(f"deployment:{deployment_id}", shard_count)
+    if user_id:
+        return shard_for_key(f"user:{user_id}", shard_count)
+    return None
+
+
+def assign_shards(worker_ids: Iterable[str], shard_count: int = SHARD_COUNT) -> dict[str, frozenset[int]]:
+    """
+    Rendezvous hashing : chaque shard revient au worker de plus haut score hash(worker, shard).
+    Déterministe sans coordination, et un départ/arrivée ne déplace que ~1/N des shards.
+    """
+    members = sorted(set(worker_ids))
+    owned: dict[str, set[int]] = {worker_id: set() for worker_id in members}
+    if not members:
+        return {}
+    for shard in range(shard_count):
+        owner = max(members, key=lambda worker_id: _stable_hash(f"{worker_id}:{shard}"))
+        owned[owner].add(shard)
+    return {worker_id: frozenset(shards) for worker_id, shards in owned.items()}
@@ -7,115 +7,195 @@ import structlog
 from sqlalchemy.orm import Session
 
 from app.db.models.scheduled_job import ScheduledJob
+from app.scheduler.deadlines import deadline_for, schedule_jitter
+from app.scheduler.dependencies import dependency_metadata
+from app.scheduler.fairness import tenant_key_for_job
+from app.scheduler.job_targets import collect_job_metadata
+from app.scheduler.sharding import shard_key_for_job
+from app.scheduler.wakeup import notify_jobs_scheduled
 
 logger = structlog.get_logger(__name__)
 
 POST_COLLECTION_INTERVAL_SECONDS = 60  # seconds
 
-
-def _build_job_metadata(
-    metrics_endpoint: str,
-    use_hmac: bool,
-    hmac_secret: str,
-    project_id: UUID,
-) -> dict:
-    return {
-        "metrics_endpoint": metrics_endpoint,
-        "use_hmac": use_hmac,
-        "hmac_secret": hmac_secret,
-        "project_id": str(project_id) if project_id else None,
-    }
+# Champs répétés dans chaque notification d'un outbox, stockés une seule fois au niveau du job
+# (fusionnés à la lecture par JobPoller._iter_outbox_notifications).
+OUTBOX_SHARED_KEYS = ("project_id", "user_id", "context")
+
+
+def _compact_outbox_notifications(metadata: dict[str, Any], notifications: list[dict[str, Any]]) -> list:
+    contexts = [
+        notification["payload"]["context"]
+        for notification in notifications
+        if isinstance(notification.get("payload"), dict) and "context" in notification["payload"]
+    ]
+    if contexts and all(context == contexts[0] for context in contexts):
+        metadata["context"] = contexts[0]
+
+    compacted = []
+    for notification in notifications:
+        payload = notification.get("payload")
+        shared_keys = []
+        if isinstance(payload, dict):
+            # Chaque item garde la liste des clés retirées : seules celles-ci sont restaurées
+            # à la lecture (un item sans `context` ne doit pas hériter de celui des autres).
+            shared_keys = [
+                key
+                for key in OUTBOX_SHARED_KEYS
+                if key in payload and metadata.get(key) is not None and metadata[key] == payload[key]
+            ]
+            payload = {key: value for key, value in payload.items() if key not in shared_keys}
+        compacted.append({**notification, "payload": payload, "shared_keys": shared_keys})
+    return compacted
 
 
 def schedule_pre_collection(
     db: Session,
     deployment_id: UUID,
-    metrics_endpoint: str,
-    use_hmac: bool,
-    hmac_secret: str,
     project_id: UUID,
 ):
+    scheduled_at = datetime.now(timezone.utc)
     job = ScheduledJob(
         deployment_id=deployment_id,
         job_type="pre_collect",
         phase="pre",
-        scheduled_at=datetime.now(timezone.utc),
+        scheduled_at=scheduled_at,
+        deadline_at=deadline_for("pre_collect", scheduled_at),
         status="pending",
-        job_metadata=_build_job_metadata(
-            metrics_endpoint=metrics_endpoint,
-            use_hmac=use_hmac,
-            hmac_secret=hmac_secret,
-            project_id=project_id,
-        ),
+        shard_key=shard_key_for_job(project_id=project_id, deployment_id=deployment_id),
+        tenant_key=tenant_key_for_job(project_id=project_id, deployment_id=deployment_id),
+        job_metadata=collect_job_metadata(project_id),
     )
     db.add(job)
+    notify_jobs_scheduled(db, job.scheduled_at)
     db.commit()
 
     logger.info(
         "pre_collect_job_scheduled",
         job_id=str(job.id),
         deployment_id=str(deployment_id),
-        metrics_endpoint=metrics_endpoint,
-        use_hmac=bool(use_hmac),
+        project_id=str(project_id) if project_id else None,
     )
 
 
 def schedule_post_collection(
     db: Session,
     deployment_id: UUID,
-    metrics_endpoint: str,
-    use_hmac: bool,
-    hmac_secret: str,
     project_id: UUID,
     observation_window: int = 5,
 ):
-    now = datetime.now(timezone.utc)
-    metadata = _build_job_metadata(
-        metrics_endpoint=metrics_endpoint,
-        use_hmac=use_hmac,
-        hmac_secret=hmac_secret,
-        project_id=project_id,
-    )
+    # Même décalage pour toute la séquence : l'espacement entre samples reste exact.
+    now = datetime.now(timezone.utc) + schedule_jitter()
+    metadata = collect_job_metadata(project_id)
+    shard_key = shard_key_for_job(project_id=project_id, deployment_id=deployment_id)
+    tenant_key = tenant_key_for_job(project_id=project_id, deployment_id=deployment_id)
 
     jobs = []
     for index in range(observation_window):
+        scheduled_at = now + timedelta(seconds=index * POST_COLLECTION_INTERVAL_SECONDS)
         jobs.append(
             ScheduledJob(
                 deployment_id=deployment_id,
                 job_type="post_collect",
                 phase="post",
                 sequence_index=index,
-                scheduled_at=now + timedelta(seconds=index * POST_COLLECTION_INTERVAL_SECONDS),
+                scheduled_at=scheduled_at,
+                deadline_at=deadline_for("post_collect", scheduled_at),
                 status="pending",
+                shard_key=shard_key,
+                tenant_key=tenant_key,
                 job_metadata=metadata,
             )
         )
 
     db.add_all(jobs)
+    notify_jobs_scheduled(db, now)
     db.commit()
 
     logger.info(
         "post_collect_jobs_scheduled",
         deployment_id=str(deployment_id),
         jobs_count=len(jobs),
-        metrics_endpoint=metrics_endpoint,
-        use_hmac=bool(use_hmac),
+        project_id=str(project_id) if project_id else None,
         observation_window=observation_window,
     )
 
 
-def schedule_analysis(db: Session, deployment_id: UUID, delay_minutes: int):
-    scheduled_at = datetime.now(timezone.utc) + timedelta(minutes=delay_minutes)
+def schedule_observation_session(
+    db: Session,
+    deployment_id: UUID,
+    project_id: UUID,
+    observation_window: int = 5,
+) -> ScheduledJob:
+    """
+    Une seule ligne pour toute la fenêtre d'observation : le job porte un curseur
+    (sequence_index, scheduled_at) qu'il avance après chaque sample, puis libère
+    l'analyse quand la fenêtre est complète (voir JobPoller._advance_observation_session).
+    """
+    started_at = datetime.now(timezone.utc) + schedule_jitter()
+    metadata = collect_job_metadata(project_id)
+    metadata.update(
+        {
+            "observation_window": observation_window,
+            "interval_seconds": POST_COLLECTION_INTERVAL_SECONDS,
+            "started_at": started_at.isoformat(),
+            "shift_seconds": 0.0,
+        }
+    )
+
+    job = ScheduledJob(
+        deployment_id=deployment_id,
+        job_type="observation_session",
+        phase="post",
+        sequence_index=0,
+        scheduled_at=started_at,
+        deadline_at=deadline_for("observation_session", started_at),
+        status="pending",
+        shard_key=shard_key_for_job(project_id=project_id, deployment_id=deployment_id),
+        tenant_key=tenant_key_for_job(project_id=project_id, deployment_id=deployment_id),
+        job_metadata=metadata,
+    )
+    db.add(job)
+    notify_jobs_scheduled(db, started_at)
+    db.commit()
+
+    logger.info(
+        "observation_session_scheduled",
+        job_id=str(job.id),
+        deployment_id=str(deployment_id),
+        project_id=str(project_id) if project_id else None,
+        observation_window=observation_window,
+    )
+    return job
+
+
+def schedule_analysis(
+    db: Session,
+    deployment_id: UUID,
+    delay_minutes: int = 0,
+    project_id: UUID | str | None = None,
+):
+    """
+    scheduled_at est l'heure de repli : l'analyse est avancée dès que la collecte du déploiement
+    est terminée (app/scheduler/dependencies.py), et attend les retries de collecte encore en
+    cours au plus SCHEDULER_DEPENDENCY_GRACE_SECONDS au-delà.
+    """
+    scheduled_at = datetime.now(timezone.utc) + timedelta(minutes=delay_minutes) + schedule_jitter()
 
     job = ScheduledJob(
         deployment_id=deployment_id,
         job_type="analysis",
         phase=None,
         scheduled_at=scheduled_at,
+        deadline_at=deadline_for("analysis", scheduled_at),
         status="pending",
+        shard_key=shard_key_for_job(project_id=project_id, deployment_id=deployment_id),
+        tenant_key=tenant_key_for_job(project_id=project_id, deployment_id=deployment_id),
+        job_metadata=dependency_metadata(scheduled_at),
     )
 
     db.add(job)
+    notify_jobs_scheduled(db, scheduled_at)
     db.commit()
 
     logger.info(
@@ -149,15 +229,20 @@ def schedule_email(
         "context": context or {},
     }
 
+    scheduled_at = scheduled_at or datetime.now(timezone.utc)
     job = ScheduledJob(
         deployment_id=deployment_id,
         job_type="email_send",
         phase=None,
-        scheduled_at=scheduled_at or datetime.now(timezone.utc),
+        scheduled_at=scheduled_at,
+        deadline_at=deadline_for("email_send", scheduled_at),
         status="pending",
+        shard_key=shard_key_for_job(project_id=project_id, deployment_id=deployment_id, user_id=user_id),
+        tenant_key=tenant_key_for_job(project_id=project_id, deployment_id=deployment_id, user_id=user_id),
         job_metadata=metadata,
     )
     db.add(job)
+    notify_jobs_scheduled(db, job.scheduled_at)
     if autocommit:
         db.commit()
 
@@ -193,15 +278,20 @@ def schedule_slack(
         "message_text": message_text,
     }
 
+    scheduled_at = scheduled_at or datetime.now(timezone.utc)
     job = ScheduledJob(
         deployment_id=deployment_id,
         job_type="slack_send",
         phase=None,
-        scheduled_at=scheduled_at or datetime.now(timezone.utc),
+        scheduled_at=scheduled_at,
+        deadline_at=deadline_for("slack_send", scheduled_at),
         status="pending",
+        shard_key=shard_key_for_job(project_id=project_id, deployment_id=deployment_id, user_id=user_id),
+        tenant_key=tenant_key_for_job(project_id=project_id, deployment_id=deployment_id, user_id=user_id),
         job_metadata=metadata,
     )
     db.add(job)
+    notify_jobs_scheduled(db, job.scheduled_at)
     if autocommit:
         db.commit()
 
@@ -235,18 +325,23 @@ def schedule_notification_outbox(
         "dedupe_key": dedupe_key,
         "project_id": str(project_id) if project_id else None,
         "user_id": str(user_id) if user_id else None,
-        "notifications": notifications,
     }
+    metadata["notifications"] = _compact_outbox_notifications(metadata, notifications)
 
+    scheduled_at = scheduled_at or datetime.now(timezone.utc)
     job = ScheduledJob(
         deployment_id=deployment_id,
         job_type="notification_outbox",
         phase=None,
-        scheduled_at=scheduled_at or datetime.now(timezone.utc),
+        scheduled_at=scheduled_at,
+        deadline_at=deadline_for("notification_outbox", scheduled_at),
         status="pending",
+        shard_key=shard_key_for_job(project_id=project_id, deployment_id=deployment_id, user_id=user_id),
+        tenant_key=tenant_key_for_job(project_id=project_id, deployment_id=deployment_id, user_id=user_id),
         job_metadata=metadata,
     )
     db.add(job)
+    notify_jobs_scheduled(db, job.scheduled_at)
     if autocommit:
         db.commit()
 
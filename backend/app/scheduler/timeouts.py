@@ -0,0 +1,236 @@
+# app/scheduler/timeouts.py
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import httpx
+import structlog
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+# Durée d'exécution maximale par type de job : au-delà, le watchdog annule la requête SQL en
+# cours, remet le job en file avec backoff et libère le slot sans attendre l'expiration du lease.
+JOB_TIMEOUT_SECONDS = {
+    "pre_collect": max(1, int(settings.SCHEDULER_JOB_TIMEOUT_COLLECT_SECONDS)),
+    "post_collect": max(1, int(settings.SCHEDULER_JOB_TIMEOUT_COLLECT_SECONDS)),
+    "observation_session": max(1, int(settings.SCHEDULER_JOB_TIMEOUT_COLLECT_SECONDS)),
+    "analysis": max(1, int(settings.SCHEDULER_JOB_TIMEOUT_ANALYSIS_SECONDS)),
+    "email_send": max(1, int(settings.SCHEDULER_JOB_TIMEOUT_NOTIFICATION_SECONDS)),
+    "slack_send": max(1, int(settings.SCHEDULER_JOB_TIMEOUT_NOTIFICATION_SECONDS)),
+    "notification_outbox": max(1, int(settings.SCHEDULER_JOB_TIMEOUT_NOTIFICATION_SECONDS)),
+}
+DEFAULT_JOB_TIMEOUT_SECONDS = 300
+# Plafond par requête des sessions de job (Postgres), borné par le délai du job ; 0 = désactivé.
+STATEMENT_TIMEOUT_SECONDS = max(0, int(settings.SCHEDULER_STATEMENT_TIMEOUT_SECONDS))
+WATCHDOG_ENABLED = bool(settings.SCHEDULER_WATCHDOG_ENABLED)
+WATCHDOG_INTERVAL_SECONDS = 1.0
+
+# SQLSTATE query_canceled : statement_timeout atteint ou requête annulée par le watchdog.
+_PG_QUERY_CANCELED = "57014"
+
+
+class JobTimeout(Exception):
+    """Le job a dépassé sa durée d'exécution maximale."""
+
+    def __init__(self, *, job_type: Optional[str], elapsed_seconds: float, timeout_seconds: float):
+        super().__init__(
+            f"Job execution exceeded {timeout_seconds:g}s (job_type={job_type}, elapsed={elapsed_seconds:.1f}s)"
+        )
+        self.job_type = job_type
+        self.elapsed_seconds = elapsed_seconds
+        self.timeout_seconds = timeout_seconds
+
+
+def timeout_for(job_type: Optional[str]) -> float:
+    return float(JOB_TIMEOUT_SECONDS.get(job_type, DEFAULT_JOB_TIMEOUT_SECONDS))
+
+
+def statement_timeout_ms(job_type: Optional[str]) -> int:
+    if STATEMENT_TIMEOUT_SECONDS <= 0:
+        return 0
+    return int(min(STATEMENT_TIMEOUT_SECONDS, timeout_for(job_type)) * 1000)
+
+
+def failure_class(error: BaseException) -> str:
+    """Classe d'échec exportée en métrique : `timeout` (watchdog, statement_timeout, HTTP) ou `error`."""
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if isinstance(current, (JobTimeout, httpx.TimeoutException, TimeoutError)):
+            return "timeout"
+        if getattr(getattr(current, "orig", None), "pgcode", None) == _PG_QUERY_CANCELED:
+            return "timeout"
+        current = current.__cause__ or current.__context__
+    return "error"
+
+
+@dataclass(eq=False)
+class JobExecution:
+    """Exécution en cours d'un job réclamé, suivie par le watchdog."""
+
+    job: object
+    timeout_seconds: float
+    started_at: float = field(default_factory=time.monotonic)
+    dbapi_connection: object = None
+    timed_out: threading.Event = field(default_factory=threading.Event)
+
+    @property
+    def job_type(self) -> Optional[str]:
+        return getattr(self.job, "job_type", None)
+
+    def elapsed_seconds(self, now: Optional[float] = None) -> float:
+        return (now if now is not None else time.monotonic()) - self.started_at
+
+    def overdue(self, now: float) -> bool:
+        return self.elapsed_seconds(now) > self.timeout_seconds
+
+    def raise_if_timed_out(self) -> None:
+        """Point d'annulation coopératif (entre deux étapes d'un job)."""
+        if self.timed_out.is_set():
+            raise JobTimeout(
+                job_type=self.job_type,
+                elapsed_seconds=self.elapsed_seconds(),
+                timeout_seconds=self.timeout_seconds,
+            )
+
+    def cancel_statement(self) -> bool:
+        # psycopg2 : cancel() est sûr depuis un autre thread et interrompt la requête en cours.
+        cancel = getattr(self.dbapi_connection, "cancel", None)
+        if cancel is None:
+            return False
+        try:
+            cancel()
+            return True
+        except Exception as e:
+            logger.warning("job_statement_cancel_failed", job_id=str(getattr(self.job, "id", None)), error=str(e))
+            return False
+
+
+# Exécution courante (thread worker ou tâche asyncio) pour les points d'annulation coopératifs.
+_current_execution: ContextVar[Optional[JobExecution]] = ContextVar("scheduler_job_execution", default=None)
+
+
+def set_current_execution(execution: Optional[JobExecution]):
+    return _current_execution.set(execution)
+
+
+def reset_current_execution(token) -> None:
+    _current_execution.reset(token)
+
+
+def raise_if_timed_out() -> None:
+    """À appeler entre deux étapes longues d'un job : lève JobTimeout si le watchdog l'a expiré."""
+    execution = _current_execution.get()
+    if execution is not None:
+        execution.raise_if_timed_out()
+
+
+def bind_job_session(db: Session, execution: JobExecution) -> None:
+    """
+    Chaque transaction de la session du job démarre par SET LOCAL statement_timeout (Postgres) ;
+    la connexion DBAPI est retenue pour que le watchdog puisse annuler la requête en cours.
+    """
+    timeout_ms = statement_timeout_ms(execution.job_type)
+    is_postgres = db.get_bind().dialect.name == "postgresql"
+
+    @event.listens_for(db, "after_begin")
+    def _on_begin(_session, _transaction, connection):
+        if not is_postgres:
+            return
+        execution.dbapi_connection = connection.connection.dbapi_connection
+        if timeout_ms > 0:
+            connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+
+
+class JobWatchdog:
+    """
+    Thread de surveillance des exécutions : toutes les WATCHDOG_INTERVAL_SECONDS, chaque job
+    au-delà de son délai est marqué `timed_out` puis passé à `on_timeout` (une seule fois).
+    """
+
+    def __init__(
+        self,
+        *,
+        on_timeout: Callable[[JobExecution], None],
+        interval_seconds: float = WATCHDOG_INTERVAL_SECONDS,
+        name: str = "scheduler-watchdog",
+    ):
+        self._on_timeout = on_timeout
+        self._interval_seconds = interval_seconds
+        self._name = name
+        self._lock = threading.Lock()
+        self._executions: set[JobExecution] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, job, *, timeout_seconds: Optional[float] = None) -> JobExecution:
+        execution = JobExecution(
+            job=job,
+            timeout_seconds=timeout_seconds if timeout_seconds is not None else timeout_for(job.job_type),
+        )
+        with self._lock:
+            self._executions.add(execution)
+        return execution
+
+    def untrack(self, execution: JobExecution) -> None:
+        with self._lock:
+            self._executions.discard(execution)
+
+    def running(self) -> int:
+        with self._lock:
+            return len(self._executions)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and timeout is not None:
+            thread.join(timeout=timeout)
+
+    def check(self, now: Optional[float] = None) -> list[JobExecution]:
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            overdue = [execution for execution in self._executions if execution.overdue(now)]
+            for execution in overdue:
+                self._executions.discard(execution)
+                execution.timed_out.set()
+        for execution in overdue:
+            try:
+                self._on_timeout(execution)
+            except Exception as e:
+                logger.exception(
+                    "job_timeout_handling_failed",
+                    job_id=str(getattr(execution.job, "id", None)),
+                    error=str(e),
+                )
+        return overdue
+
+    def abandon_all(self) -> list[JobExecution]:
+        """
+        Arrêt du poller : les exécutions encore suivies (jobs rendus en `pending`) sont marquées
+        expirées et leur requête annulée ; elles s'arrêtent au prochain point d'annulation.
+        """
+        with self._lock:
+            abandoned = list(self._executions)
+            self._executions.clear()
+        for execution in abandoned:
+            execution.timed_out.set()
+            execution.cancel_statement()
+        return abandoned
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval_seconds):
+            self.check()
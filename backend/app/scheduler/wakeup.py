@@ -0,0 +1,154 @@
+# app/scheduler/wakeup.py
+import asyncio
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+SCHEDULER_NOTIFY_CHANNEL = "seqpulse_scheduled_jobs"
+LISTEN_NOTIFY_ENABLED = bool(settings.SCHEDULER_LISTEN_NOTIFY_ENABLED)
+LISTENER_RECONNECT_SECONDS = 5.0
+
+
+def notify_jobs_scheduled(db: Session, scheduled_at: Optional[datetime] = None) -> None:
+    """
+    Réveille les pollers en écoute (Postgres NOTIFY).
+    Transactionnel : la notification part au commit de l'appelant.
+    """
+    if not LISTEN_NOTIFY_ENABLED:
+        return
+    try:
+        dialect_name = db.get_bind().dialect.name
+    except Exception:
+        return
+    if dialect_name != "postgresql":
+        return
+
+    payload = ""
+    if scheduled_at is not None:
+        if scheduled_at.tzinfo is None:
+            scheduled_at = scheduled_at.replace(tzinfo=timezone.utc)
+        payload = f"{scheduled_at.timestamp():.3f}"
+
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": SCHEDULER_NOTIFY_CHANNEL, "payload": payload},
+    )
+
+
+def parse_notification_payload(payload: str | None) -> Optional[datetime]:
+    if not payload:
+        return None
+    try:
+        return datetime.fromtimestamp(float(payload), tz=timezone.utc)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class JobWakeupListener:
+    """
+    Connexion dédiée en LISTEN sur le canal du scheduler.
+    Lue directement par la boucle asyncio (add_reader), sans thread.
+    """
+
+    def __init__(
+        self,
+        *,
+        on_notify: Callable[[Optional[datetime]], None],
+        connection_factory: Optional[Callable[[], object]] = None,
+        channel: str = SCHEDULER_NOTIFY_CHANNEL,
+    ):
+        self._on_notify = on_notify
+        self._connection_factory = connection_factory or _default_connection_factory
+        self._channel = channel
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._conn = None
+        self._reconnect_handle: Optional[asyncio.TimerHandle] = None
+        self._stopped = True
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stopped = False
+        self._connect()
+
+    def stop(self) -> None:
+        self._stopped = True
+        if self._reconnect_handle is not None:
+            self._reconnect_handle.cancel()
+            self._reconnect_handle = None
+        self._disconnect()
+
+    def _connect(self) -> None:
+        self._reconnect_handle = None
+        if self._stopped:
+            return
+        try:
+            conn = self._connection_factory()
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {self._channel}")
+            self._loop.add_reader(conn.fileno(), self._drain)
+        except Exception as e:
+            logger.warning("scheduler_listener_connect_failed", channel=self._channel, error=str(e))
+            self._schedule_reconnect()
+            return
+
+        self._conn = conn
+        logger.info("scheduler_listener_connected", channel=self._channel)
+        # Des notifications ont pu être perdues pendant la coupure : forcer un tick.
+        self._on_notify(None)
+
+    def _drain(self) -> None:
+        conn = self._conn
+        if conn is None:
+            return
+        try:
+            conn.poll()
+        except Exception as e:
+            logger.warning("scheduler_listener_poll_failed", channel=self._channel, error=str(e))
+            self._disconnect()
+            self._schedule_reconnect()
+            return
+
+        while conn.notifies:
+            notification = conn.notifies.pop(0)
+            self._on_notify(parse_notification_payload(getattr(notification, "payload", None)))
+
+    def _disconnect(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            self._loop.remove_reader(conn.fileno())
+        except Exception:
+            pass
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _schedule_reconnect(self) -> None:
+        if self._stopped or self._loop is None:
+            return
+        self._reconnect_handle = self._loop.call_later(LISTENER_RECONNECT_SECONDS, self._connect)
+
+
+def _default_connection_factory():
+    from app.db.session import engine
+
+    if engine.dialect.name != "postgresql":
+        raise RuntimeError(f"LISTEN/NOTIFY requires postgresql (got {engine.dialect.name})")
+    raw = engine.raw_connection()
+    # Connexion dédiée : on la sort du pool pour qu'elle ne soit jamais recyclée.
+    raw.detach()
+    return raw.driver_connection
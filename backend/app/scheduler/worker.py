@@ -0,0 +1,107 @@
+# app/scheduler/worker.py
+"""
+Processus scheduler dédié, découplé de l'API :
+
+    python -m app.scheduler.worker [--execution-mode async] [--max-concurrent-jobs 20]
+
+Côté API, SCHEDULER_EMBEDDED_POLLER=false évite de lancer un poller par worker uvicorn.
+Chaque processus publie son heartbeat dans scheduler_workers (lu par /health/scheduler).
+"""
+import argparse
+import asyncio
+import signal
+from typing import Optional
+
+import structlog
+from prometheus_client import start_http_server
+
+from app.core.logging_config import configure_logging
+from app.core.settings import settings
+from app.metrics.http_client import close_http_client
+from app.metrics.sample_writer import close_sample_writer
+from app.scheduler.poller import JobPoller
+
+logger = structlog.get_logger(__name__)
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.scheduler.worker", description="SeqPulse scheduler worker")
+    parser.add_argument(
+        "--execution-mode",
+        choices=("thread", "async"),
+        default=None,
+        help="défaut : SCHEDULER_EXECUTION_MODE",
+    )
+    parser.add_argument(
+        "--max-concurrent-jobs",
+        type=int,
+        default=None,
+        help="workers (mode thread) ou threads CPU (mode async) ; défaut : SCHEDULER_MAX_CONCURRENT_JOBS",
+    )
+    parser.add_argument(
+        "--async-max-in-flight",
+        type=int,
+        default=None,
+        help="jobs I/O en vol en mode async ; défaut : SCHEDULER_ASYNC_MAX_IN_FLIGHT",
+    )
+    parser.add_argument(
+        "--drain-grace-seconds",
+        type=float,
+        default=None,
+        help="arrêt : délai pour finir les jobs en cours avant de les rendre ; défaut : SCHEDULER_DRAIN_GRACE_SECONDS",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=int(settings.SCHEDULER_WORKER_METRICS_PORT),
+        help="port d'exposition Prometheus (0 = désactivé) ; défaut : SCHEDULER_WORKER_METRICS_PORT",
+    )
+    return parser.parse_args(argv)
+
+
+def build_poller(args: argparse.Namespace) -> JobPoller:
+    return JobPoller(
+        role="worker",
+        execution_mode=args.execution_mode,
+        max_concurrent_jobs=args.max_concurrent_jobs,
+        async_max_in_flight=args.async_max_in_flight,
+    )
+
+
+async def run_worker(
+    poller: JobPoller,
+    stop_event: Optional[asyncio.Event] = None,
+    *,
+    drain_grace_seconds: Optional[float] = None,
+) -> None:
+    stop_event = stop_event or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError, ValueError):
+            # Hors thread principal / Windows : l'arrêt passe par stop_event.
+            pass
+
+    await poller.start()
+    logger.info("scheduler_worker_started", worker_id=poller.worker_id)
+    try:
+        await stop_event.wait()
+    finally:
+        # SIGTERM (rolling restart) : drain borné, les jobs non terminés sont rendus aux autres workers.
+        await poller.stop(grace_seconds=drain_grace_seconds)
+        close_sample_writer()
+        close_http_client()
+        logger.info("scheduler_worker_stopped", worker_id=poller.worker_id)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = parse_args(argv)
+    configure_logging()
+    if args.metrics_port > 0:
+        start_http_server(args.metrics_port)
+    asyncio.run(run_worker(build_poller(args), drain_grace_seconds=args.drain_grace_seconds))
+
+
+if __name__ == "__main__":
+    main()
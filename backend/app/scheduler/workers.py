@@ -0,0 +1,196 @@
+# app/scheduler/workers.py
+import queue
+import threading
+from typing import Callable, Optional
+
+import structlog
+
+from app.observability.metrics import set_scheduler_worker_slots
+
+logger = structlog.get_logger(__name__)
+
+_STOP = object()
+
+
+class JobWorkerPool:
+    """
+    Pool de workers persistant alimenté par une file bornée.
+    Le poller réclame au plus `free_slots()` jobs : un job lent n'occupe que son slot
+    et n'empêche pas les jobs suivants de démarrer.
+    """
+
+    def __init__(
+        self,
+        *,
+        size: int,
+        handler: Callable[[object], None],
+        queue_size: int = 0,
+        on_slot_freed: Optional[Callable[[], None]] = None,
+        name: str = "scheduler-worker",
+    ):
+        self.size = max(1, int(size))
+        self.queue_size = max(0, int(queue_size))
+        self._handler = handler
+        self._on_slot_freed = on_slot_freed
+        self._name = name
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._busy = 0
+        self._queued = 0
+        self._threads: list[threading.Thread] = []
+        self._spawned = 0
+        # job_id -> thread qui l'exécute ; threads détachés par le watchdog (job en dépassement).
+        self._running: dict = {}
+        self._detached: set[threading.Thread] = set()
+        self._started = False
+
+    @property
+    def capacity(self) -> int:
+        return self.size + self.queue_size
+
+    @property
+    def busy(self) -> int:
+        with self._lock:
+            return self._busy
+
+    @property
+    def queued(self) -> int:
+        with self._lock:
+            return self._queued
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            for _ in range(self.size):
+                self._spawn_worker()
+            self._publish_slots()
+
+    def _spawn_worker(self) -> None:
+        # Appelé sous self._lock.
+        thread = threading.Thread(
+            target=self._run,
+            name=f"{self._name}-{self._spawned}",
+            daemon=True,
+        )
+        self._spawned += 1
+        thread.start()
+        self._threads.append(thread)
+
+    def free_slots(self) -> int:
+        with self._lock:
+            return max(0, self.capacity - self._busy - self._queued)
+
+    def submit(self, job) -> bool:
+        with self._lock:
+            if not self._started or self._busy + self._queued >= self.capacity:
+                return False
+            self._queued += 1
+            self._publish_slots()
+        self._queue.put(job)
+        return True
+
+    def detach(self, job_id) -> bool:
+        """
+        Libère tout de suite le slot d'un job en dépassement : son thread est remplacé et
+        sortira du pool quand le handler rendra la main (le job a déjà été remis en file).
+        """
+        with self._lock:
+            thread = self._running.pop(job_id, None)
+            if thread is None or not self._started:
+                return False
+            self._detached.add(thread)
+            if thread in self._threads:
+                self._threads.remove(thread)
+            self._busy -= 1
+            self._spawn_worker()
+            self._publish_slots()
+            self._idle.notify_all()
+        self._notify_slot_freed()
+        return True
+
+    def drain_queued(self) -> list:
+        """Retire de la file les jobs soumis mais pas encore démarrés (arrêt du poller) et les retourne."""
+        drained = []
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is _STOP:
+                self._queue.put(job)
+                break
+            drained.append(job)
+        if drained:
+            with self._lock:
+                self._queued -= len(drained)
+                self._publish_slots()
+                self._idle.notify_all()
+        return drained
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        with self._idle:
+            return self._idle.wait_for(lambda: self._busy == 0 and self._queued == 0, timeout=timeout)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+            threads = list(self._threads)
+            self._threads = []
+        for _ in threads:
+            self._queue.put(_STOP)
+        if timeout is None:
+            return
+        for thread in threads:
+            thread.join(timeout=timeout)
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            current = threading.current_thread()
+            job_id = getattr(job, "id", None)
+            with self._lock:
+                self._queued -= 1
+                self._busy += 1
+                self._running[job_id] = current
+                self._publish_slots()
+            try:
+                self._handler(job)
+            except Exception as e:
+                logger.exception("job_worker_error", job_id=str(job_id), error=str(e))
+            finally:
+                with self._lock:
+                    detached = current in self._detached
+                    if detached:
+                        # Slot déjà rendu par detach() et thread remplacé : on sort du pool.
+                        self._detached.discard(current)
+                    else:
+                        if self._running.get(job_id) is current:
+                            del self._running[job_id]
+                        self._busy -= 1
+                        self._publish_slots()
+                        self._idle.notify_all()
+                if detached:
+                    return
+                self._notify_slot_freed()
+
+    def _notify_slot_freed(self) -> None:
+        if self._on_slot_freed is not None:
+            try:
+                self._on_slot_freed()
+            except Exception as e:
+                logger.warning("worker_slot_callback_failed", error=str(e))
+
+    def _publish_slots(self) -> None:
+        # Appelé sous self._lock.
+        set_scheduler_worker_slots(
+            busy=self._busy,
+            idle=max(0, self.size - self._busy),
+            queued=self._queued,
+        )
@@ -24,6 +24,14 @@ class SlackSendResult:
     reason: str | None = None
 
 
+@dataclass(frozen=True)
+class _PendingSlackSend:
+    delivery: SlackDelivery
+    webhook_url: str
+    message_text: str
+    channel: str | None
+
+
 def send_slack_if_not_sent(
     db: Session,
     *,
@@ -33,6 +41,75 @@ def send_slack_if_not_sent(
     dedupe_key: str,
     message_text: str,
 ) -> SlackSendResult:
+    pending = _prepare_slack_send(
+        db,
+        user_id=user_id,
+        project_id=project_id,
+        notification_type=notification_type,
+        dedupe_key=dedupe_key,
+        message_text=message_text,
+    )
+    if isinstance(pending, SlackSendResult):
+        return pending
+
+    try:
+        provider_message_id = _send_slack_webhook(
+            webhook_url=pending.webhook_url,
+            message_text=pending.message_text,
+            channel=pending.channel,
+        )
+    except Exception as exc:
+        return _record_slack_send_failed(db, pending, exc)
+    return _record_slack_sent(db, pending, provider_message_id)
+
+
+async def send_slack_if_not_sent_async(
+    db: Session,
+    *,
+    client: httpx.AsyncClient,
+    run_db,
+    user_id: str | UUID,
+    project_id: str | UUID,
+    notification_type: str,
+    dedupe_key: str,
+    message_text: str,
+) -> SlackSendResult:
+    """
+    Variante asyncio : les étapes DB passent par `run_db`, le webhook est attendu sur la boucle.
+    """
+    pending = await run_db(
+        _prepare_slack_send,
+        db,
+        user_id=user_id,
+        project_id=project_id,
+        notification_type=notification_type,
+        dedupe_key=dedupe_key,
+        message_text=message_text,
+    )
+    if isinstance(pending, SlackSendResult):
+        return pending
+
+    try:
+        provider_message_id = await _send_slack_webhook_async(
+            client=client,
+            webhook_url=pending.webhook_url,
+            message_text=pending.message_text,
+            channel=pending.channel,
+        )
+    except Exception as exc:
+        return await run_db(_record_slack_send_failed, db, pending, exc)
+    return await run_db(_record_slack_sent, db, pending, provider_message_id)
+
+
+def _prepare_slack_send(
+    db: Session,
+    *,
+    user_id: str | UUID,
+    project_id: str | UUID,
+    notification_type: str,
+    dedupe_key: str,
+    message_text: str,
+) -> SlackSendResult | _PendingSlackSend:
     if notification_type not in SUPPORTED_SLACK_TYPES:
         raise ValueError(f"Unsupported Slack notification type: {notification_type}")
     if not dedupe_key:
@@ -46,7 +123,7 @@ def send_slack_if_not_sent(
     existing = db.query(SlackDelivery).filter(SlackDelivery.dedupe_key == dedupe_key).first()
     if existing is not None:
         if existing.status in {"queued", "failed"}:
-            return _send_existing_delivery(
+            return _prepare_existing_delivery(
                 db=db,
                 delivery=existing,
                 message_text=message_text,
@@ -111,7 +188,7 @@ def send_slack_if_not_sent(
             reason="duplicate_dedupe_key",
         )
 
-    return _send_existing_delivery(
+    return _prepare_existing_delivery(
         db=db,
         delivery=delivery,
         message_text=message_text,
@@ -130,12 +207,12 @@ def _suppression_reason(project: Project) -> str | None:
     return None
 
 
-def _send_existing_delivery(
+def _prepare_existing_delivery(
     db: Session,
     *,
     delivery: SlackDelivery,
     message_text: str,
-) -> SlackSendResult:
+) -> SlackSendResult | _PendingSlackSend:
     db.refresh(delivery)
     project = db.query(Project).filter(Project.id == delivery.project_id).first()
     if project is None:
@@ -161,29 +238,35 @@ def _send_existing_delivery(
     }
     db.commit()
 
-    try:
-        provider_message_id = _send_slack_webhook(
-            webhook_url=project.slack_webhook_url or "",
-            message_text=message_text,
-            channel=project.slack_channel,
-        )
-    except Exception as exc:
-        db.refresh(delivery)
-        delivery.status = "failed"
-        delivery.error_message = str(exc)
-        db.commit()
-        logger.warning(
-            "slack_send_failed",
-            slack_delivery_id=str(delivery.id),
-            project_id=str(delivery.project_id),
-            error=str(exc),
-        )
-        return SlackSendResult(
-            status="failed",
-            slack_delivery_id=str(delivery.id),
-            reason=str(exc),
-        )
+    return _PendingSlackSend(
+        delivery=delivery,
+        webhook_url=project.slack_webhook_url or "",
+        message_text=message_text,
+        channel=project.slack_channel,
+    )
+
+
+def _record_slack_send_failed(db: Session, pending: _PendingSlackSend, exc: Exception) -> SlackSendResult:
+    delivery = pending.delivery
+    db.refresh(delivery)
+    delivery.status = "failed"
+    delivery.error_message = str(exc)
+    db.commit()
+    logger.warning(
+        "slack_send_failed",
+        slack_delivery_id=str(delivery.id),
+        project_id=str(delivery.project_id),
+        error=str(exc),
+    )
+    return SlackSendResult(
+        status="failed",
+        slack_delivery_id=str(delivery.id),
+        reason=str(exc),
+    )
+
 
+def _record_slack_sent(db: Session, pending: _PendingSlackSend, provider_message_id: str) -> SlackSendResult:
+    delivery = pending.delivery
     db.refresh(delivery)
     delivery.status = "sent"
     delivery.provider_message_id = provider_message_id
@@ -205,18 +288,42 @@ def _send_existing_delivery(
 
 
 def _send_slack_webhook(*, webhook_url: str, message_text: str, channel: str | None = None) -> str:
+    with httpx.Client(timeout=_slack_timeout_seconds()) as client:
+        response = client.post(webhook_url, json=_build_webhook_payload(message_text=message_text, channel=channel))
+        return _parse_webhook_response(response)
+
+
+async def _send_slack_webhook_async(
+    *,
+    client: httpx.AsyncClient,
+    webhook_url: str,
+    message_text: str,
+    channel: str | None = None,
+) -> str:
+    response = await client.post(
+        webhook_url,
+        json=_build_webhook_payload(message_text=message_text, channel=channel),
+        timeout=_slack_timeout_seconds(),
+    )
+    return _parse_webhook_response(response)
+
+
+def _build_webhook_payload(*, message_text: str, channel: str | None) -> dict[str, Any]:
     payload: dict[str, Any] = {"text": message_text}
     if channel:
         payload["channel"] = channel
+    return payload
+
+
+def _slack_timeout_seconds() -> float:
+    return float(max(1, int(getattr(settings, "SLACK_HTTP_TIMEOUT_SECONDS", 10) or 10)))
 
-    timeout = float(max(1, int(getattr(settings, "SLACK_HTTP_TIMEOUT_SECONDS", 10) or 10)))
-    with httpx.Client(timeout=timeout) as client:
-        response = client.post(webhook_url, json=payload)
-        response.raise_for_status()
-        body = response.text.strip().lower()
-        if body and body not in {"ok", "accepted"}:
-            raise RuntimeError(f"Slack webhook returned unexpected body: {response.text}")
 
+def _parse_webhook_response(response: httpx.Response) -> str:
+    response.raise_for_status()
+    body = response.text.strip().lower()
+    if body and body not in {"ok", "accepted"}:
+        raise RuntimeError(f"Slack webhook returned unexpected body: {response.text}")
     return f"slack_webhook:{int(datetime.now(timezone.utc).timestamp())}"
 
 
@@ -0,0 +1,183 @@
+"""
+Benchmark de l'écriture des MetricSample : un commit par sample vs écriture groupée (MetricSampleWriter).
+
+Des threads concurrents (les workers du poller) écrivent chacun leurs samples via le chemin réel
+du collecteur (_store_metric_sample), sans fetch HTTP ; on mesure le débit (samples/s) et la latence
+d'acquittement (p50/p99, appel -> sample commité) dans les deux modes.
+
+Usage (depuis backend/) :
+    python -m benchmarks.metric_sample_writer_benchmark --samples 20000 --threads 32
+    python -m benchmarks.metric_sample_writer_benchmark --database-url postgresql://.../seqpulse_bench
+
+Par défaut une base SQLite temporaire (WAL) est utilisée ; avec --database-url, utiliser
+une base jetable : la table metric_samples est créée si absente puis vidée.
+"""
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+from uuid import uuid4
+
+from sqlalchemy import create_engine, delete, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.logging_config import configure_logging
+from app.db.models.metric_sample import MetricSample
+from app.metrics import collector as collector_module
+from app.metrics.sample_writer import MetricSampleWriter
+
+MODES = ("commit", "buffered")
+
+METRICS = {
+    "requests_per_sec": 42.0,
+    "latency_p95": 180.0,
+    "error_rate": 0.01,
+    "cpu_usage": 0.35,
+    "memory_usage": 0.5,
+}
+
+
+def _build_engine(database_url: str | None, pool_size: int):
+    if database_url:
+        return create_engine(database_url, pool_size=pool_size, max_overflow=pool_size), None
+
+    fd, db_path = tempfile.mkstemp(prefix="sample-writer-bench-", suffix=".db")
+    os.close(fd)
+    engine = create_engine(
+        f"sqlite+pysqlite:///{db_path}",
+        pool_size=pool_size,
+        max_overflow=pool_size,
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    return engine, db_path
+
+
+def run_mode(mode: str, *, session_local, samples: int, threads: int, batch_size: int, flush_interval_ms: float) -> dict:
+    with session_local() as session:
+        session.execute(delete(MetricSample))
+        session.commit()
+
+    writer = None
+    original_enabled = collector_module.BUFFERED_WRITES_ENABLED
+    original_get_writer = collector_module.get_sample_writer
+    if mode == "buffered":
+        writer = MetricSampleWriter(
+            session_factory=session_local,
+            batch_size=batch_size,
+            flush_interval_seconds=flush_interval_ms / 1000.0,
+        )
+        writer.start()
+        collector_module.get_sample_writer = lambda: writer
+    collector_module.BUFFERED_WRITES_ENABLED = mode == "buffered"
+
+    per_thread = [samples // threads + (1 if idx < samples % threads else 0) for idx in range(threads)]
+    latencies: list[list[float]] = [[] for _ in range(threads)]
+    start_barrier = threading.Barrier(threads + 1)
+
+    def _worker(idx: int) -> None:
+        start_barrier.wait()
+        with session_local() as db:
+            for _ in range(per_thread[idx]):
+                started = time.perf_counter()
+                # Un déploiement par sample : aucun doublon sur (deployment_id, phase, collected_at).
+                collector_module._store_metric_sample(
+                    db,
+                    deployment_id=uuid4(),
+                    phase="post",
+                    metrics_endpoint="https://app.bench.invalid/ds-metrics",
+                    data=METRICS,
+                    fetch_duration_ms=0,
+                )
+                latencies[idx].append(time.perf_counter() - started)
+
+    workers = [threading.Thread(target=_worker, args=(idx,)) for idx in range(threads)]
+    try:
+        for worker in workers:
+            worker.start()
+        start_barrier.wait()
+        started = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        collector_module.BUFFERED_WRITES_ENABLED = original_enabled
+        collector_module.get_sample_writer = original_get_writer
+        if writer is not None:
+            writer.stop(timeout=30)
+
+    with session_local() as session:
+        written = session.execute(select(func.count(MetricSample.id))).scalar_one()
+
+    ordered = sorted(latency for thread_latencies in latencies for latency in thread_latencies)
+    return {
+        "mode": mode,
+        "samples": len(ordered),
+        "written": written,
+        "elapsed_s": elapsed,
+        "samples_per_sec": len(ordered) / elapsed if elapsed > 0 else 0.0,
+        "ack_p50_ms": statistics.median(ordered) * 1000 if ordered else 0.0,
+        "ack_p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000 if ordered else 0.0,
+    }
+
+
+def main(argv: list[str] | None = None) -> list[dict]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=32, help="collectes concurrentes (workers du poller)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--flush-interval-ms", type=float, default=5.0)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args(argv)
+    configure_logging(logging.WARNING)
+
+    threads = max(1, args.threads)
+    engine, db_path = _build_engine(args.database_url, pool_size=threads + 1)
+    MetricSample.__table__.create(bind=engine, checkfirst=True)
+    session_local = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    print(
+        f"samples={args.samples} threads={threads} batch_size={args.batch_size} "
+        f"flush_interval_ms={args.flush_interval_ms} dialect={engine.dialect.name}"
+    )
+    print(f"{'mode':<10}{'samples':>9}{'written':>9}{'elapsed_s':>12}{'samples/s':>12}{'p50_ack_ms':>13}{'p99_ack_ms':>13}")
+    results = []
+    try:
+        for mode in args.modes:
+            result = run_mode(
+                mode,
+                session_local=session_local,
+                samples=args.samples,
+                threads=threads,
+                batch_size=args.batch_size,
+                flush_interval_ms=args.flush_interval_ms,
+            )
+            results.append(result)
+            print(
+                f"{result['mode']:<10}{result['samples']:>9}{result['written']:>9}"
+                f"{result['elapsed_s']:>12.2f}{result['samples_per_sec']:>12.1f}"
+                f"{result['ack_p50_ms']:>13.2f}{result['ack_p99_ms']:>13.2f}"
+            )
+    finally:
+        engine.dispose()
+        if db_path:
+            try:
+                os.remove(db_path)
+            except FileNotFoundError:
+                pass
+    return results
+
+
+if __name__ == "__main__":
+    main()
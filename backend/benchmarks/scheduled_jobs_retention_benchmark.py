@@ -0,0 +1,273 @@
+"""
+Benchmark de la séparation chaud/froid de scheduled_jobs : latence du claim du poller avec
+un historique croissant de jobs terminés, puis après archivage.
+
+Trois mesures sur le même lot de jobs pending dus :
+- `empty`    : aucun historique
+- `history`  : N jobs terminés (payload JSONB, étalés sur 90 jours) ajoutés à la table
+- `archived` : après passage de l'archivage (app/scheduler/retention.py) jusqu'à épuisement
+
+Avec les index partiels sur les statuts actifs, `history` doit rester au niveau de `empty`.
+Chaque claim est chronométré puis annulé (jobs remis en pending) pour mesurer toujours le même lot.
+
+Usage (depuis backend/) :
+    python -m benchmarks.scheduled_jobs_retention_benchmark --database-url postgresql://.../seqpulse_bench
+    python -m benchmarks.scheduled_jobs_retention_benchmark --history-rows 200000
+
+Postgres : 10M lignes d'historique par défaut (INSERT ... SELECT generate_series, par tranches
+d'un million), base jetable : scheduled_jobs / scheduled_jobs_archive sont vidées.
+Sans --database-url, SQLite temporaire et 200k lignes par défaut (les index partiels Postgres
+n'y existent pas : seul l'ordre de grandeur de l'archivage y est significatif).
+"""
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import create_engine, delete, func, insert, select, text, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.core.logging_config import configure_logging
+from app.db.models.deployment import Deployment
+from app.db.models.project import Project
+from app.db.models.scheduled_job import ScheduledJob
+from app.db.models.scheduled_job_archive import ScheduledJobArchive
+from app.db.models.user import User
+from app.scheduler import retention as retention_module
+from app.scheduler.lanes import LANES
+from app.scheduler.poller import JobPoller
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_for_sqlite(_type, _compiler, **_kwargs):
+    return "JSON"
+
+
+POSTGRES_HISTORY_CHUNK = 1_000_000
+SQLITE_HISTORY_CHUNK = 20_000
+
+POSTGRES_HISTORY_INSERT = """
+INSERT INTO scheduled_jobs (
+    id, job_type, phase, sequence_index, scheduled_at, deadline_at, status, retry_count,
+    last_error, job_metadata, tenant_key, created_at, updated_at
+)
+SELECT
+    gen_random_uuid(), 'post_collect', 'post', g % 15, ts, ts + interval '2 minutes',
+    CASE WHEN g % 50 = 0 THEN 'failed' ELSE 'completed' END, 0,
+    CASE WHEN g % 50 = 0 THEN 'Collection failed: endpoint timeout' END,
+    jsonb_build_object('project_id', md5((g % 5000)::text)),
+    'project:' || md5((g % 5000)::text), ts, ts + interval '5 seconds'
+FROM (
+    SELECT g, now() - random() * interval '90 days' AS ts
+    FROM generate_series(:start, :stop) AS g
+) history
+"""
+
+
+def _build_engine(database_url: str | None):
+    if database_url:
+        return create_engine(database_url, pool_size=5), None
+
+    fd, db_path = tempfile.mkstemp(prefix="retention-bench-", suffix=".db")
+    os.close(fd)
+    engine = create_engine(
+        f"sqlite+pysqlite:///{db_path}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    return engine, db_path
+
+
+def _seed_pending(session_local, pending: int) -> None:
+    now = datetime.now(timezone.utc)
+    with session_local() as session:
+        session.execute(delete(ScheduledJobArchive))
+        session.execute(delete(ScheduledJob))
+        session.add_all(
+            # tenant_key posé à la création (comme tasks.py) : pas de déploiement à créer, et les
+            # clés étrangères Postgres restent satisfaites.
+            ScheduledJob(
+                job_type="post_collect",
+                phase="post",
+                sequence_index=0,
+                scheduled_at=now - timedelta(seconds=idx % 60),
+                deadline_at=now + timedelta(minutes=2),
+                status="pending",
+                job_metadata={"metrics_endpoint": f"https://app-{idx}.bench.invalid/ds-metrics"},
+                tenant_key=f"project:{idx % 50}",
+            )
+            for idx in range(pending)
+        )
+        session.commit()
+
+
+def _refresh_pending(session_local) -> None:
+    # Le seed de 10M lignes dure plusieurs minutes : les jobs pending sont recalés sur l'heure
+    # courante avant chaque mesure, sinon leur deadline passe et le claim mesure aussi les logs
+    # job_deadline_missed.
+    now = datetime.now(timezone.utc)
+    with session_local() as session:
+        pending = session.query(ScheduledJob).filter(ScheduledJob.status == "pending").order_by(ScheduledJob.id)
+        for idx, job in enumerate(pending):
+            job.scheduled_at = now - timedelta(seconds=idx % 60)
+            job.deadline_at = now + timedelta(minutes=2)
+        session.commit()
+
+
+def _seed_history(engine, session_local, rows: int) -> float:
+    started = time.perf_counter()
+    if engine.dialect.name == "postgresql":
+        for start in range(1, rows + 1, POSTGRES_HISTORY_CHUNK):
+            stop = min(rows, start + POSTGRES_HISTORY_CHUNK - 1)
+            with engine.begin() as connection:
+                connection.execute(text(POSTGRES_HISTORY_INSERT), {"start": start, "stop": stop})
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("ANALYZE scheduled_jobs"))
+        return time.perf_counter() - started
+
+    now = datetime.now(timezone.utc)
+    for start in range(0, rows, SQLITE_HISTORY_CHUNK):
+        batch = []
+        for idx in range(start, min(rows, start + SQLITE_HISTORY_CHUNK)):
+            created_at = now - timedelta(days=90 * ((idx * 7919) % rows) / rows)
+            batch.append(
+                {
+                    "id": uuid4(),
+                    "job_type": "post_collect",
+                    "phase": "post",
+                    "sequence_index": idx % 15,
+                    "scheduled_at": created_at,
+                    "deadline_at": created_at + timedelta(minutes=2),
+                    "status": "failed" if idx % 50 == 0 else "completed",
+                    "retry_count": 0,
+                    "job_metadata": {"metrics_endpoint": f"https://app-{idx % 5000}.bench.invalid/ds-metrics"},
+                    "tenant_key": f"project:{idx % 5000}",
+                    "created_at": created_at,
+                    "updated_at": created_at + timedelta(seconds=5),
+                }
+            )
+        with session_local() as session:
+            session.execute(insert(ScheduledJob), batch)
+            session.commit()
+    return time.perf_counter() - started
+
+
+def _measure_claims(session_local, *, claims: int, limit: int) -> dict:
+    poller = JobPoller()
+    lane = LANES[0]
+    durations: list[float] = []
+    for _ in range(claims):
+        with session_local() as session:
+            started = time.perf_counter()
+            claimed = poller._claim_due_jobs(db=session, limit=limit, lane=lane)
+            durations.append(time.perf_counter() - started)
+        # Annule le claim : la mesure suivante porte sur le même lot de jobs dus.
+        with session_local() as session:
+            session.execute(
+                update(ScheduledJob)
+                .where(ScheduledJob.id.in_([job.id for job in claimed]))
+                .values(status="pending", locked_by=None, lease_expires_at=None)
+            )
+            session.commit()
+    ordered = sorted(durations)
+    return {
+        "claim_p50_ms": statistics.median(ordered) * 1000,
+        "claim_p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+    }
+
+
+def _archive_all(engine, session_local, *, batch_size: int) -> tuple[int, float]:
+    original = (retention_module.ARCHIVE_BATCH_SIZE, retention_module.ARCHIVE_MAX_BATCHES_PER_RUN)
+    retention_module.ARCHIVE_BATCH_SIZE = batch_size
+    retention_module.ARCHIVE_MAX_BATCHES_PER_RUN = 100
+    moved_total = 0
+    started = time.perf_counter()
+    try:
+        with session_local() as session:
+            while True:
+                moved = retention_module.archive_terminal_jobs(session, datetime.now(timezone.utc))
+                if not moved:
+                    break
+                moved_total += sum(moved.values())
+    finally:
+        retention_module.ARCHIVE_BATCH_SIZE, retention_module.ARCHIVE_MAX_BATCHES_PER_RUN = original
+    elapsed = time.perf_counter() - started
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("VACUUM ANALYZE scheduled_jobs"))
+    return moved_total, elapsed
+
+
+def _hot_rows(session_local) -> int:
+    with session_local() as session:
+        return session.execute(select(func.count(ScheduledJob.id))).scalar_one()
+
+
+def main(argv: list[str] | None = None) -> list[dict]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history-rows", type=int, default=None, help="10M sur Postgres, 200k sur SQLite")
+    parser.add_argument("--pending", type=int, default=2000, help="jobs pending dus (lot claimé)")
+    parser.add_argument("--claims", type=int, default=200)
+    parser.add_argument("--claim-limit", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=5000, help="taille des lots d'archivage")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args(argv)
+    configure_logging(logging.WARNING)
+
+    engine, db_path = _build_engine(args.database_url)
+    is_postgres = engine.dialect.name == "postgresql"
+    history_rows = args.history_rows if args.history_rows is not None else (10_000_000 if is_postgres else 200_000)
+    if is_postgres:
+        # Clé étrangère scheduled_jobs -> deployments -> projects -> users (tables vides). SQLite
+        # n'applique pas les clés étrangères et ne sait pas compiler projects.envs (ARRAY).
+        for model in (User, Project, Deployment):
+            model.__table__.create(bind=engine, checkfirst=True)
+    ScheduledJob.__table__.create(bind=engine, checkfirst=True)
+    ScheduledJobArchive.__table__.create(bind=engine, checkfirst=True)
+    session_local = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    results = []
+    try:
+        _seed_pending(session_local, args.pending)
+        print(
+            f"dialect={engine.dialect.name} history_rows={history_rows} pending={args.pending} "
+            f"claims={args.claims} claim_limit={args.claim_limit} batch_size={args.batch_size}"
+        )
+        print(f"{'phase':<10}{'hot_rows':>12}{'claim_p50_ms':>14}{'claim_p99_ms':>14}")
+
+        def _report(phase: str) -> None:
+            _refresh_pending(session_local)
+            result = {"phase": phase, "hot_rows": _hot_rows(session_local)}
+            result.update(_measure_claims(session_local, claims=args.claims, limit=args.claim_limit))
+            results.append(result)
+            print(
+                f"{result['phase']:<10}{result['hot_rows']:>12}"
+                f"{result['claim_p50_ms']:>14.2f}{result['claim_p99_ms']:>14.2f}"
+            )
+
+        _report("empty")
+        seed_seconds = _seed_history(engine, session_local, history_rows)
+        _report("history")
+        moved, archive_seconds = _archive_all(engine, session_local, batch_size=args.batch_size)
+        _report("archived")
+        print(
+            f"history seeded in {seed_seconds:.1f}s; archived {moved} jobs in {archive_seconds:.1f}s "
+            f"({moved / archive_seconds if archive_seconds > 0 else 0.0:.0f} jobs/s)"
+        )
+    finally:
+        engine.dispose()
+        if db_path:
+            try:
+                os.remove(db_path)
+            except FileNotFoundError:
+                pass
+    return results
+
+
+if __name__ == "__main__":
+    main()
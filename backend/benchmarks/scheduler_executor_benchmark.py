@@ -0,0 +1,238 @@
+"""
+Benchmark du scheduler : modèle threads (JobWorkerPool) vs exécuteur asyncio (AsyncJobExecutor).
+
+Chaque déploiement simulé a un job post_collect dû immédiatement ; l'endpoint de métriques
+est simulé avec une latence fixe (+ jitter). On mesure le débit (jobs/s) et le délai de
+démarrage (p50/p99, scheduled_at -> début d'exécution) jusqu'à ce que tous les jobs soient traités.
+
+Usage (depuis backend/) :
+    python -m benchmarks.scheduler_executor_benchmark --deployments 1000 --latency-ms 500
+    python -m benchmarks.scheduler_executor_benchmark --database-url postgresql://.../seqpulse_bench
+
+Par défaut une base SQLite temporaire (WAL) est utilisée ; avec --database-url, utiliser
+une base jetable : les tables deployments / scheduled_jobs / metric_samples sont créées si absentes
+et scheduled_jobs / metric_samples sont vidées.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import create_engine, delete, event, func, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.core.logging_config import configure_logging
+from app.db.models.deployment import Deployment
+from app.db.models.metric_sample import MetricSample
+from app.db.models.scheduled_job import ScheduledJob
+from app.metrics import collector as collector_module
+from app.metrics.http_client import build_async_http_client, build_http_client
+from app.scheduler import async_executor as async_executor_module
+from app.scheduler import poller as poller_module
+from app.scheduler.poller import JobPoller
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_for_sqlite(_type, _compiler, **_kwargs):
+    return "JSON"
+
+
+METRICS_PAYLOAD = {
+    "metrics": {
+        "requests_per_sec": 42.0,
+        "latency_p95": 180.0,
+        "error_rate": 0.01,
+        "cpu_usage": 0.35,
+        "memory_usage": 0.5,
+    }
+}
+
+
+def _build_engine(database_url: str | None):
+    if database_url:
+        return create_engine(database_url, pool_size=20, max_overflow=20), None
+
+    fd, db_path = tempfile.mkstemp(prefix="scheduler-bench-", suffix=".db")
+    os.close(fd)
+    engine = create_engine(
+        f"sqlite+pysqlite:///{db_path}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    return engine, db_path
+
+
+def _seed_jobs(session_local, deployments: int) -> datetime:
+    now = datetime.now(timezone.utc)
+    with session_local() as session:
+        session.execute(delete(MetricSample))
+        session.execute(delete(ScheduledJob))
+        session.add_all(
+            ScheduledJob(
+                deployment_id=uuid4(),
+                job_type="post_collect",
+                phase="post",
+                sequence_index=0,
+                scheduled_at=now,
+                status="pending",
+                job_metadata={"metrics_endpoint": f"https://app-{idx}.bench.invalid/ds-metrics"},
+            )
+            for idx in range(deployments)
+        )
+        session.commit()
+    return now
+
+
+def _latency_seconds(latency_ms: float, jitter_ms: float) -> float:
+    return max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000.0
+
+
+def _install_fake_endpoints(mode: str, latency_ms: float, jitter_ms: float):
+    """Remplace l'accès réseau par un endpoint simulé ; retourne une fonction de restauration."""
+    if mode == "thread":
+        original_get_client = collector_module.get_http_client
+
+        def _fake_endpoint_sync(request: httpx.Request) -> httpx.Response:
+            time.sleep(_latency_seconds(latency_ms, jitter_ms))
+            return httpx.Response(200, json=METRICS_PAYLOAD)
+
+        client = build_http_client(transport=httpx.MockTransport(_fake_endpoint_sync))
+        collector_module.get_http_client = lambda: client
+        return lambda: setattr(collector_module, "get_http_client", original_get_client)
+
+    async def _fake_endpoint(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(_latency_seconds(latency_ms, jitter_ms))
+        return httpx.Response(200, json=METRICS_PAYLOAD)
+
+    original_factory = async_executor_module._default_http_client_factory
+    async_executor_module._default_http_client_factory = lambda _max_in_flight: build_async_http_client(
+        transport=httpx.MockTransport(_fake_endpoint)
+    )
+    return lambda: setattr(async_executor_module, "_default_http_client_factory", original_factory)
+
+
+def _count_remaining(session_local) -> int:
+    with session_local() as session:
+        return session.execute(
+            select(func.count(ScheduledJob.id)).where(ScheduledJob.status.in_(("pending", "running")))
+        ).scalar_one()
+
+
+def run_mode(mode: str, *, session_local, deployments: int, latency_ms: float, jitter_ms: float) -> dict:
+    delays: list[float] = []
+    original_observe = poller_module.observe_scheduler_job_start_delay
+    original_session_local = poller_module.SessionLocal
+    original_mode = poller_module.EXECUTION_MODE
+    restore_endpoints = _install_fake_endpoints(mode, latency_ms, jitter_ms)
+
+    poller_module.observe_scheduler_job_start_delay = lambda *, job_type, delay_seconds: delays.append(
+        delay_seconds
+    )
+    poller_module.SessionLocal = session_local
+    poller_module.EXECUTION_MODE = mode
+
+    _seed_jobs(session_local, deployments)
+    poller = JobPoller()
+    started = time.perf_counter()
+    try:
+        # Boucle du poller sans asyncio : un tick dès qu'un slot se libère.
+        while True:
+            poller._process_pending_jobs()
+            if _count_remaining(session_local) == 0:
+                break
+            while poller.worker_pool.free_slots() == 0:
+                time.sleep(0.005)
+        poller.worker_pool.wait_idle(timeout=60)
+        elapsed = time.perf_counter() - started
+    finally:
+        if poller.worker_pool is not None:
+            poller.worker_pool.stop(timeout=30)
+        poller_module.observe_scheduler_job_start_delay = original_observe
+        poller_module.SessionLocal = original_session_local
+        poller_module.EXECUTION_MODE = original_mode
+        restore_endpoints()
+
+    with session_local() as session:
+        completed = session.execute(
+            select(func.count(ScheduledJob.id)).where(ScheduledJob.status == "completed")
+        ).scalar_one()
+
+    ordered = sorted(delays)
+    return {
+        "mode": mode,
+        "jobs": len(ordered),
+        "completed": completed,
+        "elapsed_s": elapsed,
+        "jobs_per_sec": len(ordered) / elapsed if elapsed > 0 else 0.0,
+        "start_delay_p50_s": statistics.median(ordered) if ordered else 0.0,
+        "start_delay_p99_s": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] if ordered else 0.0,
+    }
+
+
+def main(argv: list[str] | None = None) -> list[dict]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deployments", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="latence simulée de l'endpoint")
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--modes", nargs="+", choices=("thread", "async"), default=["thread", "async"])
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args(argv)
+    configure_logging(logging.WARNING)
+
+    engine, db_path = _build_engine(args.database_url)
+    # deployments : requis par la lookup de fairness (vide ici, repli sur la clé déploiement).
+    Deployment.__table__.create(bind=engine, checkfirst=True)
+    ScheduledJob.__table__.create(bind=engine, checkfirst=True)
+    MetricSample.__table__.create(bind=engine, checkfirst=True)
+    session_local = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    print(
+        f"deployments={args.deployments} latency_ms={args.latency_ms} jitter_ms={args.jitter_ms} "
+        f"max_concurrent_jobs={poller_module.MAX_CONCURRENT_JOBS} "
+        f"async_max_in_flight={poller_module.ASYNC_MAX_IN_FLIGHT} async_db_threads={poller_module.ASYNC_DB_THREADS}"
+    )
+    print(f"{'mode':<8}{'jobs':>8}{'done':>8}{'elapsed_s':>12}{'jobs/s':>10}{'p50_delay_s':>14}{'p99_delay_s':>14}")
+    results = []
+    try:
+        for mode in args.modes:
+            result = run_mode(
+                mode,
+                session_local=session_local,
+                deployments=args.deployments,
+                latency_ms=args.latency_ms,
+                jitter_ms=args.jitter_ms,
+            )
+            results.append(result)
+            print(
+                f"{result['mode']:<8}{result['jobs']:>8}{result['completed']:>8}"
+                f"{result['elapsed_s']:>12.2f}{result['jobs_per_sec']:>10.1f}"
+                f"{result['start_delay_p50_s']:>14.2f}{result['start_delay_p99_s']:>14.2f}"
+            )
+    finally:
+        engine.dispose()
+        if db_path:
+            try:
+                os.remove(db_path)
+            except FileNotFoundError:
+                pass
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,833 @@
+"""
+Simulateur de capacité du scheduler : JobPoller piloté par une horloge virtuelle.
+
+Le vrai JobPoller (claims, lanes, fairness DRR, deadlines, catch-up, dépendances, retries,
+dead-letter) tourne sur une base SQLite temporaire ; seuls le temps et les handlers sont simulés :
+- l'horloge virtuelle n'avance que d'un événement au suivant (arrivée d'un déploiement, fin d'un
+  job, tick du poller) : des heures de charge se rejouent en quelques secondes ;
+- les collecteurs, l'analyse et les notifications sont remplacés par des handlers factices dont
+  la latence suit une distribution configurable (et qui échouent avec une probabilité donnée) ;
+- le pool d'exécution est remplacé par un pool simulé : un job occupe son slot pendant sa
+  latence virtuelle. Ses écritures (statut final, libération de l'analyse, retry) sont datées
+  de sa fin mais appliquées au démarrage : un job n'est jamais observé `running` en base.
+
+La charge est synthétique (N déploiements/minute sur M projets, arrivées de Poisson) ou rejouée
+depuis un export CSV (colonnes started_at, project_id, et optionnellement plan,
+observation_window, duration_seconds). Le rapport donne les percentiles du délai de démarrage
+(scheduled_at -> début d'exécution) par type de job, le retard par tenant et le débit.
+
+Usage (depuis backend/) :
+    python -m benchmarks.scheduler_simulation --hours 4 --deployments-per-minute 20 --projects 200
+    python -m benchmarks.scheduler_simulation --hours 1 --max-concurrent-jobs 4 \\
+        --collect-latency lognormal:0.8:0.6 --analysis-latency uniform:5:30 --collect-failure-rate 0.05
+    python -m benchmarks.scheduler_simulation --workload-csv deployments.csv
+
+Export d'une charge réelle (psql) :
+    \\copy (SELECT d.started_at, d.project_id, p.plan, p.observation_window_minutes AS observation_window,
+           d.duration_ms / 1000.0 AS duration_seconds FROM deployments d JOIN projects p ON p.id = d.project_id
+           WHERE d.started_at >= now() - interval '1 day' ORDER BY d.started_at) TO 'deployments.csv' CSV HEADER
+"""
+import argparse
+import csv
+import heapq
+import itertools
+import logging
+import math
+import os
+import random
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import ARRAY, create_engine, func, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.core.logging_config import configure_logging
+from app.core.settings import settings
+from app.db.models.project import Project
+from app.db.models.scheduled_job import ScheduledJob
+from app.db.models.scheduled_job_count import ScheduledJobCount
+from app.db.models.scheduled_job_dead_letter import ScheduledJobDeadLetter
+from app.db.models.scheduler_worker import SchedulerWorker
+from app.scheduler import poller as poller_module
+from app.scheduler.deadlines import deadline_for
+from app.scheduler.dependencies import dependency_metadata
+from app.scheduler.fairness import tenant_key_for_job
+from app.scheduler.job_counts import install_job_count_triggers
+from app.scheduler.job_targets import collect_job_metadata
+from app.scheduler.lanes import lane_for_job_type
+from app.scheduler.poller import JobPoller
+from app.scheduler.sharding import shard_key_for_job
+from app.scheduler.tasks import POST_COLLECTION_INTERVAL_SECONDS, schedule_notification_outbox
+from app.scheduler.timeouts import reset_current_execution, set_current_execution
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_for_sqlite(_type, _compiler, **_kwargs):
+    return "JSON"
+
+
+@compiles(ARRAY, "sqlite")
+def _compile_array_for_sqlite(_type, _compiler, **_kwargs):
+    return "JSON"
+
+
+SIMULATION_EPOCH = datetime(2025, 1, 6, 8, 0, tzinfo=timezone.utc)
+HANDLER_FAMILIES = ("collect", "analysis", "notification")
+_FAMILY_BY_JOB_TYPE = {
+    "pre_collect": "collect",
+    "post_collect": "collect",
+    "observation_session": "collect",
+    "analysis": "analysis",
+    "email_send": "notification",
+    "slack_send": "notification",
+    "notification_outbox": "notification",
+}
+
+
+class VirtualClock:
+    """
+    Horloge injectée dans JobPoller(clock=...) : le temps n'avance que par advance_to().
+    Pendant l'exécution d'un job (measure), sleep() décale l'heure vue par ce job seulement :
+    ses écritures finales sont datées de sa fin, les autres événements ne voient rien passer.
+    """
+
+    def __init__(self, start: datetime = SIMULATION_EPOCH):
+        self._epoch = start
+        self._now = start
+        self._job_elapsed: Optional[float] = None
+
+    def now(self) -> datetime:
+        if self._job_elapsed:
+            return self._now + timedelta(seconds=self._job_elapsed)
+        return self._now
+
+    def monotonic(self) -> float:
+        return (self.now() - self._epoch).total_seconds()
+
+    def perf_counter(self) -> float:
+        return self.monotonic()
+
+    def advance_to(self, when: datetime) -> None:
+        if when > self._now:
+            self._now = when
+
+    def sleep(self, seconds: float) -> None:
+        if self._job_elapsed is None:
+            raise RuntimeError("VirtualClock.sleep() is only valid inside measure()")
+        self._job_elapsed += max(0.0, seconds)
+
+    def measure(self, fn: Callable, *args) -> float:
+        """Exécute fn(*args) et retourne la durée virtuelle écoulée (somme des sleep())."""
+        self._job_elapsed = 0.0
+        try:
+            fn(*args)
+        finally:
+            elapsed, self._job_elapsed = self._job_elapsed, None
+        return elapsed
+
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """
+    Latence d'un handler factice, en secondes :
+    - fixed:A            A
+    - uniform:A:B        uniforme entre A et B
+    - exponential:A      exponentielle de moyenne A
+    - lognormal:A:B      log-normale de médiane A et d'écart-type B (échelle log) : longue traîne
+    """
+
+    kind: str
+    a: float
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        kind, *params = spec.strip().split(":")
+        values = [float(param) for param in params]
+        if kind not in ("fixed", "uniform", "exponential", "lognormal") or not values:
+            raise ValueError(f"Invalid latency distribution: {spec!r}")
+        if kind in ("uniform", "lognormal") and len(values) < 2:
+            raise ValueError(f"Latency distribution {kind!r} needs two parameters: {spec!r}")
+        return cls(kind=kind, a=values[0], b=values[1] if len(values) > 1 else 0.0)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            value = rng.uniform(self.a, self.b)
+        elif self.kind == "exponential":
+            value = rng.expovariate(1.0 / self.a) if self.a > 0 else 0.0
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(math.log(self.a), self.b) if self.a > 0 else 0.0
+        else:
+            value = self.a
+        return max(0.0, value)
+
+
+@dataclass(frozen=True)
+class HandlerProfile:
+    latency: LatencyDistribution
+    failure_rate: float = 0.0
+
+
+DEFAULT_HANDLER_PROFILES = {
+    "collect": HandlerProfile(LatencyDistribution.parse("lognormal:0.5:0.5")),
+    "analysis": HandlerProfile(LatencyDistribution.parse("uniform:2:10")),
+    "notification": HandlerProfile(LatencyDistribution.parse("lognormal:0.3:0.4")),
+}
+
+
+class SimulatedJobFailure(Exception):
+    """Échec injecté par un handler factice (consomme un retry comme un échec réel)."""
+
+
+@dataclass(frozen=True)
+class DeploymentArrival:
+    """Un déploiement de la charge : pre_collect au déclenchement, fenêtre d'observation à la fin."""
+
+    at_seconds: float
+    project_id: uuid.UUID
+    plan: str = "free"
+    observation_window: int = 5
+    duration_seconds: float = 120.0
+
+
+def synthetic_workload(
+    *,
+    duration_seconds: float,
+    deployments_per_minute: float,
+    projects: int,
+    hot_project_share: float = 0.0,
+    plan_mix: Optional[dict[str, float]] = None,
+    observation_window: int = 5,
+    deploy_duration: Optional[LatencyDistribution] = None,
+    seed: int = 0,
+) -> list[DeploymentArrival]:
+    """
+    Arrivées de Poisson à `deployments_per_minute` réparties uniformément sur `projects` projets ;
+    `hot_project_share` de la charge va au premier projet (voisin bruyant).
+    """
+    rng = random.Random(seed)
+    deploy_duration = deploy_duration or LatencyDistribution.parse("uniform:60:300")
+    plan_mix = plan_mix or {"free": 1.0}
+    plans, weights = zip(*sorted(plan_mix.items()))
+    project_ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(max(1, projects))]
+    project_plans = {project_id: rng.choices(plans, weights)[0] for project_id in project_ids}
+
+    arrivals = []
+    rate_per_second = deployments_per_minute / 60.0
+    at = rng.expovariate(rate_per_second) if rate_per_second > 0 else duration_seconds
+    while at < duration_seconds:
+        if rng.random() < hot_project_share:
+            project_id = project_ids[0]
+        else:
+            project_id = rng.choice(project_ids)
+        arrivals.append(
+            DeploymentArrival(
+                at_seconds=at,
+                project_id=project_id,
+                plan=project_plans[project_id],
+                observation_window=observation_window,
+                duration_seconds=deploy_duration.sample(rng),
+            )
+        )
+        at += rng.expovariate(rate_per_second)
+    return arrivals
+
+
+def load_workload_csv(path: str, *, default_observation_window: int = 5) -> list[DeploymentArrival]:
+    """Charge exportée (voir l'en-tête du module) ; instants rebasés sur le premier déploiement."""
+    with open(path, newline="") as handle:
+        rows = list(csv.DictReader(handle))
+    if not rows:
+        return []
+    started = [datetime.fromisoformat(row["started_at"]) for row in rows]
+    origin = min(started)
+    arrivals = []
+    for row, started_at in zip(rows, started):
+        arrivals.append(
+            DeploymentArrival(
+                at_seconds=(started_at - origin).total_seconds(),
+                project_id=uuid.UUID(row["project_id"]),
+                plan=row.get("plan") or "free",
+                observation_window=int(row.get("observation_window") or default_observation_window),
+                duration_seconds=float(row.get("duration_seconds") or 120.0),
+            )
+        )
+    return sorted(arrivals, key=lambda arrival: arrival.at_seconds)
+
+
+class SimulatedWorkerPool:
+    """
+    Pool compatible JobWorkerPool, sans threads : submit() exécute le job tout de suite (horloge
+    figée à son démarrage) et garde le slot occupé jusqu'à la fin de sa latence virtuelle.
+    """
+
+    def __init__(self, *, size: int, clock: VirtualClock, execute: Callable, on_start: Callable):
+        self.capacity = max(1, int(size))
+        self._clock = clock
+        self._execute = execute
+        self._on_start = on_start
+        self._in_flight: dict = {}
+        self._completions: list = []
+        self._sequence = itertools.count()
+        self.busy_seconds = 0.0
+
+    @property
+    def busy(self) -> int:
+        return len(self._in_flight)
+
+    @property
+    def queued(self) -> int:
+        return 0
+
+    def start(self) -> None:
+        return None
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        return None
+
+    def free_slots(self) -> int:
+        return max(0, self.capacity - len(self._in_flight))
+
+    def submit(self, job) -> bool:
+        if self.free_slots() <= 0:
+            return False
+        self._on_start(job)
+        elapsed, finish = self._execute(job)
+        finish_at = self._clock.now() + timedelta(seconds=elapsed)
+        self._in_flight[job.id] = finish
+        self.busy_seconds += elapsed
+        heapq.heappush(self._completions, (finish_at, next(self._sequence), job.id))
+        return True
+
+    def drain_queued(self) -> list:
+        return []
+
+    def detach(self, job_id) -> None:
+        self._in_flight.pop(job_id, None)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        return not self._in_flight
+
+    def next_completion_at(self) -> Optional[datetime]:
+        return self._completions[0][0] if self._completions else None
+
+    def complete_until(self, now: datetime) -> int:
+        completed = 0
+        while self._completions and self._completions[0][0] <= now:
+            _, _, job_id = heapq.heappop(self._completions)
+            finish = self._in_flight.pop(job_id, None)
+            if finish is not None:
+                finish()
+                completed += 1
+        return completed
+
+
+@dataclass
+class _JobStart:
+    job_type: str
+    tenant: str
+    delay_seconds: float
+    late: bool
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def _delay_summary(delays: list[float]) -> dict:
+    ordered = sorted(delays)
+    return {
+        "count": len(ordered),
+        "p50_s": _percentile(ordered, 0.50),
+        "p95_s": _percentile(ordered, 0.95),
+        "p99_s": _percentile(ordered, 0.99),
+        "max_s": ordered[-1] if ordered else 0.0,
+    }
+
+
+@dataclass
+class SimulationReport:
+    simulated_seconds: float
+    wall_seconds: float
+    deployments: int
+    ticks: int
+    capacity: int
+    jobs_started: int
+    handler_failures: int
+    busy_seconds: float
+    final_status: dict[str, int]
+    dead_lettered: int
+    start_delay: dict[str, dict]
+    tenants: dict[str, dict]
+    completed_per_minute: float = field(default=0.0)
+
+    @property
+    def utilisation(self) -> float:
+        if self.simulated_seconds <= 0:
+            return 0.0
+        return self.busy_seconds / (self.capacity * self.simulated_seconds)
+
+    @property
+    def wall_ms_per_tick(self) -> float:
+        # Coût CPU réel d'un tick du poller (SQLite) : à surveiller autant que les délais simulés.
+        return self.wall_seconds * 1000 / self.ticks if self.ticks else 0.0
+
+    @property
+    def speedup(self) -> float:
+        return self.simulated_seconds / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def worst_tenants(self, top_n: int = 10) -> list[tuple[str, dict]]:
+        return sorted(self.tenants.items(), key=lambda item: item[1]["p95_s"], reverse=True)[:top_n]
+
+    def format(self, top_tenants: int = 10) -> str:
+        lines = [
+            f"simulated={self.simulated_seconds / 3600:.2f}h wall={self.wall_seconds:.1f}s "
+            f"(x{self.speedup:.0f}) deployments={self.deployments} ticks={self.ticks} "
+            f"wall_ms/tick={self.wall_ms_per_tick:.1f}",
+            f"capacity={self.capacity} jobs_started={self.jobs_started} "
+            f"completed/min={self.completed_per_minute:.1f} utilisation={self.utilisation:.0%} "
+            f"handler_failures={self.handler_failures} dead_lettered={self.dead_lettered}",
+            "final_status: " + " ".join(f"{status}={count}" for status, count in sorted(self.final_status.items())),
+            "",
+            f"{'start delay':<22}{'jobs':>8}{'p50_s':>10}{'p95_s':>10}{'p99_s':>10}{'max_s':>10}",
+        ]
+        for name, summary in sorted(self.start_delay.items()):
+            lines.append(
+                f"{name:<22}{summary['count']:>8}{summary['p50_s']:>10.1f}{summary['p95_s']:>10.1f}"
+                f"{summary['p99_s']:>10.1f}{summary['max_s']:>10.1f}"
+            )
+        lines += ["", f"{'tenant (worst p95)':<50}{'jobs':>8}{'late':>8}{'p95_s':>10}{'max_s':>10}"]
+        for tenant, summary in self.worst_tenants(top_tenants):
+            lines.append(
+                f"{tenant:<50}{summary['count']:>8}{summary['late']:>8}"
+                f"{summary['p95_s']:>10.1f}{summary['max_s']:>10.1f}"
+            )
+        return "\n".join(lines)
+
+
+class SchedulerSimulation:
+    """
+    Rejoue `workload` sur un JobPoller réel (horloge virtuelle, pool et handlers simulés).
+    Boucle à événements discrets, calquée sur _poll_forever : un tick au fallback POLL_INTERVAL,
+    à l'échéance du prochain job dû (s'il reste un slot), à chaque slot libéré et à chaque
+    arrivée de déploiement (LISTEN/NOTIFY).
+    """
+
+    def __init__(
+        self,
+        *,
+        session_local,
+        workload: list[DeploymentArrival],
+        handler_profiles: Optional[dict[str, HandlerProfile]] = None,
+        max_concurrent_jobs: Optional[int] = None,
+        observation_sessions: Optional[bool] = None,
+        notification_ratio: float = 0.3,
+        settle_seconds: float = 3600.0,
+        seed: int = 0,
+        start_at: datetime = SIMULATION_EPOCH,
+    ):
+        self.session_local = session_local
+        self.workload = sorted(workload, key=lambda arrival: arrival.at_seconds)
+        self.handler_profiles = {**DEFAULT_HANDLER_PROFILES, **(handler_profiles or {})}
+        self.observation_sessions = (
+            settings.SCHEDULER_OBSERVATION_SESSIONS_ENABLED if observation_sessions is None else observation_sessions
+        )
+        self.notification_ratio = notification_ratio
+        self.settle_seconds = settle_seconds
+        self.seed = seed
+        self.start_at = start_at
+        self.clock = VirtualClock(start_at)
+        self.rng = random.Random(seed)
+        self.poller = JobPoller(role="simulation", max_concurrent_jobs=max_concurrent_jobs, clock=self.clock)
+        self.poller._run_job = self._run_fake_job
+        self.pool = SimulatedWorkerPool(
+            size=self.poller.max_concurrent_jobs,
+            clock=self.clock,
+            execute=self._execute,
+            on_start=self._record_start,
+        )
+        self.poller.worker_pool = self.pool
+        self._starts: list[_JobStart] = []
+        self._handler_failures = 0
+        self._events: list = []
+        self._event_sequence = itertools.count()
+
+    # -- charge ---------------------------------------------------------------------------
+
+    def _at(self, seconds: float) -> datetime:
+        return self.start_at + timedelta(seconds=seconds)
+
+    def _push_event(self, at: datetime, action: Callable) -> None:
+        heapq.heappush(self._events, (at, next(self._event_sequence), action))
+
+    def _seed_projects(self) -> None:
+        plans = {arrival.project_id: arrival.plan for arrival in self.workload}
+        with self.session_local() as db:
+            db.add_all(
+                Project(
+                    id=project_id,
+                    name=f"sim-{project_id.hex[:8]}",
+                    owner_id=uuid.uuid4(),
+                    api_key=f"sim-{project_id.hex}",
+                    hmac_secret=f"sim-{project_id.hex}",
+                    envs='["prod"]',  # ARRAY rendu en JSON sous SQLite : valeur déjà sérialisée
+                    plan=plan,
+                )
+                for project_id, plan in plans.items()
+            )
+            db.commit()
+
+    def _job(self, arrival: DeploymentArrival, deployment_id, job_type: str, scheduled_at: datetime, **values):
+        return ScheduledJob(
+            deployment_id=deployment_id,
+            job_type=job_type,
+            scheduled_at=scheduled_at,
+            deadline_at=deadline_for(job_type, scheduled_at),
+            status="pending",
+            shard_key=shard_key_for_job(project_id=arrival.project_id, deployment_id=deployment_id),
+            tenant_key=tenant_key_for_job(project_id=arrival.project_id, deployment_id=deployment_id),
+            created_at=self.clock.now(),
+            **values,
+        )
+
+    def _trigger_deployment(self, arrival: DeploymentArrival) -> None:
+        # Même forme que trigger_deployment_flow / finish_deployment_flow (app/deployments/services.py).
+        deployment_id = uuid.uuid4()
+        now = self.clock.now()
+        with self.session_local() as db:
+            db.add(
+                self._job(
+                    arrival,
+                    deployment_id,
+                    "pre_collect",
+                    now,
+                    phase="pre",
+                    job_metadata=collect_job_metadata(arrival.project_id),
+                )
+            )
+            db.commit()
+        self._push_event(
+            now + timedelta(seconds=arrival.duration_seconds),
+            lambda: self._finish_deployment(arrival, deployment_id),
+        )
+
+    def _finish_deployment(self, arrival: DeploymentArrival, deployment_id) -> None:
+        now = self.clock.now()
+        window = max(1, arrival.observation_window)
+        jobs = []
+        if self.observation_sessions:
+            metadata = collect_job_metadata(arrival.project_id)
+            metadata.update(
+                {
+                    "observation_window": window,
+                    "interval_seconds": POST_COLLECTION_INTERVAL_SECONDS,
+                    "started_at": now.isoformat(),
+                    "shift_seconds": 0.0,
+                }
+            )
+            jobs.append(
+                self._job(
+                    arrival, deployment_id, "observation_session", now, phase="post", sequence_index=0,
+                    job_metadata=metadata,
+                )
+            )
+        else:
+            for index in range(window):
+                jobs.append(
+                    self._job(
+                        arrival,
+                        deployment_id,
+                        "post_collect",
+                        now + timedelta(seconds=index * POST_COLLECTION_INTERVAL_SECONDS),
+                        phase="post",
+                        sequence_index=index,
+                        job_metadata=collect_job_metadata(arrival.project_id),
+                    )
+                )
+        analysis_at = now + timedelta(minutes=window)
+        jobs.append(self._job(arrival, deployment_id, "analysis", analysis_at, job_metadata=dependency_metadata(analysis_at)))
+        with self.session_local() as db:
+            db.add_all(jobs)
+            db.commit()
+
+    # -- exécution ------------------------------------------------------------------------
+
+    def _record_start(self, job) -> None:
+        started_at = self.clock.now()
+        scheduled_at = _as_utc(job.scheduled_at)
+        deadline_at = _as_utc(job.deadline_at) if job.deadline_at is not None else None
+        self._starts.append(
+            _JobStart(
+                job_type=job.job_type,
+                tenant=job.tenant_key or "unknown",
+                delay_seconds=max(0.0, (started_at - scheduled_at).total_seconds()),
+                late=deadline_at is not None and started_at > deadline_at,
+            )
+        )
+
+    def _execute(self, job):
+        # Même séquence que JobPoller._execute_claimed_job ; la fin de suivi (slot, lane) est
+        # différée à la fin virtuelle du job.
+        db = self.session_local()
+        execution = self.poller._begin_execution_tracking(db, job)
+        token = set_current_execution(execution)
+        try:
+            elapsed = self.clock.measure(self.poller._execute_job, db, job, execution)
+        finally:
+            reset_current_execution(token)
+            db.close()
+        return elapsed, lambda: self.poller._end_execution_tracking(job, execution)
+
+    def _run_fake_job(self, db, job) -> None:
+        family = _FAMILY_BY_JOB_TYPE.get(job.job_type, "notification")
+        if job.job_type == "analysis":
+            # Dépendances réelles : l'analyse attend la fin de la collecte du déploiement.
+            self.poller._wait_for_upstream(db, job)
+        profile = self.handler_profiles[family]
+        items = len((job.job_metadata or {}).get("notifications") or ()) or 1
+        for _ in range(items):
+            self.clock.sleep(profile.latency.sample(self.rng))
+        if profile.failure_rate > 0 and self.rng.random() < profile.failure_rate:
+            self._handler_failures += 1
+            raise SimulatedJobFailure(f"simulated {family} failure")
+        if job.job_type == "analysis" and self.rng.random() < self.notification_ratio:
+            schedule_notification_outbox(
+                db,
+                deployment_id=job.deployment_id,
+                dedupe_key=f"sim-analysis-{job.deployment_id}",
+                notifications=[
+                    {"channel": "email", "payload": {"email_type": "analysis_result"}},
+                    {"channel": "slack", "payload": {"notification_type": "analysis_result"}},
+                ],
+                project_id=(job.tenant_key or "").partition(":")[2] or None,
+                scheduled_at=self.clock.now(),
+                autocommit=False,
+            )
+
+    # -- boucle ---------------------------------------------------------------------------
+
+    def run(self) -> SimulationReport:
+        original_session_local = poller_module.SessionLocal
+        state = random.getstate()
+        # Jitter des retries (RetryPolicy.delay_seconds) : reproductible d'un run à l'autre.
+        random.seed(self.seed)
+        poller_module.SessionLocal = self.session_local
+        wall_started = time.perf_counter()
+        try:
+            self._seed_projects()
+            for arrival in self.workload:
+                self._push_event(self._at(arrival.at_seconds), lambda arrival=arrival: self._trigger_deployment(arrival))
+            ticks, end_at = self._loop()
+        finally:
+            poller_module.SessionLocal = original_session_local
+            random.setstate(state)
+        return self._report(ticks=ticks, end_at=end_at, wall_seconds=time.perf_counter() - wall_started)
+
+    def _loop(self) -> tuple[int, datetime]:
+        workload_end = self._at(self.workload[-1].at_seconds if self.workload else 0.0)
+        hard_stop = workload_end + timedelta(seconds=self.settle_seconds)
+        poll_interval = timedelta(seconds=poller_module.POLL_INTERVAL)
+        next_tick_at = self.start_at
+        ticks = 0
+        while True:
+            now = self.clock.now()
+            freed = self.pool.complete_until(now)
+            arrived = False
+            while self._events and self._events[0][0] <= now:
+                _, _, action = heapq.heappop(self._events)
+                action()
+                arrived = True
+
+            # Un tick sans job dû ne réclame rien : seuls ceux qui peuvent claimer sont rejoués
+            # (fallback POLL_INTERVAL et slots libérés compris), le reste du temps est sauté.
+            tick_due = next_tick_at is not None and now >= next_tick_at
+            if (tick_due or freed or arrived) and self._has_due_jobs(now):
+                claimed, next_due_at = self.poller._process_pending_jobs()
+                ticks += 1
+                next_tick_at = now + poll_interval
+                if next_due_at is not None and self.pool.free_slots() > 0:
+                    if next_due_at > now:
+                        next_tick_at = min(next_tick_at, next_due_at)
+                    elif claimed:
+                        # Encore des jobs dus et des slots : tick suivant immédiat, comme _poll_forever.
+                        next_tick_at = now
+            else:
+                next_due_at = self._next_due_at()
+                next_tick_at = max(now, next_due_at) if next_due_at is not None else None
+
+            if not self._events and not self.pool.busy and next_tick_at is None:
+                return ticks, now
+            candidates = [at for at in (next_tick_at, self.pool.next_completion_at()) if at is not None]
+            if self._events:
+                candidates.append(self._events[0][0])
+            next_at = min(candidates)
+            if next_at > hard_stop:
+                return ticks, hard_stop
+            self.clock.advance_to(next_at)
+
+    def _has_due_jobs(self, now: datetime) -> bool:
+        next_due_at = self._next_due_at()
+        return next_due_at is not None and next_due_at <= now
+
+    def _next_due_at(self) -> Optional[datetime]:
+        with self.session_local() as db:
+            next_due_at = db.execute(
+                select(func.min(ScheduledJob.scheduled_at)).where(ScheduledJob.status == "pending")
+            ).scalar_one()
+        return _as_utc(next_due_at) if next_due_at is not None else None
+
+    def _report(self, *, ticks: int, end_at: datetime, wall_seconds: float) -> SimulationReport:
+        with self.session_local() as db:
+            final_status = dict(
+                db.execute(select(ScheduledJob.status, func.count(ScheduledJob.id)).group_by(ScheduledJob.status)).all()
+            )
+            dead_lettered = db.execute(select(func.count(ScheduledJobDeadLetter.id))).scalar_one()
+
+        by_type: dict[str, list[float]] = defaultdict(list)
+        by_lane: dict[str, list[float]] = defaultdict(list)
+        by_tenant: dict[str, list[_JobStart]] = defaultdict(list)
+        for start in self._starts:
+            by_type[start.job_type].append(start.delay_seconds)
+            by_lane[f"lane:{lane_for_job_type(start.job_type).name}"].append(start.delay_seconds)
+            by_tenant[start.tenant].append(start)
+
+        start_delay = {"all": _delay_summary([start.delay_seconds for start in self._starts])}
+        start_delay.update({job_type: _delay_summary(delays) for job_type, delays in by_type.items()})
+        start_delay.update({lane: _delay_summary(delays) for lane, delays in by_lane.items()})
+        tenants = {}
+        for tenant, starts in by_tenant.items():
+            summary = _delay_summary([start.delay_seconds for start in starts])
+            summary["late"] = sum(1 for start in starts if start.late)
+            tenants[tenant] = summary
+
+        simulated_seconds = max(0.0, (end_at - self.start_at).total_seconds())
+        completed = Counter(final_status)["completed"]
+        return SimulationReport(
+            simulated_seconds=simulated_seconds,
+            wall_seconds=wall_seconds,
+            deployments=len(self.workload),
+            ticks=ticks,
+            capacity=self.pool.capacity,
+            jobs_started=len(self._starts),
+            handler_failures=self._handler_failures,
+            busy_seconds=self.pool.busy_seconds,
+            final_status=final_status,
+            dead_lettered=dead_lettered,
+            start_delay=start_delay,
+            tenants=tenants,
+            completed_per_minute=completed / (simulated_seconds / 60.0) if simulated_seconds > 0 else 0.0,
+        )
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def build_sqlite_session_local():
+    """Base SQLite temporaire avec les tables lues par le poller ; retourne (session_local, cleanup)."""
+    fd, db_path = tempfile.mkstemp(prefix="scheduler-sim-", suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite+pysqlite:///{db_path}", connect_args={"check_same_thread": False})
+    for model in (Project, ScheduledJob, ScheduledJobCount, ScheduledJobDeadLetter, SchedulerWorker):
+        model.__table__.create(bind=engine)
+    with engine.begin() as connection:
+        install_job_count_triggers(connection)
+
+    def _cleanup():
+        engine.dispose()
+        try:
+            os.remove(db_path)
+        except FileNotFoundError:
+            pass
+
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False), _cleanup
+
+
+def _parse_plan_mix(raw: str) -> dict[str, float]:
+    mix = {}
+    for part in raw.split(","):
+        plan, _, share = part.partition("=")
+        if plan.strip():
+            mix[plan.strip()] = float(share or 1.0)
+    return mix
+
+
+def main(argv: list[str] | None = None) -> SimulationReport:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=1.0, help="durée simulée de la charge synthétique")
+    parser.add_argument("--deployments-per-minute", type=float, default=10.0)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--hot-project-share", type=float, default=0.0, help="part de la charge sur un seul projet")
+    parser.add_argument("--plan-mix", default="free=1", help="ex. free=0.7,pro=0.25,enterprise=0.05")
+    parser.add_argument("--observation-window", type=int, default=5)
+    parser.add_argument("--deploy-duration", default="uniform:60:300", help="durée d'un déploiement (s)")
+    parser.add_argument("--workload-csv", default=None, help="charge exportée (remplace la charge synthétique)")
+    parser.add_argument("--max-concurrent-jobs", type=int, default=None)
+    parser.add_argument("--observation-sessions", choices=("on", "off"), default=None)
+    parser.add_argument("--notification-ratio", type=float, default=0.3, help="analyses suivies d'un outbox")
+    for family in HANDLER_FAMILIES:
+        default = DEFAULT_HANDLER_PROFILES[family].latency
+        parser.add_argument(
+            f"--{family}-latency",
+            default=f"{default.kind}:{default.a:g}:{default.b:g}",
+            help="fixed:A | uniform:A:B | exponential:A | lognormal:MEDIAN:SIGMA (secondes)",
+        )
+        parser.add_argument(f"--{family}-failure-rate", type=float, default=0.0)
+    parser.add_argument("--settle-seconds", type=float, default=3600.0, help="temps simulé laissé après la dernière arrivée")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top-tenants", type=int, default=10)
+    args = parser.parse_args(argv)
+    configure_logging(logging.WARNING)
+
+    if args.workload_csv:
+        workload = load_workload_csv(args.workload_csv, default_observation_window=args.observation_window)
+    else:
+        workload = synthetic_workload(
+            duration_seconds=args.hours * 3600,
+            deployments_per_minute=args.deployments_per_minute,
+            projects=args.projects,
+            hot_project_share=args.hot_project_share,
+            plan_mix=_parse_plan_mix(args.plan_mix),
+            observation_window=args.observation_window,
+            deploy_duration=LatencyDistribution.parse(args.deploy_duration),
+            seed=args.seed,
+        )
+    profiles = {
+        family: HandlerProfile(
+            latency=LatencyDistribution.parse(getattr(args, f"{family}_latency")),
+            failure_rate=getattr(args, f"{family}_failure_rate"),
+        )
+        for family in HANDLER_FAMILIES
+    }
+
+    session_local, cleanup = build_sqlite_session_local()
+    try:
+        report = SchedulerSimulation(
+            session_local=session_local,
+            workload=workload,
+            handler_profiles=profiles,
+            max_concurrent_jobs=args.max_concurrent_jobs,
+            observation_sessions=None if args.observation_sessions is None else args.observation_sessions == "on",
+            notification_ratio=args.notification_ratio,
+            settle_seconds=args.settle_seconds,
+            seed=args.seed,
+        ).run()
+    finally:
+        cleanup()
+    print(report.format(top_tenants=args.top_tenants))
+    return report
+
+
+if __name__ == "__main__":
+    main()
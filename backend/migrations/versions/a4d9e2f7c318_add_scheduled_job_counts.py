@@ -0,0 +1,107 @@
+"""add scheduled_job_counts maintained by triggers on scheduled_jobs
+
+Revision ID: a4d9e2f7c318
+Revises: f1c4e8a2d356
+Create Date: 2026-05-18 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d9e2f7c318"
+down_revision: Union[str, Sequence[str], None] = "f1c4e8a2d356"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduled_job_counts",
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("job_type", sa.String(length=50), nullable=False),
+        sa.Column("slot", sa.SmallInteger(), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("status", "job_type", "slot"),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION scheduled_job_counts_apply() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            counter_slot smallint := pg_backend_pid() % 16;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO scheduled_job_counts AS c (status, job_type, slot, count)
+                SELECT n.status, n.job_type, counter_slot, count(*)
+                FROM new_rows n
+                GROUP BY n.status, n.job_type
+                ORDER BY n.status, n.job_type
+                ON CONFLICT (status, job_type, slot) DO UPDATE SET count = c.count + EXCLUDED.count;
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO scheduled_job_counts AS c (status, job_type, slot, count)
+                SELECT o.status, o.job_type, counter_slot, -count(*)
+                FROM old_rows o
+                GROUP BY o.status, o.job_type
+                ORDER BY o.status, o.job_type
+                ON CONFLICT (status, job_type, slot) DO UPDATE SET count = c.count + EXCLUDED.count;
+            ELSE
+                INSERT INTO scheduled_job_counts AS c (status, job_type, slot, count)
+                SELECT d.status, d.job_type, counter_slot, sum(d.delta)
+                FROM (
+                    SELECT n.status, n.job_type, 1 AS delta FROM new_rows n
+                    UNION ALL
+                    SELECT o.status, o.job_type, -1 AS delta FROM old_rows o
+                ) d
+                GROUP BY d.status, d.job_type
+                HAVING sum(d.delta) <> 0
+                ORDER BY d.status, d.job_type
+                ON CONFLICT (status, job_type, slot) DO UPDATE SET count = c.count + EXCLUDED.count;
+            END IF;
+            RETURN NULL;
+        END;
+        $$
+        """
+    )
+    # CREATE TRIGGER verrouille scheduled_jobs en écriture jusqu'au commit : l'initialisation
+    # ci-dessous est exacte, aucun changement d'état ne peut s'intercaler.
+    op.execute(
+        """
+        CREATE TRIGGER scheduled_jobs_counts_insert AFTER INSERT ON scheduled_jobs
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION scheduled_job_counts_apply()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER scheduled_jobs_counts_update AFTER UPDATE ON scheduled_jobs
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION scheduled_job_counts_apply()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER scheduled_jobs_counts_delete AFTER DELETE ON scheduled_jobs
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION scheduled_job_counts_apply()
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO scheduled_job_counts (status, job_type, slot, count)
+        SELECT status, job_type, 0, count(*)
+        FROM scheduled_jobs
+        GROUP BY status, job_type
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS scheduled_jobs_counts_delete ON scheduled_jobs")
+    op.execute("DROP TRIGGER IF EXISTS scheduled_jobs_counts_update ON scheduled_jobs")
+    op.execute("DROP TRIGGER IF EXISTS scheduled_jobs_counts_insert ON scheduled_jobs")
+    op.execute("DROP FUNCTION IF EXISTS scheduled_job_counts_apply()")
+    op.drop_table("scheduled_job_counts")
@@ -0,0 +1,39 @@
+"""add scheduler_workers heartbeat table
+
+Revision ID: a7c3e9d2b415
+Revises: 9db4cbf1c467
+Create Date: 2026-04-10 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c3e9d2b415"
+down_revision: Union[str, Sequence[str], None] = "9db4cbf1c467"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduler_workers",
+        sa.Column("worker_id", sa.String(length=255), nullable=False),
+        sa.Column("hostname", sa.String(length=255), nullable=False),
+        sa.Column("pid", sa.Integer(), nullable=False),
+        sa.Column("role", sa.String(length=20), nullable=False, server_default="worker"),
+        sa.Column("execution_mode", sa.String(length=20), nullable=False, server_default="thread"),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("stopped_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("worker_id"),
+    )
+    op.create_index("ix_scheduler_workers_heartbeat_at", "scheduler_workers", ["heartbeat_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scheduler_workers_heartbeat_at", table_name="scheduler_workers")
+    op.drop_table("scheduler_workers")
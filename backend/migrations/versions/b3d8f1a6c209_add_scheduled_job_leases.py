@@ -0,0 +1,35 @@
+"""add lease ownership columns to scheduled_jobs
+
+Revision ID: b3d8f1a6c209
+Revises: a7c3e9d2b415
+Create Date: 2026-04-12 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b3d8f1a6c209"
+down_revision: Union[str, Sequence[str], None] = "a7c3e9d2b415"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("scheduled_jobs", sa.Column("locked_by", sa.String(length=255), nullable=True))
+    op.add_column("scheduled_jobs", sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        "ix_scheduled_jobs_status_lease_expires_at",
+        "scheduled_jobs",
+        ["status", "lease_expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scheduled_jobs_status_lease_expires_at", table_name="scheduled_jobs")
+    op.drop_column("scheduled_jobs", "lease_expires_at")
+    op.drop_column("scheduled_jobs", "locked_by")
@@ -0,0 +1,94 @@
+"""partial indexes on active scheduled_jobs and scheduled_jobs_archive table
+
+Revision ID: b7e3c1d5a982
+Revises: a4d9e2f7c318
+Create Date: 2026-05-25 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e3c1d5a982"
+down_revision: Union[str, Sequence[str], None] = "a4d9e2f7c318"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PENDING = sa.text("status = 'pending'")
+RUNNING = sa.text("status = 'running'")
+TERMINAL = sa.text("status IN ('completed', 'failed', 'skipped')")
+
+PARTIAL_INDEXES = (
+    ("ix_scheduled_jobs_pending_scheduled_at", ["scheduled_at"], PENDING),
+    ("ix_scheduled_jobs_pending_deadline_at", ["deadline_at"], PENDING),
+    ("ix_scheduled_jobs_pending_shard_key_scheduled_at", ["shard_key", "scheduled_at"], PENDING),
+    ("ix_scheduled_jobs_pending_tenant_key_deadline_at", ["tenant_key", "deadline_at"], PENDING),
+    ("ix_scheduled_jobs_running_lease_expires_at", ["lease_expires_at"], RUNNING),
+    ("ix_scheduled_jobs_terminal_status_created_at", ["status", "created_at"], TERMINAL),
+)
+
+FULL_INDEXES = (
+    ("ix_scheduled_jobs_status_scheduled_at", ["status", "scheduled_at"]),
+    ("ix_scheduled_jobs_status_lease_expires_at", ["status", "lease_expires_at"]),
+    ("ix_scheduled_jobs_status_shard_key_scheduled_at", ["status", "shard_key", "scheduled_at"]),
+    ("ix_scheduled_jobs_status_deadline_at", ["status", "deadline_at"]),
+    ("ix_scheduled_jobs_status_tenant_key_deadline_at", ["status", "tenant_key", "deadline_at"]),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduled_jobs_archive",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("deployment_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("tenant_key", sa.String(length=80), nullable=True),
+        sa.Column("job_type", sa.String(length=50), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("retry_count", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("scheduled_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_scheduled_jobs_archive_created_at", "scheduled_jobs_archive", ["created_at"], unique=False)
+    op.create_index("ix_scheduled_jobs_archive_deployment_id", "scheduled_jobs_archive", ["deployment_id"], unique=False)
+
+    # CONCURRENTLY : scheduled_jobs reste accessible en écriture pendant la construction.
+    with op.get_context().autocommit_block():
+        for name, columns, where in PARTIAL_INDEXES:
+            op.create_index(
+                name,
+                "scheduled_jobs",
+                columns,
+                unique=False,
+                postgresql_where=where,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name, _columns in FULL_INDEXES:
+            op.drop_index(name, table_name="scheduled_jobs", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns in FULL_INDEXES:
+            op.create_index(
+                name,
+                "scheduled_jobs",
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name, _columns, _where in PARTIAL_INDEXES:
+            op.drop_index(name, table_name="scheduled_jobs", postgresql_concurrently=True, if_exists=True)
+
+    op.drop_index("ix_scheduled_jobs_archive_deployment_id", table_name="scheduled_jobs_archive")
+    op.drop_index("ix_scheduled_jobs_archive_created_at", table_name="scheduled_jobs_archive")
+    op.drop_table("scheduled_jobs_archive")
@@ -0,0 +1,50 @@
+"""strip copied metrics endpoint and HMAC secret from scheduled_jobs.job_metadata
+
+Revision ID: c2f8a6d4e517
+Revises: b7e3c1d5a982
+Create Date: 2026-06-01 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c2f8a6d4e517"
+down_revision: Union[str, Sequence[str], None] = "b7e3c1d5a982"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10000
+
+# Les workers résolvent endpoint et secret via project_id (app/scheduler/job_targets.py) :
+# les copies ne servent plus et laissent des secrets périmés après rotation. Les lignes sans
+# project_id gardent leur payload (repli legacy du resolver).
+STRIP_BATCH = sa.text(
+    """
+    UPDATE scheduled_jobs
+    SET job_metadata = job_metadata - 'metrics_endpoint' - 'use_hmac' - 'hmac_secret'
+    WHERE id IN (
+        SELECT id FROM scheduled_jobs
+        WHERE job_type IN ('pre_collect', 'post_collect', 'observation_session')
+          AND job_metadata ? 'hmac_secret'
+          AND job_metadata ->> 'project_id' IS NOT NULL
+        LIMIT :batch_size
+    )
+    """
+)
+
+
+def upgrade() -> None:
+    # Lots courts en autocommit : pas de verrou long sur la table la plus sollicitée.
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        while connection.execute(STRIP_BATCH, {"batch_size": BATCH_SIZE}).rowcount:
+            pass
+
+
+def downgrade() -> None:
+    # Irréversible : les secrets retirés ne sont pas restaurés, le resolver lit le projet.
+    pass
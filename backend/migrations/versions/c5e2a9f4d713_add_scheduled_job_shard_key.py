@@ -0,0 +1,34 @@
+"""add shard_key to scheduled_jobs
+
+Revision ID: c5e2a9f4d713
+Revises: b3d8f1a6c209
+Create Date: 2026-04-19 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e2a9f4d713"
+down_revision: Union[str, Sequence[str], None] = "b3d8f1a6c209"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Pas de backfill : les jobs existants (shard_key NULL) restent réclamables par tous les workers.
+    op.add_column("scheduled_jobs", sa.Column("shard_key", sa.SmallInteger(), nullable=True))
+    op.create_index(
+        "ix_scheduled_jobs_status_shard_key_scheduled_at",
+        "scheduled_jobs",
+        ["status", "shard_key", "scheduled_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scheduled_jobs_status_shard_key_scheduled_at", table_name="scheduled_jobs")
+    op.drop_column("scheduled_jobs", "shard_key")
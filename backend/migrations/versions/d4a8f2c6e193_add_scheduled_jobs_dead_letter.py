@@ -0,0 +1,68 @@
+"""add scheduled_jobs_dead_letter table
+
+Revision ID: d4a8f2c6e193
+Revises: c2f8a6d4e517
+Create Date: 2026-06-08 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a8f2c6e193"
+down_revision: Union[str, Sequence[str], None] = "c2f8a6d4e517"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduled_jobs_dead_letter",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("deployment_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("job_type", sa.String(length=50), nullable=False),
+        sa.Column("phase", sa.String(length=20), nullable=True),
+        sa.Column("sequence_index", sa.Integer(), nullable=True),
+        sa.Column("job_metadata", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("shard_key", sa.SmallInteger(), nullable=True),
+        sa.Column("tenant_key", sa.String(length=80), nullable=True),
+        sa.Column("retry_count", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("reason", sa.String(length=20), nullable=False),
+        sa.Column("scheduled_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("dead_lettered_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("replayed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("replay_job_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_scheduled_jobs_dead_letter_pending_dead_lettered_at",
+        "scheduled_jobs_dead_letter",
+        ["dead_lettered_at"],
+        unique=False,
+        postgresql_where=sa.text("replayed_at IS NULL"),
+    )
+    op.create_index(
+        "ix_scheduled_jobs_dead_letter_job_type_dead_lettered_at",
+        "scheduled_jobs_dead_letter",
+        ["job_type", "dead_lettered_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_scheduled_jobs_dead_letter_deployment_id",
+        "scheduled_jobs_dead_letter",
+        ["deployment_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scheduled_jobs_dead_letter_deployment_id", table_name="scheduled_jobs_dead_letter")
+    op.drop_index("ix_scheduled_jobs_dead_letter_job_type_dead_lettered_at", table_name="scheduled_jobs_dead_letter")
+    op.drop_index("ix_scheduled_jobs_dead_letter_pending_dead_lettered_at", table_name="scheduled_jobs_dead_letter")
+    op.drop_table("scheduled_jobs_dead_letter")
@@ -0,0 +1,51 @@
+"""add deadline_at to scheduled_jobs
+
+Revision ID: d8b4f2c6e915
+Revises: c5e2a9f4d713
+Create Date: 2026-04-26 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d8b4f2c6e915"
+down_revision: Union[str, Sequence[str], None] = "c5e2a9f4d713"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("scheduled_jobs", sa.Column("deadline_at", sa.DateTime(timezone=True), nullable=True))
+    # Budgets alignés sur app/scheduler/deadlines.py (post_collect : 60s × (1.8 − 1)).
+    op.execute(
+        """
+        UPDATE scheduled_jobs
+        SET deadline_at = scheduled_at + (
+            CASE job_type
+                WHEN 'post_collect' THEN 48
+                WHEN 'pre_collect' THEN 60
+                WHEN 'analysis' THEN 300
+                WHEN 'email_send' THEN 900
+                WHEN 'slack_send' THEN 300
+                WHEN 'notification_outbox' THEN 300
+                ELSE 600
+            END
+        ) * interval '1 second'
+        WHERE status IN ('pending', 'running')
+        """
+    )
+    op.create_index(
+        "ix_scheduled_jobs_status_deadline_at",
+        "scheduled_jobs",
+        ["status", "deadline_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scheduled_jobs_status_deadline_at", table_name="scheduled_jobs")
+    op.drop_column("scheduled_jobs", "deadline_at")
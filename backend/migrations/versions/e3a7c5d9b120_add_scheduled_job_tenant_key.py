@@ -0,0 +1,54 @@
+"""add tenant_key to scheduled_jobs
+
+Revision ID: e3a7c5d9b120
+Revises: d8b4f2c6e915
+Create Date: 2026-05-03 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e3a7c5d9b120"
+down_revision: Union[str, Sequence[str], None] = "d8b4f2c6e915"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("scheduled_jobs", sa.Column("tenant_key", sa.String(length=80), nullable=True))
+    # Même priorité que app/scheduler/fairness.py : projet, utilisateur, puis déploiement.
+    op.execute(
+        """
+        UPDATE scheduled_jobs
+        SET tenant_key = CASE
+            WHEN job_metadata->>'project_id' IS NOT NULL THEN 'project:' || (job_metadata->>'project_id')
+            WHEN job_metadata->>'user_id' IS NOT NULL THEN 'user:' || (job_metadata->>'user_id')
+        END
+        WHERE status IN ('pending', 'running')
+        """
+    )
+    op.execute(
+        """
+        UPDATE scheduled_jobs AS sj
+        SET tenant_key = 'project:' || d.project_id::text
+        FROM deployments AS d
+        WHERE sj.deployment_id = d.id
+          AND sj.tenant_key IS NULL
+          AND sj.status IN ('pending', 'running')
+        """
+    )
+    op.create_index(
+        "ix_scheduled_jobs_status_tenant_key_deadline_at",
+        "scheduled_jobs",
+        ["status", "tenant_key", "deadline_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scheduled_jobs_status_tenant_key_deadline_at", table_name="scheduled_jobs")
+    op.drop_column("scheduled_jobs", "tenant_key")
@@ -0,0 +1,85 @@
+"""drop remaining full scheduled_jobs indexes, age terminal jobs by updated_at
+
+Revision ID: e6b1d3f8a254
+Revises: d4a8f2c6e193
+Create Date: 2026-06-12 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e6b1d3f8a254"
+down_revision: Union[str, Sequence[str], None] = "d4a8f2c6e193"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TERMINAL = sa.text("status IN ('completed', 'failed', 'skipped')")
+
+# Index mono-colonne d'origine (add_scheduled_jobs_table) : pleins, ils grossissent avec
+# l'historique alors que claim et recovery passent par les index partiels.
+FULL_INDEXES = (
+    ("ix_scheduled_jobs_scheduled_at", ["scheduled_at"]),
+    ("ix_scheduled_jobs_status", ["status"]),
+)
+
+
+def upgrade() -> None:
+    # L'archivage vieillit les jobs terminés par updated_at (passage au statut terminal) :
+    # les rares lignes terminées sans updated_at reprennent leur created_at.
+    op.execute(
+        sa.text(
+            "UPDATE scheduled_jobs SET updated_at = created_at "
+            "WHERE updated_at IS NULL AND status IN ('completed', 'failed', 'skipped')"
+        )
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_scheduled_jobs_terminal_status_updated_at",
+            "scheduled_jobs",
+            ["status", "updated_at"],
+            unique=False,
+            postgresql_where=TERMINAL,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_scheduled_jobs_terminal_status_created_at",
+            table_name="scheduled_jobs",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        for name, _columns in FULL_INDEXES:
+            op.drop_index(name, table_name="scheduled_jobs", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns in FULL_INDEXES:
+            op.create_index(
+                name,
+                "scheduled_jobs",
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        op.create_index(
+            "ix_scheduled_jobs_terminal_status_created_at",
+            "scheduled_jobs",
+            ["status", "created_at"],
+            unique=False,
+            postgresql_where=TERMINAL,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_scheduled_jobs_terminal_status_updated_at",
+            table_name="scheduled_jobs",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,32 @@
+"""add catch-up progress to scheduler_workers
+
+Revision ID: f1c4e8a2d356
+Revises: e3a7c5d9b120
+Create Date: 2026-05-10 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1c4e8a2d356"
+down_revision: Union[str, Sequence[str], None] = "e3a7c5d9b120"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("scheduler_workers", sa.Column("catchup_started_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("scheduler_workers", sa.Column("catchup_backlog_start", sa.Integer(), nullable=True))
+    op.add_column("scheduler_workers", sa.Column("catchup_backlog_remaining", sa.Integer(), nullable=True))
+    op.add_column("scheduler_workers", sa.Column("catchup_collapsed_jobs", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("scheduler_workers", "catchup_collapsed_jobs")
+    op.drop_column("scheduler_workers", "catchup_backlog_remaining")
+    op.drop_column("scheduler_workers", "catchup_backlog_start")
+    op.drop_column("scheduler_workers", "catchup_started_at")
@@ -0,0 +1,28 @@
+"""add planned_at to scheduled_jobs
+
+Revision ID: f3c9a7e2b816
+Revises: e6b1d3f8a254
+Create Date: 2026-06-14 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3c9a7e2b816"
+down_revision: Union[str, Sequence[str], None] = "e6b1d3f8a254"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Pas de backfill : tant que planned_at est NULL, l'heure prévue se déduit de deadline_at,
+    # que les retries antérieurs à cette révision n'ont jamais réécrit.
+    op.add_column("scheduled_jobs", sa.Column("planned_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("scheduled_jobs", "planned_at")
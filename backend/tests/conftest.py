@@ -1,7 +1,14 @@
 import os
 import sys
+import tempfile
 from pathlib import Path
 
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
@@ -18,3 +25,47 @@ os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
 os.environ.setdefault("SECRET_KEY", "test-secret-key")
 os.environ.setdefault("JWT_ALGORITHM", "HS256")
 os.environ.setdefault("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_for_sqlite(_type, _compiler, **_kwargs):
+    return "JSON"
+
+
+@pytest.fixture
+def sqlite_engine_factory(request):
+    """
+    Base SQLite jetable (fichier temporaire, partageable entre threads) avec les tables des modèles
+    donnés, dans l'ordre ; supprimée en fin de test.
+    """
+    created = []
+
+    def _create(*models):
+        fd, db_path = tempfile.mkstemp(prefix=f"{request.node.module.__name__}-", suffix=".db")
+        os.close(fd)
+        engine = create_engine(
+            f"sqlite+pysqlite:///{db_path}",
+            connect_args={"check_same_thread": False},
+        )
+        created.append((engine, db_path))
+        for model in models:
+            model.__table__.create(bind=engine)
+        return engine
+
+    yield _create
+    for engine, db_path in created:
+        engine.dispose()
+        try:
+            os.remove(db_path)
+        except FileNotFoundError:
+            pass
+
+
+@pytest.fixture
+def sqlite_session_factory(sqlite_engine_factory):
+    """Comme sqlite_engine_factory, mais retourne le sessionmaker de la base."""
+
+    def _create(*models):
+        return sessionmaker(bind=sqlite_engine_factory(*models), autocommit=False, autoflush=False)
+
+    return _create
@@ -552,6 +552,27 @@ def test_evaluate_data_quality_flags_min_post_samples():
     assert any(issue.startswith("min_post_samples") for issue in issues)
 
 
+def test_evaluate_data_quality_counts_one_multi_sample_fetch_as_one_collection():
+    t0 = datetime.now(timezone.utc) - timedelta(minutes=1)
+    pre = [_sample(latency=100, error_rate=0.001, cpu=0.3, memory=0.4, rps=1.0, collected_at=t0)]
+    # Un seul fetch d'un payload multi-samples : six samples espacés de 10s.
+    one_fetch = [
+        _sample(latency=120, error_rate=0.002, cpu=0.35, memory=0.45, rps=1.1, collected_at=t0 + timedelta(seconds=10 * idx))
+        for idx in range(6)
+    ]
+    # Cinq collectes régulières, à la gigue près.
+    five_collections = [
+        _sample(latency=120, error_rate=0.002, cpu=0.35, memory=0.45, rps=1.1, collected_at=t0 + timedelta(seconds=58 * idx))
+        for idx in range(5)
+    ]
+
+    _, issues = engine._evaluate_data_quality(pre_samples=pre, post_samples=one_fetch)
+    assert any(issue.startswith("min_post_samples") for issue in issues)
+
+    _, issues = engine._evaluate_data_quality(pre_samples=pre, post_samples=five_collections)
+    assert not any(issue.startswith("min_post_samples") for issue in issues)
+
+
 def test_evaluate_data_quality_flags_incoherent_timestamps():
     pre_time = datetime.now(timezone.utc)
     pre = [_sample(latency=100, error_rate=0.001, cpu=0.3, memory=0.4, rps=1.0, collected_at=pre_time)]
@@ -4,7 +4,9 @@ from uuid import uuid4
 import httpx
 import pytest
 
+from app.metrics import collector as collector_module
 from app.metrics.collector import MetricsHMACValidationError, collect_metrics
+from app.metrics.http_client import build_http_client
 from app.metrics.security import (
     MAX_SKEW_FUTURE,
     MAX_SKEW_PAST,
@@ -80,16 +82,20 @@ def test_build_signature_changes_when_nonce_changes():
     assert signature_a1 != signature_b
 
 
+def _use_fake_endpoint(monkeypatch, handler) -> None:
+    client = build_http_client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(collector_module, "get_http_client", lambda: client)
+
+
 def test_collect_metrics_uses_canonical_path_in_hmac_headers(monkeypatch):
     captured = {}
 
-    def _fake_get(url, headers=None, timeout=5):
-        captured["url"] = url
-        captured["headers"] = headers or {}
-        request = httpx.Request("GET", url)
-        return httpx.Response(status_code=200, json=_metric_payload(), request=request)
+    def _fake_endpoint(request: httpx.Request) -> httpx.Response:
+        captured["url"] = str(request.url)
+        captured["headers"] = request.headers
+        return httpx.Response(status_code=200, json=_metric_payload())
 
-    monkeypatch.setattr(httpx, "get", _fake_get)
+    _use_fake_endpoint(monkeypatch, _fake_endpoint)
 
     db = _FakeCollectorDB()
     collect_metrics(
@@ -112,11 +118,10 @@ def test_collect_metrics_uses_canonical_path_in_hmac_headers(monkeypatch):
 
 
 def test_collect_metrics_surfaces_replay_related_hmac_errors(monkeypatch):
-    def _fake_get(url, headers=None, timeout=5):
-        request = httpx.Request("GET", url, headers=headers)
-        return httpx.Response(status_code=401, json={"detail": "Nonce reuse"}, request=request)
-
-    monkeypatch.setattr(httpx, "get", _fake_get)
+    _use_fake_endpoint(
+        monkeypatch,
+        lambda request: httpx.Response(status_code=401, json={"detail": "Nonce reuse"}),
+    )
 
     db = _FakeCollectorDB()
     with pytest.raises(MetricsHMACValidationError, match="nonce usage"):
@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy.orm import Session
+
+from app.db.models.metric_sample import MetricSample
+from app.db.models.scheduled_job import ScheduledJob
+from app.metrics import collector as collector_module
+from app.metrics.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreakerRegistry, endpoint_host
+from app.metrics.http_client import build_http_client
+from app.scheduler import poller as poller_module
+from app.scheduler.poller import JobPoller
+
+
+@pytest.fixture
+def collector_session_local(sqlite_session_factory):
+    return sqlite_session_factory(ScheduledJob, MetricSample)
+
+
+def test_breaker_opens_on_failure_rate_and_probes_after_cooldown():
+    now = [0.0]
+    breakers = CircuitBreakerRegistry(
+        clock=lambda: now[0],
+        failure_rate_threshold=0.5,
+        min_requests=4,
+        window_seconds=60,
+        cooldown_seconds=30,
+        half_open_max_calls=1,
+    )
+    host = endpoint_host("https://API.example.com:8443/ds-metrics")
+    assert host == "api.example.com:8443"
+
+    for ok in (True, True, False):
+        assert breakers.allow(host)[0]
+        breakers.record(host, ok=ok)
+    assert breakers.state(host) == CLOSED
+    breakers.record(host, ok=False)
+    assert breakers.state(host) == OPEN
+    assert breakers.allow(host) == (False, 30)
+    assert REGISTRY.get_sample_value("seqpulse_collector_circuit_breakers", {"state": "open"}) >= 1
+
+    # Après le cooldown : un seul fetch d'essai, un échec rouvre le circuit.
+    now[0] = 31
+    assert breakers.allow(host)[0]
+    assert breakers.state(host) == HALF_OPEN
+    assert not breakers.allow(host)[0]
+    breakers.record(host, ok=False)
+    assert breakers.state(host) == OPEN
+
+    # Échec local (plafond par hôte) : le slot d'essai est rendu sans verdict.
+    now[0] = 62
+    assert breakers.allow(host)[0]
+    breakers.record(host, ok=None)
+    assert breakers.state(host) == HALF_OPEN
+    assert breakers.allow(host)[0]
+    breakers.record(host, ok=True)
+    assert breakers.state(host) == CLOSED
+    # Un autre hôte n'est jamais affecté.
+    assert breakers.state("other.example.com") == CLOSED
+
+
+def _post_collect(session_local, endpoint: str, sequence_index: int):
+    session: Session = session_local()
+    job = ScheduledJob(
+        deployment_id=uuid4(),
+        job_type="post_collect",
+        phase="post",
+        sequence_index=sequence_index,
+        scheduled_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+        status="pending",
+        job_metadata={"metrics_endpoint": endpoint},
+    )
+    session.add(job)
+    session.commit()
+    job_id = job.id
+    session.close()
+    return job_id
+
+
+def _run_tick(poller: JobPoller) -> None:
+    poller._process_pending_jobs()
+    assert poller.worker_pool.wait_idle(timeout=5)
+
+
+def test_open_circuit_skips_samples_without_network_calls(monkeypatch, collector_session_local):
+    endpoint = "https://dead.example.test/ds-metrics"
+    requests = []
+
+    def _down(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(503)
+
+    client = build_http_client(transport=httpx.MockTransport(_down))
+    monkeypatch.setattr(collector_module, "get_http_client", lambda: client)
+    monkeypatch.setattr(
+        collector_module,
+        "_circuit_breakers",
+        CircuitBreakerRegistry(failure_rate_threshold=0.5, min_requests=1, cooldown_seconds=60),
+    )
+    monkeypatch.setattr(poller_module, "SessionLocal", collector_session_local)
+
+    poller = JobPoller()
+    try:
+        failed_id = _post_collect(collector_session_local, endpoint, 0)
+        _run_tick(poller)
+        skipped_id = _post_collect(collector_session_local, endpoint, 1)
+        _run_tick(poller)
+    finally:
+        poller.worker_pool.stop(timeout=5)
+
+    assert len(requests) == 1
+    verify_session: Session = collector_session_local()
+    failed = verify_session.get(ScheduledJob, failed_id)
+    assert failed.status == "pending"
+    assert "HTTP error 503" in failed.last_error
+    skipped = verify_session.get(ScheduledJob, skipped_id)
+    assert skipped.status == "skipped"
+    assert skipped.retry_count == 0
+    assert "MetricsEndpointUnavailable" in skipped.last_error
+    verify_session.close()
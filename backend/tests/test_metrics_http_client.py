@@ -0,0 +1,204 @@
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from app.metrics import http_client as http_client_module
+from app.metrics.http_client import CollectorTransport, DnsCache, build_async_http_client, build_http_client
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections: set = set()
+
+    def do_GET(self):
+        self.connections.add(self.client_address)
+        body = b'{"metrics": {}}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def metrics_server():
+    _MetricsHandler.connections = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_dns_cache_serves_resolutions_until_ttl_expires():
+    now = [0.0]
+    calls = []
+
+    def _resolver(host, port, type=None):
+        calls.append(host)
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.1", port)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.1", port)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.2", port)),
+        ]
+
+    cache = DnsCache(60, resolver=_resolver, clock=lambda: now[0])
+
+    assert cache.lookup("metrics.example.com") is None
+    assert cache.resolve("metrics.example.com", 443) == ["10.0.0.1", "10.0.0.2"]
+    now[0] = 59
+    assert cache.lookup("metrics.example.com") == ["10.0.0.1", "10.0.0.2"]
+    now[0] = 61
+    assert cache.lookup("metrics.example.com") is None
+    cache.resolve("metrics.example.com", 443)
+    cache.invalidate("metrics.example.com")
+    assert cache.lookup("metrics.example.com") is None
+    assert calls == ["metrics.example.com", "metrics.example.com"]
+    # Adresses IP et cache désactivé : pas de résolution par le cache.
+    assert cache.lookup("192.0.2.10") == ["192.0.2.10"]
+    assert DnsCache(0, resolver=_resolver).lookup("metrics.example.com") == ["metrics.example.com"]
+
+
+def test_shared_client_reuses_kept_alive_connections(metrics_server):
+    port = metrics_server.server_address[1]
+    misses = _sample("seqpulse_collector_http_pool_requests_total", result="miss")
+    hits = _sample("seqpulse_collector_http_pool_requests_total", result="hit")
+    connects = _sample("seqpulse_collector_http_connect_seconds_count")
+    http_client_module._dns_cache.clear()
+
+    client = build_http_client()
+    try:
+        for _ in range(3):
+            response = client.get(f"http://localhost:{port}/ds-metrics", timeout=5)
+            assert response.json() == {"metrics": {}}
+    finally:
+        client.close()
+
+    # Une seule connexion TCP (et une seule résolution DNS) pour les trois samples.
+    assert len(_MetricsHandler.connections) == 1
+    assert _sample("seqpulse_collector_http_pool_requests_total", result="miss") == misses + 1
+    assert _sample("seqpulse_collector_http_pool_requests_total", result="hit") == hits + 2
+    assert _sample("seqpulse_collector_http_connect_seconds_count") == connects + 1
+    assert http_client_module._dns_cache.lookup("localhost") is not None
+
+
+def test_each_host_gets_its_own_pool_pinned_to_resolved_addresses(monkeypatch):
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "NO_PROXY"):
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv(name.lower(), raising=False)
+    transport = CollectorTransport()
+    first = httpx.Request("GET", "https://a.example.com/ds-metrics")
+    second = httpx.Request("GET", "https://b.example.com/ds-metrics")
+    try:
+        # Deux noms sur la même IP (ingress partagé) ne partagent jamais une connexion TLS.
+        assert transport._route(first)[0] is not transport._route(second)[0]
+        assert transport._route(first) == transport._route(httpx.Request("GET", "https://a.example.com/other"))
+        assert transport._route(first)[1] is True
+
+        pinned = http_client_module._pinned_request(first, "2001:db8::1")
+        assert str(pinned.url) == "https://[2001:db8::1]/ds-metrics"
+        assert pinned.headers["host"] == "a.example.com"
+        assert pinned.extensions["sni_hostname"] == "a.example.com"
+
+        # Derrière un proxy d'environnement, c'est le proxy qui résout : pas de DnsCache.
+        monkeypatch.setenv("HTTPS_PROXY", "proxy.internal:3128")
+        monkeypatch.setenv("NO_PROXY", "b.example.com")
+        proxied = httpx.Request("GET", "https://c.example.com/ds-metrics")
+        assert http_client_module._route_options(proxied.url, max_per_host=4, max_connections=None)["proxy"] == (
+            "http://proxy.internal:3128"
+        )
+        assert transport._route(proxied)[1] is False
+        assert http_client_module._env_proxy(httpx.URL("https://b.example.com/")) is None
+    finally:
+        transport.close()
+
+
+def test_per_host_limit_fails_fast_as_a_request_error():
+    release = threading.Event()
+    entered = threading.Event()
+
+    def _slow_endpoint(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "slow.example.com":
+            entered.set()
+            release.wait(5)
+        return httpx.Response(200, json={"metrics": {}})
+
+    client = httpx.Client(transport=CollectorTransport(httpx.MockTransport(_slow_endpoint), max_per_host=1))
+    first = threading.Thread(target=client.get, args=("https://slow.example.com/ds-metrics",))
+    first.start()
+    assert entered.wait(5)
+    try:
+        with pytest.raises(httpx.RequestError):
+            client.get("https://slow.example.com/ds-metrics", timeout=httpx.Timeout(5, pool=0.05))
+        # Le plafond est par hôte : les autres endpoints ne sont pas bloqués.
+        assert client.get("https://other.example.com/ds-metrics").status_code == 200
+    finally:
+        release.set()
+        first.join(5)
+    # Slot rendu à la fermeture de la réponse.
+    assert client.get("https://slow.example.com/ds-metrics", timeout=httpx.Timeout(5, pool=0.05)).status_code == 200
+    client.close()
+
+
+def test_per_host_limit_waits_for_a_slot_without_pool_timeout():
+    release = threading.Event()
+    entered = threading.Event()
+
+    def _slow_endpoint(request: httpx.Request) -> httpx.Response:
+        if not entered.is_set():
+            entered.set()
+            release.wait(5)
+        return httpx.Response(200, json={"metrics": {}})
+
+    client = httpx.Client(transport=CollectorTransport(httpx.MockTransport(_slow_endpoint), max_per_host=1))
+    first = threading.Thread(target=client.get, args=("https://slow.example.com/ds-metrics",))
+    first.start()
+    assert entered.wait(5)
+    statuses = []
+    second = threading.Thread(
+        target=lambda: statuses.append(
+            client.get("https://slow.example.com/ds-metrics", timeout=httpx.Timeout(5, pool=None)).status_code
+        )
+    )
+    second.start()
+    second.join(0.2)
+    # Pas de timeout de pool : la requête attend le slot au lieu d'échouer.
+    assert second.is_alive() and statuses == []
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert statuses == [200]
+    client.close()
+
+
+def test_async_client_resolves_through_the_dns_cache(metrics_server):
+    port = metrics_server.server_address[1]
+    http_client_module._dns_cache.clear()
+
+    async def _fetch():
+        client = build_async_http_client()
+        try:
+            for _ in range(2):
+                response = await client.get(f"http://localhost:{port}/ds-metrics", timeout=5)
+                assert response.json() == {"metrics": {}}
+        finally:
+            await client.aclose()
+
+    asyncio.run(_fetch())
+    assert len(_MetricsHandler.connections) == 1
+    assert http_client_module._dns_cache.lookup("localhost") is not None
@@ -0,0 +1,356 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.db.models.deployment import Deployment
+from app.db.models.metric_sample import MetricSample
+from app.metrics import collector as collector_module
+from app.metrics import sample_writer as sample_writer_module
+from app.metrics.collector import collect_metrics, collect_metrics_async
+from app.metrics.http_client import build_async_http_client, build_http_client
+from app.metrics.sample_writer import MetricSampleWriter, insert_samples
+
+ENDPOINT = "https://app.example.com/ds-metrics"
+
+
+@pytest.fixture
+def samples_session_local(sqlite_session_factory):
+    return sqlite_session_factory(Deployment, MetricSample)
+
+
+def _row(deployment_id=None, collected_at=None) -> dict:
+    return {
+        "id": uuid4(),
+        "deployment_id": deployment_id or uuid4(),
+        "phase": "post",
+        "requests_per_sec": 10.0,
+        "latency_p95": 120.0,
+        "error_rate": 0.002,
+        "cpu_usage": 0.42,
+        "memory_usage": 0.51,
+        "collected_at": collected_at or datetime.now(timezone.utc),
+    }
+
+
+def _count_samples(session_local) -> int:
+    with session_local() as db:
+        return db.execute(select(func.count()).select_from(MetricSample)).scalar_one()
+
+
+def _metrics_response(_request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={
+            "metrics": {
+                "requests_per_sec": 10.0,
+                "latency_p95": 120.0,
+                "error_rate": 0.002,
+                "cpu_usage": 0.42,
+                "memory_usage": 0.51,
+            }
+        },
+    )
+
+
+def test_insert_samples_skips_duplicates_in_one_statement(samples_session_local):
+    existing = _row()
+    with samples_session_local() as db:
+        assert insert_samples(db, [existing]) == {existing["id"]}
+        db.commit()
+
+    fresh = _row()
+    duplicate = _row(deployment_id=existing["deployment_id"], collected_at=existing["collected_at"])
+    with samples_session_local() as db:
+        assert insert_samples(db, [fresh, duplicate]) == {fresh["id"]}
+        db.commit()
+    assert _count_samples(samples_session_local) == 2
+
+
+def test_writer_flushes_on_batch_size_and_on_interval(samples_session_local):
+    writer = MetricSampleWriter(session_factory=samples_session_local, batch_size=3, flush_interval_seconds=60)
+    writer.start()
+    try:
+        futures = [writer.submit(_row()) for _ in range(2)]
+        time.sleep(0.1)
+        # Sous le seuil et avant l'échéance : rien n'est écrit.
+        assert writer.pending() == 2
+        assert not any(future.done() for future in futures)
+        futures.append(writer.submit(_row()))
+        assert [future.result(timeout=5) for future in futures] == [True, True, True]
+    finally:
+        writer.stop(timeout=5)
+    assert _count_samples(samples_session_local) == 3
+
+    writer = MetricSampleWriter(session_factory=samples_session_local, batch_size=100, flush_interval_seconds=0.05)
+    writer.start()
+    try:
+        assert writer.write(_row(), timeout=5) is True
+    finally:
+        writer.stop(timeout=5)
+
+    # Arrêt : les lignes en attente sont écrites avant de rendre la main.
+    writer = MetricSampleWriter(session_factory=samples_session_local, batch_size=100, flush_interval_seconds=60)
+    writer.start()
+    pending = writer.submit(_row())
+    writer.stop(timeout=5)
+    assert pending.result(timeout=0) is True
+    assert _count_samples(samples_session_local) == 5
+    with pytest.raises(RuntimeError):
+        writer.submit(_row())
+
+
+def test_writer_propagates_flush_errors_to_every_row_of_the_batch():
+    def _broken_session():
+        raise RuntimeError("database unavailable")
+
+    writer = MetricSampleWriter(session_factory=_broken_session, batch_size=2, flush_interval_seconds=60)
+    writer.start()
+    try:
+        futures = [writer.submit(_row()) for _ in range(2)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="database unavailable"):
+                future.result(timeout=5)
+    finally:
+        writer.stop(timeout=5)
+
+
+def test_writer_isolates_a_rejected_row_from_the_rest_of_the_batch(samples_session_local):
+    writer = MetricSampleWriter(session_factory=samples_session_local, batch_size=3, flush_interval_seconds=60)
+    writer.start()
+    try:
+        rows = [_row(), dict(_row(), requests_per_sec=None), _row()]
+        futures = writer.submit_many(rows)
+        assert futures[0].result(timeout=5) is True
+        with pytest.raises(IntegrityError):
+            futures[1].result(timeout=5)
+        assert futures[2].result(timeout=5) is True
+    finally:
+        writer.stop(timeout=5)
+    assert _count_samples(samples_session_local) == 2
+
+
+def test_buffered_collect_fails_when_the_writer_does_not_acknowledge(monkeypatch, samples_session_local):
+    # Writer jamais démarré : aucun flush, la collecte échoue au bout du timeout d'acquittement.
+    writer = MetricSampleWriter(session_factory=samples_session_local, batch_size=100, flush_interval_seconds=60)
+    client = build_http_client(transport=httpx.MockTransport(_metrics_response))
+    monkeypatch.setattr(collector_module, "get_http_client", lambda: client)
+    monkeypatch.setattr(collector_module, "get_sample_writer", lambda: writer)
+    monkeypatch.setattr(collector_module, "BUFFERED_WRITES_ENABLED", True)
+    monkeypatch.setattr(collector_module, "SINGLE_FLIGHT_ENABLED", False)
+    monkeypatch.setattr(collector_module, "WRITE_ACK_TIMEOUT_SECONDS", 0.05)
+
+    async def _collect_async():
+        async_client = build_async_http_client(transport=httpx.MockTransport(_metrics_response))
+        try:
+            await collect_metrics_async(uuid4(), "post", ENDPOINT, None, client=async_client, run_db=None)
+        finally:
+            await async_client.aclose()
+
+    with samples_session_local() as db:
+        with pytest.raises(TimeoutError, match="not flushed"):
+            collect_metrics(uuid4(), "post", ENDPOINT, db)
+    with pytest.raises(TimeoutError, match="not flushed"):
+        asyncio.run(_collect_async())
+    # Lignes abandonnées par leur collecte : jamais écrites par un flush ultérieur.
+    writer.stop(timeout=5)
+    assert _count_samples(samples_session_local) == 0
+
+
+def test_collect_metrics_buffered_acknowledges_after_flush(monkeypatch, samples_session_local):
+    writer = MetricSampleWriter(session_factory=samples_session_local, batch_size=100, flush_interval_seconds=0.05)
+    writer.start()
+    client = build_http_client(transport=httpx.MockTransport(_metrics_response))
+    monkeypatch.setattr(collector_module, "get_http_client", lambda: client)
+    monkeypatch.setattr(collector_module, "get_sample_writer", lambda: writer)
+    monkeypatch.setattr(collector_module, "BUFFERED_WRITES_ENABLED", True)
+    monkeypatch.setattr(collector_module, "SINGLE_FLIGHT_ENABLED", False)
+
+    async def _run_db(_fn, *_args, **_kwargs):
+        raise AssertionError("buffered writes must not use a DB thread")
+
+    async def _collect_async():
+        async_client = build_async_http_client(transport=httpx.MockTransport(_metrics_response))
+        try:
+            await asyncio.gather(
+                *(
+                    collect_metrics_async(uuid4(), "post", ENDPOINT, None, client=async_client, run_db=_run_db)
+                    for _ in range(3)
+                )
+            )
+        finally:
+            await async_client.aclose()
+
+    try:
+        with samples_session_local() as db:
+            collect_metrics(uuid4(), "post", ENDPOINT, db)
+            # Retour de collect_metrics = sample déjà commité par le writer.
+            assert _count_samples(samples_session_local) == 1
+        asyncio.run(_collect_async())
+        assert _count_samples(samples_session_local) == 4
+        assert writer.pending() == 0
+    finally:
+        writer.stop(timeout=5)
+
+
+def _samples_payload(start: datetime, count: int, *, step_seconds: int = 10) -> list[dict]:
+    return [
+        {
+            "timestamp": (start + timedelta(seconds=idx * step_seconds)).isoformat().replace("+00:00", "Z"),
+            "requests_per_sec": 10.0 + idx,
+            "latency_p95": 120.0,
+            "error_rate": 0.002,
+            "cpu_usage": 0.42,
+            "memory_usage": 0.51,
+        }
+        for idx in range(count)
+    ]
+
+
+def _serve(payloads: list):
+    def _endpoint(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=payloads.pop(0))
+
+    return build_http_client(transport=httpx.MockTransport(_endpoint))
+
+
+def test_collect_metrics_stores_timestamped_samples_in_one_insert(monkeypatch, samples_session_local):
+    start = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(seconds=90)
+    first = _samples_payload(start, 6)
+    # Fetch suivant : fenêtre glissante qui recouvre les 3 derniers samples déjà reçus.
+    second = _samples_payload(start + timedelta(seconds=30), 6)
+    stale = dict(first[0], timestamp=(start - timedelta(hours=1)).timestamp())
+    client = _serve([{"samples": [stale] + first}, {"samples": second}])
+    monkeypatch.setattr(collector_module, "get_http_client", lambda: client)
+    monkeypatch.setattr(collector_module, "SINGLE_FLIGHT_ENABLED", False)
+
+    deployment_id = uuid4()
+    with samples_session_local() as db:
+        collect_metrics(deployment_id, "post", ENDPOINT, db)
+        collect_metrics(deployment_id, "post", ENDPOINT, db)
+
+    with samples_session_local() as db:
+        samples = db.execute(select(MetricSample).order_by(MetricSample.collected_at)).scalars().all()
+    assert len(samples) == 9
+    assert [sample.collected_at.replace(tzinfo=timezone.utc) for sample in samples] == [
+        start + timedelta(seconds=idx * 10) for idx in range(9)
+    ]
+    assert [sample.requests_per_sec for sample in samples[:6]] == [10.0 + idx for idx in range(6)]
+
+
+def test_collect_metrics_keeps_timestamped_samples_inside_the_deployment_phase(monkeypatch, samples_session_local):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    started_at = now - timedelta(seconds=55)
+    finished_at = now - timedelta(seconds=25)
+    deployment = Deployment(
+        deployment_number=1,
+        project_id=uuid4(),
+        env="prod",
+        state="finished",
+        started_at=started_at,
+        finished_at=finished_at,
+    )
+    with samples_session_local() as db:
+        db.add(deployment)
+        db.commit()
+        deployment_id = deployment.id
+
+    # Samples de now - 80s à now - 0s : chaque fetch recouvre le déploiement.
+    payload = {"samples": _samples_payload(now - timedelta(seconds=80), 9)}
+    client = _serve([payload, payload])
+    monkeypatch.setattr(collector_module, "get_http_client", lambda: client)
+    monkeypatch.setattr(collector_module, "SINGLE_FLIGHT_ENABLED", False)
+
+    with samples_session_local() as db:
+        collect_metrics(deployment_id, "pre", ENDPOINT, db)
+        collect_metrics(deployment_id, "post", ENDPOINT, db)
+
+    with samples_session_local() as db:
+        samples = db.execute(select(MetricSample).order_by(MetricSample.collected_at)).scalars().all()
+    times = {
+        phase: [sample.collected_at.replace(tzinfo=timezone.utc) for sample in samples if sample.phase == phase]
+        for phase in ("pre", "post")
+    }
+    # pre : pas après le début du déploiement ; post : pas avant sa fin.
+    assert times["pre"] == [now - timedelta(seconds=80 - idx * 10) for idx in range(3)]
+    assert times["post"] == [now - timedelta(seconds=20 - idx * 10) for idx in range(3)]
+
+
+def test_collect_metrics_rejects_the_whole_payload_on_one_invalid_sample(monkeypatch, samples_session_local):
+    now = datetime.now(timezone.utc)
+    invalid = _samples_payload(now - timedelta(seconds=50), 6)
+    invalid[2]["error_rate"] = 1.5
+    naive = _samples_payload(now - timedelta(seconds=50), 2)
+    naive[1]["timestamp"] = naive[1]["timestamp"].rstrip("Z")
+    too_many = _samples_payload(now - timedelta(seconds=50), 7, step_seconds=1)
+    future_only = _samples_payload(now + timedelta(minutes=10), 2)
+    client = _serve([{"samples": invalid}, {"samples": naive}, {"samples": too_many}, {"samples": future_only}])
+    monkeypatch.setattr(collector_module, "get_http_client", lambda: client)
+    monkeypatch.setattr(collector_module, "SINGLE_FLIGHT_ENABLED", False)
+    monkeypatch.setattr(collector_module, "MAX_SAMPLES_PER_PAYLOAD", 6)
+
+    with samples_session_local() as db:
+        with pytest.raises(ValueError, match=r"samples\[2\]: Metric 'error_rate' above maximum"):
+            collect_metrics(uuid4(), "post", ENDPOINT, db)
+        with pytest.raises(ValueError, match=r"samples\[1\]: Sample timestamp without timezone"):
+            collect_metrics(uuid4(), "post", ENDPOINT, db)
+        with pytest.raises(ValueError, match="Too many metrics samples: 7 > 6"):
+            collect_metrics(uuid4(), "post", ENDPOINT, db)
+        with pytest.raises(ValueError, match="No metrics sample within the accepted time window"):
+            collect_metrics(uuid4(), "post", ENDPOINT, db)
+    assert _count_samples(samples_session_local) == 0
+
+
+def test_collect_metrics_rejects_a_body_that_is_not_an_object(monkeypatch, samples_session_local):
+    now = datetime.now(timezone.utc)
+    # Tableau de samples nu (sans l'objet `samples`) puis JSON scalaire : payload invalide, pas d'AttributeError.
+    client = _serve([_samples_payload(now - timedelta(seconds=50), 2), "ok"])
+    monkeypatch.setattr(collector_module, "get_http_client", lambda: client)
+    monkeypatch.setattr(collector_module, "SINGLE_FLIGHT_ENABLED", False)
+
+    with samples_session_local() as db:
+        with pytest.raises(ValueError, match="Metrics payload must be a JSON object, got list"):
+            collect_metrics(uuid4(), "post", ENDPOINT, db)
+        with pytest.raises(ValueError, match="Metrics payload must be a JSON object, got str"):
+            collect_metrics(uuid4(), "post", ENDPOINT, db)
+    assert _count_samples(samples_session_local) == 0
+
+
+def test_buffered_writer_keeps_a_multi_sample_payload_in_one_flush(monkeypatch, samples_session_local):
+    writer = MetricSampleWriter(session_factory=samples_session_local, batch_size=100, flush_interval_seconds=0.05)
+    writer.start()
+    flushed_rows = []
+    monkeypatch.setattr(
+        sample_writer_module,
+        "observe_collector_sample_flush",
+        lambda *, rows, duration_seconds, outcome: flushed_rows.append(rows),
+    )
+    payload = {"samples": _samples_payload(datetime.now(timezone.utc) - timedelta(seconds=60), 6)}
+
+    async def _endpoint(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=payload)
+
+    async def _run_db(fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+    async def _collect():
+        client = build_async_http_client(transport=httpx.MockTransport(_endpoint))
+        try:
+            with samples_session_local() as db:
+                await collect_metrics_async(uuid4(), "pre", ENDPOINT, db, client=client, run_db=_run_db)
+        finally:
+            await client.aclose()
+
+    monkeypatch.setattr(collector_module, "get_sample_writer", lambda: writer)
+    monkeypatch.setattr(collector_module, "BUFFERED_WRITES_ENABLED", True)
+    try:
+        asyncio.run(_collect())
+    finally:
+        writer.stop(timeout=5)
+    assert flushed_rows == [6]
+    assert _count_samples(samples_session_local) == 6
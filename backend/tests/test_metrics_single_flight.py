@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from app.metrics import collector as collector_module
+from app.metrics.collector import collect_metrics, collect_metrics_async
+from app.metrics.http_client import build_async_http_client, build_http_client
+from app.metrics.single_flight import FETCHED, JOINED, REUSED, SingleFlight
+
+ENDPOINT = "https://app.example.com/ds-metrics"
+
+
+class _FakeCollectorDB:
+    def __init__(self):
+        self.samples = []
+
+    def add(self, sample):
+        self.samples.append(sample)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def _metrics_response(_request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={
+            "metrics": {
+                "requests_per_sec": 10.0,
+                "latency_p95": 120.0,
+                "error_rate": 0.002,
+                "cpu_usage": 0.42,
+                "memory_usage": 0.51,
+            }
+        },
+    )
+
+
+def test_single_flight_shares_in_flight_calls_and_reuses_within_window():
+    now = [0.0]
+    flights = SingleFlight(clock=lambda: now[0])
+    release = threading.Event()
+    entered = threading.Event()
+    calls = []
+
+    def _slow_call():
+        calls.append(1)
+        entered.set()
+        release.wait(5)
+        return "payload"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flights.do("key", _slow_call, window_seconds=1.0)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    assert entered.wait(5)
+    # Laisse les autres threads rejoindre l'appel en cours avant de le terminer.
+    time.sleep(0.1)
+    assert flights.in_flight() == 1
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(role for _, role in results) == sorted([FETCHED, JOINED, JOINED, JOINED])
+    assert {result for result, _ in results} == {"payload"}
+
+    now[0] = 0.5
+    assert flights.do("key", _slow_call, window_seconds=1.0) == ("payload", REUSED)
+    now[0] = 1.5
+    assert flights.do("key", _slow_call, window_seconds=1.0) == ("payload", FETCHED)
+    assert len(calls) == 2
+
+    def _failing_call():
+        raise ValueError("endpoint down")
+
+    with pytest.raises(ValueError):
+        flights.do("other", _failing_call, window_seconds=1.0)
+    # Un échec n'est pas réutilisé : l'appel suivant retente.
+    assert flights.do("other", lambda: "recovered", window_seconds=1.0) == ("recovered", FETCHED)
+
+
+def test_collect_metrics_coalesces_fetches_but_writes_one_sample_per_deployment(monkeypatch):
+    requests = []
+
+    def _endpoint(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return _metrics_response(request)
+
+    client = build_http_client(transport=httpx.MockTransport(_endpoint))
+    monkeypatch.setattr(collector_module, "get_http_client", lambda: client)
+    monkeypatch.setattr(collector_module, "_fetch_flights", SingleFlight())
+    monkeypatch.setattr(collector_module, "SINGLE_FLIGHT_WINDOW_SECONDS", 60.0)
+
+    db = _FakeCollectorDB()
+    deployments = [uuid4(), uuid4()]
+    for deployment_id in deployments:
+        collect_metrics(deployment_id, "post", ENDPOINT, db, use_hmac=True, secret="s1", project_id="p1")
+    assert len(requests) == 1
+    assert [sample.deployment_id for sample in db.samples] == deployments
+
+    # Autres identifiants : requête signée différente, pas de partage.
+    collect_metrics(uuid4(), "post", ENDPOINT, db, use_hmac=True, secret="s2", project_id="p1")
+    assert len(requests) == 2
+
+    monkeypatch.setattr(collector_module, "SINGLE_FLIGHT_ENABLED", False)
+    collect_metrics(uuid4(), "post", ENDPOINT, db, use_hmac=True, secret="s1", project_id="p1")
+    assert len(requests) == 3
+    assert len(db.samples) == 4
+
+
+def test_collect_metrics_async_shares_one_fetch_between_concurrent_jobs(monkeypatch):
+    requests = []
+
+    async def _endpoint(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await asyncio.sleep(0.05)
+        return _metrics_response(request)
+
+    async def _run_db(fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr(collector_module, "SINGLE_FLIGHT_WINDOW_SECONDS", 0.0)
+    db = _FakeCollectorDB()
+
+    async def _collect_all():
+        client = build_async_http_client(transport=httpx.MockTransport(_endpoint))
+        try:
+            await asyncio.gather(
+                *(
+                    collect_metrics_async(uuid4(), "post", ENDPOINT, db, client=client, run_db=_run_db)
+                    for _ in range(5)
+                )
+            )
+        finally:
+            await client.aclose()
+
+    asyncio.run(_collect_all())
+
+    assert len(requests) == 1
+    assert len({sample.deployment_id for sample in db.samples}) == 5
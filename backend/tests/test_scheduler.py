@@ -1,46 +1,24 @@
+from dataclasses import replace
 from datetime import datetime, timedelta, timezone
-import os
-import tempfile
 from types import SimpleNamespace
 import threading
 from uuid import uuid4
 
 import pytest
 from sqlalchemy.exc import OperationalError, TimeoutError as SATimeoutError
-from sqlalchemy import create_engine
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.ext.compiler import compiles
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.orm import Session
 
 from app.db.models.scheduled_job import ScheduledJob
 from app.metrics.collector import MetricsHMACValidationError
 from app.scheduler import poller as poller_module
-from app.scheduler.poller import JobPoller, MAX_RETRIES
-
-
-@compiles(JSONB, "sqlite")
-def _compile_jsonb_for_sqlite(_type, _compiler, **_kwargs):
-    return "JSON"
+from app.scheduler.lanes import lane_for_job_type
+from app.scheduler.poller import JobPoller
+from app.scheduler.retry_policies import retry_policy_for
 
 
 @pytest.fixture
-def scheduler_session_local():
-    fd, db_path = tempfile.mkstemp(prefix="scheduler-tests-", suffix=".db")
-    os.close(fd)
-    engine = create_engine(
-        f"sqlite+pysqlite:///{db_path}",
-        connect_args={"check_same_thread": False},
-    )
-    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
-    ScheduledJob.__table__.create(bind=engine)
-    try:
-        yield SessionLocal
-    finally:
-        engine.dispose()
-        try:
-            os.remove(db_path)
-        except FileNotFoundError:
-            pass
+def scheduler_session_local(sqlite_session_factory):
+    return sqlite_session_factory(ScheduledJob)
 
 
 class _ExecuteResult:
@@ -63,16 +41,15 @@ class _FakeQuery:
 
 
 class _FakeSchedulerDB:
-    def __init__(self, jobs=None, stuck_jobs=None):
+    def __init__(self, jobs=None):
         jobs = jobs or []
         self.jobs = {job.id: job for job in jobs}
-        self.stuck_jobs = list(stuck_jobs or [])
         self.commit_count = 0
         self.rollback_count = 0
 
     def query(self, model):
         if model is ScheduledJob:
-            return _FakeQuery(self.stuck_jobs)
+            return _FakeQuery(self.jobs.values())
         return _FakeQuery([])
 
     def execute(self, statement):
@@ -120,38 +97,38 @@ def _job(*, status="pending", retry_count=0, job_type="analysis", updated_at=Non
         last_error=None,
         scheduled_at=now,
         updated_at=updated_at or now,
+        locked_by=None,
+        lease_expires_at=None,
         job_metadata={},
     )
 
 
-def _as_utc(value: datetime) -> datetime:
-    if value.tzinfo is None:
-        return value.replace(tzinfo=timezone.utc)
-    return value.astimezone(timezone.utc)
-
-
-def test_execute_job_skips_when_already_claimed(monkeypatch):
-    poller = JobPoller()
-    job = _job(status="running")
-    db = _FakeSchedulerDB(jobs=[job])
-
-    calls = {"analysis": 0}
+def _run_poll_tick(poller: JobPoller):
+    poller._process_pending_jobs()
+    assert poller.worker_pool.wait_idle(timeout=5)
 
-    def _analysis(*_args, **_kwargs):
-        calls["analysis"] += 1
 
-    monkeypatch.setattr(poller, "_execute_analysis", _analysis)
+def _end_retry_backoff(session_local, job_id) -> datetime:
+    # Le job récupéré attend le backoff de son type : on avance son scheduled_at à maintenant.
+    session: Session = session_local()
+    job = session.get(ScheduledJob, job_id)
+    assert job.status == "pending"
+    retry_at = _as_utc(job.scheduled_at)
+    job.scheduled_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    session.commit()
+    session.close()
+    return retry_at
 
-    poller._execute_job(db, job)
 
-    assert calls["analysis"] == 0
-    assert job.status == "running"
-    assert db.commit_count == 1
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
 
 
 def test_execute_job_retries_with_backoff_when_execution_fails(monkeypatch):
     poller = JobPoller()
-    job = _job(status="pending", retry_count=0, job_type="analysis")
+    job = _job(status="running", retry_count=0, job_type="analysis")
     db = _FakeSchedulerDB(jobs=[job])
 
     def _boom(*_args, **_kwargs):
@@ -166,13 +143,13 @@ def test_execute_job_retries_with_backoff_when_execution_fails(monkeypatch):
     assert job.retry_count == 1
     assert "RuntimeError: simulated failure" in job.last_error
     assert job.scheduled_at >= before + timedelta(seconds=25)
-    assert db.commit_count >= 2
+    assert db.commit_count >= 1
     assert db.rollback_count == 1
 
 
 def test_execute_job_retries_when_analysis_hits_db_timeout(monkeypatch):
     poller = JobPoller()
-    job = _job(status="pending", retry_count=0, job_type="analysis")
+    job = _job(status="running", retry_count=0, job_type="analysis")
     db = _FakeSchedulerDB(jobs=[job])
 
     def _timeout(*_args, **_kwargs):
@@ -192,7 +169,7 @@ def test_execute_job_retries_when_analysis_hits_db_timeout(monkeypatch):
 
 def test_execute_job_retries_when_analysis_hits_deadlock(monkeypatch):
     poller = JobPoller()
-    job = _job(status="pending", retry_count=0, job_type="analysis")
+    job = _job(status="running", retry_count=0, job_type="analysis")
     db = _FakeSchedulerDB(jobs=[job])
 
     def _deadlock(*_args, **_kwargs):
@@ -216,7 +193,7 @@ def test_execute_job_retries_when_analysis_hits_deadlock(monkeypatch):
 
 def test_execute_job_does_not_retry_on_hmac_validation_error(monkeypatch):
     poller = JobPoller()
-    job = _job(status="pending", retry_count=0, job_type="analysis")
+    job = _job(status="running", retry_count=0, job_type="analysis")
     db = _FakeSchedulerDB(jobs=[job])
 
     def _hmac_fail(*_args, **_kwargs):
@@ -229,14 +206,14 @@ def test_execute_job_does_not_retry_on_hmac_validation_error(monkeypatch):
     assert job.status == "failed"
     assert job.retry_count == 1
     assert "HMAC validation failed" in (job.last_error or "")
-    assert db.commit_count >= 2
+    assert db.commit_count >= 1
 
 
 def test_execute_job_cancels_related_pending_jobs_after_hmac_failure(monkeypatch):
     poller = JobPoller()
     deployment_id = uuid4()
 
-    failed_job = _job(status="pending", retry_count=0, job_type="post_collect")
+    failed_job = _job(status="running", retry_count=0, job_type="post_collect")
     failed_job.deployment_id = deployment_id
     failed_job.phase = "post"
 
@@ -264,7 +241,7 @@ def test_execute_job_cancels_related_pending_jobs_after_hmac_failure(monkeypatch
 
 def test_execute_job_handles_email_send_success(monkeypatch):
     poller = JobPoller()
-    job = _job(status="pending", retry_count=0, job_type="email_send")
+    job = _job(status="running", retry_count=0, job_type="email_send")
     job.job_metadata = {
         "user_id": str(uuid4()),
         "to_email": "user@example.com",
@@ -293,12 +270,12 @@ def test_execute_job_handles_email_send_success(monkeypatch):
     assert job.status == "completed"
     assert captured["email_type"] == "E-TRX-01"
     assert captured["to_email"] == "user@example.com"
-    assert db.commit_count >= 2
+    assert db.commit_count >= 1
 
 
 def test_execute_job_retries_when_email_metadata_is_missing():
     poller = JobPoller()
-    job = _job(status="pending", retry_count=0, job_type="email_send")
+    job = _job(status="running", retry_count=0, job_type="email_send")
     job.job_metadata = {"to_email": "missing@example.com"}
     db = _FakeSchedulerDB(jobs=[job])
 
@@ -313,7 +290,7 @@ def test_execute_job_retries_when_email_metadata_is_missing():
 
 def test_execute_job_handles_notification_outbox_success(monkeypatch):
     poller = JobPoller()
-    job = _job(status="pending", retry_count=0, job_type="notification_outbox")
+    job = _job(status="running", retry_count=0, job_type="notification_outbox")
     user_id = str(uuid4())
     project_id = str(uuid4())
     job.job_metadata = {
@@ -373,12 +350,12 @@ def test_execute_job_handles_notification_outbox_success(monkeypatch):
 
     assert job.status == "completed"
     assert calls == {"email": 1, "slack": 1}
-    assert db.commit_count >= 2
+    assert db.commit_count >= 1
 
 
 def test_execute_job_retries_when_notification_outbox_channel_is_invalid():
     poller = JobPoller()
-    job = _job(status="pending", retry_count=0, job_type="notification_outbox")
+    job = _job(status="running", retry_count=0, job_type="notification_outbox")
     job.job_metadata = {
         "notifications": [
             {"channel": "sms", "payload": {"dedupe_key": "invalid"}},
@@ -397,7 +374,7 @@ def test_execute_job_retries_when_notification_outbox_channel_is_invalid():
 
 def test_execute_job_observes_start_delay_metric(monkeypatch):
     poller = JobPoller()
-    job = _job(status="pending", retry_count=0, job_type="analysis")
+    job = _job(status="running", retry_count=0, job_type="analysis")
     job.scheduled_at = datetime.now(timezone.utc) - timedelta(seconds=42)
     db = _FakeSchedulerDB(jobs=[job])
 
@@ -419,47 +396,242 @@ def test_execute_job_observes_start_delay_metric(monkeypatch):
     assert observed["delay_seconds"] >= 40
 
 
-def test_recover_stuck_jobs_marks_failed_after_retry_budget(monkeypatch):
-    poller = JobPoller()
-    stale_time = datetime.now(timezone.utc) - timedelta(minutes=11)
-
-    recoverable = _job(status="running", retry_count=0, updated_at=stale_time)
-    exhausted = _job(status="running", retry_count=MAX_RETRIES, updated_at=stale_time)
+def test_recover_expired_leases_requeues_or_fails_in_set_based_updates(monkeypatch, scheduler_session_local):
+    session: Session = scheduler_session_local()
+    now = datetime.now(timezone.utc)
+    recoverable = ScheduledJob(
+        deployment_id=uuid4(),
+        job_type="analysis",
+        scheduled_at=now - timedelta(minutes=5),
+        status="running",
+        retry_count=0,
+        locked_by="dead-host:1:abcd",
+        lease_expires_at=now - timedelta(seconds=1),
+    )
+    exhausted = ScheduledJob(
+        deployment_id=uuid4(),
+        job_type="analysis",
+        scheduled_at=now - timedelta(minutes=5),
+        status="running",
+        retry_count=retry_policy_for("analysis").max_retries,
+        locked_by="dead-host:1:abcd",
+        lease_expires_at=now - timedelta(seconds=1),
+    )
+    live = ScheduledJob(
+        deployment_id=uuid4(),
+        job_type="analysis",
+        scheduled_at=now - timedelta(minutes=5),
+        status="running",
+        retry_count=0,
+        locked_by="live-host:2:efgh",
+        lease_expires_at=now + timedelta(seconds=30),
+        # Un vieux updated_at ne suffit plus quand le lease est valide.
+        updated_at=now - timedelta(seconds=poller_module.RUNNING_STUCK_SECONDS + 5),
+    )
+    session.add_all([recoverable, exhausted, live])
+    session.commit()
+    ids = {"recoverable": recoverable.id, "exhausted": exhausted.id, "live": live.id}
+    session.close()
 
-    db = _FakeSchedulerDB(jobs=[recoverable, exhausted], stuck_jobs=[recoverable, exhausted])
     failed_counter_calls = {"count": 0}
+    lease_events = []
 
     def _failed_counter():
         failed_counter_calls["count"] += 1
 
     monkeypatch.setattr(poller_module, "inc_scheduler_jobs_failed", _failed_counter)
+    monkeypatch.setattr(
+        poller_module,
+        "inc_scheduler_lease_events",
+        lambda *, event, count=1: lease_events.append((event, count)),
+    )
 
-    poller._recover_stuck_jobs(db)
+    poller = JobPoller()
+    db: Session = scheduler_session_local()
+    assert poller._recover_expired_leases(db) == 2
+    db.close()
 
-    assert recoverable.status == "pending"
-    assert recoverable.retry_count == 1
-    assert recoverable.last_error == "Recovered job after timeout"
+    verify_session: Session = scheduler_session_local()
+    recovered_row = verify_session.get(ScheduledJob, ids["recoverable"])
+    assert recovered_row.status == "pending"
+    assert recovered_row.retry_count == 1
+    assert recovered_row.last_error == "Recovered job after lease expiry (owner=dead-host:1:abcd)"
+    assert recovered_row.locked_by is None
+    assert recovered_row.lease_expires_at is None
+
+    exhausted_row = verify_session.get(ScheduledJob, ids["exhausted"])
+    assert exhausted_row.status == "failed"
+    assert exhausted_row.retry_count == retry_policy_for("analysis").max_retries + 1
+    assert "exceeded max retries" in exhausted_row.last_error
+    assert "dead-host:1:abcd" in exhausted_row.last_error
 
-    assert exhausted.status == "failed"
-    assert exhausted.retry_count == MAX_RETRIES + 1
-    assert "exceeded max retries" in exhausted.last_error
+    assert verify_session.get(ScheduledJob, ids["live"]).status == "running"
     assert failed_counter_calls["count"] == 1
-    assert db.commit_count == 1
-
-
-@pytest.mark.parametrize(
-    ("retry_count", "expected_seconds"),
-    [
-        (0, 30),
-        (1, 30),
-        (2, 120),
-        (3, 300),
-        (50, 300),
-    ],
-)
-def test_next_retry_delay_uses_backoff_schedule(retry_count, expected_seconds):
+    assert lease_events == [("recovered", 2)]
+    verify_session.close()
+
+
+def test_claim_sets_owner_and_renewal_extends_only_owned_leases(monkeypatch, scheduler_session_local):
+    session: Session = scheduler_session_local()
+    now = datetime.now(timezone.utc)
+    job = ScheduledJob(
+        deployment_id=uuid4(),
+        job_type="analysis",
+        scheduled_at=now - timedelta(seconds=1),
+        status="pending",
+    )
+    session.add(job)
+    session.commit()
+    job_id = job.id
+    session.close()
+
+    monkeypatch.setattr(poller_module, "SessionLocal", scheduler_session_local)
+    lease_events = []
+    monkeypatch.setattr(
+        poller_module,
+        "inc_scheduler_lease_events",
+        lambda *, event, count=1: lease_events.append((event, count)),
+    )
     poller = JobPoller()
-    assert poller._next_retry_delay(retry_count) == expected_seconds
+
+    db: Session = scheduler_session_local()
+    claimed = poller._claim_due_jobs(db, limit=5)
+    db.close()
+    assert [row.id for row in claimed] == [job_id]
+    assert claimed[0].locked_by == poller.worker_id
+    first_expiry = _as_utc(claimed[0].lease_expires_at)
+    assert first_expiry > now + timedelta(seconds=poller_module.LEASE_SECONDS - 5)
+
+    poller._track_owned_job(job_id)
+    assert poller._renew_owned_leases() == 1
+    verify_session: Session = scheduler_session_local()
+    assert _as_utc(verify_session.get(ScheduledJob, job_id).lease_expires_at) >= first_expiry
+    verify_session.close()
+
+    # Un autre poller a récupéré le job : le renouvellement le signale comme perdu.
+    takeover_session: Session = scheduler_session_local()
+    takeover_session.get(ScheduledJob, job_id).locked_by = "other-host:9:ffff"
+    takeover_session.commit()
+    takeover_session.close()
+
+    assert poller._renew_owned_leases() == 0
+    assert lease_events == [("lost", 1)]
+
+
+def test_finish_is_fenced_when_lease_was_taken_over(monkeypatch):
+    poller = JobPoller()
+    job = _job(status="running", retry_count=0, job_type="analysis")
+    job.locked_by = "old-owner:1:aaaa"
+    db = _FakeSchedulerDB(jobs=[job])
+    lease_events = []
+    monkeypatch.setattr(
+        poller_module,
+        "inc_scheduler_lease_events",
+        lambda *, event, count=1: lease_events.append((event, count)),
+    )
+    monkeypatch.setattr(poller, "_execute_analysis", lambda *_args: None)
+
+    # Le snapshot de l'exécuteur date d'un claim antérieur : recovery puis re-claim entre-temps.
+    stale_snapshot = SimpleNamespace(**vars(job))
+    job.locked_by = "new-owner:2:bbbb"
+    job.retry_count = 1
+
+    poller._execute_job(db, stale_snapshot)
+
+    assert job.status == "running"
+    assert job.locked_by == "new-owner:2:bbbb"
+    assert lease_events == [("fenced", 1)]
+
+
+def test_claim_due_jobs_claims_batch_in_one_statement(monkeypatch, scheduler_session_local):
+    session: Session = scheduler_session_local()
+    now = datetime.now(timezone.utc)
+    due_jobs = [
+        ScheduledJob(
+            deployment_id=uuid4(),
+            job_type="analysis",
+            phase=None,
+            scheduled_at=now - timedelta(seconds=idx + 1),
+            status="pending",
+        )
+        for idx in range(3)
+    ]
+    running_job = ScheduledJob(
+        deployment_id=uuid4(),
+        job_type="analysis",
+        phase=None,
+        scheduled_at=now - timedelta(seconds=30),
+        status="running",
+    )
+    session.add_all([*due_jobs, running_job])
+    session.commit()
+    due_ids = {job.id for job in due_jobs}
+    session.close()
+
+    observed = {}
+
+    def _observe_claim(*, claimed: int, lost: int):
+        observed["claimed"] = claimed
+        observed["lost"] = lost
+
+    monkeypatch.setattr(poller_module, "observe_scheduler_claim", _observe_claim)
+
+    poller = JobPoller()
+    claim_session: Session = scheduler_session_local()
+    claimed = poller._claim_due_jobs(db=claim_session, limit=10)
+    claim_session.close()
+
+    assert {job.id for job in claimed} == due_ids
+    # Detached rows keep their payload for the workers, without a second fetch.
+    assert all(job.status == "running" for job in claimed)
+    assert all(job.job_type == "analysis" for job in claimed)
+    assert observed == {"claimed": 3, "lost": 0}
+
+    verify_session: Session = scheduler_session_local()
+    statuses = {job_id: verify_session.get(ScheduledJob, job_id).status for job_id in due_ids}
+    assert set(statuses.values()) == {"running"}
+    verify_session.close()
+
+
+def test_claim_due_jobs_reports_lost_claims(monkeypatch, scheduler_session_local):
+    session: Session = scheduler_session_local()
+    job = ScheduledJob(
+        deployment_id=uuid4(),
+        job_type="analysis",
+        phase=None,
+        scheduled_at=datetime.now(timezone.utc) - timedelta(seconds=5),
+        status="pending",
+    )
+    session.add(job)
+    session.commit()
+    job_id = job.id
+    session.close()
+
+    observed = {}
+
+    def _observe_claim(*, claimed: int, lost: int):
+        observed["claimed"] = claimed
+        observed["lost"] = lost
+
+    poller = JobPoller()
+    original_select = poller._select_jobs_with_fairness
+
+    def _select_then_lose_race(db, jobs, limit, lane=None):
+        # Another poller claims the row between selection and the claim statement.
+        with scheduler_session_local() as other:
+            other.get(ScheduledJob, job_id).status = "running"
+            other.commit()
+        return original_select(db=db, jobs=jobs, limit=limit, lane=lane)
+
+    monkeypatch.setattr(poller_module, "observe_scheduler_claim", _observe_claim)
+    monkeypatch.setattr(poller, "_select_jobs_with_fairness", _select_then_lose_race)
+
+    claim_session: Session = scheduler_session_local()
+    claimed = poller._claim_due_jobs(db=claim_session, limit=10)
+    claim_session.close()
+
+    assert claimed == []
+    assert observed == {"claimed": 0, "lost": 1}
 
 
 def test_process_pending_jobs_persists_completed_status(monkeypatch, scheduler_session_local):
@@ -494,7 +666,7 @@ def test_process_pending_jobs_persists_completed_status(monkeypatch, scheduler_s
     monkeypatch.setattr(poller_module, "SessionLocal", scheduler_session_local)
     monkeypatch.setattr(poller, "_execute_analysis", _analysis)
 
-    poller._process_pending_jobs()
+    _run_poll_tick(poller)
 
     verify_session: Session = scheduler_session_local()
     due_job_row = verify_session.get(ScheduledJob, due_job_id)
@@ -529,7 +701,7 @@ def test_process_pending_jobs_persists_retry_after_failure(monkeypatch, schedule
     monkeypatch.setattr(poller, "_execute_analysis", _boom)
 
     before = datetime.now(timezone.utc)
-    poller._process_pending_jobs()
+    _run_poll_tick(poller)
 
     verify_session: Session = scheduler_session_local()
     failed_row = verify_session.get(ScheduledJob, job_id)
@@ -567,15 +739,21 @@ def test_process_pending_jobs_recovers_stale_running_job_once(monkeypatch, sched
     monkeypatch.setattr(poller_module, "SessionLocal", scheduler_session_local)
     monkeypatch.setattr(poller, "_execute_analysis", _analysis)
 
-    poller._process_pending_jobs()
-    poller._process_pending_jobs()
+    recovered_at = datetime.now(timezone.utc)
+    _run_poll_tick(poller)
+    assert execution_calls["count"] == 0
+    # Même backoff qu'un échec d'exécution, pas de re-claim immédiat.
+    retry_at = _end_retry_backoff(scheduler_session_local, stuck_job_id)
+    assert retry_at >= recovered_at + timedelta(seconds=30)
+    _run_poll_tick(poller)
+    _run_poll_tick(poller)
 
     verify_session: Session = scheduler_session_local()
     recovered_row = verify_session.get(ScheduledJob, stuck_job_id)
     assert recovered_row is not None
     assert recovered_row.status == "completed"
     assert recovered_row.retry_count == 1
-    assert recovered_row.last_error == "Recovered job after timeout"
+    assert recovered_row.last_error == "Recovered job after lease expiry (owner=unknown)"
     assert execution_calls["count"] == 1
     verify_session.close()
 
@@ -635,7 +813,7 @@ def test_process_pending_jobs_executes_jobs_concurrently(monkeypatch, scheduler_
     monkeypatch.setattr(poller_module, "SessionLocal", scheduler_session_local)
     monkeypatch.setattr(poller, "_execute_email_send", _email_send_concurrent)
 
-    poller._process_pending_jobs()
+    _run_poll_tick(poller)
 
     verify_session: Session = scheduler_session_local()
     first_row = verify_session.get(ScheduledJob, first_id)
@@ -713,9 +891,14 @@ def test_process_pending_jobs_applies_project_fairness(monkeypatch, scheduler_se
     poller = JobPoller()
     monkeypatch.setattr(poller_module, "SessionLocal", scheduler_session_local)
     monkeypatch.setattr(poller_module, "MAX_CONCURRENT_JOBS", 2)
+    monkeypatch.setattr(poller_module, "WORKER_QUEUE_SIZE", 0)
+    # Lane unique : seule la fairness par projet départage les jobs.
+    single_lane = replace(lane_for_job_type("email_send"), share=1.0)
+    monkeypatch.setattr(poller_module, "LANES", (single_lane,))
+    monkeypatch.setattr(poller_module, "DEFAULT_LANE", single_lane)
     monkeypatch.setattr(poller, "_execute_email_send", _email_send_record)
 
-    poller._process_pending_jobs()
+    _run_poll_tick(poller)
 
     verify_session: Session = scheduler_session_local()
     rows = [verify_session.get(ScheduledJob, job_id) for job_id in ids]
@@ -745,19 +928,20 @@ def test_process_pending_jobs_recovers_after_scheduler_internal_error(monkeypatc
     monkeypatch.setattr(poller_module, "SessionLocal", scheduler_session_local)
 
     failure_switch = {"first": True}
-    original_execute_jobs_concurrently = poller._execute_jobs_concurrently
+    pool = poller._ensure_worker_pool()
+    original_submit = pool.submit
 
-    def _flaky_execute_jobs(job_ids):
+    def _flaky_submit(job):
         if failure_switch["first"]:
             failure_switch["first"] = False
             raise RuntimeError("scheduler dispatcher failure")
-        return original_execute_jobs_concurrently(job_ids)
+        return original_submit(job)
 
-    monkeypatch.setattr(poller, "_execute_jobs_concurrently", _flaky_execute_jobs)
+    monkeypatch.setattr(pool, "submit", _flaky_submit)
     monkeypatch.setattr(poller, "_execute_analysis", lambda _db, _job: None)
 
     # First poll: scheduler internals fail before job execution; pending job must stay intact.
-    poller._process_pending_jobs()
+    _run_poll_tick(poller)
     verify_session: Session = scheduler_session_local()
     first_row = verify_session.get(ScheduledJob, job_id)
     assert first_row is not None
@@ -765,7 +949,7 @@ def test_process_pending_jobs_recovers_after_scheduler_internal_error(monkeypatc
     verify_session.close()
 
     # Second poll: clean recovery and successful completion.
-    poller._process_pending_jobs()
+    _run_poll_tick(poller)
     verify_session = scheduler_session_local()
     second_row = verify_session.get(ScheduledJob, job_id)
     assert second_row is not None
@@ -800,14 +984,78 @@ def test_restart_during_analysis_recovers_running_job_cleanly(monkeypatch, sched
     monkeypatch.setattr(poller, "_execute_analysis", _analysis)
 
     # Simulates a new process recovering after previous process died mid-analysis.
-    poller._process_pending_jobs()
-    poller._process_pending_jobs()
+    _run_poll_tick(poller)
+    _end_retry_backoff(scheduler_session_local, stuck_job_id)
+    _run_poll_tick(poller)
 
     verify_session: Session = scheduler_session_local()
     row = verify_session.get(ScheduledJob, stuck_job_id)
     assert row is not None
     assert row.status == "completed"
     assert row.retry_count == 1
-    assert row.last_error == "Recovered job after timeout"
+    assert row.last_error == "Recovered job after lease expiry (owner=unknown)"
     assert executions["count"] == 1
     verify_session.close()
+
+
+def test_process_pending_jobs_keeps_claiming_while_slow_job_runs(monkeypatch, scheduler_session_local):
+    session: Session = scheduler_session_local()
+    slow_job = ScheduledJob(
+        deployment_id=uuid4(),
+        job_type="analysis",
+        phase=None,
+        scheduled_at=datetime.now(timezone.utc) - timedelta(seconds=5),
+        status="pending",
+    )
+    session.add(slow_job)
+    session.commit()
+    slow_job_id = slow_job.id
+    session.close()
+
+    slow_started = threading.Event()
+    slow_release = threading.Event()
+    fast_done = threading.Event()
+
+    def _analysis(_db, job):
+        if job.id == slow_job_id:
+            slow_started.set()
+            slow_release.wait(timeout=5)
+        else:
+            fast_done.set()
+
+    poller = JobPoller()
+    monkeypatch.setattr(poller_module, "SessionLocal", scheduler_session_local)
+    monkeypatch.setattr(poller, "_execute_analysis", _analysis)
+
+    try:
+        poller._process_pending_jobs()
+        assert slow_started.wait(timeout=2)
+
+        # A job that comes due while the slow one is still running.
+        session = scheduler_session_local()
+        fast_job = ScheduledJob(
+            deployment_id=uuid4(),
+            job_type="analysis",
+            phase=None,
+            scheduled_at=datetime.now(timezone.utc),
+            status="pending",
+        )
+        session.add(fast_job)
+        session.commit()
+        fast_job_id = fast_job.id
+        session.close()
+
+        claimed_count, _next_due_at = poller._process_pending_jobs()
+        assert claimed_count == 1
+        assert fast_done.wait(timeout=2)
+        check_session: Session = scheduler_session_local()
+        assert check_session.get(ScheduledJob, slow_job_id).status == "running"
+        check_session.close()
+    finally:
+        slow_release.set()
+        assert poller.worker_pool.wait_idle(timeout=5)
+
+    verify_session: Session = scheduler_session_local()
+    assert verify_session.get(ScheduledJob, fast_job_id).status == "completed"
+    assert verify_session.get(ScheduledJob, slow_job_id).status == "completed"
+    verify_session.close()
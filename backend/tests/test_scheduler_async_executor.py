@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import httpx
+import pytest
+from sqlalchemy.orm import Session
+
+from app.db.models.metric_sample import MetricSample
+from app.db.models.scheduled_job import ScheduledJob
+from app.scheduler import async_executor as async_executor_module
+from app.scheduler import poller as poller_module
+from app.scheduler.async_executor import AsyncJobExecutor
+from app.scheduler.poller import JobPoller
+
+
+@pytest.fixture
+def collector_session_local(sqlite_session_factory):
+    return sqlite_session_factory(ScheduledJob, MetricSample)
+
+
+def _job(job_type: str):
+    return SimpleNamespace(id=uuid4(), job_type=job_type)
+
+
+def test_executor_routes_io_jobs_to_loop_and_analysis_to_cpu_pool():
+    seen = {}
+    seen_lock = threading.Lock()
+
+    async def _async_handler(job, executor):
+        db_thread = await executor.run_db(lambda: threading.current_thread().name)
+        with seen_lock:
+            seen[job.job_type] = (threading.current_thread().name, db_thread)
+
+    def _sync_handler(job):
+        with seen_lock:
+            seen[job.job_type] = (threading.current_thread().name, None)
+
+    executor = AsyncJobExecutor(
+        max_in_flight=4,
+        async_handler=_async_handler,
+        sync_handler=_sync_handler,
+        name="test-async",
+    )
+    executor.start()
+    try:
+        assert executor.submit(_job("post_collect"))
+        assert executor.submit(_job("analysis"))
+        assert executor.wait_idle(timeout=5)
+    finally:
+        executor.stop(timeout=5)
+
+    loop_thread, db_thread = seen["post_collect"]
+    assert loop_thread == "test-async-loop"
+    assert db_thread.startswith("test-async-db")
+    assert seen["analysis"][0].startswith("test-async-cpu")
+
+
+def test_executor_keeps_many_io_jobs_in_flight_and_bounds_capacity():
+    in_flight = {"current": 0, "peak": 0}
+    lock = threading.Lock()
+
+    async def _async_handler(_job, _executor):
+        with lock:
+            in_flight["current"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+        await asyncio.sleep(0.2)
+        with lock:
+            in_flight["current"] -= 1
+
+    executor = AsyncJobExecutor(
+        max_in_flight=300,
+        async_handler=_async_handler,
+        sync_handler=lambda _job: None,
+    )
+    executor.start()
+    started = time.perf_counter()
+    try:
+        accepted = sum(1 for _ in range(400) if executor.submit(_job("pre_collect")))
+        assert accepted == 300
+        assert executor.free_slots() == 0
+        assert executor.wait_idle(timeout=5)
+    finally:
+        executor.stop(timeout=5)
+
+    # 300 attentes de 200ms se chevauchent au lieu de s'enchaîner.
+    assert time.perf_counter() - started < 2.0
+    assert in_flight["peak"] == 300
+    assert executor.submit(_job("pre_collect")) is False
+
+
+def test_poller_async_mode_collects_metrics_without_blocking_threads(monkeypatch, collector_session_local):
+    session: Session = collector_session_local()
+    now = datetime.now(timezone.utc)
+    jobs = [
+        ScheduledJob(
+            deployment_id=uuid4(),
+            job_type="post_collect",
+            phase="post",
+            sequence_index=0,
+            scheduled_at=now - timedelta(seconds=1),
+            status="pending",
+            job_metadata={"metrics_endpoint": f"https://app-{idx}.example.test/ds-metrics"},
+        )
+        for idx in range(20)
+    ]
+    session.add_all(jobs)
+    session.commit()
+    job_ids = [job.id for job in jobs]
+    session.close()
+
+    async def _metrics_endpoint(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.2)
+        return httpx.Response(
+            200,
+            json={
+                "metrics": {
+                    "requests_per_sec": 12.0,
+                    "latency_p95": 120.0,
+                    "error_rate": 0.01,
+                    "cpu_usage": 0.3,
+                    "memory_usage": 0.4,
+                }
+            },
+        )
+
+    monkeypatch.setattr(poller_module, "SessionLocal", collector_session_local)
+    monkeypatch.setattr(poller_module, "EXECUTION_MODE", "async")
+    monkeypatch.setattr(poller_module, "ASYNC_MAX_IN_FLIGHT", 50)
+    monkeypatch.setattr(poller_module, "ASYNC_DB_THREADS", 1)
+    monkeypatch.setattr(
+        async_executor_module,
+        "_default_http_client_factory",
+        lambda _max_in_flight: httpx.AsyncClient(transport=httpx.MockTransport(_metrics_endpoint)),
+    )
+
+    poller = JobPoller()
+    started = time.perf_counter()
+    try:
+        poller._process_pending_jobs()
+        assert poller.worker_pool.wait_idle(timeout=10)
+    finally:
+        poller.worker_pool.stop(timeout=5)
+    elapsed = time.perf_counter() - started
+
+    assert isinstance(poller.worker_pool, AsyncJobExecutor)
+    # 20 fetchs de 200ms avec un seul thread DB : ils se recouvrent.
+    assert elapsed < 2.0
+
+    verify_session: Session = collector_session_local()
+    statuses = {verify_session.get(ScheduledJob, job_id).status for job_id in job_ids}
+    assert statuses == {"completed"}
+    assert verify_session.query(MetricSample).count() == 20
+    verify_session.close()
+
+
+def test_poller_async_mode_retries_failed_collection(monkeypatch, collector_session_local):
+    session: Session = collector_session_local()
+    job = ScheduledJob(
+        deployment_id=uuid4(),
+        job_type="pre_collect",
+        phase="pre",
+        scheduled_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+        status="pending",
+        job_metadata={"metrics_endpoint": "https://down.example.test/ds-metrics"},
+    )
+    session.add(job)
+    session.commit()
+    job_id = job.id
+    session.close()
+
+    monkeypatch.setattr(poller_module, "SessionLocal", collector_session_local)
+    monkeypatch.setattr(poller_module, "EXECUTION_MODE", "async")
+    monkeypatch.setattr(
+        async_executor_module,
+        "_default_http_client_factory",
+        lambda _max_in_flight: httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(503))
+        ),
+    )
+
+    poller = JobPoller()
+    try:
+        poller._process_pending_jobs()
+        assert poller.worker_pool.wait_idle(timeout=5)
+    finally:
+        poller.worker_pool.stop(timeout=5)
+
+    verify_session: Session = collector_session_local()
+    row = verify_session.get(ScheduledJob, job_id)
+    assert row.status == "pending"
+    assert row.retry_count == 1
+    assert "HTTP error 503" in row.last_error
+    verify_session.close()
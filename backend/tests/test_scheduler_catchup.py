@@ -0,0 +1,217 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.db.models.scheduled_job import ScheduledJob
+from app.db.models.scheduler_worker import SchedulerWorker
+from app.scheduler import deadlines as deadlines_module
+from app.scheduler import poller as poller_module
+from app.scheduler.catchup import (
+    COLLAPSED_STATUS,
+    collapse_overdue_observation_sessions,
+    collapse_overdue_post_collects,
+)
+from app.scheduler.deadlines import deadline_for
+from app.scheduler.poller import JobPoller
+
+
+@pytest.fixture
+def catchup_session_local(monkeypatch, sqlite_session_factory):
+    monkeypatch.setattr(deadlines_module, "SCHEDULE_JITTER_SECONDS", 0.0)
+    SessionLocal = sqlite_session_factory(ScheduledJob, SchedulerWorker)
+    return SessionLocal
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _job(job_type: str, scheduled_at: datetime, **kwargs) -> ScheduledJob:
+    return ScheduledJob(
+        job_type=job_type,
+        scheduled_at=scheduled_at,
+        deadline_at=deadline_for(job_type, scheduled_at),
+        status="pending",
+        **kwargs,
+    )
+
+
+def _seed_outage(session_local, *, overdue: int, upcoming: int, now: datetime):
+    # Scheduler arrêté une heure : `overdue` samples POST dépassés, `upcoming` encore à venir.
+    deployment_id = uuid4()
+    session: Session = session_local()
+    jobs = [
+        _job(
+            "post_collect",
+            now - timedelta(hours=1) + timedelta(seconds=60 * index),
+            deployment_id=deployment_id,
+            phase="post",
+            sequence_index=index,
+        )
+        for index in range(overdue)
+    ] + [
+        _job(
+            "post_collect",
+            now + timedelta(seconds=30 + 60 * index),
+            deployment_id=deployment_id,
+            phase="post",
+            sequence_index=overdue + index,
+        )
+        for index in range(upcoming)
+    ]
+    session.add_all(jobs)
+    session.commit()
+    session.close()
+    return deployment_id
+
+
+def test_overdue_post_collects_are_collapsed_to_the_samples_analysis_needs(catchup_session_local):
+    now = datetime.now(timezone.utc)
+    deployment_id = _seed_outage(catchup_session_local, overdue=8, upcoming=2, now=now)
+
+    db: Session = catchup_session_local()
+    collapsed = collapse_overdue_post_collects(db, now, keep=3, interval_seconds=60)
+    db.commit()
+
+    assert collapsed == 5
+    posts = (
+        db.query(ScheduledJob)
+        .filter(ScheduledJob.deployment_id == deployment_id)
+        .order_by(ScheduledJob.sequence_index)
+        .all()
+    )
+    assert [job.status for job in posts[:5]] == [COLLAPSED_STATUS] * 5
+    kept = posts[5:8]
+    assert [job.status for job in kept] == ["pending"] * 3
+    assert [(_as_utc(job.scheduled_at) - now).total_seconds() for job in kept] == [0, 60, 120]
+    # Les samples à venir sont décalés derrière les samples conservés, espacement inchangé.
+    assert [(_as_utc(job.scheduled_at) - now).total_seconds() for job in posts[8:]] == [180, 240]
+    db.close()
+
+
+def test_overdue_observation_session_cursor_jumps_to_the_last_samples(catchup_session_local):
+    now = datetime.now(timezone.utc)
+    started_at = now - timedelta(hours=1)
+    session: Session = catchup_session_local()
+    job = _job(
+        "observation_session",
+        started_at + timedelta(seconds=60 * 2),
+        deployment_id=uuid4(),
+        phase="post",
+        sequence_index=2,
+        job_metadata={
+            "observation_window": 15,
+            "interval_seconds": 60,
+            "started_at": started_at.isoformat(),
+            "shift_seconds": 0,
+        },
+    )
+    session.add(job)
+    session.commit()
+    job_id = job.id
+    session.close()
+
+    db: Session = catchup_session_local()
+    assert collapse_overdue_observation_sessions(db, now, keep=5, interval_seconds=60) == 8
+    db.commit()
+
+    job = db.get(ScheduledJob, job_id)
+    assert (job.status, job.sequence_index) == ("pending", 10)
+    assert job.job_metadata["catchup_skipped_samples"] == 8
+    assert _as_utc(job.scheduled_at) == now
+    # Le prochain sample tombe à started_at + 10 * interval + shift = maintenant.
+    assert job.job_metadata["shift_seconds"] == pytest.approx((now - started_at).total_seconds() - 600, abs=0.01)
+    db.close()
+
+
+def test_poller_enters_catch_up_prioritizes_analysis_then_exits(monkeypatch, catchup_session_local):
+    monkeypatch.setattr(poller_module, "CATCHUP_BACKLOG_THRESHOLD", 6)
+    monkeypatch.setattr(poller_module, "CATCHUP_EXIT_BACKLOG", 0)
+    monkeypatch.setattr(poller_module, "samples_per_deployment", lambda: 2)
+    now = datetime.now(timezone.utc)
+    _seed_outage(catchup_session_local, overdue=8, upcoming=0, now=now)
+    session: Session = catchup_session_local()
+    session.add(_job("analysis", now - timedelta(minutes=30), deployment_id=uuid4()))
+    session.commit()
+    session.close()
+    monotonic = {"now": 1000.0}
+    clock = SimpleNamespace(
+        now=lambda: datetime.now(timezone.utc),
+        monotonic=lambda: monotonic["now"],
+        perf_counter=lambda: monotonic["now"],
+    )
+    counts = []
+    count_overdue = poller_module.count_overdue
+
+    def _counting_overdue(*args):
+        counts.append(count_overdue(*args))
+        return counts[-1]
+
+    monkeypatch.setattr(poller_module, "count_overdue", _counting_overdue)
+    poller = JobPoller(clock=clock)
+
+    db: Session = catchup_session_local()
+    poller._update_catch_up(db)
+    db.close()
+
+    # 9 jobs en retard à l'entrée, 6 samples réduits : 3 restants estimés jusqu'au prochain COUNT.
+    assert poller.catch_up.active is True
+    assert (poller.catch_up.backlog_at_start, poller.catch_up.backlog_remaining) == (9, 3)
+    assert poller.catch_up.collapsed_jobs == 6
+    assert counts == [9]
+    assert [lane.name for lane in poller._lanes_in_claim_order()][:2] == ["analysis", "notifications"]
+
+    db = catchup_session_local()
+    claimed = poller._claim_due_jobs_by_lane(db=db, pool=SimpleNamespace(capacity=1), free_slots=1)
+    db.close()
+    assert [job.job_type for job in claimed] == ["analysis"]
+
+    # Tick suivant dans l'intervalle : pas de COUNT, donc pas de sortie.
+    db = catchup_session_local()
+    poller._update_catch_up(db)
+    db.close()
+    assert poller.catch_up.active is True
+    assert counts == [9]
+
+    # Les 2 samples gardés sont replanifiés, l'analyse est réclamée : plus rien en retard.
+    monotonic["now"] += poller_module.CATCHUP_CHECK_INTERVAL_SECONDS
+    db = catchup_session_local()
+    poller._update_catch_up(db)
+    db.close()
+    assert counts == [9, 0]
+    assert poller.catch_up.active is False
+    assert [lane.name for lane in poller._lanes_in_claim_order()][0] == "collection"
+
+
+def test_scheduler_health_reports_catch_up_progress(catchup_session_local):
+    from app import main as main_module
+
+    now = datetime.now(timezone.utc)
+    session: Session = catchup_session_local()
+    session.add(
+        SchedulerWorker(
+            worker_id="worker-a:1:catchup",
+            hostname="worker-a",
+            pid=1,
+            role="worker",
+            execution_mode="async",
+            heartbeat_at=now,
+            catchup_started_at=now - timedelta(minutes=2),
+            catchup_backlog_start=400,
+            catchup_backlog_remaining=100,
+            catchup_collapsed_jobs=250,
+        )
+    )
+    session.commit()
+
+    snapshot = main_module._scheduler_snapshot(db=session, now=now)
+
+    assert snapshot["catch_up_active"] is True
+    catch_up = snapshot["workers"][0]["catch_up"]
+    assert (catch_up["backlog_remaining"], catch_up["collapsed_samples"], catch_up["progress"]) == (100, 250, 0.75)
+    session.close()
@@ -0,0 +1,224 @@
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.db.models.scheduled_job import ScheduledJob
+from app.db.models.scheduled_job_dead_letter import ScheduledJobDeadLetter
+from app.scheduler import routes as scheduler_routes
+from app.scheduler.deadlines import deadline_for
+from app.scheduler.poller import JobPoller
+from app.scheduler.retry_policies import retry_policy_for
+from app.scheduler.schemas import DeadLetterReplayRequest
+
+
+@pytest.fixture
+def dead_letter_session_local(sqlite_session_factory):
+    return sqlite_session_factory(ScheduledJob, ScheduledJobDeadLetter)
+
+
+def _seed_running(session_local, *, job_type: str, retry_count: int, planned_at: datetime, **fields):
+    session: Session = session_local()
+    job = ScheduledJob(
+        deployment_id=uuid4(),
+        job_type=job_type,
+        scheduled_at=planned_at,
+        deadline_at=deadline_for(job_type, planned_at),
+        status="running",
+        retry_count=retry_count,
+        locked_by="worker-a",
+        job_metadata={"project_id": "p-1"},
+        **fields,
+    )
+    session.add(job)
+    session.commit()
+    job_id = job.id
+    session.close()
+    return job_id
+
+
+def _fail(session_local, job_id, error: Exception) -> None:
+    db: Session = session_local()
+    job = db.get(ScheduledJob, job_id)
+    JobPoller()._handle_job_failure(db, job, error, time.perf_counter())
+    db.commit()
+    db.close()
+
+
+def test_exhausted_and_too_old_jobs_move_to_the_dead_letter_table(dead_letter_session_local):
+    now = datetime.now(timezone.utc)
+    exhausted_id = _seed_running(
+        dead_letter_session_local,
+        job_type="analysis",
+        retry_count=retry_policy_for("analysis").max_retries,
+        planned_at=now - timedelta(minutes=10),
+    )
+    # Premier échec d'un post_collect prévu il y a 5 minutes : le retry n'aurait plus de sens.
+    stale_id = _seed_running(
+        dead_letter_session_local,
+        job_type="post_collect",
+        retry_count=0,
+        planned_at=now - timedelta(minutes=5),
+    )
+    fresh_id = _seed_running(dead_letter_session_local, job_type="post_collect", retry_count=0, planned_at=now)
+
+    for job_id in (exhausted_id, stale_id, fresh_id):
+        _fail(dead_letter_session_local, job_id, RuntimeError("endpoint down"))
+
+    db: Session = dead_letter_session_local()
+    assert db.get(ScheduledJob, exhausted_id) is None
+    assert db.get(ScheduledJob, stale_id) is None
+    entries = {entry.id: entry for entry in db.query(ScheduledJobDeadLetter).all()}
+    assert {entry_id: entry.reason for entry_id, entry in entries.items()} == {
+        exhausted_id: "exhausted",
+        stale_id: "max_age",
+    }
+    assert entries[stale_id].job_metadata == {"project_id": "p-1"}
+    assert entries[stale_id].last_error == "RuntimeError: endpoint down"
+
+    fresh = db.get(ScheduledJob, fresh_id)
+    assert (fresh.status, fresh.retry_count) == ("pending", 1)
+    db.close()
+
+
+def test_retry_moves_the_deadline_but_keeps_the_planned_time(dead_letter_session_local):
+    now = datetime.now(timezone.utc)
+    # post_collect : backoff 10s puis 30s, âge max 120s.
+    planned = now - timedelta(seconds=100)
+    job_id = _seed_running(dead_letter_session_local, job_type="post_collect", retry_count=0, planned_at=planned)
+
+    _fail(dead_letter_session_local, job_id, RuntimeError("endpoint down"))
+
+    db: Session = dead_letter_session_local()
+    job = db.get(ScheduledJob, job_id)
+    scheduled_at = job.scheduled_at.replace(tzinfo=timezone.utc)
+    assert (job.status, job.retry_count) == ("pending", 1)
+    # Nouvelle deadline depuis l'heure du retry : pas de deadline manquée dès le re-claim.
+    assert job.deadline_at.replace(tzinfo=timezone.utc) == deadline_for("post_collect", scheduled_at)
+    assert job.planned_at.replace(tzinfo=timezone.utc) == planned
+    job.status = "running"
+    db.commit()
+    db.close()
+
+    # Deuxième échec : l'âge max part toujours de l'heure prévue, pas de la deadline déplacée.
+    _fail(dead_letter_session_local, job_id, RuntimeError("endpoint down"))
+
+    db = dead_letter_session_local()
+    assert db.get(ScheduledJob, job_id) is None
+    assert db.get(ScheduledJobDeadLetter, job_id).reason == "max_age"
+    db.close()
+
+
+def test_lease_recovery_dead_letters_jobs_past_their_type_budget(dead_letter_session_local):
+    now = datetime.now(timezone.utc)
+    job_id = _seed_running(
+        dead_letter_session_local,
+        job_type="email_send",
+        retry_count=retry_policy_for("email_send").max_retries,
+        planned_at=now - timedelta(minutes=5),
+        lease_expires_at=now - timedelta(seconds=1),
+    )
+
+    db: Session = dead_letter_session_local()
+    assert JobPoller()._recover_expired_leases(db) == 1
+    db.close()
+
+    db = dead_letter_session_local()
+    assert db.get(ScheduledJob, job_id) is None
+    assert db.get(ScheduledJobDeadLetter, job_id).reason == "lease_expired"
+    db.close()
+
+
+def test_lease_recovery_uses_the_failure_retry_policy(dead_letter_session_local):
+    now = datetime.now(timezone.utc)
+    lease = {"lease_expires_at": now - timedelta(seconds=1)}
+    # Retries restants mais prévu il y a 5 minutes : au-delà de l'âge max d'une collecte.
+    stale_id = _seed_running(
+        dead_letter_session_local, job_type="post_collect", retry_count=0, planned_at=now - timedelta(minutes=5), **lease
+    )
+    fresh_id = _seed_running(dead_letter_session_local, job_type="analysis", retry_count=0, planned_at=now, **lease)
+
+    db: Session = dead_letter_session_local()
+    assert JobPoller()._recover_expired_leases(db) == 2
+    db.close()
+
+    db = dead_letter_session_local()
+    assert db.get(ScheduledJob, stale_id) is None
+    assert db.get(ScheduledJobDeadLetter, stale_id).reason == "lease_expired"
+    fresh = db.get(ScheduledJob, fresh_id)
+    retry_at = fresh.scheduled_at.replace(tzinfo=timezone.utc)
+    assert (fresh.status, fresh.retry_count, fresh.locked_by) == ("pending", 1, None)
+    assert retry_at >= now + timedelta(seconds=retry_policy_for("analysis").base_delay_seconds(1))
+    assert fresh.deadline_at.replace(tzinfo=timezone.utc) == deadline_for("analysis", retry_at)
+    assert fresh.planned_at.replace(tzinfo=timezone.utc) == now
+    db.close()
+
+
+def test_lease_recovery_failure_rolls_back_the_tick(dead_letter_session_local, monkeypatch):
+    now = datetime.now(timezone.utc)
+    job_id = _seed_running(
+        dead_letter_session_local,
+        job_type="analysis",
+        retry_count=0,
+        planned_at=now,
+        lease_expires_at=now - timedelta(seconds=1),
+    )
+    poller = JobPoller()
+
+    def _broken_retry_values(*_args, **_kwargs):
+        raise RuntimeError("lock timeout")
+
+    monkeypatch.setattr(poller, "_retry_values", _broken_retry_values)
+
+    db: Session = dead_letter_session_local()
+    assert poller._recover_expired_leases(db) == 0
+    # Session réutilisable dans le même tick : la transaction a été annulée.
+    assert db.get(ScheduledJob, job_id).status == "running"
+    db.close()
+
+
+def test_replay_requeues_dead_letters_once_and_requires_a_superuser(dead_letter_session_local):
+    now = datetime.now(timezone.utc)
+    job_ids = [
+        _seed_running(
+            dead_letter_session_local,
+            job_type="slack_send",
+            retry_count=retry_policy_for("slack_send").max_retries,
+            planned_at=now - timedelta(minutes=1),
+        )
+        for _ in range(2)
+    ]
+    for job_id in job_ids:
+        _fail(dead_letter_session_local, job_id, RuntimeError("slack 503"))
+
+    with pytest.raises(HTTPException) as denied:
+        scheduler_routes._require_superuser(current_user=SimpleNamespace(id=uuid4(), is_superuser=False))
+    assert denied.value.status_code == 403
+
+    admin = SimpleNamespace(id=uuid4(), is_superuser=True)
+    db: Session = dead_letter_session_local()
+    listed = scheduler_routes.get_dead_letters(
+        job_type="slack_send", reason=None, deployment_id=None, include_replayed=False, limit=100, _admin=admin, db=db
+    )
+    assert listed.pending == 2
+    assert {item.id for item in listed.items} == set(job_ids)
+
+    response = scheduler_routes.replay_dead_letter_jobs(
+        DeadLetterReplayRequest(job_type="slack_send"), admin=admin, db=db
+    )
+    assert response.replayed == 2
+    again = scheduler_routes.replay_dead_letter_jobs(DeadLetterReplayRequest(ids=job_ids), admin=admin, db=db)
+    assert again.replayed == 0
+    db.close()
+
+    db = dead_letter_session_local()
+    for replayed in response.jobs:
+        job = db.get(ScheduledJob, replayed.job_id)
+        assert (job.status, job.retry_count, job.job_metadata) == ("pending", 0, {"project_id": "p-1"})
+        entry = db.get(ScheduledJobDeadLetter, replayed.dead_letter_id)
+        assert entry.replay_job_id == job.id and entry.replayed_at is not None
+    db.close()
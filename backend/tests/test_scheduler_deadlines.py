@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.db.models.scheduled_job import ScheduledJob
+from app.scheduler import deadlines as deadlines_module
+from app.scheduler import poller as poller_module
+from app.scheduler.deadlines import deadline_for, lateness_budget_seconds
+from app.scheduler.poller import JobPoller
+from app.scheduler.tasks import POST_COLLECTION_INTERVAL_SECONDS, schedule_post_collection
+
+
+@pytest.fixture
+def deadlines_session_local(sqlite_session_factory):
+    return sqlite_session_factory(ScheduledJob)
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def test_post_collect_budget_follows_sequence_gap_threshold():
+    # 60s × (1.8 − 1) : au-delà, l'écart entre deux samples dépasse le seuil de sequence_gaps.
+    assert lateness_budget_seconds("post_collect") == pytest.approx(48.0)
+    scheduled_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert deadline_for("email_send", scheduled_at) == scheduled_at + timedelta(seconds=900)
+    assert lateness_budget_seconds("unknown") == 600
+
+
+def test_post_collection_sequence_is_jittered_as_a_whole(monkeypatch, deadlines_session_local):
+    monkeypatch.setattr(deadlines_module, "SCHEDULE_JITTER_SECONDS", 30.0)
+    session: Session = deadlines_session_local()
+    before = datetime.now(timezone.utc)
+
+    schedule_post_collection(
+        db=session,
+        deployment_id=uuid4(),
+        project_id=uuid4(),
+        observation_window=3,
+    )
+
+    jobs = session.query(ScheduledJob).order_by(ScheduledJob.sequence_index).all()
+    scheduled = [_as_utc(job.scheduled_at) for job in jobs]
+    assert before <= scheduled[0] <= before + timedelta(seconds=31)
+    assert [(b - a).total_seconds() for a, b in zip(scheduled, scheduled[1:])] == [
+        POST_COLLECTION_INTERVAL_SECONDS,
+        POST_COLLECTION_INTERVAL_SECONDS,
+    ]
+    assert all(
+        _as_utc(job.deadline_at) == _as_utc(job.scheduled_at) + timedelta(seconds=48) for job in jobs
+    )
+    session.close()
+
+
+def test_urgent_jobs_go_first_then_fairness():
+    now = datetime.now(timezone.utc)
+
+    def _job(project: str, deadline_in_seconds: float | None):
+        return SimpleNamespace(
+            id=uuid4(),
+            deployment_id=None,
+            job_type="email_send",
+            job_metadata={"project_id": project},
+            tenant_key=None,
+            deadline_at=now + timedelta(seconds=deadline_in_seconds) if deadline_in_seconds is not None else None,
+        )
+
+    relaxed_a1 = _job("A", 600)
+    relaxed_a2 = _job("A", 700)
+    relaxed_b = _job("B", 800)
+    urgent_c = _job("C", 5)
+    overdue_d = _job("D", -30)
+
+    selected = JobPoller()._select_jobs_with_fairness(
+        db=None,
+        jobs=[relaxed_a1, relaxed_a2, relaxed_b, urgent_c, overdue_d],
+        limit=4,
+    )
+
+    assert selected == [overdue_d, urgent_c, relaxed_a1, relaxed_b]
+
+
+def test_late_post_collect_is_flagged_and_sequence_is_shifted(monkeypatch, deadlines_session_local):
+    missed = []
+    monkeypatch.setattr(poller_module, "inc_scheduler_deadline_missed", lambda *, job_type: missed.append(job_type))
+    session: Session = deadlines_session_local()
+    now = datetime.now(timezone.utc)
+    deployment_id = uuid4()
+    start = now - timedelta(seconds=200)
+
+    def _post(index: int) -> ScheduledJob:
+        scheduled_at = start + timedelta(seconds=index * POST_COLLECTION_INTERVAL_SECONDS)
+        return ScheduledJob(
+            deployment_id=deployment_id,
+            job_type="post_collect",
+            phase="post",
+            sequence_index=index,
+            scheduled_at=scheduled_at,
+            deadline_at=deadline_for("post_collect", scheduled_at),
+            status="pending",
+        )
+
+    late = _post(0)
+    next_post = _post(4)
+    analysis_at = now + timedelta(minutes=5)
+    analysis = ScheduledJob(
+        deployment_id=deployment_id,
+        job_type="analysis",
+        scheduled_at=analysis_at,
+        deadline_at=deadline_for("analysis", analysis_at),
+        status="pending",
+    )
+    session.add_all([late, next_post, analysis])
+    session.commit()
+    next_post_id, analysis_id = next_post.id, analysis.id
+    original_next = _as_utc(next_post.scheduled_at)
+    session.close()
+
+    db: Session = deadlines_session_local()
+    claimed = JobPoller()._claim_due_jobs(db, limit=1)
+    db.close()
+
+    assert [job.sequence_index for job in claimed] == [0]
+    assert missed == ["post_collect"]
+
+    verify: Session = deadlines_session_local()
+    shifted_next = verify.get(ScheduledJob, next_post_id)
+    shift = (_as_utc(shifted_next.scheduled_at) - original_next).total_seconds()
+    assert 199 <= shift <= 205
+    assert _as_utc(shifted_next.deadline_at) == _as_utc(shifted_next.scheduled_at) + timedelta(seconds=48)
+    shifted_analysis = verify.get(ScheduledJob, analysis_id)
+    assert (_as_utc(shifted_analysis.scheduled_at) - analysis_at).total_seconds() == pytest.approx(shift, abs=0.01)
+    verify.close()
@@ -0,0 +1,192 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.models.scheduled_job import ScheduledJob
+from app.scheduler import dependencies as dependencies_module
+from app.scheduler import poller as poller_module
+from app.scheduler.dependencies import DOWNSTREAM_JOB_TYPES
+from app.scheduler.poller import JobPoller
+from app.scheduler.retry_policies import retry_policy_for
+
+
+@pytest.fixture
+def dependencies_session_local(sqlite_session_factory):
+    return sqlite_session_factory(ScheduledJob)
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _seed_sequence(session_local, *, posts_due: int, analysis_in_seconds: float, grace_seconds: float = 600):
+    now = datetime.now(timezone.utc)
+    deployment_id = uuid4()
+    session: Session = session_local()
+    posts = [
+        ScheduledJob(
+            deployment_id=deployment_id,
+            job_type="post_collect",
+            phase="post",
+            sequence_index=index,
+            scheduled_at=now - timedelta(seconds=10 - index),
+            status="pending",
+        )
+        for index in range(posts_due)
+    ]
+    analysis_at = now + timedelta(seconds=analysis_in_seconds)
+    metadata = {"dependencies_deadline_at": (analysis_at + timedelta(seconds=grace_seconds)).isoformat()}
+    analysis = ScheduledJob(
+        deployment_id=deployment_id,
+        job_type="analysis",
+        scheduled_at=analysis_at,
+        status="pending",
+        job_metadata=metadata,
+    )
+    session.add_all([*posts, analysis])
+    session.commit()
+    ids = [post.id for post in posts], analysis.id
+    session.close()
+    return ids
+
+
+def _finish_claimed(poller: JobPoller, session_local, *, limit: int, error: Exception | None = None) -> list:
+    db: Session = session_local()
+    claimed = poller._claim_due_jobs(db=db, limit=limit)
+    db.close()
+    for job in claimed:
+        run_db: Session = session_local()
+        poller._finish_job(run_db, job, time.perf_counter(), error=error)
+        run_db.close()
+    return claimed
+
+
+def test_collection_job_types_point_to_analysis():
+    assert DOWNSTREAM_JOB_TYPES["post_collect"] == {"analysis"}
+    assert DOWNSTREAM_JOB_TYPES["observation_session"] == {"analysis"}
+    assert "analysis" not in DOWNSTREAM_JOB_TYPES
+
+
+def test_analysis_is_released_when_the_last_post_collect_completes(dependencies_session_local):
+    (first_post, second_post), analysis_id = _seed_sequence(
+        dependencies_session_local, posts_due=2, analysis_in_seconds=300
+    )
+    poller = JobPoller()
+
+    assert [job.id for job in _finish_claimed(poller, dependencies_session_local, limit=1)] == [first_post]
+    db: Session = dependencies_session_local()
+    assert _as_utc(db.get(ScheduledJob, analysis_id).scheduled_at) > datetime.now(timezone.utc)
+    db.close()
+
+    assert [job.id for job in _finish_claimed(poller, dependencies_session_local, limit=1)] == [second_post]
+    db = dependencies_session_local()
+    analysis = db.get(ScheduledJob, analysis_id)
+    assert _as_utc(analysis.scheduled_at) <= datetime.now(timezone.utc)
+    assert analysis.status == "pending"
+    db.close()
+
+
+def test_concurrent_completion_of_the_last_upstream_jobs_releases_analysis(monkeypatch, dependencies_session_local):
+    (first_post, second_post), analysis_id = _seed_sequence(
+        dependencies_session_local, posts_due=2, analysis_in_seconds=300
+    )
+    poller = JobPoller()
+    db: Session = dependencies_session_local()
+    claimed = poller._claim_due_jobs(db=db, limit=2)
+    db.close()
+    assert {job.id for job in claimed} == {first_post, second_post}
+
+    # Les deux jobs amont arrivent au comptage en même temps si rien ne les sérialise.
+    counting = threading.Barrier(2, timeout=0.5)
+    original_count = dependencies_module._unfinished_count
+
+    def _count_together(*args, **kwargs):
+        try:
+            counting.wait()
+        except threading.BrokenBarrierError:
+            pass
+        return original_count(*args, **kwargs)
+
+    monkeypatch.setattr(dependencies_module, "_unfinished_count", _count_together)
+
+    def _finish(job) -> None:
+        run_db: Session = dependencies_session_local()
+        poller._finish_job(run_db, job, time.perf_counter())
+        run_db.close()
+
+    threads = [threading.Thread(target=_finish, args=(job,)) for job in claimed]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    db = dependencies_session_local()
+    assert {db.get(ScheduledJob, job_id).status for job_id in (first_post, second_post)} == {"completed"}
+    assert _as_utc(db.get(ScheduledJob, analysis_id).scheduled_at) <= datetime.now(timezone.utc)
+    db.close()
+    # Postgres : le comptage des jobs amont se fait sous verrou des jobs aval.
+    lock = dependencies_module._lock_pending_downstream(uuid4(), "analysis")
+    assert "FOR UPDATE" in str(lock.compile(dialect=postgresql.dialect()))
+
+
+def test_final_failure_of_last_post_collect_also_releases_analysis(dependencies_session_local):
+    (post_id,), analysis_id = _seed_sequence(dependencies_session_local, posts_due=1, analysis_in_seconds=300)
+    db: Session = dependencies_session_local()
+    db.get(ScheduledJob, post_id).retry_count = retry_policy_for("post_collect").max_retries
+    db.commit()
+    db.close()
+
+    _finish_claimed(JobPoller(), dependencies_session_local, limit=1, error=RuntimeError("endpoint down"))
+
+    db = dependencies_session_local()
+    assert db.get(ScheduledJob, post_id).status == "failed"
+    assert _as_utc(db.get(ScheduledJob, analysis_id).scheduled_at) <= datetime.now(timezone.utc)
+    db.close()
+
+
+def test_analysis_waits_for_a_late_retry_then_falls_back_after_grace(monkeypatch, dependencies_session_local):
+    analyzed = []
+    monkeypatch.setattr(poller_module, "analyze_deployment", lambda **kwargs: analyzed.append(kwargs))
+    (post_id,), analysis_id = _seed_sequence(
+        dependencies_session_local, posts_due=1, analysis_in_seconds=-1, grace_seconds=120
+    )
+    # Heure de repli atteinte, mais le dernier sample est en retry dans 1 minute.
+    db: Session = dependencies_session_local()
+    db.get(ScheduledJob, post_id).scheduled_at = datetime.now(timezone.utc) + timedelta(minutes=1)
+    db.commit()
+    db.close()
+    poller = JobPoller()
+
+    def _claim_and_execute() -> None:
+        claim_db: Session = dependencies_session_local()
+        claimed = poller._claim_due_jobs(db=claim_db, limit=1)
+        claim_db.close()
+        assert [job.id for job in claimed] == [analysis_id]
+        run_db: Session = dependencies_session_local()
+        poller._execute_job(run_db, claimed[0])
+        run_db.close()
+
+    _claim_and_execute()
+    db = dependencies_session_local()
+    analysis = db.get(ScheduledJob, analysis_id)
+    assert (analysis.status, analysis.retry_count, analyzed) == ("pending", 0, [])
+    assert _as_utc(analysis.scheduled_at) > datetime.now(timezone.utc) + timedelta(seconds=100)
+
+    # Délai de grâce écoulé : l'analyse tourne avec les samples disponibles.
+    analysis.scheduled_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    analysis.job_metadata = {"dependencies_deadline_at": datetime.now(timezone.utc).isoformat()}
+    db.commit()
+    db.close()
+
+    _claim_and_execute()
+    db = dependencies_session_local()
+    assert db.get(ScheduledJob, analysis_id).status == "completed"
+    assert len(analyzed) == 1
+    db.close()
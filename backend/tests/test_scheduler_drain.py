@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.db.models.scheduled_job import ScheduledJob
+from app.db.models.scheduler_worker import SchedulerWorker
+from app.scheduler import poller as poller_module
+from app.scheduler.poller import JobPoller
+
+
+@pytest.fixture
+def drain_session_local(monkeypatch, sqlite_session_factory):
+    SessionLocal = sqlite_session_factory(ScheduledJob, SchedulerWorker)
+    monkeypatch.setattr(poller_module, "SessionLocal", SessionLocal)
+    return SessionLocal
+
+
+def _seed_pending(session_local, count: int) -> list:
+    session: Session = session_local()
+    jobs = [
+        ScheduledJob(
+            deployment_id=uuid4(),
+            job_type="analysis",
+            scheduled_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+            status="pending",
+        )
+        for _ in range(count)
+    ]
+    session.add_all(jobs)
+    session.commit()
+    ids = [job.id for job in jobs]
+    session.close()
+    return ids
+
+
+def _claim_and_dispatch(poller: JobPoller, session_local, limit: int) -> None:
+    db: Session = session_local()
+    claimed = poller._claim_due_jobs(db=db, limit=limit)
+    poller._dispatch_claimed_jobs(db, claimed)
+    db.close()
+
+
+def test_drain_hands_back_queued_and_overrunning_jobs_in_one_pass(monkeypatch, drain_session_local):
+    job_ids = _seed_pending(drain_session_local, 2)
+    started = threading.Event()
+    release = threading.Event()
+
+    def _hung_run_job(_db, _job):
+        started.set()
+        release.wait(timeout=5)
+
+    poller = JobPoller(max_concurrent_jobs=1)
+    monkeypatch.setattr(poller, "_run_job", _hung_run_job)
+    pool = poller._ensure_worker_pool()
+    try:
+        _claim_and_dispatch(poller, drain_session_local, limit=2)
+        assert started.wait(timeout=2)
+        assert pool.queued == 1
+
+        drain_started = time.monotonic()
+        asyncio.run(poller.stop(grace_seconds=0.3))
+        # Borné par la grâce, sans attendre le job bloqué ni l'expiration de son lease.
+        assert time.monotonic() - drain_started < 2
+        assert not release.is_set()
+
+        db: Session = drain_session_local()
+        rows = [db.get(ScheduledJob, job_id) for job_id in job_ids]
+        assert [(row.status, row.locked_by, row.retry_count) for row in rows] == [("pending", None, 0)] * 2
+        assert db.get(SchedulerWorker, poller.worker_id).stopped_at is not None
+        db.close()
+        assert poller.lane_in_flight() == {}
+
+        # Le résultat tardif du job rendu est ignoré (fencing) : la ligne reste pending.
+        release.set()
+        time.sleep(0.1)
+        db = drain_session_local()
+        assert all(db.get(ScheduledJob, job_id).status == "pending" for job_id in job_ids)
+        db.close()
+    finally:
+        release.set()
+        pool.stop(timeout=2)
+
+
+def test_drain_lets_in_flight_jobs_finish_within_the_grace_period(monkeypatch, drain_session_local):
+    (job_id,) = _seed_pending(drain_session_local, 1)
+    started = threading.Event()
+
+    def _short_run_job(_db, _job):
+        started.set()
+        time.sleep(0.1)
+
+    poller = JobPoller(max_concurrent_jobs=1)
+    monkeypatch.setattr(poller, "_run_job", _short_run_job)
+    poller._ensure_worker_pool()
+    _claim_and_dispatch(poller, drain_session_local, limit=1)
+    assert started.wait(timeout=2)
+
+    asyncio.run(poller.stop(grace_seconds=5))
+
+    db: Session = drain_session_local()
+    assert db.get(ScheduledJob, job_id).status == "completed"
+    db.close()
+    assert poller.worker_pool is None
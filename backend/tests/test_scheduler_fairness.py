@@ -0,0 +1,134 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.db.models.scheduled_job import ScheduledJob
+from app.scheduler import poller as poller_module
+from app.scheduler.fairness import DeficitRoundRobin, plan_weight, tenant_key_for_job, urgency_key
+from app.scheduler.poller import JobPoller
+
+
+@pytest.fixture
+def fairness_session_local(sqlite_session_factory):
+    return sqlite_session_factory(ScheduledJob)
+
+
+def _seed(session_local, tenant: str, count: int, *, age_seconds: int) -> None:
+    now = datetime.now(timezone.utc)
+    session: Session = session_local()
+    for idx in range(count):
+        scheduled_at = now - timedelta(seconds=age_seconds, milliseconds=idx)
+        session.add(
+            ScheduledJob(
+                job_type="email_send",
+                scheduled_at=scheduled_at,
+                deadline_at=scheduled_at + timedelta(minutes=15),
+                status="pending",
+                tenant_key=tenant,
+            )
+        )
+    session.commit()
+    session.close()
+
+
+def _claim_tenants(poller: JobPoller, session_local, *, limit: int) -> list[str]:
+    db: Session = session_local()
+    try:
+        return [job.tenant_key for job in poller._claim_due_jobs(db=db, limit=limit)]
+    finally:
+        db.close()
+
+
+def test_tenant_key_prefers_project_then_user_then_deployment():
+    project_id, user_id, deployment_id = uuid4(), uuid4(), uuid4()
+    assert tenant_key_for_job(project_id=project_id, user_id=user_id) == f"project:{project_id}"
+    assert tenant_key_for_job(user_id=user_id, deployment_id=deployment_id) == f"user:{user_id}"
+    assert tenant_key_for_job(deployment_id=deployment_id) == f"deployment:{deployment_id}"
+    assert tenant_key_for_job() is None
+    assert (plan_weight("free"), plan_weight("pro"), plan_weight("enterprise"), plan_weight(None)) == (1, 2, 4, 1)
+
+
+def test_drr_shares_slots_by_plan_weight():
+    now = datetime.now(timezone.utc)
+    drr = DeficitRoundRobin()
+    weights = {"free": 1, "pro": 2}
+    served = Counter()
+    for tick in range(10):
+        # Deux tenants saturés : chaque tick voit 10 jobs de chacun.
+        jobs = [
+            SimpleNamespace(tenant=tenant, deadline_at=now + timedelta(seconds=tick * 10 + idx))
+            for tenant in weights
+            for idx in range(10)
+        ]
+        selected = drr.select(
+            jobs,
+            3,
+            tenant_of=lambda job: job.tenant,
+            weight_of=weights.__getitem__,
+            urgency_of=urgency_key,
+        )
+        served.update(job.tenant for job in selected)
+
+    assert served == {"free": 10, "pro": 20}
+
+
+def test_noisy_tenant_cannot_fill_the_claim_window(fairness_session_local):
+    # Tenant bruyant dont les jobs sont tous plus anciens : sans files par tenant, il remplirait
+    # toute la fenêtre de lookahead et les autres tenants attendraient son drainage.
+    _seed(fairness_session_local, "project:noisy", 50, age_seconds=600)
+    _seed(fairness_session_local, "project:quiet-a", 1, age_seconds=5)
+    _seed(fairness_session_local, "project:quiet-b", 1, age_seconds=5)
+
+    claimed = _claim_tenants(JobPoller(), fairness_session_local, limit=3)
+
+    assert sorted(claimed) == ["project:noisy", "project:quiet-a", "project:quiet-b"]
+
+
+def test_full_tenant_is_left_out_of_the_next_locked_batch(monkeypatch, fairness_session_local):
+    # Le premier lot verrouillé ne contient que le tenant bruyant : plein après `limit` jobs,
+    # il est exclu du lot suivant, qui comble la fenêtre avec le tenant discret.
+    monkeypatch.setattr(poller_module, "FAIRNESS_LOOKAHEAD_MULTIPLIER", 2)
+    _seed(fairness_session_local, "project:noisy", 50, age_seconds=600)
+    _seed(fairness_session_local, "project:quiet", 3, age_seconds=5)
+
+    claimed = _claim_tenants(JobPoller(), fairness_session_local, limit=2)
+
+    assert sorted(claimed) == ["project:noisy", "project:quiet"]
+
+
+def test_tenants_take_turns_across_ticks(fairness_session_local):
+    _seed(fairness_session_local, "project:old", 5, age_seconds=600)
+    _seed(fairness_session_local, "project:new", 5, age_seconds=5)
+    poller = JobPoller()
+
+    ticks = [_claim_tenants(poller, fairness_session_local, limit=1) for _ in range(4)]
+
+    assert ticks == [["project:old"], ["project:new"], ["project:old"], ["project:new"]]
+
+
+def test_tenant_backlog_metrics_are_bounded_to_top_n(monkeypatch, fairness_session_local):
+    _seed(fairness_session_local, "project:a", 3, age_seconds=120)
+    _seed(fairness_session_local, "project:b", 2, age_seconds=30)
+    _seed(fairness_session_local, "project:c", 1, age_seconds=10)
+    exported = {}
+    monkeypatch.setattr(poller_module, "TENANT_METRICS_TOP_N", 2)
+    monkeypatch.setattr(
+        poller_module,
+        "set_scheduler_tenant_backlog",
+        lambda *, tenants, backlogged: exported.update(tenants=tenants, backlogged=backlogged),
+    )
+
+    db: Session = fairness_session_local()
+    JobPoller()._update_pending_jobs_gauge(db)
+    db.close()
+
+    assert exported["backlogged"] == 3
+    assert {tenant: backlog for tenant, (backlog, _) in exported["tenants"].items()} == {
+        "project:a": 3,
+        "project:b": 2,
+    }
+    assert exported["tenants"]["project:a"][1] >= 119
@@ -0,0 +1,168 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models.scheduled_job import ScheduledJob
+from app.db.models.scheduled_job_count import ScheduledJobCount
+from app.db.models.scheduled_job_dead_letter import ScheduledJobDeadLetter
+from app.db.models.scheduler_worker import SchedulerWorker
+from app.scheduler import poller as poller_module
+from app.scheduler.job_counts import (
+    counts_by_status,
+    install_job_count_triggers,
+    pending_by_lane,
+    read_job_counts,
+    rebuild_job_counts,
+)
+from app.scheduler.poller import JobPoller
+
+
+@pytest.fixture
+def counts_engine(sqlite_engine_factory):
+    engine = sqlite_engine_factory(ScheduledJob, SchedulerWorker, ScheduledJobCount, ScheduledJobDeadLetter)
+    with engine.begin() as connection:
+        install_job_count_triggers(connection)
+    return engine
+
+
+@pytest.fixture
+def counts_session_local(counts_engine):
+    return sessionmaker(bind=counts_engine, autocommit=False, autoflush=False)
+
+
+def _seed(session_local, job_type: str, count: int) -> None:
+    now = datetime.now(timezone.utc)
+    session: Session = session_local()
+    session.add_all(
+        ScheduledJob(job_type=job_type, scheduled_at=now - timedelta(seconds=5), status="pending")
+        for _ in range(count)
+    )
+    session.commit()
+    session.close()
+
+
+def _actual_counts(db: Session) -> dict:
+    rows = (
+        db.query(ScheduledJob.status, ScheduledJob.job_type, func.count(ScheduledJob.id))
+        .group_by(ScheduledJob.status, ScheduledJob.job_type)
+        .all()
+    )
+    return {(status, job_type): count for status, job_type, count in rows}
+
+
+def test_triggers_follow_inserts_claims_completions_and_deletes(counts_session_local):
+    _seed(counts_session_local, "post_collect", 3)
+    _seed(counts_session_local, "email_send", 2)
+    poller = JobPoller()
+
+    db: Session = counts_session_local()
+    claimed = poller._claim_due_jobs(db=db, limit=2, lane=poller_module.LANES[0])
+    db.close()
+    run_db: Session = counts_session_local()
+    poller._finish_job(run_db, claimed[0], time.perf_counter())
+    run_db.close()
+
+    db = counts_session_local()
+    db.query(ScheduledJob).filter(ScheduledJob.job_type == "email_send").delete(synchronize_session=False)
+    db.commit()
+
+    counts = read_job_counts(db)
+    assert counts == _actual_counts(db)
+    assert counts == {("pending", "post_collect"): 1, ("running", "post_collect"): 1, ("completed", "post_collect"): 1}
+    assert counts_by_status(counts)["pending"] == 1
+    assert pending_by_lane(counts) == {"collection": 1, "analysis": 0, "notifications": 0}
+    db.close()
+
+
+def test_rebuild_matches_a_full_recount(counts_session_local):
+    _seed(counts_session_local, "analysis", 2)
+    db: Session = counts_session_local()
+    db.query(ScheduledJobCount).delete()
+    db.add(ScheduledJobCount(status="pending", job_type="analysis", slot=3, count=40))
+    db.commit()
+
+    rebuild_job_counts(db)
+    db.commit()
+
+    assert read_job_counts(db) == {("pending", "analysis"): 2}
+    db.close()
+
+
+def test_pending_gauge_reads_counters_without_counting_scheduled_jobs(monkeypatch, counts_engine, counts_session_local):
+    _seed(counts_session_local, "post_collect", 4)
+    exported = {}
+    monkeypatch.setattr(poller_module, "set_scheduler_jobs_pending", lambda value: exported.update(pending=value))
+    poller = JobPoller()
+    db: Session = counts_session_local()
+    poller._update_pending_jobs_gauge(db)
+
+    statements = []
+    listener = lambda _conn, _cursor, statement, *_args: statements.append(statement)
+    event.listen(counts_engine, "before_cursor_execute", listener)
+    try:
+        # Tick suivant dans l'intervalle des métriques de files : seuls les compteurs sont lus.
+        poller._update_pending_jobs_gauge(db)
+    finally:
+        event.remove(counts_engine, "before_cursor_execute", listener)
+        db.close()
+
+    assert exported["pending"] == 4
+    assert statements and all("FROM scheduled_jobs" not in statement for statement in statements)
+
+
+def test_health_snapshot_is_cached_for_one_poll_interval(monkeypatch, counts_session_local):
+    from app import main as main_module
+
+    monkeypatch.setattr(main_module, "_scheduler_snapshot_cache", {})
+    _seed(counts_session_local, "analysis", 1)
+    session: Session = counts_session_local()
+    now = datetime.now(timezone.utc)
+
+    first = main_module._cached_scheduler_snapshot(db=session, now=now)
+    _seed(counts_session_local, "analysis", 2)
+    assert main_module._cached_scheduler_snapshot(db=session, now=now) is first
+    assert first["pending"] == 1
+
+    main_module._scheduler_snapshot_cache["computed_at"] -= main_module.HEALTH_SNAPSHOT_MAX_AGE_SECONDS
+    refreshed = main_module._cached_scheduler_snapshot(db=session, now=now)
+    assert refreshed["pending"] == 3
+    session.close()
+
+
+def test_stale_health_snapshot_is_served_while_another_probe_refreshes(monkeypatch):
+    from app import main as main_module
+
+    previous = {"pending": 1}
+    monkeypatch.setattr(
+        main_module,
+        "_scheduler_snapshot_cache",
+        {"computed_at": time.monotonic() - main_module.HEALTH_SNAPSHOT_MAX_AGE_SECONDS, "snapshot": previous},
+    )
+    refreshing = threading.Event()
+    release = threading.Event()
+
+    def _slow_snapshot(db, now):
+        refreshing.set()
+        release.wait(5)
+        return {"pending": 2}
+
+    monkeypatch.setattr(main_module, "_scheduler_snapshot", _slow_snapshot)
+    now = datetime.now(timezone.utc)
+    results = []
+    refresher = threading.Thread(
+        target=lambda: results.append(main_module._cached_scheduler_snapshot(db=None, now=now))
+    )
+    refresher.start()
+    assert refreshing.wait(5)
+    # DB lente : les autres sondes ne font pas la queue derrière le recalcul.
+    started = time.monotonic()
+    assert main_module._cached_scheduler_snapshot(db=None, now=now) is previous
+    assert time.monotonic() - started < 1
+    release.set()
+    refresher.join(5)
+    assert results == [{"pending": 2}]
+    assert main_module._cached_scheduler_snapshot(db=None, now=now) == {"pending": 2}
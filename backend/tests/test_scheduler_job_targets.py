@@ -0,0 +1,202 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import ARRAY
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+
+from app.db.models.deployment import Deployment
+from app.db.models.project import Project
+from app.db.models.scheduled_job import ScheduledJob
+from app.scheduler.job_targets import clear_collect_target_cache, resolve_collect_target
+from app.scheduler.poller import JobPoller
+from app.scheduler.tasks import _compact_outbox_notifications, schedule_notification_outbox, schedule_post_collection
+
+
+@compiles(ARRAY, "sqlite")
+def _compile_array_for_sqlite(_type, _compiler, **_kwargs):
+    return "JSON"
+
+
+@pytest.fixture
+def targets_session_local(sqlite_session_factory):
+    clear_collect_target_cache()
+    SessionLocal = sqlite_session_factory(Project, Deployment, ScheduledJob)
+    try:
+        yield SessionLocal
+    finally:
+        clear_collect_target_cache()
+
+
+def _seed_project(session_local, *, secret: str = "secret-v1"):
+    session: Session = session_local()
+    project = Project(
+        name="checkout",
+        owner_id=uuid4(),
+        api_key=f"sp_{uuid4().hex}",
+        envs='["prod"]',  # ARRAY rendu en JSON sous SQLite : valeur déjà sérialisée
+        hmac_enabled=True,
+        hmac_secret=secret,
+        metrics_endpoint_active="https://app.example.test/ds-metrics",
+    )
+    session.add(project)
+    session.commit()
+    project_id = project.id
+    session.close()
+    return project_id
+
+
+def _rotate_secret(session_local, project_id, secret: str) -> None:
+    session: Session = session_local()
+    project = session.get(Project, project_id)
+    project.hmac_secret = secret
+    # CURRENT_TIMESTAMP SQLite est à la seconde : updated_at explicite pour changer de version.
+    project.updated_at = datetime.now(timezone.utc) + timedelta(seconds=5)
+    session.commit()
+    session.close()
+
+
+def test_collection_jobs_only_store_references(targets_session_local):
+    project_id = _seed_project(targets_session_local)
+    session: Session = targets_session_local()
+    schedule_post_collection(db=session, deployment_id=uuid4(), project_id=project_id, observation_window=3)
+
+    jobs = session.query(ScheduledJob).order_by(ScheduledJob.sequence_index).all()
+    assert [job.sequence_index for job in jobs] == [0, 1, 2]
+    assert all(job.job_metadata == {"project_id": str(project_id)} for job in jobs)
+    session.close()
+
+
+def test_collection_uses_the_current_secret_after_rotation(targets_session_local):
+    project_id = _seed_project(targets_session_local)
+    job = ScheduledJob(
+        id=uuid4(),
+        deployment_id=uuid4(),
+        job_type="post_collect",
+        # Ancienne ligne : secret copié au moment de la planification.
+        job_metadata={
+            "project_id": str(project_id),
+            "metrics_endpoint": "https://old.example.test/ds-metrics",
+            "use_hmac": True,
+            "hmac_secret": "secret-v1",
+        },
+    )
+
+    db: Session = targets_session_local()
+    first = resolve_collect_target(db, job)
+    assert (first.metrics_endpoint, first.use_hmac, first.secret) == (
+        "https://app.example.test/ds-metrics",
+        True,
+        "secret-v1",
+    )
+    assert resolve_collect_target(db, job) is first
+    db.close()
+
+    _rotate_secret(targets_session_local, project_id, "secret-v2")
+    db = targets_session_local()
+    assert resolve_collect_target(db, job).secret == "secret-v2"
+    db.close()
+
+
+def test_project_is_found_through_the_deployment_or_the_legacy_payload(targets_session_local):
+    project_id = _seed_project(targets_session_local)
+    session: Session = targets_session_local()
+    deployment = Deployment(deployment_number=1, project_id=project_id, env="prod", state="running")
+    session.add(deployment)
+    session.commit()
+
+    by_deployment = ScheduledJob(id=uuid4(), deployment_id=deployment.id, job_type="pre_collect", job_metadata={})
+    assert resolve_collect_target(session, by_deployment).project_id == str(project_id)
+
+    legacy = ScheduledJob(
+        id=uuid4(),
+        deployment_id=uuid4(),
+        job_type="pre_collect",
+        job_metadata={"metrics_endpoint": "https://legacy.example.test/ds-metrics", "use_hmac": False},
+    )
+    target = resolve_collect_target(session, legacy)
+    assert (target.project_id, target.metrics_endpoint, target.secret) == (
+        None,
+        "https://legacy.example.test/ds-metrics",
+        None,
+    )
+    session.close()
+
+
+def test_outbox_stores_shared_notification_fields_once(targets_session_local):
+    project_id, user_id = str(uuid4()), str(uuid4())
+    context = {"first_name": "Ada", "project_name": "checkout", "verdict": "warning"}
+    notifications = [
+        {
+            "channel": "email",
+            "payload": {
+                "user_id": user_id,
+                "to_email": "ada@example.test",
+                "email_type": email_type,
+                "dedupe_key": f"{email_type}:{project_id}",
+                "project_id": project_id,
+                "context": context,
+            },
+        }
+        for email_type in ("first_verdict_available", "critical_verdict_alert")
+    ] + [
+        {
+            "channel": "slack",
+            "payload": {
+                "user_id": user_id,
+                "project_id": project_id,
+                "notification_type": "critical_verdict_alert",
+                "dedupe_key": f"slack:critical_verdict_alert:{project_id}",
+                "message_text": "SeqPulse • Critical verdict",
+            },
+        }
+    ]
+
+    session: Session = targets_session_local()
+    job = schedule_notification_outbox(
+        db=session,
+        deployment_id=uuid4(),
+        dedupe_key="verdict_notifications:x",
+        notifications=notifications,
+        project_id=project_id,
+        user_id=user_id,
+    )
+
+    stored = session.get(ScheduledJob, job.id).job_metadata
+    assert stored["context"] == context
+    assert all(
+        not {"user_id", "project_id", "context"} & set(item["payload"]) for item in stored["notifications"]
+    )
+    rebuilt = [
+        (channel, adapter_job.job_metadata)
+        for _idx, channel, adapter_job in JobPoller()._iter_outbox_notifications(job)
+    ]
+    assert [channel for channel, _payload in rebuilt] == ["email", "email", "slack"]
+    # Le slack n'a pas de `context` : il ne récupère pas celui des emails.
+    assert [payload for _channel, payload in rebuilt] == [item["payload"] for item in notifications]
+    session.close()
+
+
+def test_outbox_compaction_round_trips_mixed_payloads():
+    project_id = str(uuid4())
+    context = {"verdict": "critical"}
+    notifications = [
+        {"channel": "email", "payload": {"user_id": "u-1", "project_id": project_id, "context": context}},
+        {"channel": "email", "payload": {"user_id": "u-2", "project_id": project_id, "context": context}},
+        {"channel": "slack", "payload": {"project_id": project_id, "message_text": "critical"}},
+        {"channel": "slack", "payload": {"project_id": None, "user_id": "u-1", "message_text": "legacy"}},
+    ]
+    metadata = {"project_id": project_id, "user_id": "u-1"}
+    metadata["notifications"] = _compact_outbox_notifications(metadata, notifications)
+
+    assert metadata["context"] == context
+    assert [item["shared_keys"] for item in metadata["notifications"]] == [
+        ["project_id", "user_id", "context"],
+        ["project_id", "context"],
+        ["project_id"],
+        ["user_id"],
+    ]
+    job = ScheduledJob(id=uuid4(), job_type="notification_outbox", job_metadata=metadata)
+    rebuilt = [adapter_job.job_metadata for _idx, _channel, adapter_job in JobPoller()._iter_outbox_notifications(job)]
+    assert rebuilt == [item["payload"] for item in notifications]
@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.db.models.scheduled_job import ScheduledJob
+from app.scheduler import poller as poller_module
+from app.scheduler.lanes import LANES, lane_for_job_type
+from app.scheduler.poller import JobPoller
+
+
+@pytest.fixture
+def lanes_session_local(sqlite_session_factory):
+    return sqlite_session_factory(ScheduledJob)
+
+
+def _seed(session_local, job_type: str, count: int, *, age_seconds: int) -> None:
+    now = datetime.now(timezone.utc)
+    session: Session = session_local()
+    session.add_all(
+        ScheduledJob(
+            deployment_id=uuid4(),
+            job_type=job_type,
+            scheduled_at=now - timedelta(seconds=age_seconds, milliseconds=idx),
+            status="pending",
+            job_metadata={"project_id": f"project-{job_type}-{idx}"},
+        )
+        for idx in range(count)
+    )
+    session.commit()
+    session.close()
+
+
+def _claim(poller: JobPoller, session_local, *, capacity: int) -> list:
+    db: Session = session_local()
+    try:
+        return poller._claim_due_jobs_by_lane(
+            db=db,
+            pool=SimpleNamespace(capacity=capacity),
+            free_slots=capacity,
+        )
+    finally:
+        db.close()
+
+
+def test_lanes_are_ordered_by_priority_and_map_job_types():
+    assert [lane.name for lane in LANES] == ["collection", "analysis", "notifications"]
+    assert lane_for_job_type("post_collect").name == "collection"
+    assert lane_for_job_type("slack_send").name == "notifications"
+    assert lane_for_job_type("unknown_type").name == "notifications"
+
+
+def test_email_backlog_does_not_starve_collection(lanes_session_local):
+    # Backlog d'emails plus ancien que les collectes : sans lanes, il prendrait tous les slots.
+    _seed(lanes_session_local, "email_send", 30, age_seconds=600)
+    _seed(lanes_session_local, "post_collect", 4, age_seconds=1)
+
+    claimed = _claim(JobPoller(), lanes_session_local, capacity=10)
+
+    by_type = {}
+    for job in claimed:
+        by_type[job.job_type] = by_type.get(job.job_type, 0) + 1
+    assert by_type == {"post_collect": 4, "email_send": 3}
+
+
+def test_collection_borrows_idle_capacity_but_notifications_do_not(lanes_session_local):
+    _seed(lanes_session_local, "post_collect", 20, age_seconds=5)
+
+    claimed = _claim(JobPoller(), lanes_session_local, capacity=10)
+    assert len(claimed) == 10
+    assert {job.job_type for job in claimed} == {"post_collect"}
+
+    db: Session = lanes_session_local()
+    db.query(ScheduledJob).delete()
+    db.commit()
+    db.close()
+    _seed(lanes_session_local, "email_send", 20, age_seconds=5)
+
+    claimed = _claim(JobPoller(), lanes_session_local, capacity=10)
+    assert len(claimed) == 3
+
+
+def test_in_flight_jobs_consume_lane_budget(lanes_session_local):
+    _seed(lanes_session_local, "email_send", 10, age_seconds=5)
+    poller = JobPoller()
+    for _ in range(3):
+        poller._track_owned_job(uuid4(), "notifications")
+
+    assert _claim(poller, lanes_session_local, capacity=10) == []
+    assert poller.lane_in_flight()["notifications"] == 3
+
+
+def test_lane_queue_depth_and_start_delay_are_exported(monkeypatch, lanes_session_local):
+    _seed(lanes_session_local, "email_send", 2, age_seconds=5)
+    _seed(lanes_session_local, "analysis", 1, age_seconds=5)
+    depths = {}
+    delays = []
+    monkeypatch.setattr(
+        poller_module,
+        "set_scheduler_lane_queue_depth",
+        lambda *, lane, depth: depths.__setitem__(lane, depth),
+    )
+    monkeypatch.setattr(
+        poller_module,
+        "observe_scheduler_lane_start_delay",
+        lambda *, lane, delay_seconds: delays.append((lane, delay_seconds)),
+    )
+    poller = JobPoller()
+
+    db: Session = lanes_session_local()
+    poller._update_pending_jobs_gauge(db)
+    db.close()
+    poller._begin_job_execution(
+        SimpleNamespace(
+            id=uuid4(),
+            deployment_id=None,
+            job_type="post_collect",
+            phase="post",
+            scheduled_at=datetime.now(timezone.utc) - timedelta(seconds=12),
+        )
+    )
+
+    assert depths == {"collection": 0, "analysis": 1, "notifications": 2}
+    assert delays[0][0] == "collection"
+    assert delays[0][1] >= 11
+
+
+def test_saturated_lane_does_not_trigger_immediate_wakeups(lanes_session_local):
+    _seed(lanes_session_local, "email_send", 5, age_seconds=5)
+    poller = JobPoller()
+    for _ in range(3):
+        poller._track_owned_job(uuid4(), "notifications")
+    pool = SimpleNamespace(capacity=10, free_slots=lambda: 7)
+
+    db: Session = lanes_session_local()
+    open_lanes = poller._lanes_with_capacity(pool)
+    assert "notifications" not in [lane.name for lane in open_lanes]
+    assert poller._next_pending_due_at(db, lanes=open_lanes) is None
+    assert poller._next_pending_due_at(db) is not None
+    db.close()
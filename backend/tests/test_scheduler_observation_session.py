@@ -0,0 +1,138 @@
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.db.models.scheduled_job import ScheduledJob
+from app.scheduler import deadlines as deadlines_module
+from app.scheduler import poller as poller_module
+from app.scheduler.poller import JobPoller
+from app.scheduler.retry_policies import retry_policy_for
+from app.scheduler.tasks import schedule_analysis, schedule_observation_session
+
+
+@pytest.fixture
+def session_local(monkeypatch, sqlite_session_factory):
+    monkeypatch.setattr(deadlines_module, "SCHEDULE_JITTER_SECONDS", 0.0)
+    SessionLocal = sqlite_session_factory(ScheduledJob)
+    return SessionLocal
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _schedule(session_local, *, window: int, started_ago_seconds: float = 0.0) -> tuple:
+    session: Session = session_local()
+    job = schedule_observation_session(
+        db=session,
+        deployment_id=uuid4(),
+        project_id=uuid4(),
+        observation_window=window,
+    )
+    if started_ago_seconds:
+        # Session démarrée dans le passé : le premier sample est dû.
+        metadata = dict(job.job_metadata)
+        started_at = datetime.fromisoformat(metadata["started_at"]) - timedelta(seconds=started_ago_seconds)
+        metadata["started_at"] = started_at.isoformat()
+        job.job_metadata = metadata
+        job.scheduled_at = started_at
+        job.deadline_at = deadlines_module.deadline_for("observation_session", started_at)
+        session.commit()
+    job_id, deployment_id = job.id, job.deployment_id
+    session.close()
+    return job_id, deployment_id
+
+
+def _run_due_sample(poller: JobPoller, session_local, error: Exception | None = None) -> list:
+    db: Session = session_local()
+    claimed = poller._claim_due_jobs(db=db, limit=5)
+    db.close()
+    for job in claimed:
+        run_db: Session = session_local()
+        poller._finish_job(run_db, job, time.perf_counter(), error=error)
+        run_db.close()
+    return claimed
+
+
+def _make_due(session_local, job_id) -> None:
+    db: Session = session_local()
+    job = db.get(ScheduledJob, job_id)
+    job.scheduled_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+    db.close()
+
+
+def test_observation_session_is_a_single_row(session_local):
+    job_id, _ = _schedule(session_local, window=15)
+
+    db: Session = session_local()
+    jobs = db.query(ScheduledJob).all()
+    assert [(job.id, job.job_type, job.sequence_index) for job in jobs] == [(job_id, "observation_session", 0)]
+    assert jobs[0].job_metadata["observation_window"] == 15
+    db.close()
+
+
+def test_session_advances_its_own_cursor_then_releases_analysis(session_local):
+    job_id, deployment_id = _schedule(session_local, window=2, started_ago_seconds=1)
+    session: Session = session_local()
+    schedule_analysis(db=session, deployment_id=deployment_id, delay_minutes=2)
+    session.close()
+    poller = JobPoller()
+
+    assert len(_run_due_sample(poller, session_local)) == 1
+    db: Session = session_local()
+    job = db.get(ScheduledJob, job_id)
+    started_at = _as_utc(datetime.fromisoformat(job.job_metadata["started_at"]))
+    assert (job.status, job.sequence_index, job.locked_by) == ("pending", 1, None)
+    assert _as_utc(job.scheduled_at) == started_at + timedelta(seconds=60)
+    assert db.query(ScheduledJob).filter(ScheduledJob.job_type == "observation_session").count() == 1
+    db.close()
+
+    _make_due(session_local, job_id)
+    assert len(_run_due_sample(poller, session_local)) == 1
+
+    db = session_local()
+    assert db.get(ScheduledJob, job_id).status == "completed"
+    analysis = db.query(ScheduledJob).filter(ScheduledJob.job_type == "analysis").one()
+    assert analysis.deployment_id == deployment_id
+    # Libérée à la fin de la session, sans attendre l'heure de repli (+2 min).
+    assert _as_utc(analysis.scheduled_at) <= datetime.now(timezone.utc)
+    db.close()
+
+
+def test_late_sample_shifts_the_rest_of_the_session(session_local):
+    job_id, _ = _schedule(session_local, window=3, started_ago_seconds=200)
+
+    _run_due_sample(JobPoller(), session_local)
+
+    db: Session = session_local()
+    job = db.get(ScheduledJob, job_id)
+    started_at = _as_utc(datetime.fromisoformat(job.job_metadata["started_at"]))
+    shift = job.job_metadata["shift_seconds"]
+    assert 199 <= shift <= 205
+    assert (_as_utc(job.scheduled_at) - started_at).total_seconds() == pytest.approx(60 + shift, abs=0.01)
+    db.close()
+
+
+def test_exhausted_sample_is_skipped_without_ending_the_session(monkeypatch, session_local):
+    job_id, _ = _schedule(session_local, window=3, started_ago_seconds=1)
+    failures = []
+    monkeypatch.setattr(poller_module, "inc_scheduler_jobs_failed", lambda: failures.append(1))
+    db: Session = session_local()
+    db.get(ScheduledJob, job_id).retry_count = retry_policy_for("observation_session").max_retries
+    db.commit()
+    db.close()
+
+    _run_due_sample(JobPoller(), session_local, error=RuntimeError("endpoint down"))
+
+    db = session_local()
+    job = db.get(ScheduledJob, job_id)
+    assert (job.status, job.sequence_index, job.retry_count) == ("pending", 1, 0)
+    assert "endpoint down" in job.last_error
+    assert failures == [1]
+    db.close()
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from app.db.models.scheduled_job import ScheduledJob
+from app.db.models.scheduled_job_archive import ScheduledJobArchive
+from app.scheduler import retention as retention_module
+from app.scheduler.retention import archive_terminal_jobs, purge_archived_jobs
+
+
+@pytest.fixture
+def retention_session_local(monkeypatch, sqlite_session_factory):
+    monkeypatch.setattr(
+        retention_module, "HOT_RETENTION_DAYS", {"completed": 7, "skipped": 7, "failed": 30}
+    )
+    SessionLocal = sqlite_session_factory(ScheduledJob, ScheduledJobArchive)
+    return SessionLocal
+
+
+def _seed(
+    session_local,
+    status: str,
+    *,
+    age_days: float,
+    finished_days_ago: float | None = None,
+    count: int = 1,
+    last_error: str | None = None,
+) -> list:
+    now = datetime.now(timezone.utc)
+    created_at = now - timedelta(days=age_days)
+    updated_at = created_at + timedelta(seconds=5) if finished_days_ago is None else now - timedelta(days=finished_days_ago)
+    session: Session = session_local()
+    jobs = [
+        ScheduledJob(
+            deployment_id=uuid4(),
+            job_type="post_collect",
+            scheduled_at=created_at,
+            status=status,
+            created_at=created_at,
+            updated_at=updated_at,
+            last_error=last_error,
+            job_metadata={"metrics_endpoint": "https://app.example.test/ds-metrics"},
+        )
+        for _ in range(count)
+    ]
+    session.add_all(jobs)
+    session.commit()
+    ids = [job.id for job in jobs]
+    session.close()
+    return ids
+
+
+def test_active_states_use_partial_indexes():
+    ddl = {
+        index.name: str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+        for index in ScheduledJob.__table__.indexes
+    }
+
+    assert "WHERE status = 'pending'" in ddl["ix_scheduled_jobs_pending_deadline_at"]
+    assert "WHERE status = 'running'" in ddl["ix_scheduled_jobs_running_lease_expires_at"]
+    assert "WHERE status IN ('completed', 'failed', 'skipped')" in ddl["ix_scheduled_jobs_terminal_status_updated_at"]
+    assert not any(name.startswith("ix_scheduled_jobs_status") for name in ddl)
+    assert "ix_scheduled_jobs_scheduled_at" not in ddl
+
+
+def test_terminal_jobs_past_their_hot_retention_are_archived(retention_session_local):
+    (old_completed,) = _seed(retention_session_local, "completed", age_days=8, last_error="x" * 2000)
+    (old_skipped,) = _seed(retention_session_local, "skipped", age_days=8)
+    (recent_failed,) = _seed(retention_session_local, "failed", age_days=8)
+    (old_failed,) = _seed(retention_session_local, "failed", age_days=31)
+    (recent_completed,) = _seed(retention_session_local, "completed", age_days=1)
+    (old_pending,) = _seed(retention_session_local, "pending", age_days=60)
+
+    db: Session = retention_session_local()
+    moved = archive_terminal_jobs(db, datetime.now(timezone.utc))
+
+    assert moved == {"completed": 1, "skipped": 1, "failed": 1}
+    assert {job.id for job in db.query(ScheduledJob).all()} == {recent_failed, recent_completed, old_pending}
+    archived = {row.id: row for row in db.query(ScheduledJobArchive).all()}
+    assert set(archived) == {old_completed, old_skipped, old_failed}
+    assert len(archived[old_completed].last_error) == retention_module.ARCHIVE_LAST_ERROR_CHARS
+    assert archived[old_completed].finished_at is not None
+    db.close()
+
+
+def test_terminal_jobs_age_from_the_end_of_their_run(retention_session_local):
+    # Créé il y a 40 jours (retries, report, longue observation) mais terminé hier.
+    (long_lived,) = _seed(retention_session_local, "completed", age_days=40, finished_days_ago=1)
+    (finished_long_ago,) = _seed(retention_session_local, "completed", age_days=40, finished_days_ago=8)
+
+    db: Session = retention_session_local()
+    assert archive_terminal_jobs(db, datetime.now(timezone.utc)) == {"completed": 1}
+    assert [job.id for job in db.query(ScheduledJob).all()] == [long_lived]
+    assert [row.id for row in db.query(ScheduledJobArchive).all()] == [finished_long_ago]
+    db.close()
+
+
+def test_archival_runs_in_bounded_batches(monkeypatch, retention_session_local):
+    monkeypatch.setattr(retention_module, "ARCHIVE_BATCH_SIZE", 2)
+    monkeypatch.setattr(retention_module, "ARCHIVE_MAX_BATCHES_PER_RUN", 2)
+    _seed(retention_session_local, "completed", age_days=10, count=5)
+
+    db: Session = retention_session_local()
+    now = datetime.now(timezone.utc)
+    assert archive_terminal_jobs(db, now) == {"completed": 4}
+    assert archive_terminal_jobs(db, now) == {"completed": 1}
+    assert db.query(ScheduledJob).count() == 0
+    db.close()
+
+
+def test_delete_mode_and_archive_purge(monkeypatch, retention_session_local):
+    monkeypatch.setattr(retention_module, "ARCHIVE_MODE", "delete")
+    monkeypatch.setattr(retention_module, "ARCHIVE_RETENTION_DAYS", 90)
+    _seed(retention_session_local, "completed", age_days=10, count=2)
+    now = datetime.now(timezone.utc)
+    db: Session = retention_session_local()
+    db.add_all(
+        ScheduledJobArchive(
+            id=uuid4(),
+            job_type="analysis",
+            status="completed",
+            retry_count=0,
+            scheduled_at=now - timedelta(days=age_days),
+            created_at=now - timedelta(days=age_days),
+        )
+        for age_days in (100, 10)
+    )
+    db.commit()
+
+    assert archive_terminal_jobs(db, now) == {"completed": 2}
+    assert purge_archived_jobs(db, now) == 1
+    assert db.query(ScheduledJob).count() == 0
+    assert [row.job_type for row in db.query(ScheduledJobArchive).all()] == ["analysis"]
+    db.close()
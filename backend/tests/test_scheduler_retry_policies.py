@@ -0,0 +1,50 @@
+import random
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.scheduler.deadlines import deadline_for
+from app.scheduler.retry_policies import RetryPolicy, planned_at, retry_policy_for
+
+
+def test_jittered_delay_never_precedes_the_nominal_backoff():
+    policy = RetryPolicy(backoff_seconds=(30.0, 120.0, 300.0), jitter_ratio=0.2)
+    rng = random.Random(7)
+
+    assert policy.max_retries == 3
+    for retry_count, base in [(0, 30.0), (1, 30.0), (2, 120.0), (3, 300.0), (50, 300.0)]:
+        delays = [policy.delay_seconds(retry_count, rng) for _ in range(50)]
+        assert all(base <= delay <= base * 1.2 for delay in delays)
+        # Des retries du même incident ne retombent pas tous sur la même seconde.
+        assert len({round(delay, 3) for delay in delays}) > 1
+
+
+def test_post_collect_retry_past_its_max_age_is_dropped():
+    policy = retry_policy_for("post_collect")
+    planned = datetime(2026, 6, 1, 12, 0, tzinfo=timezone.utc)
+    # scheduled_at réécrit par les retries : l'âge part de l'heure prévue (deadline_at − budget).
+    job = SimpleNamespace(
+        job_type="post_collect",
+        scheduled_at=planned + timedelta(minutes=3),
+        deadline_at=deadline_for("post_collect", planned),
+        created_at=planned - timedelta(minutes=10),
+    )
+
+    assert planned_at(job) == planned
+    assert policy.max_age_seconds is not None
+    assert not policy.too_old(planned_at(job), planned + timedelta(seconds=30))
+    assert policy.too_old(planned_at(job), planned + timedelta(minutes=5))
+    assert not retry_policy_for("unknown_type").too_old(planned, planned + timedelta(days=1))
+
+
+def test_stored_planned_at_wins_over_a_deadline_moved_by_retries():
+    planned = datetime(2026, 6, 1, 12, 0, tzinfo=timezone.utc)
+    retry_at = planned + timedelta(minutes=2)
+    job = SimpleNamespace(
+        job_type="post_collect",
+        scheduled_at=retry_at,
+        deadline_at=deadline_for("post_collect", retry_at),
+        planned_at=planned,
+        created_at=planned - timedelta(minutes=10),
+    )
+
+    assert planned_at(job) == planned
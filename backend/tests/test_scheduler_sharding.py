@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.db.models.scheduled_job import ScheduledJob
+from app.db.models.scheduler_worker import SchedulerWorker
+from app.scheduler import poller as poller_module
+from app.scheduler.poller import JobPoller
+from app.scheduler.sharding import SHARD_COUNT, assign_shards, shard_key_for_job
+
+
+@pytest.fixture
+def sharding_session_local(sqlite_session_factory):
+    return sqlite_session_factory(ScheduledJob, SchedulerWorker)
+
+
+def _register_pollers(session_local, pollers):
+    session: Session = session_local()
+    for poller in pollers:
+        poller._persist_heartbeat(session, force=True)
+    for poller in pollers:
+        poller._refresh_shard_assignment(session)
+    session.close()
+
+
+def test_shard_key_is_stable_and_groups_jobs_by_project():
+    project_id = uuid4()
+
+    assert shard_key_for_job(project_id=project_id, deployment_id=uuid4()) == shard_key_for_job(
+        project_id=str(project_id), deployment_id=uuid4()
+    )
+    assert 0 <= shard_key_for_job(deployment_id=uuid4()) < SHARD_COUNT
+    assert shard_key_for_job() is None
+
+
+def test_assign_shards_covers_every_shard_and_moves_little_on_leave():
+    workers = [f"worker-{idx}" for idx in range(4)]
+    assignment = assign_shards(workers, 256)
+
+    all_shards = [shard for shards in assignment.values() for shard in shards]
+    assert sorted(all_shards) == list(range(256))
+    assert all(40 <= len(shards) <= 90 for shards in assignment.values())
+
+    # Départ d'un worker : seuls ses shards changent de propriétaire.
+    after_leave = assign_shards(workers[:3], 256)
+    for worker_id in workers[:3]:
+        assert assignment[worker_id] <= after_leave[worker_id]
+    assert sum(len(shards) for shards in after_leave.values()) == 256
+
+
+def test_pollers_claim_disjoint_shards_and_keep_projects_on_one_worker(monkeypatch, sharding_session_local):
+    monkeypatch.setattr(poller_module, "SHARDING_ENABLED", True)
+    session: Session = sharding_session_local()
+    now = datetime.now(timezone.utc)
+    projects = [uuid4() for _ in range(20)]
+    for project_id in projects:
+        for offset in range(3):
+            session.add(
+                ScheduledJob(
+                    job_type="email_send",
+                    scheduled_at=now - timedelta(seconds=10 - offset),
+                    status="pending",
+                    shard_key=shard_key_for_job(project_id=project_id),
+                    job_metadata={"project_id": str(project_id)},
+                )
+            )
+    session.commit()
+    session.close()
+
+    first, second = JobPoller(role="worker"), JobPoller(role="worker")
+    _register_pollers(sharding_session_local, [first, second])
+
+    assert first.shard_members == second.shard_members
+    assert first.owned_shards.isdisjoint(second.owned_shards)
+    assert len(first.owned_shards | second.owned_shards) == SHARD_COUNT
+
+    claims = {}
+    for poller in (first, second):
+        db: Session = sharding_session_local()
+        claims[poller.worker_id] = poller._claim_due_jobs(db, limit=100)
+        db.close()
+
+    claimed_ids = [job.id for jobs in claims.values() for job in jobs]
+    assert len(claimed_ids) == len(set(claimed_ids)) == 60
+    owners_by_project = {}
+    for worker_id, jobs in claims.items():
+        for job in jobs:
+            owners_by_project.setdefault(job.job_metadata["project_id"], set()).add(worker_id)
+    assert all(len(owners) == 1 for owners in owners_by_project.values())
+
+
+def test_gained_shard_waits_for_previous_owner_running_jobs(monkeypatch, sharding_session_local):
+    monkeypatch.setattr(poller_module, "SHARDING_ENABLED", True)
+    poller = JobPoller(role="worker")
+    _register_pollers(sharding_session_local, [poller])
+    handed_over_shard = min(poller.owned_shards)
+
+    session: Session = sharding_session_local()
+    now = datetime.now(timezone.utc)
+    previous_owner_job = ScheduledJob(
+        job_type="email_send",
+        scheduled_at=now - timedelta(seconds=30),
+        status="running",
+        shard_key=handed_over_shard,
+        locked_by="departed-host:1:abcd",
+        lease_expires_at=now + timedelta(seconds=20),
+    )
+    next_job = ScheduledJob(
+        job_type="email_send",
+        scheduled_at=now - timedelta(seconds=5),
+        status="pending",
+        shard_key=handed_over_shard,
+    )
+    session.add_all([previous_owner_job, next_job])
+    session.commit()
+    previous_id, next_id = previous_owner_job.id, next_job.id
+    session.close()
+
+    db: Session = sharding_session_local()
+    assert poller._claim_due_jobs(db, limit=10) == []
+
+    db.query(ScheduledJob).filter(ScheduledJob.id == previous_id).update({"status": "completed"})
+    db.commit()
+    claimed = poller._claim_due_jobs(db, limit=10)
+    db.close()
+
+    assert [job.id for job in claimed] == [next_id]
+    assert handed_over_shard not in poller._handover_shards
@@ -0,0 +1,101 @@
+import random
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.scheduler import poller as poller_module
+from benchmarks.scheduler_simulation import (
+    DeploymentArrival,
+    HandlerProfile,
+    LatencyDistribution,
+    SchedulerSimulation,
+    VirtualClock,
+    build_sqlite_session_local,
+    synthetic_workload,
+)
+
+
+@pytest.fixture
+def simulation_session_local():
+    session_local, cleanup = build_sqlite_session_local()
+    try:
+        yield session_local
+    finally:
+        cleanup()
+
+
+def _fixed(seconds: float) -> HandlerProfile:
+    return HandlerProfile(LatencyDistribution.parse(f"fixed:{seconds}"))
+
+
+def test_virtual_clock_only_moves_the_running_job():
+    clock = VirtualClock()
+    start = clock.now()
+    seen = []
+
+    def _job():
+        clock.sleep(2.5)
+        seen.append(clock.now())
+
+    assert clock.measure(_job) == 2.5
+    assert seen == [start + timedelta(seconds=2.5)]
+    assert clock.now() == start
+    with pytest.raises(RuntimeError):
+        clock.sleep(1)
+    assert 1 <= LatencyDistribution.parse("uniform:1:3").sample(random.Random(0)) <= 3
+
+
+def test_simulated_hour_runs_the_full_deployment_pipeline(simulation_session_local):
+    workload = synthetic_workload(
+        duration_seconds=3600,
+        deployments_per_minute=1 / 3,
+        projects=4,
+        observation_window=3,
+        seed=7,
+    )
+
+    report = SchedulerSimulation(
+        session_local=simulation_session_local,
+        workload=workload,
+        observation_sessions=False,
+        notification_ratio=0.0,
+        seed=7,
+    ).run()
+
+    deployments = len(workload)
+    assert deployments > 10
+    assert report.simulated_seconds >= workload[-1].at_seconds
+    # 1 pre_collect + 3 post_collect + 1 analysis par déploiement, tous terminés.
+    assert report.final_status == {"completed": deployments * 5}
+    assert report.start_delay["analysis"]["count"] == deployments
+    # Capacité largement suffisante : aucun job ne démarre plus d'un intervalle de poll en retard.
+    assert report.start_delay["all"]["p99_s"] < poller_module.POLL_INTERVAL
+    assert all(summary["late"] == 0 for summary in report.tenants.values())
+    assert report.wall_seconds < report.simulated_seconds / 50
+
+
+def test_saturated_pool_shows_up_as_start_delay_and_per_tenant_lateness(simulation_session_local):
+    noisy, quiet = uuid4(), uuid4()
+    workload = [
+        DeploymentArrival(at_seconds=float(index), project_id=noisy, observation_window=1)
+        for index in range(8)
+    ] + [DeploymentArrival(at_seconds=8.0, project_id=quiet, observation_window=1)]
+
+    report = SchedulerSimulation(
+        session_local=simulation_session_local,
+        workload=workload,
+        handler_profiles={"collect": _fixed(15), "analysis": _fixed(1)},
+        max_concurrent_jobs=1,
+        observation_sessions=False,
+        notification_ratio=0.0,
+    ).run()
+
+    # 9 pre_collect de 15s sur un seul slot : la file dépasse le budget de retard (60s).
+    pre_collect = report.start_delay["pre_collect"]
+    assert pre_collect["count"] == 9
+    assert pre_collect["max_s"] >= 100
+    assert report.tenants[f"project:{noisy}"]["late"] > 0
+    # Fairness DRR : le projet calme passe avant la fin de la file du projet bruyant.
+    assert report.tenants[f"project:{quiet}"]["max_s"] < pre_collect["max_s"]
+    assert report.utilisation > 0.5
@@ -0,0 +1,138 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import httpx
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.db.models.scheduled_job import ScheduledJob
+from app.scheduler import poller as poller_module
+from app.scheduler import timeouts as timeouts_module
+from app.scheduler.poller import JobPoller
+from app.scheduler.timeouts import JobTimeout, JobWatchdog, failure_class, statement_timeout_ms
+
+
+@pytest.fixture
+def timeouts_session_local(monkeypatch, sqlite_session_factory):
+    SessionLocal = sqlite_session_factory(ScheduledJob)
+    monkeypatch.setattr(poller_module, "SessionLocal", SessionLocal)
+    return SessionLocal
+
+
+def _fetch_error(cause: Exception) -> ValueError:
+    # Même enchaînement que _raise_fetch_request_error : ValueError levée dans le except.
+    try:
+        raise cause
+    except Exception:
+        try:
+            raise ValueError("Failed to fetch metrics")
+        except ValueError as wrapped:
+            return wrapped
+
+
+def _wait_for_status(session_local, job_id, status: str, timeout: float = 3.0) -> ScheduledJob:
+    deadline = time.monotonic() + timeout
+    while True:
+        db: Session = session_local()
+        row = db.get(ScheduledJob, job_id)
+        db.close()
+        if row.status == status or time.monotonic() > deadline:
+            return row
+        time.sleep(0.02)
+
+
+def test_failure_class_separates_timeouts_from_errors():
+    query_canceled = OperationalError("SELECT 1", {}, SimpleNamespace(pgcode="57014"))
+
+    assert failure_class(JobTimeout(job_type="analysis", elapsed_seconds=2.0, timeout_seconds=1.0)) == "timeout"
+    assert failure_class(_fetch_error(httpx.ReadTimeout("read timed out"))) == "timeout"
+    assert failure_class(query_canceled) == "timeout"
+    assert failure_class(_fetch_error(httpx.ConnectError("refused"))) == "error"
+    assert failure_class(RuntimeError("boom")) == "error"
+
+
+def test_statement_timeout_is_capped_by_the_job_timeout(monkeypatch):
+    monkeypatch.setattr(timeouts_module, "STATEMENT_TIMEOUT_SECONDS", 30)
+    monkeypatch.setattr(timeouts_module, "JOB_TIMEOUT_SECONDS", {"pre_collect": 10, "analysis": 300})
+
+    assert statement_timeout_ms("pre_collect") == 10_000
+    assert statement_timeout_ms("analysis") == 30_000
+    monkeypatch.setattr(timeouts_module, "STATEMENT_TIMEOUT_SECONDS", 0)
+    assert statement_timeout_ms("analysis") == 0
+
+
+def test_watchdog_reports_each_overrun_once():
+    expired = []
+    watchdog = JobWatchdog(on_timeout=expired.append)
+    fast = watchdog.track(SimpleNamespace(id="fast", job_type="email_send"), timeout_seconds=60)
+    slow = watchdog.track(SimpleNamespace(id="slow", job_type="analysis"), timeout_seconds=1)
+
+    now = time.monotonic() + 2
+    assert watchdog.check(now) == [slow]
+    assert watchdog.check(now) == []
+    assert expired == [slow]
+    assert slow.timed_out.is_set() and not fast.timed_out.is_set()
+    with pytest.raises(JobTimeout):
+        slow.raise_if_timed_out()
+    assert watchdog.running() == 1
+
+
+def test_overrunning_job_is_requeued_with_backoff_and_its_slot_freed(monkeypatch, timeouts_session_local):
+    monkeypatch.setattr(timeouts_module, "JOB_TIMEOUT_SECONDS", {"analysis": 0.2})
+    session: Session = timeouts_session_local()
+    job = ScheduledJob(
+        deployment_id=uuid4(),
+        job_type="analysis",
+        scheduled_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+        status="pending",
+    )
+    session.add(job)
+    session.commit()
+    job_id = job.id
+    session.close()
+
+    hung = threading.Event()
+    release = threading.Event()
+
+    def _hung_run_job(_db, _job):
+        hung.set()
+        release.wait(timeout=5)
+
+    poller = JobPoller(max_concurrent_jobs=1)
+    monkeypatch.setattr(poller, "_run_job", _hung_run_job)
+    poller.watchdog = JobWatchdog(on_timeout=poller._on_job_timeout, interval_seconds=0.05)
+    poller.watchdog.start()
+    pool = poller._ensure_worker_pool()
+    try:
+        db: Session = timeouts_session_local()
+        claimed = poller._claim_due_jobs(db=db, limit=1)
+        poller._dispatch_claimed_jobs(db, claimed)
+        db.close()
+        assert hung.wait(timeout=2)
+
+        row = _wait_for_status(timeouts_session_local, job_id, "pending")
+        # Slot rendu alors que le handler est toujours bloqué.
+        assert pool.free_slots() == pool.capacity
+        assert not release.is_set()
+        assert poller.lane_in_flight() == {}
+
+        assert (row.status, row.retry_count, row.locked_by) == ("pending", 1, None)
+        assert row.last_error.startswith("JobTimeout")
+        scheduled_at = row.scheduled_at.replace(tzinfo=timezone.utc)
+        assert scheduled_at > datetime.now(timezone.utc) + timedelta(seconds=20)
+
+        # Le résultat tardif de l'exécution abandonnée n'écrase pas la remise en file.
+        release.set()
+        assert pool.wait_idle(timeout=2)
+        time.sleep(0.05)
+        db = timeouts_session_local()
+        assert db.get(ScheduledJob, job_id).status == "pending"
+        db.close()
+    finally:
+        release.set()
+        poller.watchdog.stop(timeout=1)
+        pool.stop(timeout=2)
@@ -0,0 +1,167 @@
+import asyncio
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.scheduler import poller as poller_module
+from app.scheduler import wakeup as wakeup_module
+from app.scheduler.poller import JobPoller
+from app.scheduler.wakeup import JobWakeupListener, notify_jobs_scheduled, parse_notification_payload
+
+
+class _FakeNotifyDB:
+    def __init__(self, dialect_name: str):
+        self._bind = SimpleNamespace(dialect=SimpleNamespace(name=dialect_name))
+        self.statements = []
+
+    def get_bind(self):
+        return self._bind
+
+    def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        return False
+
+    def execute(self, sql):
+        self._conn.executed.append(sql)
+
+
+class _FakeListenConnection:
+    """Connexion psycopg2 minimale : le socket sert de fd lisible pour add_reader."""
+
+    def __init__(self):
+        self.reader, self.writer = socket.socketpair()
+        self.reader.setblocking(False)
+        self.autocommit = False
+        self.executed = []
+        self.notifies = []
+        self._queued = []
+        self.closed = False
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def fileno(self):
+        return self.reader.fileno()
+
+    def push(self, payload: str):
+        self._queued.append(SimpleNamespace(channel="seqpulse_scheduled_jobs", payload=payload))
+        self.writer.send(b"x")
+
+    def poll(self):
+        try:
+            self.reader.recv(1024)
+        except BlockingIOError:
+            pass
+        self.notifies.extend(self._queued)
+        self._queued = []
+
+    def close(self):
+        self.closed = True
+        self.reader.close()
+        self.writer.close()
+
+
+def test_notify_jobs_scheduled_emits_pg_notify_on_postgres():
+    db = _FakeNotifyDB("postgresql")
+    scheduled_at = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+    notify_jobs_scheduled(db, scheduled_at)
+
+    assert len(db.statements) == 1
+    sql, params = db.statements[0]
+    assert "pg_notify" in sql
+    assert params["channel"] == "seqpulse_scheduled_jobs"
+    assert parse_notification_payload(params["payload"]) == scheduled_at
+
+
+def test_notify_jobs_scheduled_is_noop_outside_postgres(monkeypatch):
+    sqlite_db = _FakeNotifyDB("sqlite")
+    notify_jobs_scheduled(sqlite_db, datetime.now(timezone.utc))
+    assert sqlite_db.statements == []
+
+    monkeypatch.setattr(wakeup_module, "LISTEN_NOTIFY_ENABLED", False)
+    postgres_db = _FakeNotifyDB("postgresql")
+    notify_jobs_scheduled(postgres_db, datetime.now(timezone.utc))
+    assert postgres_db.statements == []
+
+
+def test_parse_notification_payload_tolerates_empty_and_invalid_values():
+    assert parse_notification_payload("") is None
+    assert parse_notification_payload(None) is None
+    assert parse_notification_payload("not-a-timestamp") is None
+
+
+def test_listener_forwards_notifications_from_dedicated_connection():
+    conn = _FakeListenConnection()
+    received = []
+
+    async def _scenario():
+        got_notification = asyncio.Event()
+
+        def _on_notify(scheduled_at):
+            received.append(scheduled_at)
+            if scheduled_at is not None:
+                got_notification.set()
+
+        listener = JobWakeupListener(on_notify=_on_notify, connection_factory=lambda: conn)
+        listener.start()
+        try:
+            conn.push("1772366400.000")
+            await asyncio.wait_for(got_notification.wait(), timeout=1.0)
+        finally:
+            listener.stop()
+
+    asyncio.run(_scenario())
+
+    assert conn.autocommit is True
+    assert conn.executed == ["LISTEN seqpulse_scheduled_jobs"]
+    # Premier appel à la connexion : tick forcé (notifications manquées pendant la coupure).
+    assert received[0] is None
+    assert received[1] == datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+    assert conn.closed is True
+
+
+def test_poller_wakes_immediately_when_due_job_is_notified(monkeypatch):
+    monkeypatch.setattr(poller_module, "POLL_INTERVAL", 30)
+    poller = JobPoller()
+    poller.running = True
+
+    async def _scenario():
+        poller._wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, poller._on_jobs_scheduled, datetime.now(timezone.utc))
+        started = time.perf_counter()
+        await asyncio.wait_for(poller._wait_for_next_tick(), timeout=2.0)
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(_scenario())
+    assert elapsed < 1.0
+
+
+def test_poller_sleeps_until_notified_future_job_is_due(monkeypatch):
+    monkeypatch.setattr(poller_module, "POLL_INTERVAL", 30)
+    poller = JobPoller()
+    poller.running = True
+
+    async def _scenario():
+        poller._wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        due_at = datetime.now(timezone.utc) + timedelta(seconds=0.3)
+        loop.call_later(0.05, poller._on_jobs_scheduled, due_at)
+        started = time.perf_counter()
+        await asyncio.wait_for(poller._wait_for_next_tick(), timeout=2.0)
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(_scenario())
+    assert 0.25 <= elapsed < 1.0
@@ -0,0 +1,174 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models.scheduled_job import ScheduledJob
+from app.db.models.scheduled_job_count import ScheduledJobCount
+from app.db.models.scheduled_job_dead_letter import ScheduledJobDeadLetter
+from app.db.models.scheduler_worker import SchedulerWorker
+from app.scheduler import poller as poller_module
+from app.scheduler.job_counts import install_job_count_triggers
+from app.scheduler.poller import JobPoller
+from app.scheduler.worker import build_poller, parse_args, run_worker
+
+
+@pytest.fixture
+def worker_session_local(sqlite_engine_factory):
+    engine = sqlite_engine_factory(ScheduledJob, SchedulerWorker, ScheduledJobCount, ScheduledJobDeadLetter)
+    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    with engine.begin() as connection:
+        install_job_count_triggers(connection)
+    return SessionLocal
+
+
+def test_parse_args_builds_worker_poller_with_overrides():
+    poller = build_poller(
+        parse_args(["--execution-mode", "async", "--max-concurrent-jobs", "3", "--async-max-in-flight", "250"])
+    )
+
+    assert poller.role == "worker"
+    assert poller.execution_mode == "async"
+    assert poller.max_concurrent_jobs == 3
+    assert poller.async_max_in_flight == 250
+
+
+def test_poller_defaults_follow_module_settings(monkeypatch):
+    poller = JobPoller()
+    monkeypatch.setattr(poller_module, "MAX_CONCURRENT_JOBS", 7)
+    monkeypatch.setattr(poller_module, "EXECUTION_MODE", "thread")
+
+    assert poller.role == "api"
+    assert poller.max_concurrent_jobs == 7
+    assert poller.execution_mode == "thread"
+
+
+def test_persist_heartbeat_upserts_single_row_and_throttles(monkeypatch, worker_session_local):
+    monkeypatch.setattr(poller_module, "HEARTBEAT_PERSIST_SECONDS", 60.0)
+    poller = JobPoller(role="worker")
+    session: Session = worker_session_local()
+
+    poller._persist_heartbeat(session)
+    first = session.get(SchedulerWorker, poller.worker_id)
+    first_heartbeat = first.heartbeat_at
+    assert first.role == "worker"
+    assert first.stopped_at is None
+
+    # Tick rapproché : pas de nouvelle écriture.
+    poller._persist_heartbeat(session)
+    session.expire_all()
+    assert session.get(SchedulerWorker, poller.worker_id).heartbeat_at == first_heartbeat
+
+    poller._persist_heartbeat(session, stopped=True, force=True)
+    session.expire_all()
+    row = session.get(SchedulerWorker, poller.worker_id)
+    assert row.stopped_at is not None
+    assert session.query(SchedulerWorker).count() == 1
+    session.close()
+
+
+def test_run_worker_publishes_heartbeat_then_marks_stopped(monkeypatch, worker_session_local):
+    monkeypatch.setattr(poller_module, "SessionLocal", worker_session_local)
+    monkeypatch.setattr(poller_module, "POLL_INTERVAL", 1)
+    poller = JobPoller(role="worker", max_concurrent_jobs=1)
+    seen_running = {}
+
+    async def _scenario():
+        stop_event = asyncio.Event()
+
+        async def _observe_then_stop():
+            for _ in range(100):
+                await asyncio.sleep(0.02)
+                session: Session = worker_session_local()
+                try:
+                    row = session.get(SchedulerWorker, poller.worker_id)
+                    if row is not None:
+                        seen_running["stopped_at"] = row.stopped_at
+                        break
+                finally:
+                    session.close()
+            stop_event.set()
+
+        await asyncio.gather(run_worker(poller, stop_event), _observe_then_stop())
+
+    asyncio.run(_scenario())
+
+    assert "stopped_at" in seen_running
+    assert seen_running["stopped_at"] is None
+    session: Session = worker_session_local()
+    row = session.get(SchedulerWorker, poller.worker_id)
+    assert row.stopped_at is not None
+    assert poller.running is False
+    session.close()
+
+
+def test_scheduler_health_reports_liveness_from_shared_heartbeat(worker_session_local):
+    from app import main as main_module
+
+    now = datetime.now(timezone.utc)
+    session: Session = worker_session_local()
+    session.add_all(
+        [
+            SchedulerWorker(
+                worker_id="worker-a:1:fresh",
+                hostname="worker-a",
+                pid=1,
+                role="worker",
+                execution_mode="async",
+                heartbeat_at=now - timedelta(seconds=5),
+            ),
+            SchedulerWorker(
+                worker_id="worker-b:2:stale",
+                hostname="worker-b",
+                pid=2,
+                role="worker",
+                execution_mode="thread",
+                heartbeat_at=now - timedelta(seconds=main_module.HEARTBEAT_STALE_SECONDS + 60),
+            ),
+            SchedulerWorker(
+                worker_id="worker-c:3:stopped",
+                hostname="worker-c",
+                pid=3,
+                role="worker",
+                execution_mode="thread",
+                heartbeat_at=now,
+                stopped_at=now,
+            ),
+            ScheduledJob(
+                job_type="analysis",
+                scheduled_at=now - timedelta(minutes=1),
+                status="running",
+                locked_by="worker-a:1:fresh",
+                lease_expires_at=now + timedelta(seconds=20),
+            ),
+            ScheduledJob(
+                job_type="analysis",
+                scheduled_at=now - timedelta(minutes=1),
+                status="running",
+                locked_by="worker-b:2:stale",
+                lease_expires_at=now - timedelta(seconds=5),
+            ),
+        ]
+    )
+    session.commit()
+
+    snapshot = main_module._scheduler_snapshot(db=session, now=now)
+
+    assert snapshot["db_query_ok"] is True
+    assert snapshot["poller_running"] is True
+    assert snapshot["heartbeat_fresh"] is True
+    assert snapshot["workers_alive"] == 1
+    assert [worker["worker_id"] for worker in snapshot["workers"]] == ["worker-a:1:fresh", "worker-b:2:stale"]
+    assert snapshot["workers"][1]["heartbeat_fresh"] is False
+    assert [worker["running_jobs"] for worker in snapshot["workers"]] == [1, 1]
+    assert [worker["shards_owned"] for worker in snapshot["workers"]] == [snapshot["shard_count"], 0]
+    assert snapshot["running"] == 2
+    assert snapshot["stuck_running"] == 1
+
+    session.query(SchedulerWorker).filter(SchedulerWorker.worker_id == "worker-a:1:fresh").delete()
+    session.commit()
+    degraded = main_module.scheduler_health(db=session)
+    assert degraded["status"] == "degraded"
+    assert degraded["checks"]["heartbeat_fresh"] is False
+    session.close()
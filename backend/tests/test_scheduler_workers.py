@@ -0,0 +1,144 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from app.scheduler import workers as workers_module
+from app.scheduler.workers import JobWorkerPool
+
+
+def _job(name: str):
+    return SimpleNamespace(id=name)
+
+
+def test_pool_accounts_for_busy_and_queued_slots(monkeypatch):
+    published = []
+    monkeypatch.setattr(
+        workers_module,
+        "set_scheduler_worker_slots",
+        lambda **kwargs: published.append(kwargs),
+    )
+    release = threading.Event()
+    started = threading.Event()
+
+    def _handler(_job):
+        started.set()
+        release.wait(timeout=5)
+
+    pool = JobWorkerPool(size=1, queue_size=1, handler=_handler)
+    pool.start()
+    try:
+        assert pool.free_slots() == 2
+        assert pool.submit(_job("a")) is True
+        assert started.wait(timeout=2)
+        assert pool.submit(_job("b")) is True
+        # Un worker occupé + un job en file : plus aucun slot.
+        assert pool.free_slots() == 0
+        assert pool.submit(_job("c")) is False
+        assert published[-1] == {"busy": 1, "idle": 0, "queued": 1}
+    finally:
+        release.set()
+        assert pool.wait_idle(timeout=5)
+        pool.stop(timeout=2)
+
+    assert published[-1] == {"busy": 0, "idle": 1, "queued": 0}
+
+
+def test_slow_job_does_not_block_other_workers():
+    slow_release = threading.Event()
+    finished = []
+    finished_lock = threading.Lock()
+
+    def _handler(job):
+        if job.id == "slow":
+            slow_release.wait(timeout=5)
+        with finished_lock:
+            finished.append(job.id)
+
+    pool = JobWorkerPool(size=2, handler=_handler)
+    pool.start()
+    try:
+        pool.submit(_job("slow"))
+        for name in ("fast-1", "fast-2", "fast-3"):
+            assert pool.submit(_job(name)) or _wait_then_submit(pool, _job(name))
+
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline:
+            with finished_lock:
+                if {"fast-1", "fast-2", "fast-3"} <= set(finished):
+                    break
+            time.sleep(0.01)
+
+        with finished_lock:
+            assert {"fast-1", "fast-2", "fast-3"} <= set(finished)
+            assert "slow" not in finished
+    finally:
+        slow_release.set()
+        assert pool.wait_idle(timeout=5)
+        pool.stop(timeout=2)
+
+
+def test_slot_freed_callback_and_handler_errors_do_not_kill_workers():
+    freed = []
+
+    def _handler(job):
+        if job.id == "boom":
+            raise RuntimeError("handler failure")
+
+    pool = JobWorkerPool(size=1, handler=_handler, on_slot_freed=lambda: freed.append(True))
+    pool.start()
+    try:
+        pool.submit(_job("boom"))
+        assert pool.wait_idle(timeout=2)
+        pool.submit(_job("ok"))
+        assert pool.wait_idle(timeout=2)
+    finally:
+        pool.stop(timeout=2)
+
+    assert len(freed) == 2
+
+
+def _wait_then_submit(pool: JobWorkerPool, job) -> bool:
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        if pool.submit(job):
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_detach_frees_the_slot_of_an_overrunning_job():
+    release = threading.Event()
+    started = threading.Event()
+    finished = []
+
+    def _handler(job):
+        if job.id == "hung":
+            started.set()
+            release.wait(timeout=5)
+        finished.append(job.id)
+
+    pool = JobWorkerPool(size=1, handler=_handler)
+    pool.start()
+    try:
+        assert pool.submit(_job("hung"))
+        assert started.wait(timeout=2)
+        assert pool.free_slots() == 0
+
+        assert pool.detach("hung") is True
+        assert pool.detach("hung") is False
+        # Slot rendu et thread remplacé : le job suivant démarre sans attendre le job bloqué.
+        assert pool.free_slots() == 1
+        assert pool.submit(_job("next"))
+        deadline = time.monotonic() + 2
+        while "next" not in finished and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert finished == ["next"]
+
+        # L'exécution détachée finit sans rendre une seconde fois son slot.
+        release.set()
+        assert pool.wait_idle(timeout=2)
+        time.sleep(0.05)
+        assert (pool.busy, pool.free_slots()) == (0, 1)
+    finally:
+        release.set()
+        pool.stop(timeout=2)